@@ -0,0 +1,100 @@
+"""
+Shared comment content validation for the Badminton Scheduler application.
+
+The model, the comment form and ValidationHelper apply the same three spam
+checks (blocked tokens, special-character ratio, repeated-character runs)
+with slightly different rules. CommentRules captures each rule set and
+compiles it once, so every check is a single linear-time regex scan instead
+of per-character Python loops.
+"""
+
+import re
+from typing import Iterable, Optional
+
+
+class CommentRules:
+    """A compiled set of comment spam rules."""
+
+    def __init__(self, blocked_tokens: Iterable[str], allowed_special: str = '',
+                 max_special_ratio: float = 0.3, max_run: int = 12,
+                 count_whitespace: bool = False, newline_runs: bool = True):
+        """
+        Args:
+            blocked_tokens: Lowercase substrings that reject the comment
+            allowed_special: Punctuation that does not count as special
+            max_special_ratio: Largest allowed share of special characters
+            max_run: Longest allowed run of one repeated character
+            count_whitespace: Whether whitespace (other than allowed_special) counts as special
+            newline_runs: Whether runs of newlines count as repeated characters
+        """
+        self.blocked_tokens = tuple(blocked_tokens)
+        self.max_special_ratio = max_special_ratio
+        self.max_run = max_run
+
+        self._token_re = re.compile('|'.join(re.escape(token) for token in self.blocked_tokens))
+
+        # A special character is anything that is not alphanumeric (str.isalnum
+        # is exactly \w without the underscore) and not otherwise allowed
+        allowed = re.escape(allowed_special) + ('' if count_whitespace else r'\s')
+        special_pattern = rf'[^\w{allowed}]'
+        if '_' not in allowed_special:
+            special_pattern += '|_'
+        self._special_re = re.compile(special_pattern)
+
+        self._run_re = re.compile(r'(.)\1{%d}' % max_run, re.DOTALL if newline_runs else 0)
+
+    def find_blocked_token(self, text: str) -> Optional[str]:
+        """Return the first blocked token found in text (case-insensitive)."""
+        match = self._token_re.search(text.lower())
+        return match.group(0) if match else None
+
+    def count_special(self, text: str) -> int:
+        """Count special characters in text."""
+        return self._special_re.subn('', text)[1]
+
+    def has_long_run(self, text: str) -> bool:
+        """Whether text repeats one character more than max_run times in a row."""
+        return self._run_re.search(text) is not None
+
+    def too_many_special(self, special_chars: int, text: str) -> bool:
+        """Whether the special character count exceeds the allowed ratio."""
+        return special_chars > len(text) * self.max_special_ratio
+
+
+def comment_spam_error(text: str, rules: CommentRules, check_tokens: bool = True) -> Optional[str]:
+    """
+    Validate comment text against a rule set.
+
+    Checks run in order of precedence (blocked tokens, special characters,
+    repeated characters) and stop at the first failure.
+
+    Returns:
+        str: Error message for the first failed check, or None if valid
+    """
+    if check_tokens and rules.find_blocked_token(text):
+        return "Comment contains invalid content"
+    if rules.too_many_special(rules.count_special(text), text):
+        return "Comment contains too many special characters"
+    if rules.has_long_run(text):
+        return "Comment contains invalid repeated characters"
+    return None
+
+
+# Rules enforced by the Comment model on every assignment to content
+MODEL_COMMENT_RULES = CommentRules(
+    blocked_tokens=('<script', 'javascript:', '<img', 'onclick=', 'onload=', 'onerror='),
+    max_run=12
+)
+
+# Rules enforced by CommentForm, which allows common punctuation
+FORM_COMMENT_RULES = CommentRules(
+    blocked_tokens=(
+        '<script', '</script>', 'javascript:', 'vbscript:',
+        'onload=', 'onerror=', 'onclick=', 'onmouseover=',
+        'onfocus=', 'onblur=', 'onchange=', 'onsubmit='
+    ),
+    allowed_special=" .,!?-_()[]{}:;\"'",
+    max_run=10,
+    count_whitespace=True,
+    newline_runs=False
+)
@@ -44,6 +44,112 @@ class Config:
     LOGIN_ATTEMPT_TIMEOUT = 300  # 5 minutes lockout after failed attempts
     MAX_LOGIN_ATTEMPTS = 3       # Maximum login attempts before lockout
     
+    # Password hashing (algorithm: pbkdf2, bcrypt or scrypt). Stored hashes made
+    # with other settings are upgraded on the user's next successful login.
+    PASSWORD_HASH_ALGORITHM = os.environ.get('PASSWORD_HASH_ALGORITHM') or 'pbkdf2'
+    PASSWORD_PBKDF2_ITERATIONS = 600000
+    PASSWORD_BCRYPT_ROUNDS = 12
+    PASSWORD_SCRYPT_N = 2 ** 15
+    PASSWORD_SCRYPT_R = 8
+    PASSWORD_SCRYPT_P = 1
+    PASSWORD_HASH_POOL_SIZE = int(os.environ.get('PASSWORD_HASH_POOL_SIZE', 0))  # 0 hashes on the request thread
+    
+    # Per-process cache of usernames with no account, checked before the
+    # database on login; accounts created in other workers show up after the TTL
+    LOGIN_UNKNOWN_USER_CACHE_TTL = 60
+    LOGIN_UNKNOWN_USER_CACHE_SIZE = 10000
+    
+    # Seconds a logged-in user's identity (id, username, role, status) is reused
+    # without a database lookup; changes made in other workers apply after this
+    USER_IDENTITY_CACHE_TTL = 30
+    
+    # Error metrics persistence (per-minute error counts, SQLite file)
+    ERROR_METRICS_DB = os.environ.get('ERROR_METRICS_DB') or 'logs/error_metrics.db'
+    ERROR_ALERT_INTERVAL = 30   # Seconds between background alert threshold checks
+    ERROR_ALERT_COOLDOWN = 900  # Seconds before a repeated alert is sent again
+    METRICS_EXPORT_INTERVAL = 60  # Seconds between metrics registry snapshots in the metrics log
+    
+    # Background maintenance scheduler
+    SCHEDULER_ENABLED = os.environ.get('SCHEDULER_ENABLED', 'true').lower() == 'true'
+    SCHEDULER_LOCK_FILE = os.environ.get('SCHEDULER_LOCK_FILE') or 'logs/maintenance.lock'
+    # Opt-in: archive availability dated before today minus this many days (None keeps
+    # everything in the availability table; the admin listing only shows live entries)
+    AVAILABILITY_ARCHIVE_AFTER_DAYS = None
+    
+    # /readyz reports ready while the latest health sample (database ping, pool,
+    # CPU, memory) is younger than HEALTH_SAMPLE_MAX_AGE seconds
+    HEALTH_SAMPLE_INTERVAL = 5
+    HEALTH_SAMPLE_MAX_AGE = 15
+    
+    # Sampling profiler behind /health/profile: defaults and hard caps that
+    # bound its overhead (rate, duration, stack depth, distinct stacks)
+    PROFILER_DEFAULT_HZ = 50
+    PROFILER_MAX_HZ = 250
+    PROFILER_DEFAULT_SECONDS = 10
+    PROFILER_MAX_SECONDS = 120
+    PROFILER_MAX_DEPTH = 64
+    PROFILER_MAX_STACKS = 5000
+    
+    # Memory diagnostics under /health/memory: tracemalloc traceback depth and
+    # snapshots kept per worker
+    MEMORY_TRACE_FRAMES = 1
+    MEMORY_MAX_SNAPSHOTS = 4
+    
+    # HTTP caching: conditional GET for page views (data versions shared by
+    # workers through marker files) and fingerprinted static asset URLs
+    HTTP_CONDITIONAL_GET = True
+    DATA_VERSION_DIR = os.environ.get('DATA_VERSION_DIR') or 'logs/data_versions'
+    STATIC_FINGERPRINT = True
+    STATIC_ASSET_MAX_AGE = 365 * 24 * 3600  # Fingerprinted files never change
+    
+    # Query result cache: expired results are served for up to this many seconds
+    # while one background refresh runs (0 disables), and results are refreshed
+    # early at random, the earlier the higher the beta (0 disables)
+    QUERY_CACHE_STALE_SECONDS = 30
+    QUERY_CACHE_EARLY_EXPIRY_BETA = 1.0
+    
+    # Estimated bytes each query cache namespace (key prefix such as
+    # 'availability_range') may hold before its oldest entries are dropped
+    QUERY_CACHE_NAMESPACE_BYTES = 8 * 1024 * 1024
+    QUERY_CACHE_NAMESPACE_BUDGETS = {
+        'availability_range': 32 * 1024 * 1024,  # Month views of ORM objects
+    }
+    
+    # Hot cached queries (see db_queries.WARMUP_REGISTRY) are refilled in the
+    # background after startup and after invalidations, batched per delay
+    CACHE_WARMUP_ENABLED = True
+    CACHE_WARMUP_DELAY = 1.0
+    CACHE_WARMUP_CONCURRENCY = 2
+    
+    # Seconds a rendered dashboard date card is reused (0 disables); availability
+    # writes for a date drop that date's cards at once
+    FRAGMENT_CACHE_TTL = 300
+    FRAGMENT_CACHE_MAX_ENTRIES = 2000
+    
+    # JSON API (/api/v1)
+    API_MAX_RANGE_DAYS = 92    # Longest date range one availability request may cover
+    API_GZIP_MIN_SIZE = 1024   # Smaller response bodies are sent uncompressed
+    
+    # Live dashboard updates (Server-Sent Events). Every open stream holds a
+    # server thread, so run a threaded server with room for SSE_MAX_CLIENTS
+    LIVE_UPDATES_DB = os.environ.get('LIVE_UPDATES_DB') or 'logs/live_updates.db'  # Shared by workers
+    LIVE_UPDATES_POLL_INTERVAL = 1.0  # Seconds between checks for other workers' changes
+    SSE_MAX_CLIENTS = 200             # Open streams per worker process
+    SSE_KEEPALIVE_SECONDS = 25
+    SSE_MAX_STREAM_SECONDS = 300      # Streams end after this and the browser reconnects
+    
+    # Production server (deploy.py serve): gunicorn prefork master with
+    # threaded workers; SERVER_WORKERS of None means 2 x CPU cores + 1
+    SERVER_BIND = os.environ.get('SERVER_BIND') or '127.0.0.1:5000'
+    SERVER_WORKERS = int(os.environ.get('WEB_CONCURRENCY', 0)) or None
+    SERVER_THREADS = int(os.environ.get('SERVER_THREADS', 8))
+    SERVER_MAX_REQUESTS = 2000        # Recycle workers to contain memory growth
+    SERVER_MAX_REQUESTS_JITTER = 200  # Spread recycling so workers don't restart together
+    SERVER_TIMEOUT = 60
+    SERVER_GRACEFUL_TIMEOUT = 30
+    SERVER_PIDFILE = os.environ.get('SERVER_PIDFILE')
+    SERVER_ACCESS_LOG = os.environ.get('SERVER_ACCESS_LOG')  # '-' for stdout
+    
     # Database performance and security (SQLite compatible)
     SQLALCHEMY_ENGINE_OPTIONS = {
         'pool_pre_ping': True,
@@ -136,6 +242,15 @@ class TestingConfig(Config):
     TESTING = True
     SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'
     WTF_CSRF_ENABLED = False  # Disable CSRF for testing
+    ERROR_METRICS_DB = None  # Keep error metrics in memory only
+    SCHEDULER_ENABLED = False  # No background threads in tests
+    PASSWORD_PBKDF2_ITERATIONS = 1000  # Cheap hashes keep the suite fast
+    USER_IDENTITY_CACHE_TTL = 0  # Tests bulk-delete users and reuse their IDs
+    DATA_VERSION_DIR = None  # Keep data versions in memory only
+    FRAGMENT_CACHE_TTL = 0  # Bulk-deleted test data would not invalidate fragments
+    QUERY_CACHE_STALE_SECONDS = 0  # Refresh expired query results inline, not in threads
+    CACHE_WARMUP_ENABLED = False  # In-memory SQLite is not visible to warm-up threads
+    LIVE_UPDATES_DB = None  # Publish live updates in-process only
     
     # Simplified database options for SQLite testing
     SQLALCHEMY_ENGINE_OPTIONS = {
@@ -145,4 +260,15 @@ class TestingConfig(Config):
             'check_same_thread': False,
             'timeout': 20
         }
-    }
\ No newline at end of file
+    }
+
+
+class BenchmarkConfig(TestingConfig):
+    """Load-testing configuration: testing shortcuts on a file database shared by threads."""
+    TESTING = False  # Report server errors as 500s instead of raising them
+    SQLALCHEMY_DATABASE_URI = os.environ.get('BENCHMARK_DATABASE_URL') or 'sqlite:///badminton_scheduler_benchmark.db'
+    PASSWORD_PBKDF2_ITERATIONS = Config.PASSWORD_PBKDF2_ITERATIONS  # Measure logins at production cost
+    USER_IDENTITY_CACHE_TTL = Config.USER_IDENTITY_CACHE_TTL
+    FRAGMENT_CACHE_TTL = Config.FRAGMENT_CACHE_TTL
+    QUERY_CACHE_STALE_SECONDS = Config.QUERY_CACHE_STALE_SECONDS
+    CACHE_WARMUP_ENABLED = Config.CACHE_WARMUP_ENABLED
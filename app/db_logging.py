@@ -13,6 +13,15 @@ from datetime import datetime
 from typing import Dict, Any, Optional
 from flask import Flask
 
+from .metrics import MetricsRegistry, metrics_registry
+
+
+# Database metric names shared by the collector and the performance monitor
+QUERY_DURATION_METRIC = 'db.query.duration'  # Histogram, by normalized query
+CONNECTION_EVENTS_METRIC = 'db.connection.events'  # Counter, by event type
+CONNECTION_GAUGES_METRIC = 'db.connections'  # Gauge: active, peak and pool settings
+CACHE_EVENTS_METRIC = 'db.cache.events'  # Counter, by event type
+
 
 class DatabasePerformanceLogger:
     """Custom logger for database performance metrics."""
@@ -166,6 +175,16 @@ class DatabasePerformanceLogger:
             }
             self.metrics_logger.info(json.dumps(metrics_data))
     
+    def log_metrics_snapshot(self, snapshot: Dict[str, Any]):
+        """Log a metrics registry snapshot (metrics log only; it is too large for the main log)."""
+        if self.metrics_logger:
+            metrics_data = {
+                'type': 'metrics_snapshot',
+                'timestamp': datetime.utcnow().isoformat(),
+                **snapshot
+            }
+            self.metrics_logger.info(json.dumps(metrics_data, default=str))
+    
     def log_performance_summary(self, summary: Dict[str, Any]):
         """Log periodic performance summary."""
         if self.logger:
@@ -207,129 +226,50 @@ class JsonFormatter(logging.Formatter):
 
 
 class PerformanceMetricsCollector:
-    """Collects and aggregates database performance metrics."""
+    """
+    Records database metrics in the metrics registry and exports registry
+    snapshots to the metrics log.
+    """
     
-    def __init__(self, logger: DatabasePerformanceLogger):
+    def __init__(self, logger: DatabasePerformanceLogger, registry: Optional[MetricsRegistry] = None):
         self.logger = logger
-        self.metrics_buffer = []
-        self.buffer_size = 100
-        self.last_flush = datetime.utcnow()
-        self.flush_interval = 300  # 5 minutes
+        self.registry = registry if registry is not None else metrics_registry
+        self.query_durations = self.registry.histogram(QUERY_DURATION_METRIC)
+        self.connection_events = self.registry.counter(CONNECTION_EVENTS_METRIC)
+        self.cache_events = self.registry.counter(CACHE_EVENTS_METRIC)
     
     def collect_query_metric(self, query: str, duration: float, **kwargs):
-        """Collect query performance metric."""
-        metric = {
-            'type': 'query',
-            'timestamp': datetime.utcnow().isoformat(),
-            'duration': duration,
-            'query_hash': hash(query) % 1000000,  # Simple query identifier
-            **kwargs
-        }
-        
-        self.metrics_buffer.append(metric)
-        self._check_flush()
+        """Collect query performance metric (query labels the series, so pass normalized SQL)."""
+        self.query_durations.observe(duration, query)
     
     def collect_connection_metric(self, event_type: str, **kwargs):
         """Collect connection pool metric."""
-        metric = {
-            'type': 'connection',
-            'timestamp': datetime.utcnow().isoformat(),
-            'event_type': event_type,
-            **kwargs
-        }
-        
-        self.metrics_buffer.append(metric)
-        self._check_flush()
+        self.connection_events.inc(label=event_type)
     
     def collect_cache_metric(self, event_type: str, **kwargs):
         """Collect cache performance metric."""
-        metric = {
-            'type': 'cache',
-            'timestamp': datetime.utcnow().isoformat(),
-            'event_type': event_type,
-            **kwargs
-        }
-        
-        self.metrics_buffer.append(metric)
-        self._check_flush()
-    
-    def _check_flush(self):
-        """Check if metrics buffer should be flushed."""
-        now = datetime.utcnow()
-        time_since_flush = (now - self.last_flush).total_seconds()
-        
-        if (len(self.metrics_buffer) >= self.buffer_size or 
-            time_since_flush >= self.flush_interval):
-            self.flush_metrics()
+        self.cache_events.inc(label=event_type)
     
     def flush_metrics(self):
-        """Flush metrics buffer to log."""
-        if not self.metrics_buffer:
+        """
+        Export a snapshot of the metrics registry to the metrics log.
+
+        Counters and histograms are cumulative since 'cumulative_since' (when
+        the registry was created), not per flush period.
+        """
+        snapshot = self.registry.snapshot()
+        if not any(snapshot.values()):
             return
         
-        # Aggregate metrics
-        aggregated = self._aggregate_metrics()
-        
-        # Log aggregated metrics
-        self.logger.log_performance_summary(aggregated)
-        
-        # Clear buffer
-        self.metrics_buffer.clear()
-        self.last_flush = datetime.utcnow()
-    
-    def _aggregate_metrics(self) -> Dict[str, Any]:
-        """Aggregate metrics from buffer."""
-        query_metrics = [m for m in self.metrics_buffer if m['type'] == 'query']
-        connection_metrics = [m for m in self.metrics_buffer if m['type'] == 'connection']
-        cache_metrics = [m for m in self.metrics_buffer if m['type'] == 'cache']
-        
-        aggregated = {
-            'period_start': self.last_flush.isoformat(),
-            'period_end': datetime.utcnow().isoformat(),
-            'total_metrics': len(self.metrics_buffer)
-        }
-        
-        # Aggregate query metrics
-        if query_metrics:
-            durations = [m['duration'] for m in query_metrics]
-            aggregated['queries'] = {
-                'count': len(query_metrics),
-                'avg_duration': sum(durations) / len(durations),
-                'max_duration': max(durations),
-                'min_duration': min(durations),
-                'slow_queries': len([d for d in durations if d > 0.1])
-            }
-        
-        # Aggregate connection metrics
-        if connection_metrics:
-            events = {}
-            for metric in connection_metrics:
-                event_type = metric['event_type']
-                events[event_type] = events.get(event_type, 0) + 1
-            
-            aggregated['connections'] = {
-                'events': events,
-                'total_events': len(connection_metrics)
-            }
-        
-        # Aggregate cache metrics
-        if cache_metrics:
-            hits = len([m for m in cache_metrics if m['event_type'] == 'hit'])
-            misses = len([m for m in cache_metrics if m['event_type'] == 'miss'])
-            total = hits + misses
-            
-            aggregated['cache'] = {
-                'hits': hits,
-                'misses': misses,
-                'hit_rate': hits / total if total > 0 else 0,
-                'total_operations': total
-            }
-        
-        return aggregated
+        self.logger.log_metrics_snapshot({
+            'cumulative_since': self.registry.created_at.isoformat(),
+            **snapshot
+        })
 
 
-# Global instance
+# Global instances
 db_performance_logger = DatabasePerformanceLogger()
+metrics_collector = PerformanceMetricsCollector(db_performance_logger)
 
 
 def init_db_logging(app: Flask):
@@ -340,4 +280,9 @@ def init_db_logging(app: Flask):
 
 def get_db_performance_logger() -> DatabasePerformanceLogger:
     """Get the database performance logger instance."""
-    return db_performance_logger
\ No newline at end of file
+    return db_performance_logger
+
+
+def get_metrics_collector() -> PerformanceMetricsCollector:
+    """Get the buffered performance metrics collector instance."""
+    return metrics_collector
\ No newline at end of file
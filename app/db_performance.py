@@ -5,52 +5,60 @@ This module provides comprehensive database performance monitoring, query optimi
 caching, and connection pooling for the badminton scheduler application.
 """
 
+import math
+import random
+import sys
 import time
 import logging
-from datetime import datetime, timedelta
+from datetime import date, datetime, time as dt_time, timedelta
 from functools import wraps
 from collections import defaultdict, deque
-from threading import Lock
+from threading import Event, Lock, Thread
 from typing import Dict, List, Optional, Any, Tuple
-from flask import g, current_app
+from flask import g, current_app, has_app_context, has_request_context
 from sqlalchemy import event, text
 from sqlalchemy.engine import Engine
 from sqlalchemy.pool import QueuePool
 import json
 import os
 
+from .db_logging import (CACHE_EVENTS_METRIC, CONNECTION_EVENTS_METRIC, CONNECTION_GAUGES_METRIC,
+                         QUERY_DURATION_METRIC)
+from .metrics import MetricsRegistry, metrics_registry
+
 # Performance monitoring logger
 perf_logger = logging.getLogger('database_performance')
 
 
 class DatabasePerformanceMonitor:
-    """Comprehensive database performance monitoring system."""
+    """
+    Comprehensive database performance monitoring system.
     
-    def __init__(self):
-        self.query_stats = defaultdict(lambda: {
-            'count': 0,
-            'total_time': 0.0,
-            'avg_time': 0.0,
-            'max_time': 0.0,
-            'min_time': float('inf'),
-            'recent_times': deque(maxlen=100),
-            'slow_queries': deque(maxlen=50)
-        })
-        self.connection_stats = {
-            'total_connections': 0,
-            'active_connections': 0,
-            'peak_connections': 0,
-            'connection_errors': 0,
-            'pool_size': 0,
-            'pool_overflow': 0
-        }
-        self.cache_stats = {
-            'hits': 0,
-            'misses': 0,
-            'hit_rate': 0.0,
-            'cache_size': 0
-        }
-        self._lock = Lock()
+    Query, connection and cache statistics are kept in a metrics registry
+    (per-thread shards, merged when read); only the recent slow queries are
+    kept here.
+    """
+    
+    # Cache event -> key in cache_stats
+    CACHE_EVENTS = {
+        'hit': 'hits',
+        'miss': 'misses',
+        'stale': 'stale_hits',
+        'coalesced': 'coalesced',
+        'early_refresh': 'early_refreshes',
+        'request_hit': 'request_hits',
+        'request_miss': 'request_misses',
+        'request': 'requests'
+    }
+    
+    def __init__(self, registry: Optional[MetricsRegistry] = None):
+        self.registry = registry if registry is not None else MetricsRegistry()
+        self.query_durations = self.registry.histogram(QUERY_DURATION_METRIC)
+        self.connection_events = self.registry.counter(CONNECTION_EVENTS_METRIC)
+        self.connection_gauges = self.registry.gauge(CONNECTION_GAUGES_METRIC)
+        self.cache_events = self.registry.counter(CACHE_EVENTS_METRIC)
+        self.slow_queries = deque(maxlen=200)
+        self._lock = Lock()  # Guards slow_queries
         self.slow_query_threshold = 0.1  # 100ms
         self.monitoring_enabled = True
     
@@ -59,134 +67,136 @@ class DatabasePerformanceMonitor:
         if not self.monitoring_enabled:
             return
         
-        with self._lock:
-            # Normalize query for grouping (remove specific values)
-            normalized_query = self._normalize_query(query)
-            
-            stats = self.query_stats[normalized_query]
-            stats['count'] += 1
-            stats['total_time'] += duration
-            stats['avg_time'] = stats['total_time'] / stats['count']
-            stats['max_time'] = max(stats['max_time'], duration)
-            stats['min_time'] = min(stats['min_time'], duration)
-            stats['recent_times'].append(duration)
+        # Normalize query for grouping (remove specific values)
+        normalized_query = self._normalize_query(query)
+        self.query_durations.observe(duration, normalized_query)
+        
+        # Track slow queries
+        if duration > self.slow_query_threshold:
+            slow_query_info = {
+                'query': query[:500],  # Truncate long queries
+                'duration': duration,
+                'timestamp': datetime.utcnow().isoformat(),
+                'params': str(params)[:200] if params else None
+            }
+            with self._lock:
+                self.slow_queries.append(slow_query_info)
             
-            # Track slow queries
-            if duration > self.slow_query_threshold:
-                slow_query_info = {
-                    'query': query[:500],  # Truncate long queries
-                    'duration': duration,
-                    'timestamp': datetime.utcnow().isoformat(),
-                    'params': str(params)[:200] if params else None
-                }
-                stats['slow_queries'].append(slow_query_info)
-                
-                # Log slow query
-                perf_logger.warning(
-                    f"Slow query detected: {duration:.3f}s - {query[:200]}..."
-                )
+            # Log slow query
+            perf_logger.warning(
+                f"Slow query detected: {duration:.3f}s - {query[:200]}..."
+            )
     
     def record_connection_event(self, event_type: str, **kwargs):
         """Record connection pool events."""
         if not self.monitoring_enabled:
             return
         
-        with self._lock:
-            if event_type == 'connect':
-                self.connection_stats['total_connections'] += 1
-                self.connection_stats['active_connections'] += 1
-                self.connection_stats['peak_connections'] = max(
-                    self.connection_stats['peak_connections'],
-                    self.connection_stats['active_connections']
-                )
-            elif event_type == 'disconnect':
-                self.connection_stats['active_connections'] = max(
-                    0, self.connection_stats['active_connections'] - 1
-                )
-            elif event_type == 'error':
-                self.connection_stats['connection_errors'] += 1
-            elif event_type == 'pool_info':
-                self.connection_stats.update(kwargs)
+        if event_type == 'pool_info':
+            for name, value in kwargs.items():
+                self.connection_gauges.set(value, name)
+            return
+        
+        self.connection_events.inc(label=event_type)
+        if event_type == 'connect':
+            active = self.connection_gauges.add(1, 'active')
+            self.connection_gauges.set_max(active, 'peak')
+        elif event_type == 'disconnect':
+            self.connection_gauges.add(-1, 'active', minimum=0)
     
     def record_cache_event(self, event_type: str):
         """Record cache hit/miss events."""
-        if not self.monitoring_enabled:
+        if self.monitoring_enabled and event_type in self.CACHE_EVENTS:
+            self.cache_events.inc(label=event_type)
+    
+    def record_request_memo(self, hits: int, misses: int):
+        """Record one request's use of its request-scoped (L1) memo."""
+        if not self.monitoring_enabled or not (hits or misses):
             return
         
-        with self._lock:
-            if event_type == 'hit':
-                self.cache_stats['hits'] += 1
-            elif event_type == 'miss':
-                self.cache_stats['misses'] += 1
-            
-            total = self.cache_stats['hits'] + self.cache_stats['misses']
-            if total > 0:
-                self.cache_stats['hit_rate'] = self.cache_stats['hits'] / total
+        self.cache_events.inc(hits, 'request_hit')
+        self.cache_events.inc(misses, 'request_miss')
+        self.cache_events.inc(label='request')
+    
+    @property
+    def cache_stats(self) -> Dict[str, Any]:
+        """Cache counters and hit rate."""
+        events = self.cache_events.values()
+        stats = {key: events.get(event_type, 0) for event_type, key in self.CACHE_EVENTS.items()}
+        
+        # Stale and coalesced results were served without running the query
+        served = stats['hits'] + stats['stale_hits'] + stats['coalesced']
+        total = served + stats['misses']
+        stats['hit_rate'] = served / total if total > 0 else 0.0
+        stats['cache_size'] = 0
+        return stats
+    
+    @property
+    def connection_stats(self) -> Dict[str, Any]:
+        """Connection counters, active and peak connections, and pool settings."""
+        events = self.connection_events.values()
+        gauges = self.connection_gauges.values()
+        stats = {
+            'total_connections': events.get('connect', 0),
+            'active_connections': gauges.pop('active', 0),
+            'peak_connections': gauges.pop('peak', 0),
+            'connection_errors': events.get('error', 0),
+            'pool_size': 0,
+            'pool_overflow': 0
+        }
+        stats.update(gauges)
+        return stats
     
     def get_performance_summary(self) -> Dict[str, Any]:
         """Get comprehensive performance summary."""
-        with self._lock:
-            # Calculate query statistics
-            total_queries = sum(stats['count'] for stats in self.query_stats.values())
-            total_query_time = sum(stats['total_time'] for stats in self.query_stats.values())
-            avg_query_time = total_query_time / total_queries if total_queries > 0 else 0
-            
-            # Find slowest queries
-            slowest_queries = []
-            for query, stats in self.query_stats.items():
-                if stats['count'] > 0:
-                    slowest_queries.append({
-                        'query': query[:200],
-                        'avg_time': stats['avg_time'],
-                        'max_time': stats['max_time'],
-                        'count': stats['count'],
-                        'total_time': stats['total_time']
-                    })
-            
-            slowest_queries.sort(key=lambda x: x['avg_time'], reverse=True)
-            
-            return {
-                'query_stats': {
-                    'total_queries': total_queries,
-                    'total_query_time': total_query_time,
-                    'avg_query_time': avg_query_time,
-                    'slowest_queries': slowest_queries[:10]
-                },
-                'connection_stats': dict(self.connection_stats),
-                'cache_stats': dict(self.cache_stats),
-                'monitoring_enabled': self.monitoring_enabled,
-                'slow_query_threshold': self.slow_query_threshold
+        query_stats = self.query_durations.stats()
+        
+        # Calculate query statistics
+        total_queries = sum(stats['count'] for stats in query_stats.values())
+        total_query_time = sum(stats['sum'] for stats in query_stats.values())
+        avg_query_time = total_query_time / total_queries if total_queries > 0 else 0
+        
+        # Find slowest queries
+        slowest_queries = [
+            {
+                'query': query[:200],
+                'avg_time': stats['mean'],
+                'max_time': stats['max'],
+                'p95_time': stats['p95'],
+                'count': stats['count'],
+                'total_time': stats['sum']
             }
+            for query, stats in query_stats.items()
+        ]
+        slowest_queries.sort(key=lambda x: x['avg_time'], reverse=True)
+        
+        return {
+            'query_stats': {
+                'total_queries': total_queries,
+                'total_query_time': total_query_time,
+                'avg_query_time': avg_query_time,
+                'slowest_queries': slowest_queries[:10]
+            },
+            'connection_stats': self.connection_stats,
+            'cache_stats': self.cache_stats,
+            'monitoring_enabled': self.monitoring_enabled,
+            'slow_query_threshold': self.slow_query_threshold
+        }
     
     def get_slow_queries(self, limit: int = 20) -> List[Dict]:
         """Get recent slow queries."""
-        slow_queries = []
         with self._lock:
-            for stats in self.query_stats.values():
-                slow_queries.extend(stats['slow_queries'])
+            slow_queries = list(self.slow_queries)
         
         # Sort by duration and return most recent
         slow_queries.sort(key=lambda x: x['duration'], reverse=True)
-        return list(slow_queries)[:limit]
+        return slow_queries[:limit]
     
     def reset_stats(self):
         """Reset all performance statistics."""
+        self.registry.reset('db.')
         with self._lock:
-            self.query_stats.clear()
-            self.connection_stats = {
-                'total_connections': 0,
-                'active_connections': 0,
-                'peak_connections': 0,
-                'connection_errors': 0,
-                'pool_size': 0,
-                'pool_overflow': 0
-            }
-            self.cache_stats = {
-                'hits': 0,
-                'misses': 0,
-                'hit_rate': 0.0,
-                'cache_size': 0
-            }
+            self.slow_queries.clear()
     
     def _normalize_query(self, query: str) -> str:
         """Normalize query for grouping by removing specific values."""
@@ -209,14 +219,97 @@ class DatabasePerformanceMonitor:
         return query
 
 
+# Values whose size is their own getsizeof()
+_ATOMIC_TYPES = (str, bytes, int, float, bool, type(None), date, datetime, dt_time, timedelta)
+
+# Framework objects reference the whole application (sessions, engines, apps);
+# they are counted shallowly, except for a pagination's page of items
+_OPAQUE_PACKAGES = ('sqlalchemy', 'flask', 'flask_sqlalchemy', 'werkzeug')
+
+
+def estimate_size(value: Any, max_objects: int = 100000) -> int:
+    """
+    Approximate the bytes retained by a cached value.
+    
+    Walks containers and the loaded attributes of ORM objects, counting each
+    object once, so a user shared by many availability entries is not
+    counted per entry.
+    
+    Args:
+        value: Cached query result
+        max_objects: Stop walking after this many objects (bounds the cost)
+    
+    Returns:
+        int: Estimated size in bytes
+    """
+    seen = set()
+    stack = [value]
+    size = 0
+    while stack and len(seen) < max_objects:
+        obj = stack.pop()
+        if id(obj) in seen:
+            continue
+        seen.add(id(obj))
+        size += sys.getsizeof(obj, 64)
+        
+        if isinstance(obj, _ATOMIC_TYPES):
+            continue
+        if isinstance(obj, dict):
+            stack.extend(obj.keys())
+            stack.extend(obj.values())
+        elif isinstance(obj, (list, tuple, set, frozenset, deque)):
+            stack.extend(obj)
+        elif type(obj).__module__.split('.')[0] in _OPAQUE_PACKAGES:
+            items = getattr(obj, 'items', None)
+            if isinstance(items, list):
+                stack.append(items)
+        elif hasattr(obj, '__dict__'):
+            state = getattr(obj, '_sa_instance_state', None)
+            size += sys.getsizeof(obj.__dict__)
+            if state is not None:
+                size += sys.getsizeof(state)
+            stack.extend(item for name, item in vars(obj).items() if name != '_sa_instance_state')
+    return size
+
+
+def cache_namespace(key: str) -> str:
+    """Namespace of a cache key: its leading words before the first argument (e.g. 'availability_range')."""
+    words = []
+    for word in key.split('_'):
+        if not word or word[0].isdigit() or word in ('None', 'True', 'False'):
+            break
+        words.append(word)
+    return '_'.join(words) or key
+
+
 class QueryCache:
-    """Simple in-memory query result cache with TTL support."""
+    """
+    Simple in-memory query result cache with TTL support.
+
+    Entries may be kept for a stale window after their TTL so that callers can
+    serve the old result while it is being recomputed (see lookup()).
+
+    Each entry's retained size is estimated when it is stored and charged to
+    its key's namespace; a namespace over its byte budget drops its oldest
+    entries, so one namespace of large results cannot crowd out the rest.
+    """
     
-    def __init__(self, max_size: int = 1000, default_ttl: int = 300):
+    def __init__(self, max_size: int = 1000, default_ttl: int = 300,
+                 namespace_budget: Optional[int] = None,
+                 namespace_budgets: Optional[Dict[str, int]] = None):
         self.cache = {}
         self.timestamps = {}
         self.max_size = max_size
         self.default_ttl = default_ttl
+        self.namespace_budget = namespace_budget  # Bytes per namespace (None = unlimited)
+        self.namespace_budgets = dict(namespace_budgets or {})  # Per-namespace overrides
+        self.sizes: Dict[str, int] = {}
+        self.namespace_bytes: Dict[str, int] = defaultdict(int)
+        self.evictions: Dict[str, int] = defaultdict(int)
+        self.rejected: Dict[str, int] = defaultdict(int)
+        # Bumped by every invalidation, so results computed before a write
+        # are not stored after it (see set())
+        self.generation = 0
         self._lock = Lock()
     
     def get(self, key: str) -> Optional[Any]:
@@ -227,14 +320,80 @@ class QueryCache:
             
             # Check if expired
             if self._is_expired(key):
-                self._remove(key)
+                if self._is_expired(key, include_stale=True):
+                    self._remove(key)
                 return None
             
             return self.cache[key]
     
-    def set(self, key: str, value: Any, ttl: Optional[int] = None) -> None:
-        """Cache a result with optional TTL."""
+    def lookup(self, key: str, early_expiry_beta: float = 0.0) -> Tuple[Optional[Any], str]:
+        """
+        Get a cached result together with its freshness.
+        
+        Args:
+            key: Cache key
+            early_expiry_beta: Weight of probabilistic early expiration (0 disables);
+                               results that took longer to compute are refreshed earlier
+        
+        Returns:
+            tuple: (value, state) where state is 'fresh', 'refresh' (still valid but
+                   picked for early recomputation), 'stale' (expired but within its
+                   stale window) or 'miss'
+        """
         with self._lock:
+            if key not in self.cache:
+                return None, 'miss'
+            
+            if self._is_expired(key):
+                if self._is_expired(key, include_stale=True):
+                    self._remove(key)
+                    return None, 'miss'
+                return self.cache[key], 'stale'
+            
+            info = self.timestamps[key]
+            if early_expiry_beta > 0 and info['compute_time'] > 0:
+                # XFetch: -log(u) is exponentially distributed, so each reader
+                # recomputes with a probability that rises sharply near expiry
+                expires = info['created'] + info['ttl']
+                gap = info['compute_time'] * early_expiry_beta * -math.log(1.0 - random.random())
+                if time.time() + gap >= expires:
+                    return self.cache[key], 'refresh'
+            
+            return self.cache[key], 'fresh'
+    
+    def set(self, key: str, value: Any, ttl: Optional[int] = None, stale_ttl: int = 0,
+            compute_time: float = 0.0, generation: Optional[int] = None) -> bool:
+        """
+        Cache a result with optional TTL.
+        
+        Args:
+            key: Cache key
+            value: Result to cache
+            ttl: Seconds the result is fresh (default_ttl if not given)
+            stale_ttl: Seconds the result is kept after expiring, for stale serving
+            compute_time: Seconds the query took (drives early expiration)
+            generation: Cache generation read before the query ran; the result is
+                        dropped if the cache was invalidated since
+        
+        Returns:
+            bool: True if the result was stored
+        """
+        namespace = cache_namespace(key)
+        budget = self.budget_for(namespace)
+        size = estimate_size(value) if budget is not None else 0
+        
+        with self._lock:
+            if generation is not None and generation != self.generation:
+                return False
+            
+            self._remove(key)
+            if budget is not None:
+                if size > budget:
+                    # Larger than its whole namespace; caching it would evict everything
+                    self.rejected[namespace] += 1
+                    return False
+                self._make_room(namespace, size, budget)
+            
             # Clean up if cache is full
             if len(self.cache) >= self.max_size:
                 self._cleanup_expired()
@@ -243,7 +402,7 @@ class QueryCache:
                 if len(self.cache) >= self.max_size:
                     oldest_keys = sorted(
                         self.timestamps.keys(),
-                        key=lambda k: self.timestamps[k]
+                        key=lambda k: self.timestamps[k]['created']
                     )[:self.max_size // 4]  # Remove 25% of entries
                     
                     for old_key in oldest_keys:
@@ -252,15 +411,27 @@ class QueryCache:
             self.cache[key] = value
             self.timestamps[key] = {
                 'created': time.time(),
-                'ttl': ttl or self.default_ttl
+                'ttl': ttl or self.default_ttl,
+                'stale': stale_ttl,
+                'compute_time': compute_time
             }
+            self.sizes[key] = size
+            self.namespace_bytes[namespace] += size
+            return True
+    
+    def budget_for(self, namespace: str) -> Optional[int]:
+        """Byte budget of a namespace (None if unlimited)."""
+        return self.namespace_budgets.get(namespace, self.namespace_budget)
     
     def invalidate(self, pattern: Optional[str] = None) -> None:
         """Invalidate cache entries matching pattern or all if no pattern."""
         with self._lock:
+            self.generation += 1
             if pattern is None:
                 self.cache.clear()
                 self.timestamps.clear()
+                self.sizes.clear()
+                self.namespace_bytes.clear()
             else:
                 import re
                 regex = re.compile(pattern)
@@ -271,46 +442,151 @@ class QueryCache:
                 for key in keys_to_remove:
                     self._remove(key)
     
+    def cleanup_expired(self) -> int:
+        """Remove all expired entries and return how many were dropped."""
+        with self._lock:
+            before = len(self.cache)
+            self._cleanup_expired()
+            return before - len(self.cache)
+    
     def get_stats(self) -> Dict[str, Any]:
-        """Get cache statistics."""
+        """Get cache statistics, including estimated memory per namespace."""
         with self._lock:
+            namespaces = defaultdict(lambda: {'entries': 0, 'bytes': 0})
+            for key in self.cache:
+                namespace = namespaces[cache_namespace(key)]
+                namespace['entries'] += 1
+                namespace['bytes'] += self.sizes.get(key, 0)
+            for name in set(self.evictions) | set(self.rejected):
+                namespaces[name]  # Also list namespaces that are empty now
+            for name, namespace in namespaces.items():
+                namespace['budget'] = self.budget_for(name)
+                namespace['evictions'] = self.evictions.get(name, 0)
+                namespace['rejected'] = self.rejected.get(name, 0)
+            
             return {
                 'size': len(self.cache),
                 'max_size': self.max_size,
-                'default_ttl': self.default_ttl
+                'default_ttl': self.default_ttl,
+                'stale': sum(1 for key in self.cache if self._is_expired(key)),
+                'bytes': sum(self.sizes.values()),
+                'namespace_budget': self.namespace_budget,
+                'namespaces': dict(sorted(namespaces.items()))
             }
     
-    def _is_expired(self, key: str) -> bool:
-        """Check if cache entry is expired."""
+    def _is_expired(self, key: str, include_stale: bool = False) -> bool:
+        """Check if cache entry is expired (or past its stale window, if include_stale)."""
         if key not in self.timestamps:
             return True
         
         timestamp_info = self.timestamps[key]
         age = time.time() - timestamp_info['created']
-        return age > timestamp_info['ttl']
+        lifetime = timestamp_info['ttl']
+        if include_stale:
+            lifetime += timestamp_info['stale']
+        return age > lifetime
     
     def _remove(self, key: str) -> None:
         """Remove entry from cache."""
         self.cache.pop(key, None)
         self.timestamps.pop(key, None)
+        size = self.sizes.pop(key, None)
+        if size is not None:
+            namespace = cache_namespace(key)
+            self.namespace_bytes[namespace] -= size
+            if not self.namespace_bytes[namespace]:
+                del self.namespace_bytes[namespace]
+    
+    def _make_room(self, namespace: str, size: int, budget: int) -> None:
+        """Drop a namespace's expired, then oldest, entries until size more bytes fit its budget."""
+        if self.namespace_bytes.get(namespace, 0) + size <= budget:
+            return
+        
+        keys = sorted(
+            (key for key in self.cache if cache_namespace(key) == namespace),
+            key=lambda k: (not self._is_expired(k), self.timestamps[k]['created'])
+        )
+        for key in keys:
+            if self.namespace_bytes.get(namespace, 0) + size <= budget:
+                break
+            self._remove(key)
+            self.evictions[namespace] += 1
     
     def _cleanup_expired(self) -> None:
-        """Remove expired entries."""
+        """Remove entries past their stale window."""
         expired_keys = [
             key for key in self.cache.keys()
-            if self._is_expired(key)
+            if self._is_expired(key, include_stale=True)
         ]
         for key in expired_keys:
             self._remove(key)
 
 
+class RequestMemo:
+    """
+    Request-scoped (L1) memo of cached query results, kept on flask.g.
+    
+    Repeated calls of a cached query within one request are answered from
+    here, so the shared QueryCache (and its lock) is consulted at most once
+    per key per request.
+    """
+    
+    def __init__(self):
+        self.results: Dict[str, Any] = {}
+        self.hits = 0
+        self.misses = 0
+    
+    def get_or_load(self, key: str, load):
+        """Return the memoized result for key, calling load() on the first use."""
+        if key in self.results:
+            self.hits += 1
+            return self.results[key]
+        
+        self.misses += 1
+        result = self.results[key] = load()
+        return result
+    
+    def invalidate(self, pattern: Optional[str] = None) -> None:
+        """Forget results matching pattern, or all of them if no pattern."""
+        if pattern is None:
+            self.results.clear()
+            return
+        import re
+        regex = re.compile(pattern)
+        for key in [key for key in self.results if regex.search(key)]:
+            del self.results[key]
+
+
+def get_request_memo() -> Optional[RequestMemo]:
+    """The current request's L1 memo, or None outside a request."""
+    if not has_request_context():
+        return None
+    memo = g.get('_query_memo')
+    if memo is None:
+        memo = g._query_memo = RequestMemo()
+    return memo
+
+
+class _Flight:
+    """A cache fill in progress, shared by the callers waiting for its result."""
+    
+    def __init__(self):
+        self.done = Event()
+        self.result = None
+        self.stored = False
+
+
 class DatabaseOptimizer:
     """Database query optimization and indexing utilities."""
     
-    def __init__(self, db):
+    def __init__(self, db, registry: Optional[MetricsRegistry] = None):
         self.db = db
-        self.monitor = DatabasePerformanceMonitor()
+        self.monitor = DatabasePerformanceMonitor(registry)
         self.cache = QueryCache()
+        # Cache fills in progress by key (single flight)
+        self._flights: Dict[str, _Flight] = {}
+        self._flights_lock = Lock()
+        self.flight_wait_timeout = 10.0  # Seconds a caller waits for another's fill
     
     def add_performance_indexes(self):
         """Add performance indexes for frequently queried fields."""
@@ -348,13 +624,6 @@ class DatabaseOptimizer:
                         'columns': ['user_id', 'date', 'start_time'],
                         'description': 'Optimize user-specific availability queries'
                     },
-                    {
-                        'name': 'idx_availability_future_dates',
-                        'table': 'availability',
-                        'columns': ['date'],
-                        'where': 'date >= date("now")',
-                        'description': 'Optimize future availability queries'
-                    },
                     
                     # Comments table indexes
                     {
@@ -386,6 +655,16 @@ class DatabaseOptimizer:
                     }
                 ]
                 
+                # Drop indexes that are no longer useful. The partial future-dates
+                # index baked in the date("now") of its creation time; past rows are
+                # now archived out of the availability table instead.
+                obsolete_indexes = ['idx_availability_future_dates']
+                for index_name in obsolete_indexes:
+                    if index_name in existing_indexes:
+                        conn.execute(text(f"DROP INDEX IF EXISTS {index_name}"))
+                        conn.commit()
+                        perf_logger.info(f"Dropped obsolete index: {index_name}")
+                
                 # Add indexes that don't already exist
                 added_indexes = []
                 for index_def in performance_indexes:
@@ -457,57 +736,149 @@ class DatabaseOptimizer:
             return False
     
     def setup_query_monitoring(self, app):
-        """Set up SQLAlchemy event listeners for query monitoring."""
-        
-        @event.listens_for(Engine, "before_cursor_execute")
-        def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
-            """Record query start time."""
-            context._query_start_time = time.time()
-        
-        @event.listens_for(Engine, "after_cursor_execute")
-        def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
-            """Record query completion and statistics."""
-            if hasattr(context, '_query_start_time'):
-                duration = time.time() - context._query_start_time
-                self.monitor.record_query(statement, duration, parameters)
-        
-        @event.listens_for(Engine, "connect")
-        def engine_connect(dbapi_conn, connection_record):
-            """Record connection events."""
-            self.monitor.record_connection_event('connect')
-        
-        @event.listens_for(Engine, "close")
-        def engine_close(dbapi_conn, connection_record):
-            """Record connection close events."""
-            self.monitor.record_connection_event('disconnect')
+        """
+        Set up SQLAlchemy event listeners for query monitoring.
+        
+        The listeners are registered once on the Engine class and report to
+        the current global optimizer, so creating another app (or reloading
+        one) does not stack them.
+        """
+        for name, listener in _ENGINE_LISTENERS:
+            if not event.contains(Engine, name, listener):
+                event.listen(Engine, name, listener)
         
         perf_logger.info("Database query monitoring enabled")
     
     def cached_query(self, cache_key: str, query_func, ttl: Optional[int] = None):
-        """Execute query with caching support."""
-        # Try to get from cache first
-        cached_result = self.cache.get(cache_key)
-        if cached_result is not None:
+        """
+        Execute query with caching support.
+        
+        A key never expires for everyone at once:
+        
+        - Concurrent misses are coalesced: one caller runs the query and the
+          others wait for its result (single flight).
+        - Expired results are kept for QUERY_CACHE_STALE_SECONDS and served
+          while one background thread refreshes them (stale-while-revalidate).
+        - Results are refreshed at random shortly before they expire, earlier
+          for slower queries (QUERY_CACHE_EARLY_EXPIRY_BETA).
+        """
+        stale_ttl, beta = self._cache_settings()
+        cached_result, state = self.cache.lookup(cache_key, beta)
+        if state == 'fresh':
             self.monitor.record_cache_event('hit')
             return cached_result
         
+        flight, leader = self._join_flight(cache_key)
+        
+        if state != 'miss':
+            # A usable result exists; only the flight leader refreshes it
+            self.monitor.record_cache_event('stale' if state == 'stale' else 'hit')
+            if not leader:
+                return cached_result
+            if state == 'refresh':
+                self.monitor.record_cache_event('early_refresh')
+            if stale_ttl > 0 and has_app_context():
+                self._refresh_in_background(cache_key, query_func, ttl, stale_ttl, flight)
+                return cached_result
+            return self._fill(cache_key, query_func, ttl, stale_ttl, flight)
+        
+        if not leader:
+            # Another caller is running this query; share its result
+            if flight.done.wait(self.flight_wait_timeout) and flight.stored:
+                self.monitor.record_cache_event('coalesced')
+                return flight.result
+            # The fill failed, is too slow or was superseded by an invalidation
+            self.monitor.record_cache_event('miss')
+            return query_func()
+        
         # Execute query and cache result
         self.monitor.record_cache_event('miss')
-        result = query_func()
-        self.cache.set(cache_key, result, ttl)
-        
-        return result
+        return self._fill(cache_key, query_func, ttl, stale_ttl, flight)
     
     def invalidate_cache(self, pattern: Optional[str] = None):
         """Invalidate cached queries."""
         self.cache.invalidate(pattern)
+        if has_request_context() and '_query_memo' in g:
+            # Writes made by this request must be visible to its later reads
+            g._query_memo.invalidate(pattern)
+        with self._flights_lock:
+            # Fills started before the write won't be stored (see QueryCache.set);
+            # new callers start their own instead of waiting for them
+            self._flights.clear()
         perf_logger.info(f"Cache invalidated with pattern: {pattern}")
     
+    def _cache_settings(self) -> Tuple[int, float]:
+        """Stale window and early expiration weight from the current app's config."""
+        if not has_app_context():
+            return 0, 0.0
+        config = current_app.config
+        return (config.get('QUERY_CACHE_STALE_SECONDS', 0),
+                config.get('QUERY_CACHE_EARLY_EXPIRY_BETA', 0.0))
+    
+    def _join_flight(self, cache_key: str) -> Tuple[_Flight, bool]:
+        """
+        Get the fill in progress for a key, starting one if there is none.
+        
+        Returns:
+            tuple: (flight, True if the caller started it and must run the query)
+        """
+        with self._flights_lock:
+            flight = self._flights.get(cache_key)
+            if flight is not None:
+                return flight, False
+            flight = self._flights[cache_key] = _Flight()
+            return flight, True
+    
+    def _fill(self, cache_key: str, query_func, ttl: Optional[int], stale_ttl: int,
+              flight: _Flight):
+        """Run the query of a flight, cache its result and release the waiting callers."""
+        generation = self.cache.generation
+        started = time.time()
+        try:
+            result = query_func()
+            flight.result = result
+            flight.stored = self.cache.set(cache_key, result, ttl, stale_ttl=stale_ttl,
+                                           compute_time=time.time() - started,
+                                           generation=generation)
+            return result
+        finally:
+            with self._flights_lock:
+                if self._flights.get(cache_key) is flight:
+                    del self._flights[cache_key]
+            flight.done.set()
+    
+    def _refresh_in_background(self, cache_key: str, query_func, ttl: Optional[int],
+                               stale_ttl: int, flight: _Flight):
+        """Refill a stale entry in a separate thread with its own app context."""
+        app = current_app._get_current_object()
+        
+        def refresh():
+            with app.app_context():
+                try:
+                    self._fill(cache_key, query_func, ttl, stale_ttl, flight)
+                except Exception as e:
+                    perf_logger.warning(f"Background refresh of {cache_key} failed: {e}")
+        
+        Thread(target=refresh, name='query-cache-refresh', daemon=True).start()
+    
+    def optimize_database(self) -> bool:
+        """Let SQLite refresh query planner statistics (PRAGMA optimize)."""
+        try:
+            if self.db.engine.dialect.name != 'sqlite':
+                return False
+            with self.db.engine.connect() as conn:
+                conn.execute(text("PRAGMA optimize"))
+            perf_logger.info("PRAGMA optimize completed")
+            return True
+        except Exception as e:
+            perf_logger.error(f"Error running PRAGMA optimize: {e}")
+            return False
+    
     def get_performance_report(self) -> Dict[str, Any]:
         """Get comprehensive performance report."""
         return {
             'monitor': self.monitor.get_performance_summary(),
-            'cache': self.cache.get_stats(),
+            'cache': dict(self.cache.get_stats(), in_flight=len(self._flights)),
             'slow_queries': self.monitor.get_slow_queries(),
             'timestamp': datetime.utcnow().isoformat()
         }
@@ -542,14 +913,55 @@ db_optimizer = None
 performance_monitor = None
 
 
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    """Record query start time."""
+    context._query_start_time = time.time()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    """Record query completion and statistics."""
+    if db_optimizer is not None and hasattr(context, '_query_start_time'):
+        duration = time.time() - context._query_start_time
+        db_optimizer.monitor.record_query(statement, duration, parameters)
+
+
+def _engine_connect(dbapi_conn, connection_record):
+    """Record connection events."""
+    if db_optimizer is not None:
+        db_optimizer.monitor.record_connection_event('connect')
+
+
+def _engine_close(dbapi_conn, connection_record):
+    """Record connection close events."""
+    if db_optimizer is not None:
+        db_optimizer.monitor.record_connection_event('disconnect')
+
+
+_ENGINE_LISTENERS = (
+    ('before_cursor_execute', _before_cursor_execute),
+    ('after_cursor_execute', _after_cursor_execute),
+    ('connect', _engine_connect),
+    ('close', _engine_close),
+)
+
+
+def remove_query_monitoring():
+    """Remove the Engine listeners, e.g. before the application modules are re-imported."""
+    for name, listener in _ENGINE_LISTENERS:
+        if event.contains(Engine, name, listener):
+            event.remove(Engine, name, listener)
+
+
 def init_db_performance(app, db):
     """Initialize database performance monitoring and optimization."""
     global db_optimizer, performance_monitor
     
     try:
         # Create optimizer instance
-        db_optimizer = DatabaseOptimizer(db)
+        db_optimizer = DatabaseOptimizer(db, metrics_registry)
         performance_monitor = db_optimizer.monitor
+        db_optimizer.cache.namespace_budget = app.config.get('QUERY_CACHE_NAMESPACE_BYTES')
+        db_optimizer.cache.namespace_budgets = dict(app.config.get('QUERY_CACHE_NAMESPACE_BUDGETS') or {})
         
         # Set up monitoring
         db_optimizer.setup_query_monitoring(app)
@@ -557,6 +969,13 @@ def init_db_performance(app, db):
         # Optimize connection pool
         db_optimizer.optimize_connection_pool(app)
         
+        @app.teardown_request
+        def record_request_memo(exc=None):
+            """Report and drop the request's L1 query memo."""
+            memo = g.pop('_query_memo', None)
+            if memo is not None and db_optimizer is not None:
+                db_optimizer.monitor.record_request_memo(memo.hits, memo.misses)
+        
         perf_logger.info("Database performance monitoring initialized successfully")
         
         # Store reference in app for later use
@@ -581,7 +1000,13 @@ def query_performance_decorator(cache_key_func=None, ttl=300):
             if cache_key_func:
                 try:
                     cache_key = cache_key_func(*args, **kwargs)
-                    return db_optimizer.cached_query(cache_key, lambda: func(*args, **kwargs), ttl)
+                    load = lambda: db_optimizer.cached_query(cache_key, lambda: func(*args, **kwargs), ttl)
+                    
+                    # Consult the request's L1 memo before the shared cache
+                    memo = get_request_memo()
+                    if memo is not None:
+                        return memo.get_or_load(cache_key, load)
+                    return load()
                 except Exception as e:
                     perf_logger.warning(f"Cache key generation failed: {e}")
             
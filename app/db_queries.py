@@ -5,15 +5,23 @@ This module provides optimized, cached database queries for common operations
 in the badminton scheduler application.
 """
 
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import date, datetime, timedelta
-from typing import List, Dict, Optional, Any, Tuple
+from typing import Callable, List, Dict, Iterable, Optional, Any, Set, Tuple
+from flask import current_app, has_app_context
 from flask_login import current_user
-from sqlalchemy import and_, or_, func, text
+from sqlalchemy import and_, or_, case, func, text, insert, select, literal
 from sqlalchemy.orm import joinedload, selectinload
 
 from . import db
-from .models import User, Availability, Comment, AdminAction
-from .db_performance import query_performance_decorator, db_optimizer
+from .models import User, Availability, AvailabilityArchive, Comment, AdminAction
+from .db_performance import query_performance_decorator, invalidate_query_cache
+from .http_cache import data_versions
+
+perf_logger = logging.getLogger('database_performance')
 
 
 class OptimizedQueries:
@@ -21,23 +29,17 @@ class OptimizedQueries:
     
     @staticmethod
     @query_performance_decorator(
-        cache_key_func=lambda start_date, end_date: f"availability_range_{start_date}_{end_date}",
+        cache_key_func=lambda start_date, end_date, include_history=False:
+            f"availability_range_{start_date}_{end_date}_{int(include_history)}",
         ttl=300  # 5 minutes
     )
-    def get_availability_by_date_range(start_date: date, end_date: date) -> List[Availability]:
-        """Get availability entries for date range with optimized query."""
-        return (
-            Availability.query
-            .join(User)
-            .filter(
-                Availability.date >= start_date,
-                Availability.date <= end_date,
-                User.is_active == True
-            )
-            .options(joinedload(Availability.user))  # Eager load user data
-            .order_by(Availability.date, Availability.start_time)
-            .all()
-        )
+    def get_availability_by_date_range(start_date: date, end_date: date,
+                                       include_history: bool = False) -> List[Availability]:
+        """Get availability entries for date range with optimized query.
+        
+        With include_history, archived entries in the range are merged in.
+        """
+        return get_availability_in_range(start_date, end_date, include_history)
     
     @staticmethod
     @query_performance_decorator(
@@ -73,18 +75,7 @@ class OptimizedQueries:
     )
     def get_user_statistics() -> Dict[str, int]:
         """Get comprehensive user statistics."""
-        # Use separate queries for better SQLite compatibility
-        total_users = User.query.count()
-        active_users = User.query.filter_by(is_active=True).count()
-        blocked_users = User.query.filter_by(is_active=False).count()
-        admin_users = User.query.filter_by(role='Admin').count()
-        
-        return {
-            'total_users': total_users,
-            'active_users': active_users,
-            'blocked_users': blocked_users,
-            'admin_users': admin_users
-        }
+        return count_user_statistics()
     
     @staticmethod
     @query_performance_decorator(
@@ -93,16 +84,7 @@ class OptimizedQueries:
     )
     def get_content_statistics() -> Dict[str, int]:
         """Get content statistics (availability, comments)."""
-        # Use separate queries for better SQLite compatibility
-        total_availability = Availability.query.count()
-        future_availability = Availability.query.filter(Availability.date >= date.today()).count()
-        total_comments = Comment.query.count()
-        
-        return {
-            'total_availability': total_availability,
-            'future_availability': future_availability,
-            'total_comments': total_comments
-        }
+        return count_content_statistics()
     
     @staticmethod
     @query_performance_decorator(
@@ -251,25 +233,22 @@ class OptimizedQueries:
         """Get admin actions summary for the last N hours."""
         since = datetime.utcnow() - timedelta(hours=hours)
         
-        actions = (
-            AdminAction.query
+        # One grouped count per (type, admin) pair instead of loading every action
+        rows = (
+            db.session.query(AdminAction.action_type, AdminAction.admin_user_id, func.count(AdminAction.id))
             .filter(AdminAction.created_at >= since)
+            .group_by(AdminAction.action_type, AdminAction.admin_user_id)
             .all()
         )
         
-        # Group by action type
         action_counts = {}
         admin_counts = {}
-        
-        for action in actions:
-            action_type = action.action_type
-            admin_id = action.admin_user_id
-            
-            action_counts[action_type] = action_counts.get(action_type, 0) + 1
-            admin_counts[admin_id] = admin_counts.get(admin_id, 0) + 1
+        for action_type, admin_id, count in rows:
+            action_counts[action_type] = action_counts.get(action_type, 0) + count
+            admin_counts[admin_id] = admin_counts.get(admin_id, 0) + count
         
         return {
-            'total_actions': len(actions),
+            'total_actions': sum(action_counts.values()),
             'action_counts': action_counts,
             'admin_counts': admin_counts,
             'time_period_hours': hours
@@ -277,64 +256,403 @@ class OptimizedQueries:
 
 
 class CacheManager:
-    """Utility class for managing query cache invalidation."""
+    """
+    Utility class for managing query cache invalidation.
+    
+    Each method also bumps the scope's shared data version (see http_cache) so
+    other worker processes and conditional GETs see the change; propagate=False
+    only clears this process's query cache. The hot queries of the invalidated
+    scope are then repopulated in the background (see cache_warmer).
+    """
     
     @staticmethod
-    def invalidate_user_cache(user_id: Optional[int] = None):
+    def invalidate_user_cache(user_id: Optional[int] = None, propagate: bool = True):
         """Invalidate user-related cache entries."""
-        if db_optimizer:
-            if user_id:
-                db_optimizer.invalidate_cache(f"user_.*_{user_id}_.*")
-            else:
-                db_optimizer.invalidate_cache("user_.*")
-                db_optimizer.invalidate_cache("active_users_count")
+        if propagate:
+            data_versions.bump('users')
+        if user_id:
+            invalidate_query_cache(f"user_.*_{user_id}_.*")
+        else:
+            invalidate_query_cache("user_.*")
+            invalidate_query_cache("active_users_count")
+        cache_warmer.schedule(['users'])
     
     @staticmethod
-    def invalidate_availability_cache(user_id: Optional[int] = None, date_val: Optional[date] = None):
+    def invalidate_availability_cache(user_id: Optional[int] = None, date_val: Optional[date] = None,
+                                      propagate: bool = True):
         """Invalidate availability-related cache entries."""
-        if db_optimizer:
-            patterns = ["availability_.*", "content_stats", "daily_availability_.*"]
-            
-            if user_id:
-                patterns.append(f"user_availability_{user_id}_.*")
-            
-            if date_val:
-                patterns.append(f"daily_availability_{date_val}")
-                patterns.append(f"availability_range_.*{date_val}.*")
-            
-            for pattern in patterns:
-                db_optimizer.invalidate_cache(pattern)
+        if propagate:
+            data_versions.bump('availability')
+        patterns = ["availability_.*", "content_stats", "daily_availability_.*"]
+        
+        if user_id:
+            patterns.append(f"user_availability_{user_id}_.*")
+        
+        if date_val:
+            patterns.append(f"daily_availability_{date_val}")
+            patterns.append(f"availability_range_.*{date_val}.*")
+        
+        for pattern in patterns:
+            invalidate_query_cache(pattern)
+        cache_warmer.schedule(['availability'])
     
     @staticmethod
-    def invalidate_comment_cache(user_id: Optional[int] = None):
+    def invalidate_availability_fragments(dates: Optional[Iterable[date]] = None):
+        """Drop rendered dashboard date cards for the given dates (all dates if None)."""
+        from .fragment_cache import fragment_cache
+        if dates is None:
+            fragment_cache.clear()
+        else:
+            fragment_cache.invalidate_dates(dates)
+    
+    @staticmethod
+    def invalidate_comment_cache(user_id: Optional[int] = None, propagate: bool = True):
         """Invalidate comment-related cache entries."""
-        if db_optimizer:
-            patterns = ["recent_comments_.*", "content_stats"]
-            
-            if user_id:
-                patterns.append(f"user_comments_{user_id}_.*")
-            
-            for pattern in patterns:
-                db_optimizer.invalidate_cache(pattern)
+        if propagate:
+            data_versions.bump('comments')
+        patterns = ["recent_comments_.*", "content_stats"]
+        
+        if user_id:
+            patterns.append(f"user_comments_{user_id}_.*")
+        
+        for pattern in patterns:
+            invalidate_query_cache(pattern)
+        cache_warmer.schedule(['comments'])
     
     @staticmethod
-    def invalidate_admin_cache():
+    def invalidate_admin_cache(propagate: bool = True):
         """Invalidate admin-related cache entries."""
-        if db_optimizer:
-            patterns = [
-                "recent_admin_actions_.*",
-                "admin_actions_summary_.*",
-                "users_paginated_.*"
-            ]
-            
-            for pattern in patterns:
-                db_optimizer.invalidate_cache(pattern)
+        if propagate:
+            data_versions.bump('admin')
+        patterns = [
+            "recent_admin_actions_.*",
+            "admin_actions_summary_.*",
+            "users_paginated_.*"
+        ]
+        
+        for pattern in patterns:
+            invalidate_query_cache(pattern)
+        cache_warmer.schedule(['admin'])
     
     @staticmethod
     def invalidate_all_cache():
         """Invalidate all cache entries."""
-        if db_optimizer:
-            db_optimizer.invalidate_cache()
+        data_versions.bump()
+        invalidate_query_cache()
+        CacheManager.invalidate_availability_fragments()
+        cache_warmer.schedule()
+
+
+def get_availability_in_range(start_date: date, end_date: date,
+                              include_history: bool = False) -> List[Any]:
+    """
+    Get active users' availability entries for a date range.
+    
+    Args:
+        start_date: First date of the range
+        end_date: Last date of the range
+        include_history: Also return archived entries that fall in the range
+    
+    Returns:
+        list: Availability (and AvailabilityArchive) entries ordered by date and time
+    """
+    entries = (
+        Availability.query
+        .join(User)
+        .filter(
+            Availability.date >= start_date,
+            Availability.date <= end_date,
+            User.is_active == True
+        )
+        .options(joinedload(Availability.user))  # Eager load user data
+        .order_by(Availability.date, Availability.start_time)
+        .all()
+    )
+    
+    if include_history:
+        archived = (
+            AvailabilityArchive.query
+            .join(User)
+            .filter(
+                AvailabilityArchive.date >= start_date,
+                AvailabilityArchive.date <= end_date,
+                User.is_active == True
+            )
+            .options(joinedload(AvailabilityArchive.user))
+            .all()
+        )
+        if archived:
+            entries = sorted(entries + archived, key=lambda entry: (entry.date, entry.start_time))
+    
+    return entries
+
+
+def _count_where(condition):
+    """SUM(CASE WHEN condition THEN 1 ELSE 0 END), 0 for an empty table."""
+    return func.coalesce(func.sum(case((condition, 1), else_=0)), 0)
+
+
+def count_user_statistics() -> Dict[str, int]:
+    """
+    Count users by status and role in a single query (uncached).
+    
+    Returns:
+        dict: total_users, active_users, blocked_users and admin_users
+    """
+    total, active, blocked, admins = db.session.query(
+        func.count(User.id),
+        _count_where(User.is_active == True),
+        _count_where(User.is_active == False),
+        _count_where(User.role == 'Admin')
+    ).one()
+    
+    return {
+        'total_users': total,
+        'active_users': active,
+        'blocked_users': blocked,
+        'admin_users': admins
+    }
+
+
+def count_content_statistics() -> Dict[str, int]:
+    """
+    Count availability entries and comments in a single statement (uncached).
+    
+    Returns:
+        dict: total_availability (archived entries included), future_availability
+            and total_comments
+    """
+    total_comments = select(func.count(Comment.id)).scalar_subquery()
+    total_archived = select(func.count(AvailabilityArchive.id)).scalar_subquery()
+    total, future, archived, comments = db.session.query(
+        func.count(Availability.id),
+        _count_where(Availability.date >= date.today()),
+        total_archived,
+        total_comments
+    ).select_from(Availability).one()
+    
+    return {
+        'total_availability': total + archived,
+        'future_availability': future,
+        'total_comments': comments
+    }
+
+
+def archive_past_availability(before: Optional[date] = None, batch_size: int = 500) -> int:
+    """
+    Move availability entries dated before the cutoff into the archive table.
+    
+    Each batch is copied and deleted in its own transaction, so a long backlog
+    never holds the write lock for more than one chunk.
+    
+    Args:
+        before: Entries dated before this are archived (defaults to today)
+        batch_size: Maximum number of rows moved per transaction
+    
+    Returns:
+        int: Number of entries archived
+    """
+    if before is None:
+        before = date.today()
+    
+    columns = ['user_id', 'date', 'start_time', 'end_time', 'created_at', 'updated_at']
+    total_archived = 0
+    
+    while True:
+        ids = [
+            row.id for row in
+            db.session.query(Availability.id)
+            .filter(Availability.date < before)
+            .order_by(Availability.id)
+            .limit(batch_size)
+        ]
+        if not ids:
+            break
+        
+        try:
+            rows = select(
+                Availability.id,
+                *[getattr(Availability, column) for column in columns],
+                literal(datetime.utcnow()).label('archived_at')
+            ).where(Availability.id.in_(ids))
+            db.session.execute(
+                insert(AvailabilityArchive).from_select(['original_id'] + columns + ['archived_at'], rows)
+            )
+            Availability.query.filter(Availability.id.in_(ids)).delete(synchronize_session=False)
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+        
+        total_archived += len(ids)
+    
+    if total_archived:
+        CacheManager.invalidate_availability_cache()
+        CacheManager.invalidate_availability_fragments()
+    
+    return total_archived
+
+
+# -------------------------------
+# Cache warming
+# -------------------------------
+
+class CacheWarmer:
+    """
+    Repopulates registered hot cached queries in the background.
+    
+    Warm-ups requested in quick succession (e.g. by the several invalidations
+    of one commit) are merged and run once after CACHE_WARMUP_DELAY seconds,
+    at most CACHE_WARMUP_CONCURRENCY queries at a time, so the first visitors
+    after a deploy or an invalidation find the cache filled.
+    """
+    
+    def __init__(self, registry: Dict[str, Tuple[Callable[[], Any], Tuple[str, ...]]]):
+        self.registry = registry
+        self._pending: Set[str] = set()
+        self._app = None
+        self._timer: Optional[threading.Timer] = None
+        self._lock = threading.Lock()
+        self._run_lock = threading.Lock()  # One batch at a time
+        self.runs = 0
+        self.errors = 0
+        self.last_run: Optional[float] = None
+        self.last_duration: Optional[float] = None
+        self.timings: Dict[str, float] = {}
+    
+    def schedule(self, scopes: Optional[Iterable[str]] = None, app=None) -> int:
+        """
+        Queue the registered queries depending on the given data scopes for warming.
+        
+        Args:
+            scopes: Changed data scopes, or None for every registered query
+            app: Application to warm for (defaults to the current one)
+        
+        Returns:
+            int: Number of queries queued (0 if warming is disabled)
+        """
+        if app is None:
+            if not has_app_context():
+                return 0
+            app = current_app._get_current_object()
+        if not app.config.get('CACHE_WARMUP_ENABLED', False):
+            return 0
+        
+        scopes = None if scopes is None else set(scopes)
+        names = {
+            name for name, (_, depends_on) in self.registry.items()
+            if scopes is None or scopes.intersection(depends_on)
+        }
+        if not names:
+            return 0
+        
+        with self._lock:
+            self._pending |= names
+            self._app = app
+            if self._timer is None:
+                self._timer = threading.Timer(app.config.get('CACHE_WARMUP_DELAY', 1.0), self._run_pending)
+                self._timer.name = 'cache-warmup'
+                self._timer.daemon = True
+                self._timer.start()
+        return len(names)
+    
+    def stop(self):
+        """Cancel queued warm-ups and wait for a running one (e.g. before forking)."""
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            self._pending.clear()
+        with self._run_lock:
+            pass
+    
+    def _run_pending(self):
+        with self._lock:
+            names, self._pending = self._pending, set()
+            app, self._timer = self._app, None
+        if names:
+            self.warm(app, names)
+    
+    def warm(self, app, names: Optional[Iterable[str]] = None) -> Dict[str, Optional[float]]:
+        """
+        Run registered queries now, filling the query cache.
+        
+        Args:
+            app: Application whose database and cache to use
+            names: Registered query names (all if None)
+        
+        Returns:
+            dict: Seconds each query took, None for queries that failed
+        """
+        names = sorted(self.registry if names is None else names)
+        
+        def run(name):
+            loader = self.registry[name][0]
+            started = time.perf_counter()
+            with app.app_context():
+                try:
+                    loader()
+                except Exception as e:
+                    perf_logger.warning(f"Cache warm-up of {name} failed: {e}")
+                    return name, None
+            return name, time.perf_counter() - started
+        
+        with self._run_lock:
+            started = time.perf_counter()
+            workers = max(1, min(app.config.get('CACHE_WARMUP_CONCURRENCY', 2), len(names)))
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='cache-warmup') as pool:
+                results = dict(pool.map(run, names))
+            duration = time.perf_counter() - started
+            
+            with self._lock:
+                self.runs += 1
+                self.errors += sum(1 for seconds in results.values() if seconds is None)
+                self.last_run = time.time()
+                self.last_duration = duration
+                self.timings.update({name: seconds for name, seconds in results.items() if seconds is not None})
+        
+        perf_logger.info(f"Warmed {len(names)} cached queries in {duration * 1000:.1f}ms")
+        return results
+    
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'registered': sorted(self.registry),
+                'pending': sorted(self._pending),
+                'runs': self.runs,
+                'errors': self.errors,
+                'last_run': datetime.utcfromtimestamp(self.last_run).isoformat() if self.last_run else None,
+                'last_duration_ms': round(self.last_duration * 1000, 2) if self.last_duration is not None else None,
+                'query_ms': {name: round(seconds * 1000, 2) for name, seconds in sorted(self.timings.items())}
+            }
+
+
+def _warm_dashboard_range(view_type: str):
+    """Fill the cached availability range of a dashboard view, as get_dashboard_data reads it."""
+    from .utils import get_date_range_filter
+    start_date, end_date = get_date_range_filter(view_type)
+    OptimizedQueries.get_availability_by_date_range(
+        start_date, end_date, include_history=start_date < date.today()
+    )
+
+
+# Hot cached queries: name -> (loader, data scopes whose invalidation empties it)
+WARMUP_REGISTRY: Dict[str, Tuple[Callable[[], Any], Tuple[str, ...]]] = {
+    'availability_today': (lambda: _warm_dashboard_range('today'), ('availability',)),
+    'availability_week': (lambda: _warm_dashboard_range('week'), ('availability',)),
+    'availability_month': (lambda: _warm_dashboard_range('month'), ('availability',)),
+    'recent_comments': (lambda: OptimizedQueries.get_recent_comments(100), ('comments',)),
+    'user_stats': (OptimizedQueries.get_user_statistics, ('users',)),
+    'content_stats': (OptimizedQueries.get_content_statistics, ('availability', 'comments')),
+    'recent_admin_actions': (lambda: OptimizedQueries.get_recent_admin_actions(10), ('admin',)),
+}
+
+cache_warmer = CacheWarmer(WARMUP_REGISTRY)
+
+
+def init_cache_warming(app):
+    """Warm the registered hot queries shortly after startup."""
+    cache_warmer.schedule(app=app)
 
 
 # Convenience functions for common queries
@@ -347,8 +665,10 @@ def get_dashboard_data(view_type: str = 'today', start_date: Optional[date] = No
     if not start_date or not end_date:
         start_date, end_date = get_date_range_filter(view_type, start_date, end_date)
     
-    # Get availability data
-    availability_entries = OptimizedQueries.get_availability_by_date_range(start_date, end_date)
+    # Get availability data; past dates live in the archive
+    availability_entries = OptimizedQueries.get_availability_by_date_range(
+        start_date, end_date, include_history=start_date < date.today()
+    )
     
     # Group entries by date, then by user
     entries_by_date = {}
@@ -6,25 +6,316 @@ Provides comprehensive error monitoring, metrics collection, and reporting capab
 import logging
 import json
 import os
+import sqlite3
 import threading
+import time
+import atexit
 from datetime import datetime, timezone, timedelta
-from collections import defaultdict, deque
+from collections import deque, Counter
 from typing import Dict, List, Optional, Any
 from flask import request, current_app
 from werkzeug.exceptions import HTTPException
 
+from .metrics import MetricsRegistry, metrics_registry
+
+
+class ErrorTimeSeries:
+    """
+    Pre-aggregated per-minute error counts kept in a fixed-size ring.
+    
+    Each bucket holds counts per error type, severity, category, endpoint and
+    user for one minute. Window queries touch one bucket per minute in the window, and
+    a rolling set of counters covering the most recent hour is maintained
+    incrementally so alert checks never rescan history. Counts can be
+    persisted to a small SQLite file shared by the worker processes and
+    reloaded on startup; each flush adds this process's new counts to the
+    stored ones, so workers never overwrite each other's errors.
+    """
+    
+    DIMENSIONS = ('type', 'severity', 'category', 'endpoint', 'user')
+    
+    def __init__(self, retention_minutes: int = 7 * 24 * 60, rolling_minutes: int = 60,
+                 db_path: Optional[str] = None):
+        self.size = retention_minutes
+        self.rolling_minutes = rolling_minutes
+        self.db_path = None
+        self.lock = threading.RLock()
+        self.buckets: List[Optional[Dict[str, Any]]] = [None] * retention_minutes
+        self.rolling = self._new_counts()
+        self.latest_minute: Optional[int] = None
+        self._pending: Dict[int, Dict[str, Any]] = {}  # Per-minute counts not yet flushed
+        
+        if db_path:
+            self.enable_persistence(db_path)
+    
+    @staticmethod
+    def current_minute() -> int:
+        """Return the current time as minutes since the epoch."""
+        return int(time.time() // 60)
+    
+    @classmethod
+    def _new_counts(cls) -> Dict[str, Any]:
+        counts = {'total': 0}
+        for dimension in cls.DIMENSIONS:
+            counts[dimension] = Counter()
+        return counts
+    
+    def _get_bucket(self, minute: int, create: bool = False) -> Optional[Dict[str, Any]]:
+        """Return the bucket for a minute, or None if it has been overwritten."""
+        index = minute % self.size
+        bucket = self.buckets[index]
+        if bucket is not None and bucket['minute'] == minute:
+            return bucket
+        if not create:
+            return None
+        bucket = self._new_counts()
+        bucket['minute'] = minute
+        self.buckets[index] = bucket
+        return bucket
+    
+    def _advance(self, minute: int):
+        """Move the rolling window forward, expiring buckets that fell out of it."""
+        if self.latest_minute is None:
+            self.latest_minute = minute
+            return
+        if minute <= self.latest_minute:
+            return
+        
+        if minute - self.latest_minute >= self.rolling_minutes:
+            # Everything in the rolling window has expired
+            self.rolling = self._new_counts()
+        else:
+            first_expired = self.latest_minute - self.rolling_minutes + 1
+            for expired_minute in range(first_expired, minute - self.rolling_minutes + 1):
+                bucket = self._get_bucket(expired_minute)
+                if bucket is not None:
+                    self._subtract(self.rolling, bucket)
+        self.latest_minute = minute
+    
+    def _subtract(self, counts: Dict[str, Any], bucket: Dict[str, Any]):
+        counts['total'] -= bucket['total']
+        for dimension in self.DIMENSIONS:
+            counts[dimension].subtract(bucket[dimension])
+            counts[dimension] += Counter()  # drop zero entries
+    
+    def _add(self, counts: Dict[str, Any], values: Dict[str, Any], amount: int = 1):
+        counts['total'] += amount
+        for dimension, key in values.items():
+            if key is not None:
+                counts[dimension][key] += amount
+    
+    def record(self, error_type: str, severity: str, endpoint: Optional[str] = None,
+               user_id: Optional[int] = None, minute: Optional[int] = None,
+               category: Optional[str] = None):
+        """Count one error in the bucket for the given (or current) minute."""
+        if minute is None:
+            minute = self.current_minute()
+        values = {
+            'type': error_type, 'severity': severity, 'category': category,
+            'endpoint': endpoint, 'user': user_id
+        }
+        
+        with self.lock:
+            self._advance(minute)
+            if minute <= self.latest_minute - self.size:
+                return  # Older than the retained history
+            bucket = self._get_bucket(minute, create=True)
+            self._add(bucket, values)
+            if minute > self.latest_minute - self.rolling_minutes:
+                self._add(self.rolling, values)
+            pending = self._pending.get(minute)
+            if pending is None:
+                pending = self._pending[minute] = self._new_counts()
+            self._add(pending, values)
+    
+    def get_rolling_counts(self, minute: Optional[int] = None) -> Dict[str, Any]:
+        """Return the counters for the rolling window (the last hour by default)."""
+        if minute is None:
+            minute = self.current_minute()
+        with self.lock:
+            self._advance(minute)
+            counts = {'total': self.rolling['total']}
+            for dimension in self.DIMENSIONS:
+                counts[dimension] = dict(self.rolling[dimension])
+            return counts
+    
+    def get_rolling_count(self, dimension: Optional[str] = None, key: Any = None,
+                          minute: Optional[int] = None) -> int:
+        """Return a single rolling counter without copying the others."""
+        if minute is None:
+            minute = self.current_minute()
+        with self.lock:
+            self._advance(minute)
+            if dimension is None:
+                return self.rolling['total']
+            return self.rolling[dimension].get(key, 0)
+    
+    def get_window(self, minutes: int, minute: Optional[int] = None) -> Dict[str, Any]:
+        """Aggregate the buckets covering the last N minutes."""
+        if minute is None:
+            minute = self.current_minute()
+        minutes = max(0, min(minutes, self.size))
+        totals = self._new_counts()
+        hourly = {}
+        
+        with self.lock:
+            for bucket_minute in range(minute - minutes + 1, minute + 1):
+                bucket = self._get_bucket(bucket_minute)
+                if bucket is None or not bucket['total']:
+                    continue
+                totals['total'] += bucket['total']
+                for dimension in self.DIMENSIONS:
+                    totals[dimension].update(bucket[dimension])
+                hour = bucket_minute // 60
+                hourly[hour] = hourly.get(hour, 0) + bucket['total']
+        
+        totals['hourly'] = [
+            {
+                'hour': datetime.fromtimestamp(hour * 3600, timezone.utc).strftime('%Y-%m-%d-%H'),
+                'count': count
+            }
+            for hour, count in sorted(hourly.items())
+        ]
+        return totals
+    
+    def prune(self, minutes: int, minute: Optional[int] = None):
+        """Drop buckets older than the last N minutes."""
+        if minute is None:
+            minute = self.current_minute()
+        cutoff = minute - minutes
+        with self.lock:
+            for index, bucket in enumerate(self.buckets):
+                if bucket is not None and bucket['minute'] <= cutoff:
+                    self.buckets[index] = None
+        if self.db_path:
+            self._execute('DELETE FROM error_buckets WHERE minute <= ?', (cutoff,))
+    
+    # -------------------------------
+    # Persistence
+    # -------------------------------
+    
+    def enable_persistence(self, db_path: str):
+        """Persist buckets to a SQLite file and load any retained history."""
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.db_path = db_path
+        self._execute(
+            'CREATE TABLE IF NOT EXISTS error_buckets ('
+            'minute INTEGER NOT NULL, dimension TEXT NOT NULL, key TEXT NOT NULL, '
+            'count INTEGER NOT NULL, PRIMARY KEY (minute, dimension, key)) WITHOUT ROWID'
+        )
+        self.load()
+    
+    def _execute(self, sql: str, params=(), many: bool = False):
+        with sqlite3.connect(self.db_path, timeout=5) as conn:
+            if many:
+                conn.executemany(sql, params)
+            else:
+                conn.execute(sql, params)
+        conn.close()
+    
+    def load(self):
+        """Rebuild the in-memory ring from the persisted buckets."""
+        if not self.db_path:
+            return
+        now = self.current_minute()
+        with sqlite3.connect(self.db_path, timeout=5) as conn:
+            rows = conn.execute(
+                'SELECT minute, dimension, key, count FROM error_buckets WHERE minute > ? AND minute <= ?',
+                (now - self.size, now)
+            ).fetchall()
+        conn.close()
+        
+        with self.lock:
+            for minute, dimension, key, count in rows:
+                bucket = self._get_bucket(minute, create=True)
+                if dimension == 'total':
+                    bucket['total'] = count
+                elif dimension in self.DIMENSIONS:
+                    if dimension == 'user' and key.isdigit():
+                        key = int(key)
+                    bucket[dimension][key] = count
+            
+            # Rebuild the rolling counters from the loaded buckets
+            self.rolling = self._new_counts()
+            for minute in range(now - self.rolling_minutes + 1, now + 1):
+                bucket = self._get_bucket(minute)
+                if bucket is not None:
+                    self.rolling['total'] += bucket['total']
+                    for dimension in self.DIMENSIONS:
+                        self.rolling[dimension].update(bucket[dimension])
+            self.latest_minute = max(now, self.latest_minute or now)
+    
+    def flush(self, include_current: bool = True):
+        """Add the counts recorded since the last flush to the stored buckets."""
+        if not self.db_path:
+            self._pending.clear()
+            return
+        
+        current = self.current_minute()
+        with self.lock:
+            flushed = {minute: self._pending.pop(minute) for minute in sorted(self._pending)
+                       if include_current or minute < current}
+        
+        rows = []
+        for minute, counts in flushed.items():
+            rows.append((minute, 'total', '', counts['total']))
+            for dimension in self.DIMENSIONS:
+                for key, count in counts[dimension].items():
+                    rows.append((minute, dimension, str(key), count))
+        
+        if not rows:
+            return
+        try:
+            self._execute(
+                'INSERT INTO error_buckets VALUES (?, ?, ?, ?) '
+                'ON CONFLICT(minute, dimension, key) DO UPDATE SET count = count + excluded.count',
+                rows, many=True
+            )
+        except Exception:
+            # Keep the counts for the next flush
+            with self.lock:
+                for minute, counts in flushed.items():
+                    pending = self._pending.setdefault(minute, self._new_counts())
+                    pending['total'] += counts['total']
+                    for dimension in self.DIMENSIONS:
+                        pending[dimension].update(counts[dimension])
+            raise
+
 
 class ErrorMetrics:
-    """Thread-safe error metrics collector."""
+    """
+    Thread-safe error metrics collector.
+    
+    Error counts by type and severity are kept in a metrics registry; the
+    per-minute series behind summaries and alerts and the recent error
+    details are kept here.
+    """
     
-    def __init__(self, max_entries=1000):
+    # Substrings that put an error type in the 'database' alert category
+    DATABASE_ERROR_MARKERS = ('database', 'sql')
+    
+    def __init__(self, max_entries=1000, retention_hours=168, registry: Optional[MetricsRegistry] = None):
         self.max_entries = max_entries
         self.lock = threading.Lock()
-        self.error_counts = defaultdict(int)
+        self.registry = registry if registry is not None else MetricsRegistry()
+        self.errors_by_type = self.registry.counter('errors.type')
+        self.errors_by_severity = self.registry.counter('errors.severity')
         self.error_history = deque(maxlen=max_entries)
-        self.hourly_stats = defaultdict(lambda: defaultdict(int))
-        self.user_errors = defaultdict(int)
-        self.endpoint_errors = defaultdict(int)
+        self.series = ErrorTimeSeries(retention_minutes=retention_hours * 60)
+        self._last_record_minute = None
+        self._categories = {}
+        self.errors_since_check = 0
+    
+    def categorize(self, error_type: str) -> Optional[str]:
+        """Return the alert category for an error type (memoized per type)."""
+        category = self._categories.get(error_type, False)
+        if category is False:
+            lowered = error_type.lower()
+            category = 'database' if any(m in lowered for m in self.DATABASE_ERROR_MARKERS) else None
+            self._categories[error_type] = category
+        return category
         
     def record_error(self, error_type: str, error_message: str, 
                     user_id: Optional[int] = None, endpoint: Optional[str] = None,
@@ -32,16 +323,14 @@ class ErrorMetrics:
         """Record an error occurrence with metadata."""
         with self.lock:
             timestamp = datetime.now(timezone.utc)
-            hour_key = timestamp.strftime('%Y-%m-%d-%H')
+            minute = int(timestamp.timestamp() // 60)
             
             # Update counters
-            self.error_counts[error_type] += 1
-            self.hourly_stats[hour_key][error_type] += 1
-            
-            if user_id:
-                self.user_errors[user_id] += 1
-            if endpoint:
-                self.endpoint_errors[endpoint] += 1
+            self.errors_by_type.inc(label=error_type)
+            self.errors_by_severity.inc(label=severity)
+            self.series.record(error_type, severity, endpoint, user_id, minute=minute,
+                               category=self.categorize(error_type))
+            self.errors_since_check += 1
             
             # Store error details
             error_record = {
@@ -54,41 +343,39 @@ class ErrorMetrics:
                 **kwargs
             }
             self.error_history.append(error_record)
+            
+            rolled_over = self._last_record_minute is not None and minute > self._last_record_minute
+            self._last_record_minute = minute
+        
+        # Persist completed minutes once the clock moves on
+        if rolled_over:
+            self.series.flush(include_current=False)
+    
+    @property
+    def error_counts(self) -> Dict[str, int]:
+        """Errors recorded per type since startup."""
+        return self.errors_by_type.values()
     
     def get_error_summary(self, hours: int = 24) -> Dict[str, Any]:
         """Get error summary for the specified time period."""
-        with self.lock:
-            cutoff_time = datetime.now(timezone.utc) - timedelta(hours=hours)
-            
-            recent_errors = [
-                error for error in self.error_history
-                if datetime.fromisoformat(error['timestamp']) > cutoff_time
-            ]
-            
-            summary = {
-                'total_errors': len(recent_errors),
-                'error_types': defaultdict(int),
-                'severity_breakdown': defaultdict(int),
-                'top_endpoints': defaultdict(int),
-                'top_users': defaultdict(int),
-                'hourly_trend': []
-            }
-            
-            for error in recent_errors:
-                summary['error_types'][error['error_type']] += 1
-                summary['severity_breakdown'][error['severity']] += 1
-                if error.get('endpoint'):
-                    summary['top_endpoints'][error['endpoint']] += 1
-                if error.get('user_id'):
-                    summary['top_users'][error['user_id']] += 1
-            
-            # Convert defaultdicts to regular dicts for JSON serialization
-            summary['error_types'] = dict(summary['error_types'])
-            summary['severity_breakdown'] = dict(summary['severity_breakdown'])
-            summary['top_endpoints'] = dict(summary['top_endpoints'])
-            summary['top_users'] = dict(summary['top_users'])
-            
-            return summary
+        window = self.series.get_window(hours * 60)
+        
+        return {
+            'total_errors': window['total'],
+            'error_types': dict(window['type']),
+            'severity_breakdown': dict(window['severity']),
+            'top_endpoints': dict(window['endpoint']),
+            'top_users': dict(window['user']),
+            'hourly_trend': window['hourly']
+        }
+    
+    def get_rolling_counts(self) -> Dict[str, Any]:
+        """Get the incrementally maintained counts for the last hour."""
+        return self.series.get_rolling_counts()
+    
+    def get_rolling_count(self, dimension: Optional[str] = None, key: Any = None) -> int:
+        """Get a single last-hour counter (total, or one severity/category/type)."""
+        return self.series.get_rolling_count(dimension, key)
     
     def get_recent_errors(self, limit: int = 50) -> List[Dict[str, Any]]:
         """Get the most recent errors."""
@@ -105,29 +392,29 @@ class ErrorMetrics:
                 error for error in self.error_history
                 if datetime.fromisoformat(error['timestamp']) > cutoff_time
             ], maxlen=self.max_entries)
-            
-            # Clear old hourly stats
-            cutoff_hour = cutoff_time.strftime('%Y-%m-%d-%H')
-            old_hours = [
-                hour for hour in self.hourly_stats.keys()
-                if hour < cutoff_hour
-            ]
-            for hour in old_hours:
-                del self.hourly_stats[hour]
+        
+        # Clear old buckets
+        self.series.prune(hours * 60)
 
 
 class ErrorTracker:
     """Main error tracking system with reporting capabilities."""
     
-    def __init__(self, app=None):
+    def __init__(self, app=None, registry: Optional[MetricsRegistry] = None):
         self.app = app
-        self.metrics = ErrorMetrics()
+        self.metrics = ErrorMetrics(registry=registry)
         self.logger = logging.getLogger('error_tracker')
         self.alert_thresholds = {
             'error_rate_per_hour': 50,
             'critical_errors_per_hour': 5,
             'database_errors_per_hour': 10
         }
+        self.alert_interval = 30  # seconds between background threshold checks
+        self.alert_cooldown = 900  # seconds before the same alert is sent again
+        self._alert_state = {}
+        self._alert_lock = threading.Lock()
+        self._alert_thread = None
+        self._alert_stop = threading.Event()
         
         if app:
             self.init_app(app)
@@ -151,14 +438,54 @@ class ErrorTracker:
         self.logger.addHandler(handler)
         self.logger.setLevel(logging.INFO)
         
-        # Register cleanup task (in a real app, this would be a background task)
+        # Persist per-minute error counts so they survive restarts
+        metrics_db = app.config.get('ERROR_METRICS_DB')
+        if metrics_db and self.metrics.series.db_path is None:
+            try:
+                self.metrics.series.enable_persistence(metrics_db)
+                atexit.register(self.metrics.series.flush)
+            except Exception as e:
+                self.logger.error(f"Failed to enable error metrics persistence: {e}")
+        
+        # Prune stale data at startup; the maintenance scheduler repeats this periodically
         with app.app_context():
             self._setup_cleanup_task()
+        
+        # Evaluate alert thresholds in the background rather than per error.
+        # The maintenance scheduler runs check_alerts when it is enabled.
+        self.alert_interval = app.config.get('ERROR_ALERT_INTERVAL', self.alert_interval)
+        self.alert_cooldown = app.config.get('ERROR_ALERT_COOLDOWN', self.alert_cooldown)
+        if not app.testing and self.alert_interval and not app.config.get('SCHEDULER_ENABLED'):
+            self.start_alert_ticker()
+    
+    def start_alert_ticker(self):
+        """Start the daemon thread that periodically checks alert thresholds."""
+        if self._alert_thread and self._alert_thread.is_alive():
+            return
+        
+        self._alert_stop.clear()
+        
+        def run():
+            while not self._alert_stop.wait(self.alert_interval):
+                self.check_alerts()
+        
+        self._alert_thread = threading.Thread(target=run, name='error-alert-ticker', daemon=True)
+        self._alert_thread.start()
+    
+    def stop_alert_ticker(self):
+        """Stop the background alert thread."""
+        self._alert_stop.set()
+        self._alert_thread = None
+    
+    def check_alerts(self, force: bool = False):
+        """Check alert thresholds if any errors were recorded since the last check."""
+        if not force and not self.metrics.errors_since_check:
+            return
+        self.metrics.errors_since_check = 0
+        self._check_alert_conditions()
     
     def _setup_cleanup_task(self):
-        """Set up periodic cleanup of old error data."""
-        # In a production environment, this would be handled by a background task
-        # For now, we'll just clean up on app startup
+        """Clean up old error data at startup (see app.scheduler for the periodic job)."""
         self.metrics.clear_old_data()
     
     def track_error(self, error: Exception, error_type: Optional[str] = None,
@@ -213,9 +540,6 @@ class ErrorTracker:
             
             self.logger.log(getattr(logging, severity), log_message)
             
-            # Check for alert conditions
-            self._check_alert_conditions()
-            
         except Exception as tracking_error:
             # Don't let error tracking itself cause issues
             self.logger.error(f"Error in error tracking: {tracking_error}")
@@ -223,17 +547,17 @@ class ErrorTracker:
     def _check_alert_conditions(self):
         """Check if any alert conditions are met."""
         try:
-            summary = self.metrics.get_error_summary(hours=1)
+            total_errors = self.metrics.get_rolling_count()
             
             # Check error rate threshold
-            if summary['total_errors'] > self.alert_thresholds['error_rate_per_hour']:
+            if total_errors > self.alert_thresholds['error_rate_per_hour']:
                 self._send_alert(
                     'HIGH_ERROR_RATE',
-                    f"High error rate detected: {summary['total_errors']} errors in the last hour"
+                    f"High error rate detected: {total_errors} errors in the last hour"
                 )
             
             # Check critical errors
-            critical_count = summary['severity_breakdown'].get('CRITICAL', 0)
+            critical_count = self.metrics.get_rolling_count('severity', 'CRITICAL')
             if critical_count > self.alert_thresholds['critical_errors_per_hour']:
                 self._send_alert(
                     'CRITICAL_ERRORS',
@@ -241,10 +565,7 @@ class ErrorTracker:
                 )
             
             # Check database errors
-            db_errors = sum(
-                count for error_type, count in summary['error_types'].items()
-                if 'database' in error_type.lower() or 'sql' in error_type.lower()
-            )
+            db_errors = self.metrics.get_rolling_count('category', 'database')
             if db_errors > self.alert_thresholds['database_errors_per_hour']:
                 self._send_alert(
                     'DATABASE_ERRORS',
@@ -254,15 +575,31 @@ class ErrorTracker:
         except Exception as e:
             self.logger.error(f"Error checking alert conditions: {e}")
     
-    def _send_alert(self, alert_type: str, message: str):
-        """Send an alert (log for now, could be extended to email/Slack/etc.)."""
+    def _send_alert(self, alert_type: str, message: str) -> bool:
+        """Send an alert (log for now, could be extended to email/Slack/etc.).
+        
+        Repeats of the same alert type within the cooldown period are
+        suppressed and counted; the count is reported with the next alert.
+        """
+        now = time.monotonic()
+        with self._alert_lock:
+            state = self._alert_state.get(alert_type)
+            if state and now - state['sent_at'] < self.alert_cooldown:
+                state['suppressed'] += 1
+                return False
+            suppressed = state['suppressed'] if state else 0
+            self._alert_state[alert_type] = {'sent_at': now, 'suppressed': 0}
+        
         alert_message = f"ALERT [{alert_type}]: {message}"
+        if suppressed:
+            alert_message += f" ({suppressed} repeat alerts suppressed)"
         self.logger.critical(alert_message)
         
         # In a production environment, this could send emails, Slack messages, etc.
         # For now, we'll just log it prominently
         if self.app:
             self.app.logger.critical(alert_message)
+        return True
     
     def get_error_report(self, hours: int = 24) -> Dict[str, Any]:
         """Generate a comprehensive error report."""
@@ -284,7 +621,7 @@ class ErrorTracker:
 
 
 # Global error tracker instance
-error_tracker = ErrorTracker()
+error_tracker = ErrorTracker(registry=metrics_registry)
 
 
 def track_error(error: Exception, error_type: Optional[str] = None, 
@@ -0,0 +1,258 @@
+"""
+Streaming data export utilities for the Badminton Scheduler application.
+Provides constant-memory CSV and JSON Lines exports of availability entries
+(archived ones included), comments and the admin audit log, with optional
+gzip compression.
+"""
+
+import csv
+import io
+import json
+import zlib
+from datetime import date, datetime, time
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+from flask import Response, stream_with_context
+from sqlalchemy import literal
+
+from . import db
+from .models import User, Availability, AvailabilityArchive, Comment, AdminAction
+
+
+# Rows fetched from the database cursor per round trip
+EXPORT_BATCH_SIZE = 500
+
+# Approximate number of bytes buffered before a chunk is sent to the client
+EXPORT_CHUNK_SIZE = 64 * 1024
+
+# Leading characters that make spreadsheet applications treat a cell as a formula
+CSV_FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r')
+
+EXPORT_FORMATS = {
+    'csv': {'mimetype': 'text/csv', 'extension': 'csv'},
+    'jsonl': {'mimetype': 'application/x-ndjson', 'extension': 'jsonl'},
+}
+
+# Archived entries have their own ids: (id, archived) identifies a row
+AVAILABILITY_EXPORT_FIELDS = [
+    'id', 'archived', 'user_id', 'username', 'date', 'start_time', 'end_time', 'created_at', 'updated_at'
+]
+
+COMMENT_EXPORT_FIELDS = [
+    'id', 'user_id', 'username', 'content', 'created_at', 'updated_at'
+]
+
+AUDIT_EXPORT_FIELDS = [
+    'id', 'admin_user_id', 'admin_username', 'action_type', 'target_type',
+    'target_id', 'target_user_id', 'description', 'details', 'created_at'
+]
+
+
+# -------------------------------
+# Filters shared with the admin listing pages
+# -------------------------------
+
+def apply_availability_filters(query, user_id: Optional[int] = None,
+                               date_val: Optional[date] = None, model=Availability):
+    """Apply the admin availability listing filters to a query (of model or AvailabilityArchive)."""
+    if user_id:
+        query = query.filter(model.user_id == user_id)
+    if date_val:
+        query = query.filter(model.date == date_val)
+    return query
+
+
+def apply_comment_filters(query, user_id: Optional[int] = None):
+    """Apply the admin comment listing filters to a query."""
+    if user_id:
+        query = query.filter(Comment.user_id == user_id)
+    return query
+
+
+def apply_audit_filters(query, action_type: Optional[str] = None,
+                        target_type: Optional[str] = None,
+                        admin_user_id: Optional[int] = None):
+    """Apply the admin audit log filters to a query."""
+    if action_type:
+        query = query.filter(AdminAction.action_type == action_type)
+    if target_type:
+        query = query.filter(AdminAction.target_type == target_type)
+    if admin_user_id:
+        query = query.filter(AdminAction.admin_user_id == admin_user_id)
+    return query
+
+
+# -------------------------------
+# Export queries
+# -------------------------------
+# Each query selects plain columns rather than ORM entities so that rows are
+# not added to the session identity map while streaming.
+
+def availability_export_query(user_id: Optional[int] = None, date_val: Optional[date] = None):
+    """Build the column query used for availability exports (live and archived entries)."""
+    def entries(model, archived):
+        query = (
+            db.session.query(
+                model.id,
+                literal(archived).label('archived'),
+                model.user_id,
+                User.username,
+                model.date,
+                model.start_time,
+                model.end_time,
+                model.created_at,
+                model.updated_at
+            )
+            .join(User, model.user_id == User.id)
+        )
+        return apply_availability_filters(query, user_id, date_val, model)
+
+    query = entries(Availability, 0).union_all(entries(AvailabilityArchive, 1))
+    return query.order_by(Availability.date.desc(), Availability.start_time)
+
+
+def comment_export_query(user_id: Optional[int] = None):
+    """Build the column query used for comment exports."""
+    query = (
+        db.session.query(
+            Comment.id,
+            Comment.user_id,
+            User.username,
+            Comment.content,
+            Comment.created_at,
+            Comment.updated_at
+        )
+        .join(User, Comment.user_id == User.id)
+    )
+    query = apply_comment_filters(query, user_id)
+    return query.order_by(Comment.created_at.desc())
+
+
+def audit_export_query(action_type: Optional[str] = None, target_type: Optional[str] = None,
+                       admin_user_id: Optional[int] = None):
+    """Build the column query used for audit log exports."""
+    query = (
+        db.session.query(
+            AdminAction.id,
+            AdminAction.admin_user_id,
+            User.username.label('admin_username'),
+            AdminAction.action_type,
+            AdminAction.target_type,
+            AdminAction.target_id,
+            AdminAction.target_user_id,
+            AdminAction.description,
+            AdminAction.details,
+            AdminAction.created_at
+        )
+        .join(User, AdminAction.admin_user_id == User.id)
+    )
+    query = apply_audit_filters(query, action_type, target_type, admin_user_id)
+    return query.order_by(AdminAction.created_at.desc())
+
+
+# -------------------------------
+# Serializers
+# -------------------------------
+
+def _export_value(value: Any) -> Any:
+    """Convert a column value to a JSON/CSV friendly representation."""
+    if isinstance(value, (datetime, date, time)):
+        return value.isoformat()
+    return value
+
+
+def iter_rows(query, batch_size: int = EXPORT_BATCH_SIZE) -> Iterator[Dict[str, Any]]:
+    """Iterate over a column query server-side, yielding one dict per row."""
+    for row in query.yield_per(batch_size):
+        yield {key: _export_value(value) for key, value in row._mapping.items()}
+
+
+def _csv_cell(value: Any) -> Any:
+    """Neutralize text that a spreadsheet would evaluate as a formula."""
+    if isinstance(value, str) and value.startswith(CSV_FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+
+def iter_csv(rows: Iterable[Dict[str, Any]], fields: List[str]) -> Iterator[str]:
+    """Encode rows as CSV, yielding chunks of roughly EXPORT_CHUNK_SIZE."""
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=fields, extrasaction='ignore')
+    writer.writeheader()
+
+    for row in rows:
+        writer.writerow({key: _csv_cell(value) for key, value in row.items()})
+        if buffer.tell() >= EXPORT_CHUNK_SIZE:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate(0)
+
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+def iter_jsonl(rows: Iterable[Dict[str, Any]], fields: List[str]) -> Iterator[str]:
+    """Encode rows as JSON Lines, yielding chunks of roughly EXPORT_CHUNK_SIZE."""
+    chunk = []
+    size = 0
+
+    for row in rows:
+        line = json.dumps({field: row.get(field) for field in fields}, default=str) + '\n'
+        chunk.append(line)
+        size += len(line)
+        if size >= EXPORT_CHUNK_SIZE:
+            yield ''.join(chunk)
+            chunk = []
+            size = 0
+
+    if chunk:
+        yield ''.join(chunk)
+
+
+def iter_gzip(chunks: Iterable[str]) -> Iterator[bytes]:
+    """Gzip-compress a stream of text chunks incrementally."""
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)  # wbits=31 -> gzip container
+
+    for chunk in chunks:
+        data = compressor.compress(chunk.encode('utf-8'))
+        if data:
+            yield data
+
+    yield compressor.flush()
+
+
+def build_export_response(query, fields: List[str], export_format: str = 'csv',
+                          filename: str = 'export', compress: bool = False) -> Response:
+    """
+    Build a streaming download response for an export query.
+
+    Args:
+        query: Column query to export
+        fields: Ordered list of column names to include
+        export_format: 'csv' or 'jsonl'
+        filename: Download filename without extension
+        compress: Whether to gzip the response body
+
+    Returns:
+        Response: Streaming Flask response
+    """
+    if export_format not in EXPORT_FORMATS:
+        raise ValueError(f"Export format must be one of: {', '.join(EXPORT_FORMATS)}")
+
+    format_info = EXPORT_FORMATS[export_format]
+    encoder = iter_csv if export_format == 'csv' else iter_jsonl
+    body = encoder(iter_rows(query), fields)
+
+    filename = f"{filename}.{format_info['extension']}"
+    mimetype = format_info['mimetype']
+
+    if compress:
+        body = iter_gzip(body)
+        filename += '.gz'
+        mimetype = 'application/gzip'
+
+    response = Response(stream_with_context(body), mimetype=mimetype)
+    response.headers['Content-Disposition'] = f'attachment; filename={filename}'
+    response.headers['Cache-Control'] = 'no-store'
+    return response
+
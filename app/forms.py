@@ -6,6 +6,7 @@ from wtforms import (
 from wtforms.validators import DataRequired, Length, ValidationError, Regexp
 from datetime import date, time, datetime, timedelta
 from .models import User
+from .comment_validation import FORM_COMMENT_RULES, comment_spam_error
 import re
 import html
 import bleach
@@ -53,11 +54,6 @@ def combine_local(d: date, t: time) -> datetime:
 
 USERNAME_REGEX = r'^[a-zA-Z0-9_]+$'
 SQL_INJECTION_PATTERNS = ['union', 'select', 'drop', 'delete', 'insert', 'update', '--', ';']
-XSS_PATTERNS = [
-    '<script', '</script>', 'javascript:', 'vbscript:',
-    'onload=', 'onerror=', 'onclick=', 'onmouseover=',
-    'onfocus=', 'onblur=', 'onchange=', 'onsubmit='
-]
 
 def sanitize_input(value: str) -> str:
     """Utility to sanitize user input consistently."""
@@ -209,15 +205,13 @@ class CommentForm(FlaskForm):
 
     def validate_content(self, field):
         raw = field.data.strip()
-        if any(p in raw.lower() for p in XSS_PATTERNS):
+        if FORM_COMMENT_RULES.find_blocked_token(raw):
             raise ValidationError("Comment contains invalid content")
 
         # Sanitize
         field.data = bleach.clean(raw, tags=[], strip=True)
 
         # Spam checks
-        special_chars = sum(1 for c in field.data if not c.isalnum() and c not in " .,!?-_()[]{}:;\"'")
-        if special_chars > len(field.data) * 0.3:
-            raise ValidationError("Comment contains too many special characters")
-        if re.search(r"(.)\1{10,}", field.data):
-            raise ValidationError("Comment contains invalid repeated characters")
+        error = comment_spam_error(field.data, FORM_COMMENT_RULES, check_tokens=False)
+        if error:
+            raise ValidationError(error)
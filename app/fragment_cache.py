@@ -0,0 +1,177 @@
+"""
+Rendered-fragment cache for the Badminton Scheduler templates.
+
+Templates wrap expensive, rarely changing parts in a cache block:
+
+    {% cache 'dashboard-date-card', entry_date, current_user.is_admin() %}
+        ...
+    {% endcache %}
+
+The values after the name make up the cache key. Date values additionally tie
+the fragment to that date's availability version, so a write for one date
+only drops that date's fragments. Every key also includes the shared 'users'
+data version, since usernames and roles appear in most fragments.
+
+CSRF tokens are per session, so they are swapped for a placeholder before a
+fragment is stored and the viewer's own token is put back when it is served.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from datetime import date
+from typing import Any, Dict, Iterable, Optional
+
+from flask import current_app
+from jinja2 import nodes
+from jinja2.ext import Extension
+from markupsafe import Markup
+
+from .http_cache import data_versions
+
+CSRF_PLACEHOLDER = '\x00csrf-token\x00'
+
+
+def _current_csrf_token() -> Optional[str]:
+    """The CSRF token of the current request, or None outside a request."""
+    try:
+        from flask_wtf.csrf import generate_csrf
+        return generate_csrf()
+    except Exception:
+        return None
+
+
+class FragmentCache:
+    """Thread-safe LRU cache of rendered template fragments."""
+
+    def __init__(self, ttl_seconds: float = 300, max_entries: int = 2000):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: 'OrderedDict[tuple, tuple]' = OrderedDict()
+        self._date_versions: Dict[date, int] = {}
+        self._generation = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def make_key(self, key_parts: Iterable[Any]) -> tuple:
+        """Full cache key: the template's key parts plus the versions they depend on."""
+        key_parts = tuple(key_parts)
+        with self._lock:
+            date_versions = tuple(
+                self._date_versions.get(part, 0) for part in key_parts if isinstance(part, date)
+            )
+            generation = self._generation
+
+        # Reading the availability version also notices writes made by other
+        # workers, which clear this cache through on_external_change
+        data_versions.token('availability')
+        return key_parts + (date_versions, generation, data_versions.token('users'))
+
+    def get(self, key: tuple) -> Optional[str]:
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[1] <= now:
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key: tuple, html: str, ttl_seconds: Optional[float] = None):
+        if ttl_seconds is None:
+            ttl_seconds = self.ttl_seconds
+        if ttl_seconds <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (html, time.time() + ttl_seconds)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def render(self, key_parts: Iterable[Any], caller) -> Markup:
+        """
+        Return a cached fragment, rendering and storing it on a miss.
+
+        The TTL comes from the current app's FRAGMENT_CACHE_TTL; 0 renders
+        every time.
+
+        Args:
+            key_parts: Hashable values identifying the fragment
+            caller: Callable rendering the fragment body
+
+        Returns:
+            Markup: Rendered HTML
+        """
+        ttl_seconds = current_app.config.get('FRAGMENT_CACHE_TTL', self.ttl_seconds)
+        if ttl_seconds <= 0:
+            return Markup(caller())
+
+        key = self.make_key(key_parts)
+        csrf_token = _current_csrf_token()
+        html = self.get(key)
+        if html is None:
+            html = str(caller())
+            stored = html.replace(csrf_token, CSRF_PLACEHOLDER) if csrf_token else html
+            self.put(key, stored, ttl_seconds)
+            return Markup(html)
+
+        if CSRF_PLACEHOLDER in html:
+            html = html.replace(CSRF_PLACEHOLDER, csrf_token or '')
+        return Markup(html)
+
+    def invalidate_dates(self, dates: Iterable[date]):
+        """Drop fragments that depend on any of the given dates."""
+        with self._lock:
+            for day in dates:
+                self._date_versions[day] = self._date_versions.get(day, 0) + 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._generation += 1
+            self.hits = 0
+            self.misses = 0
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'size': len(self._entries),
+                'max_entries': self.max_entries,
+                'ttl_seconds': self.ttl_seconds,
+                'hits': self.hits,
+                'misses': self.misses
+            }
+
+
+# Global fragment cache instance
+fragment_cache = FragmentCache()
+
+
+class FragmentCacheExtension(Extension):
+    """Jinja extension adding the {% cache name, key... %}...{% endcache %} block."""
+
+    tags = {'cache'}
+
+    def parse(self, parser):
+        lineno = next(parser.stream).lineno
+        key_parts = [parser.parse_expression()]
+        while parser.stream.skip_if('comma'):
+            key_parts.append(parser.parse_expression())
+
+        body = parser.parse_statements(('name:endcache',), drop_needle=True)
+        call = self.call_method('_render_cached', [nodes.Tuple(key_parts, 'load')])
+        return nodes.CallBlock(call, [], [], body).set_lineno(lineno)
+
+    def _render_cached(self, key_parts, caller):
+        return fragment_cache.render(key_parts, caller)
+
+
+def init_fragment_cache(app):
+    """Size the fragment cache and register the template extension."""
+    fragment_cache.max_entries = app.config.get('FRAGMENT_CACHE_MAX_ENTRIES', 2000)
+    fragment_cache.clear()
+    app.jinja_env.add_extension(FragmentCacheExtension)
@@ -0,0 +1,153 @@
+"""
+Cached health samples behind the /livez and /readyz probes.
+
+A maintenance job (see scheduler) samples database ping latency, connection
+pool state, CPU and memory every HEALTH_SAMPLE_INTERVAL seconds, so probes
+only read the latest sample and never query application tables. Without
+the scheduler, a probe that finds the sample older than
+HEALTH_SAMPLE_MAX_AGE takes a new one itself (one probe at a time).
+
+The probes are unauthenticated and exempt from the per-IP rate limit (see
+PROBE_ENDPOINTS), so they answer with a status and the sample's age only;
+the sample itself is shown to admins under /health/detailed.
+"""
+
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, Optional, Tuple
+
+from sqlalchemy import text
+
+
+# Endpoints polled by orchestrators, exempt from the per-IP rate limit and block list
+PROBE_ENDPOINTS = frozenset({'health.liveness', 'health.readiness'})
+
+
+def _pool_state(pool) -> Dict[str, Any]:
+    """Connection counts of a SQLAlchemy pool (only those the pool class reports)."""
+    state = {'class': type(pool).__name__}
+    for name in ('size', 'checkedin', 'checkedout', 'overflow'):
+        method = getattr(pool, name, None)
+        if callable(method):
+            try:
+                state[name] = method()
+            except Exception:
+                pass
+    return state
+
+
+def _process_stats(process=None) -> Dict[str, Any]:
+    """CPU and memory usage (psutil if installed, else /proc where available)."""
+    if process is not None:
+        import psutil
+        memory = process.memory_info()
+        return {
+            'cpu_percent': process.cpu_percent(interval=None),  # Since the previous sample
+            'rss_mb': round(memory.rss / 1024 / 1024, 2),
+            'system_cpu_percent': psutil.cpu_percent(interval=None),
+            'system_memory_percent': psutil.virtual_memory().percent
+        }
+
+    stats = {'cpu_percent': None, 'rss_mb': None, 'system_cpu_percent': None, 'system_memory_percent': None}
+    try:
+        with open('/proc/self/statm') as statm:
+            resident_pages = int(statm.read().split()[1])
+        stats['rss_mb'] = round(resident_pages * os.sysconf('SC_PAGE_SIZE') / 1024 / 1024, 2)
+    except (OSError, ValueError, IndexError, AttributeError):
+        pass
+    if hasattr(os, 'getloadavg'):
+        stats['load_1m'] = os.getloadavg()[0]
+    return stats
+
+
+class HealthSampler:
+    """Latest health sample of this worker process."""
+
+    def __init__(self, max_age: float = 15.0):
+        self.max_age = max_age
+        self.sample: Optional[Dict[str, Any]] = None
+        self.sampled_at: Optional[float] = None  # time.monotonic() of the sample
+        self.samples = 0
+        self._sampling = threading.Lock()
+        self._process = None
+        self._process_pid = None
+
+    def _get_process(self):
+        """psutil handle of this process, or None without psutil."""
+        if self._process_pid != os.getpid():
+            try:
+                import psutil
+            except ImportError:
+                return None
+            self._process = psutil.Process()
+            self._process_pid = os.getpid()
+        return self._process
+
+    def take_sample(self) -> Dict[str, Any]:
+        """Measure database, pool and process health now (needs an app context)."""
+        from . import db
+
+        database = {'ok': True, 'latency_ms': None, 'error': None}
+        started = time.perf_counter()
+        try:
+            with db.engine.connect() as conn:
+                conn.execute(text('SELECT 1'))
+            database['latency_ms'] = round((time.perf_counter() - started) * 1000, 3)
+        except Exception as e:
+            database.update(ok=False, error=str(e))
+
+        sample = {
+            'database': database,
+            'pool': _pool_state(db.engine.pool),
+            'process': _process_stats(self._get_process()),
+            'pid': os.getpid(),
+            'sampled_at': datetime.utcnow().isoformat()
+        }
+        self.sample, self.sampled_at = sample, time.monotonic()
+        self.samples += 1
+        return sample
+
+    def age(self) -> Optional[float]:
+        """Seconds since the latest sample (None if there is none)."""
+        if self.sampled_at is None:
+            return None
+        return time.monotonic() - self.sampled_at
+
+    def current(self) -> Tuple[Optional[Dict[str, Any]], Optional[float]]:
+        """
+        The latest sample and its age, sampling first if it is missing or stale.
+
+        Only one caller samples at a time; the others get the stale sample.
+
+        Returns:
+            tuple: (sample or None, age in seconds or None)
+        """
+        age = self.age()
+        if (age is None or age > self.max_age) and self._sampling.acquire(blocking=False):
+            try:
+                self.take_sample()
+            finally:
+                self._sampling.release()
+        return self.sample, self.age()
+
+    def readiness(self) -> Tuple[bool, Optional[float]]:
+        """
+        Whether this worker can serve requests, judged from the latest sample.
+
+        Returns:
+            tuple: (ready, age of the sample in seconds or None)
+        """
+        sample, age = self.current()
+        ready = bool(sample and sample['database']['ok'] and age is not None and age <= self.max_age)
+        return ready, round(age, 3) if age is not None else None
+
+
+# Global sampler instance
+health_sampler = HealthSampler()
+
+
+def init_health_probes(app):
+    """Configure the health sampler from the application config."""
+    health_sampler.max_age = app.config.get('HEALTH_SAMPLE_MAX_AGE', 15.0)
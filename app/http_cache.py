@@ -0,0 +1,387 @@
+"""
+HTTP caching for the Badminton Scheduler application.
+
+Conditional GET: every write bumps a version for the data scopes it touched
+(availability, comments, users, admin), from the same CacheManager.invalidate_*
+calls that clear the query cache. Versions live in marker files shared by all
+worker processes on the host. Page views decorated with conditional_get derive
+a weak ETag from those versions, the user and the view parameters, and answer
+a matching If-None-Match with 304 before running any query or rendering a
+template.
+
+Static assets: url_for('static', ...) produces content-fingerprinted filenames
+(css/main.<hash>.css) which are served with far-future, immutable cache headers.
+"""
+
+import hashlib
+import os
+import re
+import secrets
+import threading
+import time
+from datetime import date
+from functools import wraps
+from typing import Callable, Dict, Optional, Tuple
+
+from flask import current_app, make_response, request, session, send_from_directory
+from flask_login import current_user
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+
+DATA_SCOPES = ('availability', 'comments', 'users', 'admin')
+
+
+class DataVersions:
+    """
+    Per-scope data version tokens.
+
+    With a directory, each scope is a marker file that a bump atomically
+    replaces, so every worker process on the host sees the same version and
+    reading it costs one stat() call. Without one, versions are in-memory
+    counters prefixed with a per-process nonce.
+
+    When a read finds a version changed by another process, on_external_change
+    is called with the scope so this process can drop its own cached queries.
+    """
+
+    def __init__(self, directory: Optional[str] = None):
+        self.nonce = secrets.token_hex(4)
+        self.on_external_change: Optional[Callable[[str], None]] = None
+        self._counters: Dict[str, int] = {scope: 0 for scope in DATA_SCOPES}
+        self._seen: Dict[str, str] = {}
+        self._lock = threading.Lock()
+        self.configure(directory)
+
+    def configure(self, directory: Optional[str] = None):
+        self.directory = directory
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._seen = {scope: self.get(scope) for scope in DATA_SCOPES}
+
+    def bump(self, *scopes: str):
+        """Mark data in the given scopes (all scopes if none given) as changed."""
+        for scope in scopes or DATA_SCOPES:
+            with self._lock:
+                self._counters[scope] = self._counters.get(scope, 0) + 1
+            if self.directory:
+                path = os.path.join(self.directory, scope)
+                tmp_path = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+                try:
+                    with open(tmp_path, 'w') as f:
+                        f.write(secrets.token_hex(8))
+                    os.replace(tmp_path, path)
+                except OSError:
+                    pass
+            self._seen[scope] = self.get(scope)
+
+    def get(self, scope: str) -> str:
+        """Current version token of a scope."""
+        if self.directory:
+            try:
+                stat = os.stat(os.path.join(self.directory, scope))
+            except OSError:
+                return '0'
+            return f'{stat.st_ino:x}-{stat.st_mtime_ns:x}'
+        return f'{self.nonce}-{self._counters.get(scope, 0)}'
+
+    def token(self, *scopes: str) -> str:
+        """Combined version token for the given scopes."""
+        tokens = []
+        for scope in scopes:
+            current = self.get(scope)
+            seen = self._seen.get(scope)
+            if seen != current:
+                self._seen[scope] = current
+                if seen is not None and self.on_external_change:
+                    self.on_external_change(scope)
+            tokens.append(current)
+        return '.'.join(tokens)
+
+
+# Global data version instance
+data_versions = DataVersions()
+
+
+# -------------------------------
+# Commit hooks
+# -------------------------------
+
+def _scopes_for(cls) -> Tuple[str, ...]:
+    """Data scopes affected by writing rows of a model class."""
+    from .models import Availability, AvailabilityArchive, Comment, User, AdminAction
+
+    if issubclass(cls, (Availability, AvailabilityArchive)):
+        return ('availability',)
+    if issubclass(cls, Comment):
+        return ('comments',)
+    if issubclass(cls, User):
+        # Usernames and blocked status show up in availability and comment lists
+        return ('users', 'availability', 'comments')
+    if issubclass(cls, AdminAction):
+        return ('admin',)
+    return ()
+
+
+def _record_changes(session, scopes, dates=None):
+    """
+    Remember changed scopes until the transaction ends.
+
+    Args:
+        session: Session the changes were made in
+        scopes: Changed data scopes
+        dates: Changed availability dates, or None if they are unknown
+    """
+    if not scopes:
+        return
+    session.info.setdefault('changed_data_scopes', set()).update(scopes)
+    if 'availability' in scopes:
+        if dates is None:
+            session.info['changed_availability_dates'] = None
+        elif session.info.get('changed_availability_dates', set()) is not None:
+            session.info.setdefault('changed_availability_dates', set()).update(dates)
+
+
+def _collect_changed_scopes(session, flush_context, instances):
+    """Remember which data scopes a flush is about to write."""
+    from .models import Availability, AvailabilityArchive
+
+    scopes = set()
+    dates = set()
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        scopes.update(_scopes_for(type(obj)))
+        if isinstance(obj, (Availability, AvailabilityArchive)):
+            # Both the old and the new date of a moved entry change
+            dates.update(d for d in inspect(obj).attrs.date.history.sum() if d is not None)
+
+    _record_changes(session, scopes, dates)
+
+
+def _collect_bulk_scopes(orm_execute_state):
+    """Remember scopes written by bulk INSERT/UPDATE/DELETE statements, which skip flushes."""
+    if not (orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete):
+        return
+    mapper = orm_execute_state.bind_mapper
+    if mapper is not None:
+        _record_changes(orm_execute_state.session, _scopes_for(mapper.class_))
+
+
+def _invalidate_committed_scopes(session):
+    """Invalidate caches (and bump data versions) for scopes written by a commit."""
+    scopes = session.info.pop('changed_data_scopes', None)
+    dates = session.info.pop('changed_availability_dates', None)
+    if not scopes:
+        return
+
+    from .db_queries import CacheManager
+    if 'users' in scopes:
+        CacheManager.invalidate_user_cache()
+    if 'availability' in scopes:
+        CacheManager.invalidate_availability_cache()
+        CacheManager.invalidate_availability_fragments(None if 'users' in scopes else dates)
+
+        from .live_updates import availability_broker
+        availability_broker.publish(None if 'users' in scopes else dates)
+    if 'comments' in scopes:
+        CacheManager.invalidate_comment_cache()
+    if 'admin' in scopes:
+        CacheManager.invalidate_admin_cache()
+
+
+def _invalidate_local_scope(scope: str):
+    """Drop this process's cached queries for a scope changed by another process."""
+    from .db_queries import CacheManager
+    invalidate = {
+        'availability': CacheManager.invalidate_availability_cache,
+        'comments': CacheManager.invalidate_comment_cache,
+        'users': CacheManager.invalidate_user_cache,
+        'admin': CacheManager.invalidate_admin_cache
+    }.get(scope)
+    if invalidate:
+        invalidate(propagate=False)
+    if scope == 'availability':
+        # The other worker's write may have been for any date
+        CacheManager.invalidate_availability_fragments()
+
+
+def _discard_changed_scopes(session):
+    session.info.pop('changed_data_scopes', None)
+    session.info.pop('changed_availability_dates', None)
+
+
+def register_commit_hooks():
+    """Invalidate caches after every committed write, including routes that don't call CacheManager."""
+    if event.contains(Session, 'before_flush', _collect_changed_scopes):
+        return
+    event.listen(Session, 'before_flush', _collect_changed_scopes)
+    event.listen(Session, 'do_orm_execute', _collect_bulk_scopes)
+    event.listen(Session, 'after_commit', _invalidate_committed_scopes)
+    event.listen(Session, 'after_rollback', _discard_changed_scopes)
+
+
+def unregister_commit_hooks():
+    """Remove the Session hooks, e.g. before the application modules are re-imported."""
+    if not event.contains(Session, 'before_flush', _collect_changed_scopes):
+        return
+    event.remove(Session, 'before_flush', _collect_changed_scopes)
+    event.remove(Session, 'do_orm_execute', _collect_bulk_scopes)
+    event.remove(Session, 'after_commit', _invalidate_committed_scopes)
+    event.remove(Session, 'after_rollback', _discard_changed_scopes)
+
+
+# -------------------------------
+# Conditional GET
+# -------------------------------
+
+def compute_view_etag(scopes: Tuple[str, ...], view_args: Optional[dict] = None,
+                      daily: bool = False, embeds_csrf: bool = True) -> str:
+    """
+    Compute the ETag for the current request of a conditional view.
+
+    Args:
+        scopes: Data scopes the view renders
+        view_args: URL parameters of the view
+        daily: Whether the output also depends on today's date
+        embeds_csrf: Whether the output contains a CSRF token
+
+    Returns:
+        str: Opaque ETag value (without quotes or weak prefix)
+    """
+    parts = [
+        data_versions.token(*scopes),
+        current_user.get_id() if current_user.is_authenticated else '-',
+        request.path,
+        repr(sorted((view_args or {}).items())),
+        repr(sorted(request.args.items(multi=True)))
+    ]
+    if daily:
+        parts.append(date.today().isoformat())
+
+    # Cached pages embed a CSRF token, so let them expire with it
+    csrf_limit = current_app.config.get('WTF_CSRF_TIME_LIMIT')
+    if embeds_csrf and current_app.config.get('WTF_CSRF_ENABLED', True) and csrf_limit:
+        parts.append(str(int(time.time() // max(csrf_limit // 2, 1))))
+
+    return hashlib.sha1('|'.join(parts).encode('utf-8')).hexdigest()[:20]
+
+
+def conditional_get(*scopes: str, daily: bool = False, embeds_csrf: bool = True):
+    """
+    Decorator adding weak-ETag conditional GET support to a page view.
+
+    Args:
+        scopes: Data scopes whose changes alter the page; 'users' is always included
+        daily: Whether the page also changes when the date changes
+        embeds_csrf: Whether the page contains a CSRF token (False for JSON)
+    """
+    scopes = tuple(dict.fromkeys(scopes + ('users',)))
+
+    def decorator(f):
+        @wraps(f)
+        def decorated_function(*args, **kwargs):
+            # Pending flash messages must be rendered, not served from cache
+            if (request.method != 'GET' or not current_app.config.get('HTTP_CONDITIONAL_GET', True)
+                    or session.get('_flashes')):
+                return f(*args, **kwargs)
+
+            etag = compute_view_etag(scopes, kwargs, daily, embeds_csrf)
+            if request.if_none_match.contains_weak(etag):
+                response = current_app.response_class(status=304)
+            else:
+                response = make_response(f(*args, **kwargs))
+                if response.status_code != 200 or session.get('_flashes'):
+                    return response
+
+            response.set_etag(etag, weak=True)
+            response.headers['Cache-Control'] = 'private, no-cache'
+            return response
+        return decorated_function
+    return decorator
+
+
+# -------------------------------
+# Static asset fingerprinting
+# -------------------------------
+
+FINGERPRINT_RE = re.compile(r'^(?P<stem>.+)\.(?P<digest>[0-9a-f]{12})(?P<ext>\.[A-Za-z0-9]+)$')
+
+
+class StaticFingerprinter:
+    """Content-hash fingerprints for files in the static folder."""
+
+    def __init__(self, static_folder: str):
+        self.static_folder = static_folder
+        self._digests: Dict[str, Tuple[float, str]] = {}
+        self._lock = threading.Lock()
+
+    def digest(self, filename: str) -> Optional[str]:
+        """Short content hash of a static file, or None if it does not exist."""
+        path = os.path.join(self.static_folder, filename)
+        try:
+            mtime = os.path.getmtime(path)
+        except OSError:
+            return None
+
+        cached = self._digests.get(filename)
+        if cached and cached[0] == mtime:
+            return cached[1]
+
+        with open(path, 'rb') as f:
+            digest = hashlib.md5(f.read()).hexdigest()[:12]
+        with self._lock:
+            self._digests[filename] = (mtime, digest)
+        return digest
+
+    def fingerprint(self, filename: str) -> str:
+        """css/main.css -> css/main.<digest>.css (unchanged if the file is missing)."""
+        digest = self.digest(filename)
+        if not digest:
+            return filename
+        stem, ext = os.path.splitext(filename)
+        return f'{stem}.{digest}{ext}'
+
+    def resolve(self, filename: str) -> Tuple[str, bool]:
+        """
+        Map a requested static filename to the file on disk.
+
+        Returns:
+            tuple: (filename, immutable) where immutable means the fingerprint
+                   matches the current file content
+        """
+        match = FINGERPRINT_RE.match(filename)
+        if match:
+            original = match.group('stem') + match.group('ext')
+            current = self.digest(original)
+            if current:
+                return original, current == match.group('digest')
+        return filename, False
+
+
+def init_http_cache(app):
+    """Configure data versions, commit hooks and static asset fingerprinting."""
+    data_versions.configure(app.config.get('DATA_VERSION_DIR'))
+    data_versions.on_external_change = _invalidate_local_scope
+    register_commit_hooks()
+
+    if not app.config.get('STATIC_FINGERPRINT', True) or not app.static_folder:
+        return
+
+    fingerprinter = StaticFingerprinter(app.static_folder)
+    max_age = int(app.config.get('STATIC_ASSET_MAX_AGE', 365 * 24 * 3600))
+
+    @app.url_defaults
+    def fingerprint_static_urls(endpoint, values):
+        if endpoint == 'static' and 'filename' in values:
+            values['filename'] = fingerprinter.fingerprint(values['filename'])
+
+    def fingerprinted_static(filename):
+        """Serve static files, caching fingerprinted URLs for max_age."""
+        original, immutable = fingerprinter.resolve(filename)
+        if not immutable:
+            return app.send_static_file(original)
+        response = send_from_directory(app.static_folder, original, max_age=max_age)
+        response.cache_control.public = True
+        response.cache_control.immutable = True
+        return response
+
+    app.view_functions['static'] = fingerprinted_static
+    app.static_fingerprinter = fingerprinter
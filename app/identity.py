@@ -0,0 +1,139 @@
+"""
+Cached user identities for Flask-Login.
+
+The user loader runs on every authenticated request. Instead of loading the
+full User row each time, it returns a small immutable UserIdentity snapshot
+(id, username, role, is_active) kept for a short TTL. Updates and deletes of
+User rows evict the snapshot in the current process; other worker processes
+pick up the change once their entry expires.
+"""
+
+import threading
+import time
+from typing import Any, Dict, NamedTuple, Optional
+
+
+class UserIdentity(NamedTuple):
+    """Read-only snapshot of the fields request handling needs from a User."""
+
+    id: int
+    username: str
+    role: str
+    is_active: bool
+
+    @classmethod
+    def from_user(cls, user) -> 'UserIdentity':
+        return cls(user.id, user.username, user.role, bool(user.is_active))
+
+    @property
+    def is_authenticated(self) -> bool:
+        return True
+
+    @property
+    def is_anonymous(self) -> bool:
+        return False
+
+    def get_id(self) -> str:
+        """Return user ID as string for Flask-Login."""
+        return str(self.id)
+
+    def is_admin(self) -> bool:
+        """Check if user has admin role."""
+        return self.role == 'Admin'
+
+    def __str__(self):
+        return self.username
+
+
+class IdentityCache:
+    """Thread-safe TTL cache of UserIdentity snapshots keyed by user ID."""
+
+    def __init__(self, ttl_seconds: float = 30):
+        self.ttl_seconds = ttl_seconds
+        self._entries: Dict[int, tuple] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, user_id: int) -> Optional[UserIdentity]:
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None or entry[1] <= now:
+                if entry is not None:
+                    del self._entries[user_id]
+                self.misses += 1
+                return None
+            self.hits += 1
+            return entry[0]
+
+    def put(self, identity: UserIdentity, ttl_seconds: Optional[float] = None):
+        if ttl_seconds is None:
+            ttl_seconds = self.ttl_seconds
+        if ttl_seconds <= 0:
+            return
+        with self._lock:
+            self._entries[identity.id] = (identity, time.time() + ttl_seconds)
+
+    def invalidate(self, user_id: int):
+        """Evict one user's snapshot, e.g. after their role or status changed."""
+        with self._lock:
+            self._entries.pop(user_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'size': len(self._entries),
+                'ttl_seconds': self.ttl_seconds,
+                'hits': self.hits,
+                'misses': self.misses
+            }
+
+
+# Global identity cache instance
+identity_cache = IdentityCache()
+
+
+def load_identity(user_id) -> Optional[UserIdentity]:
+    """
+    Load the identity for a session's user ID, from cache when possible.
+
+    The TTL comes from the current app's USER_IDENTITY_CACHE_TTL; 0 bypasses
+    the cache.
+
+    Args:
+        user_id: User ID as stored in the session
+
+    Returns:
+        UserIdentity: Snapshot of the user, or None if the user does not exist
+    """
+    from flask import current_app
+    from . import db
+    from .models import User
+
+    try:
+        user_id = int(user_id)
+    except (TypeError, ValueError):
+        return None
+
+    ttl_seconds = current_app.config.get('USER_IDENTITY_CACHE_TTL', identity_cache.ttl_seconds)
+    if ttl_seconds > 0:
+        identity = identity_cache.get(user_id)
+        if identity is not None:
+            return identity
+
+    # Read the row even if the session already holds this user, since the
+    # snapshot outlives the request that filled it
+    user = db.session.get(User, user_id, populate_existing=True)
+    if user is None:
+        return None
+
+    identity = UserIdentity.from_user(user)
+    identity_cache.put(identity, ttl_seconds)
+    return identity
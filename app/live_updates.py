@@ -0,0 +1,223 @@
+"""
+Live availability updates for the Badminton Scheduler application.
+
+Committed availability writes are published to an in-process broker, which
+hands them to the Server-Sent Events streams watching the affected dates.
+Each stream blocks on its own queue, so an idle client costs nothing but a
+keep-alive comment every SSE_KEEPALIVE_SECONDS.
+
+Worker processes share changes through a small SQLite event log: publishers
+append a row, and one poller thread per worker, running only while that
+worker has subscribers, forwards rows written by other processes to its
+local broker.
+"""
+
+import os
+import queue
+import sqlite3
+import threading
+import time
+from datetime import date
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional, Set, Tuple
+
+# Events older than this are removed from the shared log
+EVENT_LOG_RETENTION_SECONDS = 3600
+
+
+class Subscription:
+    """One SSE stream's queue of changes for the dates it watches."""
+
+    def __init__(self, dates: FrozenSet[date], max_pending: int = 100):
+        self.dates = dates
+        self.queue: 'queue.Queue[Dict[str, Any]]' = queue.Queue(maxsize=max_pending)
+
+    def matching(self, dates: Optional[FrozenSet[date]]) -> Optional[List[str]]:
+        """
+        Watched dates among the changed ones.
+
+        Returns:
+            list: ISO dates to report ([] if none match), or None when the
+                  changed dates are unknown and every watcher is affected
+        """
+        if dates is None:
+            return None
+        return sorted(day.isoformat() for day in self.dates & dates)
+
+    def get(self, timeout: float) -> Optional[Dict[str, Any]]:
+        """Wait up to timeout seconds for the next change."""
+        try:
+            return self.queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+
+class EventLog:
+    """Append-only SQLite log of availability changes shared by worker processes."""
+
+    def __init__(self, db_path: str):
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.db_path = db_path
+        self._appends = 0
+        self._execute(
+            'CREATE TABLE IF NOT EXISTS availability_events ('
+            'id INTEGER PRIMARY KEY AUTOINCREMENT, pid INTEGER NOT NULL, '
+            'dates TEXT, created_at REAL NOT NULL)'
+        )
+
+    def _execute(self, sql: str, params=()) -> list:
+        with sqlite3.connect(self.db_path, timeout=5) as conn:
+            rows = conn.execute(sql, params).fetchall()
+        conn.close()
+        return rows
+
+    def append(self, dates: Optional[FrozenSet[date]]):
+        """Record a change made by this process (dates None means unknown)."""
+        encoded = None if dates is None else ','.join(sorted(day.isoformat() for day in dates))
+        now = time.time()
+        self._execute('INSERT INTO availability_events (pid, dates, created_at) VALUES (?, ?, ?)',
+                      (os.getpid(), encoded, now))
+
+        self._appends += 1
+        if self._appends % 100 == 0:
+            self._execute('DELETE FROM availability_events WHERE created_at < ?',
+                          (now - EVENT_LOG_RETENTION_SECONDS,))
+
+    def last_id(self) -> int:
+        return self._execute('SELECT COALESCE(MAX(id), 0) FROM availability_events')[0][0]
+
+    def read_since(self, last_id: int) -> Tuple[int, List[Optional[FrozenSet[date]]]]:
+        """
+        Changes made by other processes after last_id.
+
+        Returns:
+            tuple: (new last ID, list of changed date sets)
+        """
+        rows = self._execute('SELECT id, pid, dates FROM availability_events WHERE id > ? ORDER BY id',
+                             (last_id,))
+        changes = []
+        for event_id, pid, encoded in rows:
+            last_id = event_id
+            if pid == os.getpid():
+                continue
+            changes.append(None if encoded is None else
+                           frozenset(date.fromisoformat(day) for day in encoded.split(',') if day))
+        return last_id, changes
+
+
+class AvailabilityBroker:
+    """In-process publish/subscribe hub for availability changes."""
+
+    def __init__(self, max_subscribers: int = 200, poll_interval: float = 1.0):
+        self.max_subscribers = max_subscribers
+        self.poll_interval = poll_interval
+        self.event_log: Optional[EventLog] = None
+        self._subscribers: Set[Subscription] = set()
+        self._lock = threading.Lock()
+        self._poller: Optional[threading.Thread] = None
+        self.published = 0
+        self.delivered = 0
+        self.dropped = 0
+
+    def configure(self, db_path: Optional[str] = None, max_subscribers: int = 200,
+                  poll_interval: float = 1.0):
+        self.event_log = EventLog(db_path) if db_path else None
+        self.max_subscribers = max_subscribers
+        self.poll_interval = poll_interval
+
+    def subscribe(self, dates: Iterable[date]) -> Optional[Subscription]:
+        """Register a stream for the given dates, or return None if the broker is full."""
+        subscription = Subscription(frozenset(dates))
+        with self._lock:
+            if len(self._subscribers) >= self.max_subscribers:
+                return None
+            self._subscribers.add(subscription)
+            if self.event_log and not (self._poller and self._poller.is_alive()):
+                self._poller = threading.Thread(target=self._poll, name='live-updates-poller',
+                                                daemon=True)
+                self._poller.start()
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        with self._lock:
+            self._subscribers.discard(subscription)
+
+    def publish(self, dates: Optional[Iterable[date]] = None):
+        """
+        Announce committed availability changes.
+
+        Args:
+            dates: Changed dates, or None if any date may have changed
+        """
+        dates = None if dates is None else frozenset(dates)
+        if dates is not None and not dates:
+            return
+        self.published += 1
+        self.dispatch(dates)
+        if self.event_log:
+            try:
+                self.event_log.append(dates)
+            except sqlite3.Error:
+                pass
+
+    def dispatch(self, dates: Optional[FrozenSet[date]]):
+        """Hand a change to every local subscriber watching an affected date."""
+        with self._lock:
+            subscribers = list(self._subscribers)
+
+        for subscription in subscribers:
+            matching = subscription.matching(dates)
+            if matching == []:
+                continue
+            try:
+                subscription.queue.put_nowait({'dates': matching})
+                self.delivered += 1
+            except queue.Full:
+                # The client already has unread changes pending; it reloads anyway
+                self.dropped += 1
+
+    def _poll(self):
+        """Forward other workers' changes until this worker has no subscribers."""
+        try:
+            last_id = self.event_log.last_id()
+        except sqlite3.Error:
+            return
+
+        while True:
+            time.sleep(self.poll_interval)
+            with self._lock:
+                if not self._subscribers or not self.event_log:
+                    self._poller = None
+                    return
+            try:
+                last_id, changes = self.event_log.read_since(last_id)
+            except sqlite3.Error:
+                continue
+            for dates in changes:
+                self.dispatch(dates)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            subscribers = len(self._subscribers)
+        return {
+            'subscribers': subscribers,
+            'max_subscribers': self.max_subscribers,
+            'published': self.published,
+            'delivered': self.delivered,
+            'dropped': self.dropped,
+            'shared_log': self.event_log.db_path if self.event_log else None
+        }
+
+
+# Global broker instance
+availability_broker = AvailabilityBroker()
+
+
+def init_live_updates(app):
+    """Configure the availability broker from the application config."""
+    availability_broker.configure(
+        db_path=app.config.get('LIVE_UPDATES_DB'),
+        max_subscribers=app.config.get('SSE_MAX_CLIENTS', 200),
+        poll_interval=app.config.get('LIVE_UPDATES_POLL_INTERVAL', 1.0)
+    )
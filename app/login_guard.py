@@ -0,0 +1,151 @@
+"""
+Login pipeline support for the Badminton Scheduler application.
+
+The login view rejects requests in order of cost: form validation, one
+combined rate-limit check, a single input validation pass, then a negative
+cache of usernames known not to exist, and only then the database lookup and
+password hash. Unknown usernames still pay for a dummy hash so response times
+don't reveal which accounts exist. Each stage is timed so slow logins can be
+traced to rate limiting, lookup or hashing.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+
+class UnknownUsernameCache:
+    """Bounded in-memory cache of usernames that had no account."""
+
+    def __init__(self, ttl_seconds: float = 60, max_size: int = 10000):
+        self.ttl_seconds = ttl_seconds
+        self.max_size = max_size
+        self._entries: 'OrderedDict[str, float]' = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def contains(self, username: str) -> bool:
+        """Whether username was recently looked up and not found."""
+        now = time.time()
+        with self._lock:
+            expires_at = self._entries.get(username)
+            if expires_at is None or expires_at <= now:
+                if expires_at is not None:
+                    del self._entries[username]
+                self.misses += 1
+                return False
+            self.hits += 1
+            return True
+
+    def add(self, username: str):
+        """Remember that username has no account."""
+        if self.ttl_seconds <= 0:
+            return
+        with self._lock:
+            self._entries[username] = time.time() + self.ttl_seconds
+            self._entries.move_to_end(username)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def discard(self, username: str):
+        """Forget username, e.g. because an account was created for it."""
+        with self._lock:
+            self._entries.pop(username, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'size': len(self._entries),
+                'max_size': self.max_size,
+                'ttl_seconds': self.ttl_seconds,
+                'hits': self.hits,
+                'misses': self.misses
+            }
+
+
+class LoginTrace:
+    """Stage timings for a single login attempt."""
+
+    def __init__(self, timings: 'LoginTimings'):
+        self._timings = timings
+        self.started = time.perf_counter()
+        self._last_mark = self.started
+        self.stages: Dict[str, float] = {}
+        self.outcome: Optional[str] = None
+
+    def mark(self, stage: str):
+        """Attribute the time since the previous mark to stage."""
+        now = time.perf_counter()
+        self.stages[stage] = self.stages.get(stage, 0.0) + (now - self._last_mark)
+        self._last_mark = now
+
+    def finish(self, outcome: Optional[str] = None):
+        """Record this attempt's stage timings and outcome."""
+        if outcome is not None:
+            self.outcome = outcome
+        self._timings.record(self.stages, time.perf_counter() - self.started,
+                             self.outcome or 'error')
+
+
+class LoginTimings:
+    """Aggregated per-stage login timings and outcome counts."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def start(self) -> LoginTrace:
+        return LoginTrace(self)
+
+    def record(self, stages: Dict[str, float], total: float, outcome: str):
+        with self._lock:
+            for stage, duration in list(stages.items()) + [('total', total)]:
+                stats = self._stages.setdefault(stage, {'count': 0, 'total': 0.0, 'max': 0.0})
+                stats['count'] += 1
+                stats['total'] += duration
+                stats['max'] = max(stats['max'], duration)
+            self._outcomes[outcome] = self._outcomes.get(outcome, 0) + 1
+
+    def reset(self):
+        with self._lock:
+            self._stages: Dict[str, Dict[str, float]] = {}
+            self._outcomes: Dict[str, int] = {}
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get login timing statistics.
+
+        Returns:
+            dict: Per-stage count, average and maximum in milliseconds, and
+                  the number of attempts per outcome
+        """
+        with self._lock:
+            stages = {
+                stage: {
+                    'count': stats['count'],
+                    'avg_ms': round(stats['total'] / stats['count'] * 1000, 3),
+                    'max_ms': round(stats['max'] * 1000, 3)
+                }
+                for stage, stats in self._stages.items()
+            }
+            return {'stages': stages, 'outcomes': dict(self._outcomes)}
+
+
+# Global instances
+unknown_usernames = UnknownUsernameCache()
+login_timings = LoginTimings()
+
+
+def init_login_guard(app):
+    """Configure the unknown-username cache from the application config."""
+    unknown_usernames.ttl_seconds = app.config.get('LOGIN_UNKNOWN_USER_CACHE_TTL', 60)
+    unknown_usernames.max_size = app.config.get('LOGIN_UNKNOWN_USER_CACHE_SIZE', 10000)
+    unknown_usernames.clear()
@@ -0,0 +1,318 @@
+"""
+Memory diagnostics for the Badminton Scheduler application.
+
+Admin endpoints under /health/memory start and stop tracemalloc, take
+snapshots and diff two of them grouped by file and line, so growth between
+two points in time can be traced to the code that allocated it. Alongside,
+structure_sizes() reports the entry counts and estimated sizes of the
+application's long-lived in-memory structures (query cache, rate limiter,
+error history, metrics registry, ...), the usual suspects when worker RSS
+creeps up.
+
+Tracing slows every allocation down, so it only runs between an explicit
+start and stop, and at most MEMORY_MAX_SNAPSHOTS snapshots are kept.
+Each worker process traces itself.
+"""
+
+import threading
+import tracemalloc
+from collections import OrderedDict, deque
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from .db_performance import estimate_size
+
+
+# Allocations made by tracemalloc itself and by imports are noise in a diff
+_SNAPSHOT_FILTERS = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+    tracemalloc.Filter(False, '<frozen importlib._bootstrap_external>'),
+    tracemalloc.Filter(False, '<unknown>'),
+)
+
+GROUP_BY_OPTIONS = ('lineno', 'filename', 'traceback')
+
+
+def _stat_entry(stat) -> Dict[str, Any]:
+    """JSON form of a tracemalloc Statistic or StatisticDiff."""
+    frame = stat.traceback[0]
+    entry = {
+        'file': frame.filename,
+        'line': frame.lineno,
+        'size_kb': round(stat.size / 1024, 2),
+        'count': stat.count
+    }
+    if hasattr(stat, 'size_diff'):
+        entry['size_diff_kb'] = round(stat.size_diff / 1024, 2)
+        entry['count_diff'] = stat.count_diff
+    if len(stat.traceback) > 1:
+        entry['traceback'] = [f"{frame.filename}:{frame.lineno}" for frame in stat.traceback]
+    return entry
+
+
+class MemoryTracer:
+    """Starts and stops tracemalloc and keeps numbered snapshots."""
+
+    def __init__(self, max_snapshots: int = 4, frames: int = 1):
+        self.max_snapshots = max_snapshots
+        self.frames = frames
+        self.snapshots: 'OrderedDict[int, Dict[str, Any]]' = OrderedDict()
+        self.started_here = False  # Whether start() turned tracing on
+        self._next_id = 1
+        self._lock = threading.Lock()
+
+    def start(self, frames: Optional[int] = None) -> bool:
+        """
+        Start tracing allocations.
+
+        Args:
+            frames: Traceback depth stored per allocation (1 is enough to group
+                by file and line; more costs memory but allows 'traceback' diffs)
+
+        Returns:
+            bool: False if tracemalloc was already tracing
+        """
+        if tracemalloc.is_tracing():
+            return False
+        tracemalloc.start(max(1, min(int(frames or self.frames), 50)))
+        self.started_here = True
+        return True
+
+    def stop(self) -> bool:
+        """
+        Stop tracing and free its traces (snapshots already taken are kept).
+
+        Returns:
+            bool: False if tracemalloc was not tracing
+        """
+        if not tracemalloc.is_tracing():
+            return False
+        tracemalloc.stop()
+        self.started_here = False
+        return True
+
+    def take_snapshot(self) -> Dict[str, Any]:
+        """
+        Snapshot the traced allocations, dropping the oldest kept snapshot if full.
+
+        Returns:
+            dict: Snapshot summary (id, taken_at, traced_kb)
+
+        Raises:
+            RuntimeError: If tracemalloc is not tracing
+        """
+        if not tracemalloc.is_tracing():
+            raise RuntimeError('tracemalloc is not tracing; start it first')
+
+        snapshot = tracemalloc.take_snapshot().filter_traces(_SNAPSHOT_FILTERS)
+        with self._lock:
+            snapshot_id = self._next_id
+            self._next_id += 1
+            self.snapshots[snapshot_id] = {
+                'snapshot': snapshot,
+                'taken_at': datetime.utcnow().isoformat(),
+                'traced_kb': round(sum(trace.size for trace in snapshot.traces) / 1024, 2),
+                'frames': snapshot.traceback_limit
+            }
+            while len(self.snapshots) > self.max_snapshots:
+                self.snapshots.popitem(last=False)
+        return self._summary(snapshot_id)
+
+    def _summary(self, snapshot_id: int) -> Dict[str, Any]:
+        info = self.snapshots[snapshot_id]
+        return {'id': snapshot_id, **{name: value for name, value in info.items() if name != 'snapshot'}}
+
+    def _get(self, snapshot_id: int):
+        info = self.snapshots.get(snapshot_id)
+        if info is None:
+            raise KeyError(f'Unknown snapshot {snapshot_id}')
+        return info['snapshot']
+
+    def top(self, snapshot_id: int, group_by: str = 'lineno', limit: int = 25) -> List[Dict[str, Any]]:
+        """
+        Largest allocation sites of one snapshot.
+
+        Raises:
+            KeyError: If the snapshot is unknown (or was dropped)
+        """
+        return [_stat_entry(stat) for stat in self._get(snapshot_id).statistics(group_by)[:limit]]
+
+    def diff(self, first_id: int, second_id: int, group_by: str = 'lineno',
+             limit: int = 25) -> Dict[str, Any]:
+        """
+        Allocation growth from one snapshot to another.
+
+        Args:
+            first_id: Earlier snapshot
+            second_id: Later snapshot
+            group_by: 'lineno' (file and line), 'filename' or 'traceback'
+            limit: Number of sites returned, largest change first
+
+        Returns:
+            dict: Total size change and the sites that changed most
+
+        Raises:
+            KeyError: If a snapshot is unknown (or was dropped)
+        """
+        stats = self._get(second_id).compare_to(self._get(first_id), group_by)
+        return {
+            'from': first_id,
+            'to': second_id,
+            'group_by': group_by,
+            'size_diff_kb': round(sum(stat.size_diff for stat in stats) / 1024, 2),
+            'count_diff': sum(stat.count_diff for stat in stats),
+            'top': [_stat_entry(stat) for stat in stats[:limit] if stat.size_diff or stat.count_diff]
+        }
+
+    def get_status(self) -> Dict[str, Any]:
+        """Tracing state, traced memory and the kept snapshots."""
+        status = {
+            'tracing': tracemalloc.is_tracing(),
+            'started_here': self.started_here,
+            'frames': tracemalloc.get_traceback_limit() if tracemalloc.is_tracing() else None,
+            'max_snapshots': self.max_snapshots,
+            'snapshots': [self._summary(snapshot_id) for snapshot_id in list(self.snapshots)]
+        }
+        if status['tracing']:
+            current, peak = tracemalloc.get_traced_memory()
+            status['traced_kb'] = round(current / 1024, 2)
+            status['peak_kb'] = round(peak / 1024, 2)
+            status['overhead_kb'] = round(tracemalloc.get_tracemalloc_memory() / 1024, 2)
+        return status
+
+
+def count_orm_objects(value: Any, max_objects: int = 100000) -> int:
+    """Distinct ORM instances reachable from a cached value (containers, paginations, relationships)."""
+    seen = set()
+    stack = [value]
+    instances = 0
+    while stack and len(seen) < max_objects:
+        obj = stack.pop()
+        if id(obj) in seen:
+            continue
+        seen.add(id(obj))
+        if isinstance(obj, dict):
+            stack.extend(obj.values())
+        elif isinstance(obj, (list, tuple, set, frozenset, deque)):
+            stack.extend(obj)
+        elif hasattr(obj, '_sa_instance_state'):
+            instances += 1
+            stack.extend(item for name, item in vars(obj).items() if name != '_sa_instance_state')
+        elif isinstance(getattr(obj, 'items', None), list):  # Pagination
+            stack.append(obj.items)
+    return instances
+
+
+def structure_sizes() -> Dict[str, Dict[str, Any]]:
+    """
+    Entry counts and estimated sizes of the application's in-memory structures.
+
+    Sizes are estimates (see estimate_size) and are computed on demand, so
+    call this from admin endpoints only.
+
+    Returns:
+        dict: Per structure, its counts and 'estimated_kb'
+    """
+    from .db_performance import db_optimizer
+    from .error_tracking import error_tracker
+    from .fragment_cache import fragment_cache
+    from .live_updates import availability_broker
+    from .login_guard import unknown_usernames
+    from .metrics import metrics_registry
+    from .security import rate_limiter
+
+    def kb(value):
+        return round(estimate_size(value) / 1024, 2)
+
+    sizes = {}
+
+    if db_optimizer is not None:
+        cache = db_optimizer.cache
+        with cache._lock:
+            values = list(cache.cache.values())
+            cached_bytes = sum(cache.sizes.values())
+        # Walk the cached values outside the lock, which every cached query takes
+        sizes['query_cache'] = {
+            'entries': len(values),
+            'max_size': cache.max_size,
+            'estimated_kb': round(cached_bytes / 1024, 2),
+            'orm_objects': count_orm_objects(values),
+            'in_flight': len(db_optimizer._flights)
+        }
+
+        monitor = db_optimizer.monitor
+        with monitor._lock:
+            slow_queries = list(monitor.slow_queries)
+        sizes['query_stats'] = {
+            'queries': len(monitor.query_durations.stats()),
+            'slow_queries': len(slow_queries),
+            'estimated_kb': kb(slow_queries)
+        }
+
+    counters, histograms = metrics_registry._merge()
+    sizes['metrics_registry'] = {
+        **metrics_registry.get_stats(),
+        'estimated_kb': kb([counters, histograms])  # Merged; each thread shard holds its own copy
+    }
+
+    requests = dict(rate_limiter.requests)
+    sizes['rate_limiter'] = {
+        'keys': len(requests),
+        'timestamps': sum(len(times) for times in requests.values()),
+        'blocked_ips': len(rate_limiter.blocked_ips),
+        'login_attempt_keys': len(rate_limiter.login_attempts),
+        'locked_accounts': len(rate_limiter.locked_accounts),
+        'estimated_kb': kb([requests, rate_limiter.blocked_ips,
+                            rate_limiter.login_attempts, rate_limiter.locked_accounts])
+    }
+
+    metrics = error_tracker.metrics
+    with metrics.lock:
+        history = list(metrics.error_history)
+    with metrics.series.lock:
+        buckets = [bucket for bucket in metrics.series.buckets if bucket is not None]
+    sizes['error_metrics'] = {
+        'history': len(history),
+        'history_max': metrics.error_history.maxlen,
+        'error_types': len(metrics.error_counts),
+        'series_buckets': len(buckets),
+        'estimated_kb': kb([history, buckets])
+    }
+
+    with fragment_cache._lock:
+        fragments = dict(fragment_cache._entries)
+    sizes['fragment_cache'] = {
+        'entries': len(fragments),
+        'max_entries': fragment_cache.max_entries,
+        'estimated_kb': kb(fragments)
+    }
+    with unknown_usernames._lock:
+        usernames = dict(unknown_usernames._entries)
+    sizes['unknown_usernames'] = {
+        'entries': len(usernames),
+        'max_size': unknown_usernames.max_size,
+        'estimated_kb': kb(usernames)
+    }
+    sizes['live_updates'] = {
+        'subscribers': len(availability_broker._subscribers),
+        'max_subscribers': availability_broker.max_subscribers
+    }
+
+    try:
+        from . import db
+        sizes['session_identity_map'] = {'objects': len(db.session.identity_map)}
+    except RuntimeError:  # Outside an application context
+        pass
+
+    return sizes
+
+
+# Global tracer instance
+memory_tracer = MemoryTracer()
+
+
+def init_memory_diagnostics(app):
+    """Configure the memory tracer from the application config."""
+    memory_tracer.max_snapshots = app.config.get('MEMORY_MAX_SNAPSHOTS', 4)
+    memory_tracer.frames = app.config.get('MEMORY_TRACE_FRAMES', 1)
@@ -0,0 +1,295 @@
+"""
+Process-wide metrics registry for the Badminton Scheduler application.
+
+One registry of counters, gauges and histograms backs the database
+performance monitor, the metrics collector in db_logging and error tracking.
+Counter and histogram updates go to a shard owned by the calling thread, so
+the hot path takes no lock; reads merge the shards (folding in those of
+finished threads). Gauges are set rarely (connection pool events) and live
+under the registry lock. The metrics collector exports snapshot() to the
+metrics log periodically (see the scheduler's metrics_flush job); counters
+and histograms in it are cumulative, so rates come from the difference
+between two exports.
+
+Each metric may split into series by a single optional label, e.g. the
+normalized SQL of a query or the type of an error.
+"""
+
+import threading
+from bisect import bisect_left
+from datetime import datetime
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+
+
+# Histogram bucket upper bounds for durations in seconds (values above the
+# last bound fall into an overflow bucket)
+DURATION_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Layout of a histogram series: count, sum, min, max, then one count per bucket
+_COUNT, _SUM, _MIN, _MAX, _BUCKETS = range(5)
+
+SeriesKey = Tuple[str, Optional[Hashable]]
+
+
+def series_name(name: str, label: Optional[Hashable] = None) -> str:
+    """Flat name of a series, as used in snapshots: 'name' or 'name[label]'."""
+    return name if label is None else f"{name}[{label}]"
+
+
+class _Shard:
+    """Counters and histograms written by a single thread."""
+
+    __slots__ = ('thread', 'counters', 'histograms')
+
+    def __init__(self, thread: Optional[threading.Thread]):
+        self.thread = thread
+        self.counters: Dict[SeriesKey, float] = {}
+        self.histograms: Dict[SeriesKey, List[float]] = {}
+
+
+def _fold(counters, histograms, shard: _Shard):
+    """Add a shard's values into the counters and histograms dicts."""
+    for key, value in dict(shard.counters).items():
+        counters[key] = counters.get(key, 0) + value
+    for key, data in dict(shard.histograms).items():
+        data = list(data)
+        merged = histograms.get(key)
+        if merged is None:
+            histograms[key] = data
+            continue
+        merged[_COUNT] += data[_COUNT]
+        merged[_SUM] += data[_SUM]
+        merged[_MIN] = min(merged[_MIN], data[_MIN])
+        merged[_MAX] = max(merged[_MAX], data[_MAX])
+        for index in range(_BUCKETS, len(merged)):
+            merged[index] += data[index]
+
+
+def histogram_stats(data: List[float], bounds: Tuple[float, ...]) -> Dict[str, float]:
+    """
+    Summary of a merged histogram series.
+
+    Percentiles are the upper bound of the bucket they fall in (capped at the
+    observed maximum), so they are only as precise as the buckets.
+    """
+    count = data[_COUNT]
+    stats = {
+        'count': count,
+        'sum': data[_SUM],
+        'mean': data[_SUM] / count if count else 0.0,
+        'min': data[_MIN],
+        'max': data[_MAX]
+    }
+    for name, quantile in (('p50', 0.5), ('p95', 0.95), ('p99', 0.99)):
+        rank = quantile * count
+        seen = 0
+        for index, bound in enumerate(bounds + (data[_MAX],)):
+            seen += data[_BUCKETS + index]
+            if seen >= rank:
+                stats[name] = min(bound, data[_MAX])
+                break
+    return stats
+
+
+class Counter:
+    """Monotonic count, incremented on the calling thread's shard."""
+
+    __slots__ = ('registry', 'name')
+
+    def __init__(self, registry: 'MetricsRegistry', name: str):
+        self.registry = registry
+        self.name = name
+
+    def inc(self, amount: float = 1, label: Optional[Hashable] = None):
+        counters = self.registry._shard().counters
+        key = (self.name, label)
+        counters[key] = counters.get(key, 0) + amount
+
+    def value(self, label: Optional[Hashable] = None) -> float:
+        return self.values().get(label, 0)
+
+    def values(self) -> Dict[Optional[Hashable], float]:
+        """Merged value per label."""
+        counters, _ = self.registry._merge()
+        return {label: value for (name, label), value in counters.items() if name == self.name}
+
+
+class Gauge:
+    """Current value (set, adjusted or raised to a maximum) under the registry lock."""
+
+    __slots__ = ('registry', 'name')
+
+    def __init__(self, registry: 'MetricsRegistry', name: str):
+        self.registry = registry
+        self.name = name
+
+    def set(self, value: float, label: Optional[Hashable] = None):
+        with self.registry._lock:
+            self.registry._gauges[(self.name, label)] = value
+
+    def add(self, amount: float, label: Optional[Hashable] = None,
+            minimum: Optional[float] = None) -> float:
+        """Adjust the gauge, not going below minimum, and return the new value."""
+        key = (self.name, label)
+        with self.registry._lock:
+            value = self.registry._gauges.get(key, 0) + amount
+            if minimum is not None:
+                value = max(value, minimum)
+            self.registry._gauges[key] = value
+        return value
+
+    def set_max(self, value: float, label: Optional[Hashable] = None):
+        """Raise the gauge to value if it is higher (e.g. a peak)."""
+        key = (self.name, label)
+        with self.registry._lock:
+            if value > self.registry._gauges.get(key, value - 1):
+                self.registry._gauges[key] = value
+
+    def value(self, label: Optional[Hashable] = None) -> float:
+        return self.values().get(label, 0)
+
+    def values(self) -> Dict[Optional[Hashable], float]:
+        with self.registry._lock:
+            return {label: value for (name, label), value in self.registry._gauges.items()
+                    if name == self.name}
+
+
+class Histogram:
+    """Distribution of observed values in fixed buckets, per thread shard."""
+
+    __slots__ = ('registry', 'name', 'bounds')
+
+    def __init__(self, registry: 'MetricsRegistry', name: str, bounds: Tuple[float, ...]):
+        self.registry = registry
+        self.name = name
+        self.bounds = tuple(bounds)
+
+    def observe(self, value: float, label: Optional[Hashable] = None):
+        histograms = self.registry._shard().histograms
+        key = (self.name, label)
+        data = histograms.get(key)
+        if data is None:
+            data = histograms[key] = [0, 0.0, value, value] + [0] * (len(self.bounds) + 1)
+        data[_COUNT] += 1
+        data[_SUM] += value
+        if value < data[_MIN]:
+            data[_MIN] = value
+        if value > data[_MAX]:
+            data[_MAX] = value
+        data[_BUCKETS + bisect_left(self.bounds, value)] += 1
+
+    def stats(self) -> Dict[Optional[Hashable], Dict[str, float]]:
+        """Merged summary (count, sum, mean, min, max, percentiles) per label."""
+        _, histograms = self.registry._merge()
+        return {label: histogram_stats(data, self.bounds)
+                for (name, label), data in histograms.items() if name == self.name}
+
+
+class MetricsRegistry:
+    """Named counters, gauges and histograms with per-thread shards merged on read."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._shards: List[_Shard] = []
+        self._retired = _Shard(None)  # Values of shards whose thread has finished
+        self._gauges: Dict[SeriesKey, float] = {}
+        self._metrics: Dict[str, Any] = {}
+        self.created_at = datetime.utcnow()  # Counters and histograms accumulate from here
+
+    def _shard(self) -> _Shard:
+        """The calling thread's shard, registered on first use."""
+        try:
+            return self._local.shard
+        except AttributeError:
+            shard = self._local.shard = _Shard(threading.current_thread())
+            with self._lock:
+                self._shards.append(shard)
+            return shard
+
+    def _get_or_create(self, name: str, kind, *args):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = kind(self, name, *args)
+            elif not isinstance(metric, kind):
+                raise ValueError(f"Metric {name} is already registered as a {type(metric).__name__}")
+            return metric
+
+    def counter(self, name: str) -> Counter:
+        return self._get_or_create(name, Counter)
+
+    def gauge(self, name: str) -> Gauge:
+        return self._get_or_create(name, Gauge)
+
+    def histogram(self, name: str, buckets: Tuple[float, ...] = DURATION_BUCKETS) -> Histogram:
+        return self._get_or_create(name, Histogram, buckets)
+
+    def _merge(self) -> Tuple[Dict[SeriesKey, float], Dict[SeriesKey, List[float]]]:
+        """Counters and histograms summed over all shards."""
+        counters: Dict[SeriesKey, float] = {}
+        histograms: Dict[SeriesKey, List[float]] = {}
+        with self._lock:
+            live = []
+            for shard in self._shards:
+                if shard.thread.is_alive():
+                    live.append(shard)
+                else:
+                    _fold(self._retired.counters, self._retired.histograms, shard)
+            self._shards = live
+            _fold(counters, histograms, self._retired)
+        for shard in live:
+            _fold(counters, histograms, shard)
+        return counters, histograms
+
+    def reset(self, prefix: str = ''):
+        """
+        Drop every series whose metric name starts with prefix.
+
+        Updates made by other threads while the reset runs may be lost.
+        """
+        def keep(values):
+            return {key: value for key, value in dict(values).items() if not key[0].startswith(prefix)}
+
+        with self._lock:
+            for shard in self._shards + [self._retired]:
+                shard.counters = keep(shard.counters)
+                shard.histograms = keep(shard.histograms)
+            self._gauges = keep(self._gauges)
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Current value of every series, keyed by series_name().
+
+        Counters and histograms are cumulative since created_at (or since the
+        last reset() of their prefix), not per export period.
+
+        Returns:
+            dict: 'counters', 'gauges' and 'histograms' (each histogram
+                summarized by histogram_stats())
+        """
+        counters, histograms = self._merge()
+        with self._lock:
+            gauges = dict(self._gauges)
+            bounds = {name: metric.bounds for name, metric in self._metrics.items()
+                      if isinstance(metric, Histogram)}
+        return {
+            'counters': {series_name(*key): value for key, value in sorted(counters.items(), key=str)},
+            'gauges': {series_name(*key): value for key, value in sorted(gauges.items(), key=str)},
+            'histograms': {series_name(*key): histogram_stats(data, bounds.get(key[0], DURATION_BUCKETS))
+                           for key, data in sorted(histograms.items(), key=str)}
+        }
+
+    def get_stats(self) -> Dict[str, int]:
+        """Size of the registry: metrics, series and thread shards."""
+        counters, histograms = self._merge()
+        with self._lock:
+            return {
+                'metrics': len(self._metrics),
+                'series': len(counters) + len(histograms) + len(self._gauges),
+                'shards': len(self._shards)
+            }
+
+
+# Global registry instance
+metrics_registry = MetricsRegistry()
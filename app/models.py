@@ -1,11 +1,15 @@
 from flask_sqlalchemy import SQLAlchemy
 from flask_login import UserMixin
 from datetime import datetime, date, time
-from werkzeug.security import generate_password_hash, check_password_hash
+from sqlalchemy import event
 from sqlalchemy.orm import validates
 
 # Import db from __init__.py to avoid circular imports
 from . import db
+from .comment_validation import MODEL_COMMENT_RULES, comment_spam_error
+from .passwords import password_hasher
+from .login_guard import unknown_usernames
+from .identity import identity_cache
 
 
 class User(UserMixin, db.Model):
@@ -15,7 +19,7 @@ class User(UserMixin, db.Model):
     
     id = db.Column(db.Integer, primary_key=True)
     username = db.Column(db.String(80), unique=True, nullable=False, index=True)
-    password_hash = db.Column(db.String(120), nullable=False)
+    password_hash = db.Column(db.String(255), nullable=False)
     role = db.Column(db.String(20), nullable=False, default='User')
     is_active = db.Column(db.Boolean, default=True, nullable=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
@@ -23,6 +27,7 @@ class User(UserMixin, db.Model):
     # Relationships
     availability_entries = db.relationship('Availability', backref='user', lazy=True, cascade='all, delete-orphan')
     comments = db.relationship('Comment', backref='user', lazy=True, cascade='all, delete-orphan')
+    archived_availability = db.relationship('AvailabilityArchive', backref='user', lazy=True, cascade='all, delete-orphan')
     
     def __init__(self, username, password, role='User'):
         """Initialize user with hashed password."""
@@ -42,11 +47,23 @@ class User(UserMixin, db.Model):
         if not (has_letter and has_number):
             raise ValueError("Password must contain at least one letter and one number")
             
-        self.password_hash = generate_password_hash(password)
+        self.password_hash = password_hasher.hash(password)
     
     def check_password(self, password):
         """Check if provided password matches the user's password."""
-        return check_password_hash(self.password_hash, password)
+        return password_hasher.verify(self.password_hash, password)
+    
+    def rehash_password(self, password):
+        """
+        Re-hash a verified password if the stored hash uses outdated parameters.
+        
+        Returns:
+            bool: True if password_hash was replaced (the caller commits)
+        """
+        if not password_hasher.needs_rehash(self.password_hash):
+            return False
+        self.password_hash = password_hasher.hash(password)
+        return True
     
     def is_admin(self):
         """Check if user has admin role."""
@@ -82,6 +99,20 @@ class User(UserMixin, db.Model):
         return f'<User {self.username}>'
 
 
+@event.listens_for(User, 'after_insert')
+@event.listens_for(User, 'after_update')
+def _forget_unknown_username(mapper, connection, target):
+    """Drop a username from the login negative cache once it has an account."""
+    unknown_usernames.discard(target.username)
+
+
+@event.listens_for(User, 'after_update')
+@event.listens_for(User, 'after_delete')
+def _invalidate_user_identity(mapper, connection, target):
+    """Evict the cached login identity when a user's status, role or name changes."""
+    identity_cache.invalidate(target.id)
+
+
 class Availability(db.Model):
     """Availability model with date/time validation."""
     
@@ -100,6 +131,8 @@ class Availability(db.Model):
         db.Index('idx_availability_date_user', 'date', 'user_id'),
     )
     
+    is_archived = False
+    
     def __init__(self, user_id, date, start_time, end_time):
         """Initialize availability entry with validation."""
         self.user_id = user_id
@@ -212,6 +245,38 @@ class Availability(db.Model):
         return f'<Availability {self.id} on {self.date} from {self.start_time} to {self.end_time}>'
 
 
+class AvailabilityArchive(db.Model):
+    """Past availability entries moved out of the hot availability table.
+    
+    Rows get their own id, since SQLite reuses availability ids once the
+    highest one has been archived; original_id keeps the availability id so
+    audit log references still resolve, and is not unique. Entries are
+    read-only history, so none of the future-date validation applies.
+    """
+    
+    __tablename__ = 'availability_archive'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    original_id = db.Column(db.Integer, nullable=False, index=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    date = db.Column(db.Date, nullable=False, index=True)
+    start_time = db.Column(db.Time, nullable=False)
+    end_time = db.Column(db.Time, nullable=False)
+    created_at = db.Column(db.DateTime, nullable=False)
+    updated_at = db.Column(db.DateTime, nullable=False)
+    archived_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    
+    # Composite index for per-user history lookups
+    __table_args__ = (
+        db.Index('idx_availability_archive_user_date', 'user_id', 'date'),
+    )
+    
+    is_archived = True
+    
+    def __repr__(self):
+        return f'<AvailabilityArchive {self.id} on {self.date} from {self.start_time} to {self.end_time}>'
+
+
 class Comment(db.Model):
     """Comment model with user relationships."""
     
@@ -238,24 +303,10 @@ class Comment(db.Model):
         if len(content) > 1000:
             raise ValueError("Comment must be between 1 and 1000 characters")
         
-        # Security validation - check for malicious content
-        malicious_patterns = [
-            '<script', 'javascript:', '<img', 'onclick=', 'onload=', 'onerror='
-        ]
-        content_lower = content.lower()
-        for pattern in malicious_patterns:
-            if pattern in content_lower:
-                raise ValueError("Comment contains invalid content")
-        
-        # Spam detection - check for too many special characters
-        special_chars = sum(1 for c in content if not c.isalnum() and not c.isspace())
-        if special_chars > len(content) * 0.3:  # More than 30% special characters
-            raise ValueError("Comment contains too many special characters")
-        
-        # Check for repeated characters (spam detection)
-        for i in range(len(content) - 12):
-            if content[i] == content[i+1] == content[i+2] == content[i+3] == content[i+4] == content[i+5] == content[i+6] == content[i+7] == content[i+8] == content[i+9] == content[i+10] == content[i+11] == content[i+12]:
-                raise ValueError("Comment contains invalid repeated characters")
+        # Security and spam checks (blocked tokens, special characters, repeated characters)
+        error = comment_spam_error(content, MODEL_COMMENT_RULES)
+        if error:
+            raise ValueError(error)
         
         return content.strip()
     
@@ -0,0 +1,241 @@
+"""
+Pluggable password hashing for the Badminton Scheduler application.
+
+PasswordHasher hashes new passwords with the configured algorithm and cost
+(PBKDF2, bcrypt or scrypt), verifies hashes produced by any of them, and
+reports when a stored hash was made with different parameters so it can be
+upgraded on the next successful login. Hashing can optionally run in a small
+process pool so a burst of logins does not pin the request threads of a worker
+on CPU.
+"""
+
+import base64
+import hashlib
+import logging
+import multiprocessing
+import os
+import secrets
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Optional
+
+from werkzeug.security import check_password_hash, generate_password_hash
+
+password_logger = logging.getLogger('security')
+
+SUPPORTED_ALGORITHMS = ('pbkdf2', 'bcrypt', 'scrypt')
+BCRYPT_PREFIXES = ('$2a$', '$2b$', '$2y$')
+
+
+# -------------------------------
+# Hashing primitives
+# -------------------------------
+# Module-level functions so they can be pickled into pool worker processes.
+
+def _import_bcrypt():
+    try:
+        import bcrypt
+    except ImportError as e:
+        raise RuntimeError("bcrypt password hashing requires the bcrypt package") from e
+    return bcrypt
+
+
+def _bcrypt_secret(password: str) -> bytes:
+    """
+    Pre-hash a password for bcrypt.
+
+    bcrypt only reads the first 72 bytes of its input, and passwords may be up
+    to 128 characters, so the password is reduced to a base64 SHA-256 digest.
+    """
+    return base64.b64encode(hashlib.sha256(password.encode('utf-8')).digest())
+
+
+def _hash_password(method: str, password: str) -> str:
+    """Hash a password with a method descriptor from PasswordHasher.method."""
+    if method.startswith('bcrypt:'):
+        bcrypt = _import_bcrypt()
+        rounds = int(method.split(':', 1)[1])
+        return bcrypt.hashpw(_bcrypt_secret(password), bcrypt.gensalt(rounds)).decode('ascii')
+    return generate_password_hash(password, method=method)
+
+
+def _verify_password(stored_hash: str, password: str) -> bool:
+    """Check a password against a stored hash of any supported format."""
+    if not stored_hash:
+        return False
+    if stored_hash.startswith(BCRYPT_PREFIXES):
+        bcrypt = _import_bcrypt()
+        try:
+            return bcrypt.checkpw(_bcrypt_secret(password), stored_hash.encode('ascii'))
+        except ValueError:
+            return False
+    return check_password_hash(stored_hash, password)
+
+
+def hash_method_of(stored_hash: str) -> Optional[str]:
+    """
+    Get the method descriptor a stored hash was created with.
+
+    Returns:
+        str: e.g. 'pbkdf2:sha256:600000', 'scrypt:32768:8:1' or 'bcrypt:12',
+             or None if the format is not recognised
+    """
+    if not stored_hash:
+        return None
+    if stored_hash.startswith(BCRYPT_PREFIXES):
+        parts = stored_hash.split('$')
+        if len(parts) < 4 or not parts[2].isdigit():
+            return None
+        return f'bcrypt:{int(parts[2])}'
+    if '$' not in stored_hash:
+        return None
+    return stored_hash.split('$', 1)[0]
+
+
+class PasswordHasher:
+    """Configurable password hasher with an optional process pool."""
+
+    def __init__(self, algorithm: str = 'pbkdf2', pbkdf2_iterations: int = 600000,
+                 bcrypt_rounds: int = 12, scrypt_n: int = 2 ** 15, scrypt_r: int = 8,
+                 scrypt_p: int = 1, pool_size: int = 0):
+        self._pool = None
+        self._pool_pid = None
+        self._pool_lock = threading.Lock()
+        self._dummy_hash = None
+        self.configure(algorithm, pbkdf2_iterations, bcrypt_rounds,
+                       scrypt_n, scrypt_r, scrypt_p, pool_size)
+
+    def configure(self, algorithm: str = 'pbkdf2', pbkdf2_iterations: int = 600000,
+                  bcrypt_rounds: int = 12, scrypt_n: int = 2 ** 15, scrypt_r: int = 8,
+                  scrypt_p: int = 1, pool_size: int = 0):
+        """
+        Set the algorithm, cost parameters and pool size used for new hashes.
+
+        Args:
+            algorithm: One of 'pbkdf2', 'bcrypt' or 'scrypt'
+            pbkdf2_iterations: PBKDF2-SHA256 iteration count
+            bcrypt_rounds: bcrypt log2 work factor
+            scrypt_n: scrypt CPU/memory cost (power of two)
+            scrypt_r: scrypt block size
+            scrypt_p: scrypt parallelism
+            pool_size: Worker processes for hashing; 0 hashes on the calling thread
+        """
+        algorithm = (algorithm or 'pbkdf2').lower()
+        if algorithm not in SUPPORTED_ALGORITHMS:
+            raise ValueError(f"Unsupported password hash algorithm: {algorithm}")
+        if algorithm == 'bcrypt':
+            _import_bcrypt()
+
+        self.algorithm = algorithm
+        self.pbkdf2_iterations = int(pbkdf2_iterations)
+        self.bcrypt_rounds = int(bcrypt_rounds)
+        self.scrypt_n = int(scrypt_n)
+        self.scrypt_r = int(scrypt_r)
+        self.scrypt_p = int(scrypt_p)
+
+        pool_size = max(0, int(pool_size or 0))
+        if pool_size != getattr(self, 'pool_size', None):
+            self.shutdown()
+        self.pool_size = pool_size
+
+    @property
+    def method(self) -> str:
+        """Method descriptor for newly created hashes."""
+        if self.algorithm == 'bcrypt':
+            return f'bcrypt:{self.bcrypt_rounds}'
+        if self.algorithm == 'scrypt':
+            return f'scrypt:{self.scrypt_n}:{self.scrypt_r}:{self.scrypt_p}'
+        return f'pbkdf2:sha256:{self.pbkdf2_iterations}'
+
+    # -------------------------------
+    # Process pool
+    # -------------------------------
+
+    def _get_pool(self) -> Optional[ProcessPoolExecutor]:
+        if not self.pool_size:
+            return None
+        with self._pool_lock:
+            if self._pool is None or self._pool_pid != os.getpid():
+                # Spawned workers don't inherit the threads and locks of a
+                # running web worker, and a forked worker gets its own pool.
+                # They re-import the main script, so entry points must not
+                # create the app there (see run.py)
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.pool_size,
+                    mp_context=multiprocessing.get_context('spawn')
+                )
+                self._pool_pid = os.getpid()
+            return self._pool
+
+    def _run(self, func, *args):
+        pool = self._get_pool()
+        if pool is None:
+            return func(*args)
+        try:
+            return pool.submit(func, *args).result()
+        except (BrokenProcessPool, OSError, RuntimeError) as e:
+            password_logger.warning(f"Password hashing pool unavailable, hashing inline: {e}")
+            self.shutdown(wait=False)
+            return func(*args)
+
+    def shutdown(self, wait: bool = True):
+        """Stop the worker processes, if any."""
+        with self._pool_lock:
+            pool, self._pool = self._pool, None
+            owned = self._pool_pid == os.getpid()
+            self._pool_pid = None
+        if pool is not None and owned:
+            pool.shutdown(wait=wait)
+
+    # -------------------------------
+    # Hashing
+    # -------------------------------
+
+    def hash(self, password: str) -> str:
+        """Hash a password with the configured algorithm and cost."""
+        return self._run(_hash_password, self.method, password)
+
+    def verify(self, stored_hash: str, password: str) -> bool:
+        """Check a password against a stored hash of any supported format."""
+        if not stored_hash or password is None:
+            return False
+        return self._run(_verify_password, stored_hash, password)
+
+    def verify_dummy(self, password: str) -> bool:
+        """
+        Spend the work of a real verification without an account to check.
+
+        Used for unknown usernames so their failed logins take as long as a
+        wrong password for a real account.
+
+        Returns:
+            bool: Always False
+        """
+        dummy_hash = self._dummy_hash
+        if hash_method_of(dummy_hash) != self.method:
+            dummy_hash = self._dummy_hash = self.hash(secrets.token_urlsafe(16))
+        self.verify(dummy_hash, password or '')
+        return False
+
+    def needs_rehash(self, stored_hash: str) -> bool:
+        """Whether a stored hash was made with a different algorithm or cost."""
+        return hash_method_of(stored_hash) != self.method
+
+
+# Global password hasher instance
+password_hasher = PasswordHasher()
+
+
+def init_password_hasher(app) -> PasswordHasher:
+    """Configure the global password hasher from the application config."""
+    password_hasher.configure(
+        algorithm=app.config.get('PASSWORD_HASH_ALGORITHM', 'pbkdf2'),
+        pbkdf2_iterations=app.config.get('PASSWORD_PBKDF2_ITERATIONS', 600000),
+        bcrypt_rounds=app.config.get('PASSWORD_BCRYPT_ROUNDS', 12),
+        scrypt_n=app.config.get('PASSWORD_SCRYPT_N', 2 ** 15),
+        scrypt_r=app.config.get('PASSWORD_SCRYPT_R', 8),
+        scrypt_p=app.config.get('PASSWORD_SCRYPT_P', 1),
+        pool_size=app.config.get('PASSWORD_HASH_POOL_SIZE', 0)
+    )
+    return password_hasher
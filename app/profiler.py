@@ -0,0 +1,233 @@
+"""
+In-process statistical sampling profiler for the Badminton Scheduler application.
+
+An admin starts a profile from /health/profile; a daemon thread then reads
+sys._current_frames() PROFILER_DEFAULT_HZ times a second for a few seconds
+and counts each request thread's stack under the endpoint it is serving.
+Results are served as collapsed stacks ("endpoint;frame;frame count"), the
+input format of flamegraph.pl, speedscope and similar viewers.
+
+Overhead is bounded by capping the rate, duration, stack depth and number of
+distinct stacks, and request threads are only tracked while a profile runs.
+Each worker process profiles itself, so a profile covers the worker that
+received the start request.
+"""
+
+import math
+import sys
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+
+# Stacks beyond PROFILER_MAX_STACKS are counted under this line
+TRUNCATED_STACK = '<truncated>'
+
+
+def _frame_label(frame) -> str:
+    """Flamegraph frame name: module:function."""
+    return f"{frame.f_globals.get('__name__', '?')}:{frame.f_code.co_name}"
+
+
+def collapse_stack(frame, max_depth: int) -> str:
+    """
+    Collapse a thread's stack into 'outermost;...;innermost'.
+
+    Args:
+        frame: Innermost frame of the thread
+        max_depth: Frames kept, counted from the innermost
+
+    Returns:
+        str: Semicolon-separated frame labels
+    """
+    labels = []
+    while frame is not None and len(labels) < max_depth:
+        labels.append(_frame_label(frame))
+        frame = frame.f_back
+    labels.reverse()
+    return ';'.join(labels)
+
+
+class SamplingProfiler:
+    """Samples request thread stacks and aggregates them per endpoint."""
+
+    def __init__(self, default_hz: int = 50, max_hz: int = 250, default_seconds: int = 10,
+                 max_seconds: int = 120, max_depth: int = 64, max_stacks: int = 5000):
+        self.default_hz = default_hz
+        self.max_hz = max_hz
+        self.default_seconds = default_seconds
+        self.max_seconds = max_seconds
+        self.max_depth = max_depth
+        self.max_stacks = max_stacks
+        self.active = False
+        self.request_threads: Dict[int, str] = {}  # Thread ident -> endpoint, while active
+        self.stacks: Dict[str, int] = defaultdict(int)
+        self.info: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self, seconds: Optional[float] = None, hz: Optional[float] = None,
+              include_threads: bool = False) -> bool:
+        """
+        Start a profile in the background, discarding the previous one.
+
+        Args:
+            seconds: Profile duration (capped at max_seconds)
+            hz: Samples per second (capped at max_hz)
+            include_threads: Also sample threads not serving a request,
+                under 'thread:<name>'
+
+        Returns:
+            bool: False if a profile is already running
+
+        Raises:
+            ValueError: If seconds or hz is not a finite number
+        """
+        seconds = float(seconds or self.default_seconds)
+        hz = float(hz or self.default_hz)
+        if not (math.isfinite(seconds) and math.isfinite(hz)):
+            raise ValueError('seconds and hz must be finite numbers')
+        seconds = min(max(seconds, 0.1), self.max_seconds)
+        hz = min(max(hz, 1), self.max_hz)
+
+        with self._lock:
+            if self.active:
+                return False
+            self.active = True
+            self.stacks = defaultdict(int)
+            self.info = {
+                'started_at': datetime.utcnow().isoformat(),
+                'seconds': seconds,
+                'hz': hz,
+                'include_threads': include_threads,
+                'samples': 0,
+                'stacks_truncated': 0,
+                'elapsed_seconds': 0.0,
+                'sampling_seconds': 0.0
+            }
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, args=(seconds, hz, include_threads),
+                                            name='sampling-profiler', daemon=True)
+            self._thread.start()
+        return True
+
+    def stop(self, timeout: float = 5.0):
+        """Stop the running profile early, keeping what it sampled."""
+        self._stop.set()
+        thread = self._thread
+        if thread is not None and thread is not threading.current_thread():
+            thread.join(timeout)
+
+    def enter_request(self, endpoint: Optional[str]):
+        """Attribute the current thread's samples to endpoint until the request ends."""
+        if self.active:
+            self.request_threads[threading.get_ident()] = endpoint or '<unmatched>'
+
+    def exit_request(self):
+        """Stop attributing the current thread's samples to its endpoint."""
+        self.request_threads.pop(threading.get_ident(), None)
+
+    def _run(self, seconds: float, hz: float, include_threads: bool):
+        own_ident = threading.get_ident()
+        interval = 1.0 / hz
+        started = time.perf_counter()
+        deadline = started + seconds
+        sampling = 0.0
+
+        try:
+            while not self._stop.is_set():
+                tick = time.perf_counter()
+                if tick >= deadline:
+                    break
+                self._sample(own_ident, include_threads)
+                spent = time.perf_counter() - tick
+                sampling += spent
+                self._stop.wait(max(interval - spent, 0))
+        finally:
+            self.info['elapsed_seconds'] = round(time.perf_counter() - started, 3)
+            self.info['sampling_seconds'] = round(sampling, 4)
+            self.info['finished_at'] = datetime.utcnow().isoformat()
+            self.request_threads.clear()
+            self.active = False
+
+    def _sample(self, own_ident: int, include_threads: bool):
+        """Count one stack per profiled thread."""
+        names = None
+        for ident, frame in sys._current_frames().items():
+            if ident == own_ident:
+                continue
+            endpoint = self.request_threads.get(ident)
+            if endpoint is None:
+                if not include_threads:
+                    continue
+                if names is None:
+                    names = {thread.ident: thread.name for thread in threading.enumerate()}
+                endpoint = f"thread:{names.get(ident, ident)}"
+
+            stack = f"{endpoint};{collapse_stack(frame, self.max_depth)}"
+            if stack not in self.stacks and len(self.stacks) >= self.max_stacks:
+                stack = f"{endpoint};{TRUNCATED_STACK}"
+                self.info['stacks_truncated'] += 1
+            self.stacks[stack] += 1
+        self.info['samples'] += 1
+
+    def collapsed(self, endpoint: Optional[str] = None) -> str:
+        """
+        Sampled stacks in collapsed format, one 'stack count' per line.
+
+        Args:
+            endpoint: Only stacks of this endpoint (or 'thread:<name>')
+
+        Returns:
+            str: Flamegraph-ready text, heaviest stacks first
+        """
+        prefix = f"{endpoint};" if endpoint else ''
+        lines = [f"{stack} {count}"
+                 for stack, count in sorted(dict(self.stacks).items(), key=lambda item: -item[1])
+                 if stack.startswith(prefix)]
+        return '\n'.join(lines) + ('\n' if lines else '')
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Profile settings, progress and per-endpoint sample counts."""
+        endpoints = defaultdict(int)
+        for stack, count in dict(self.stacks).items():
+            endpoints[stack.split(';', 1)[0]] += count
+
+        stats = dict(self.info)
+        elapsed = stats.get('elapsed_seconds') or 0
+        stats.update({
+            'active': self.active,
+            'distinct_stacks': len(self.stacks),
+            'endpoints': dict(sorted(endpoints.items(), key=lambda item: -item[1])),
+            'overhead_percent': round(stats['sampling_seconds'] / elapsed * 100, 2) if elapsed else None
+        })
+        return stats
+
+
+# Global profiler instance
+sampling_profiler = SamplingProfiler()
+
+
+def init_profiler(app):
+    """Configure the sampling profiler and track which endpoint each request thread serves."""
+    sampling_profiler.default_hz = app.config.get('PROFILER_DEFAULT_HZ', 50)
+    sampling_profiler.max_hz = app.config.get('PROFILER_MAX_HZ', 250)
+    sampling_profiler.default_seconds = app.config.get('PROFILER_DEFAULT_SECONDS', 10)
+    sampling_profiler.max_seconds = app.config.get('PROFILER_MAX_SECONDS', 120)
+    sampling_profiler.max_depth = app.config.get('PROFILER_MAX_DEPTH', 64)
+    sampling_profiler.max_stacks = app.config.get('PROFILER_MAX_STACKS', 5000)
+
+    from flask import request
+
+    @app.before_request
+    def profile_request():
+        if sampling_profiler.active:
+            sampling_profiler.enter_request(request.endpoint)
+
+    @app.teardown_request
+    def unprofile_request(exc=None):
+        if sampling_profiler.request_threads:
+            sampling_profiler.exit_request()
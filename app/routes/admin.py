@@ -1,4 +1,4 @@
-from flask import Blueprint, render_template, redirect, url_for, flash, request, jsonify
+from flask import Blueprint, render_template, redirect, url_for, flash, request, jsonify, abort
 from flask_login import login_required, current_user
 from ..routes.auth import admin_required
 from ..models import User, Availability, Comment, AdminAction, db
@@ -6,6 +6,10 @@ from ..forms import RegistrationForm, AvailabilityForm, CommentForm
 from ..utils import log_admin_action, get_admin_actions
 from ..error_tracking import get_error_summary, get_error_report
 from ..security import rate_limit_endpoint, log_security_event
+from ..exports import (apply_availability_filters, apply_comment_filters, apply_audit_filters,
+                       availability_export_query, comment_export_query, audit_export_query,
+                       build_export_response, EXPORT_FORMATS, AVAILABILITY_EXPORT_FIELDS,
+                       COMMENT_EXPORT_FIELDS, AUDIT_EXPORT_FIELDS)
 from datetime import date, datetime
 
 admin_bp = Blueprint('admin', __name__)
@@ -16,18 +20,12 @@ admin_bp = Blueprint('admin', __name__)
 @admin_required
 def dashboard():
     """Admin dashboard with user management interface and recent actions."""
-    # Get statistics using optimized queries
-    from ..db_queries import OptimizedQueries
-    user_stats = OptimizedQueries.get_user_statistics()
-    content_stats = OptimizedQueries.get_content_statistics()
+    # Cached aggregate statistics and recent admin actions for the audit trail
+    from ..db_queries import get_admin_dashboard_data
+    data = get_admin_dashboard_data()
     
-    # Combine statistics
-    stats = {**user_stats, **content_stats}
-    
-    # Get recent admin actions for audit trail using optimized queries
-    recent_actions = OptimizedQueries.get_recent_admin_actions(10)
-    
-    return render_template('admin_dashboard_bootstrap.html', stats=stats, recent_actions=recent_actions)
+    return render_template('admin_dashboard_bootstrap.html', stats=data['stats'],
+                           recent_actions=data['recent_actions'])
 
 
 @admin_bp.route('/users')
@@ -219,18 +217,15 @@ def manage_availability():
     page = request.args.get('page', 1, type=int)
     
     # Build query
-    query = Availability.query.join(User)
-    
-    if user_filter:
-        query = query.filter(Availability.user_id == user_filter)
-    
+    filter_date = None
     if date_filter:
         try:
             filter_date = datetime.strptime(date_filter, '%Y-%m-%d').date()
-            query = query.filter(Availability.date == filter_date)
         except ValueError:
             flash('Invalid date format.', 'error')
     
+    query = apply_availability_filters(Availability.query.join(User), user_filter, filter_date)
+    
     # Order by date and paginate
     availability_entries = query.order_by(Availability.date.desc(), Availability.start_time).paginate(
         page=page, per_page=20, error_out=False
@@ -348,10 +343,7 @@ def manage_comments():
     page = request.args.get('page', 1, type=int)
     
     # Build query
-    query = Comment.query.join(User)
-    
-    if user_filter:
-        query = query.filter(Comment.user_id == user_filter)
+    query = apply_comment_filters(Comment.query.join(User), user_filter)
     
     # Order by creation date and paginate
     comments = query.order_by(Comment.created_at.desc()).paginate(
@@ -461,16 +453,9 @@ def audit_log():
     page = request.args.get('page', 1, type=int)
     
     # Build query
-    query = AdminAction.query.join(AdminAction.admin_user)
-    
-    if action_type:
-        query = query.filter(AdminAction.action_type == action_type)
-    
-    if target_type:
-        query = query.filter(AdminAction.target_type == target_type)
-    
-    if admin_user_id:
-        query = query.filter(AdminAction.admin_user_id == admin_user_id)
+    query = apply_audit_filters(
+        AdminAction.query.join(AdminAction.admin_user), action_type, target_type, admin_user_id
+    )
     
     # Order by creation date and paginate
     actions = query.order_by(AdminAction.created_at.desc()).paginate(
@@ -552,4 +537,48 @@ def export_errors():
     
     response = jsonify(error_data)
     response.headers['Content-Disposition'] = f'attachment; filename=error_report_{hours}h.json'
-    return response
\ No newline at end of file
+    return response
+
+
+@admin_bp.route('/export/<dataset>')
+@login_required
+@admin_required
+@rate_limit_endpoint(max_requests=30, window_minutes=10, per_user=True)
+def export_data(dataset):
+    """Stream availability, comments or the audit log as CSV or JSON Lines."""
+    export_format = request.args.get('format', 'csv')
+    compress = request.args.get('gzip', '0') in ('1', 'true', 'yes')
+    
+    if export_format not in EXPORT_FORMATS:
+        return jsonify({'error': f"Format must be one of: {', '.join(EXPORT_FORMATS)}"}), 400
+    
+    # Apply the same filters as the corresponding listing page
+    if dataset == 'availability':
+        date_filter = request.args.get('date')
+        filter_date = None
+        if date_filter:
+            try:
+                filter_date = datetime.strptime(date_filter, '%Y-%m-%d').date()
+            except ValueError:
+                return jsonify({'error': 'Invalid date format. Use YYYY-MM-DD.'}), 400
+        query = availability_export_query(request.args.get('user_id', type=int), filter_date)
+        fields = AVAILABILITY_EXPORT_FIELDS
+    elif dataset == 'comments':
+        query = comment_export_query(request.args.get('user_id', type=int))
+        fields = COMMENT_EXPORT_FIELDS
+    elif dataset == 'audit':
+        query = audit_export_query(
+            request.args.get('action_type'),
+            request.args.get('target_type'),
+            request.args.get('admin_user_id', type=int)
+        )
+        fields = AUDIT_EXPORT_FIELDS
+    else:
+        abort(404)
+    
+    log_security_event('DATA_EXPORT', 
+                       f'Admin {current_user.username} exported {dataset} as {export_format}'
+                       f'{" (gzip)" if compress else ""}', 'INFO')
+    
+    filename = f"{dataset}_export_{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}"
+    return build_export_response(query, fields, export_format, filename, compress)
@@ -0,0 +1,245 @@
+"""
+Versioned read-only JSON API for availability data.
+
+Responses are columnar: each field is a list with one value per row, and
+users appear once in a lookup table that rows reference by index. Payloads
+are built from the same cached queries as the dashboard, carry data-version
+ETags (see http_cache) and are gzip-compressed when the client accepts it.
+
+/availability/events streams changes as Server-Sent Events (see live_updates).
+"""
+
+import gzip
+import json
+import time
+from datetime import date, datetime, timedelta
+from functools import wraps
+from itertools import groupby
+from typing import Any, Dict, List, Optional, Tuple
+
+from flask import Blueprint, Response, current_app, jsonify, request
+from flask_login import current_user
+
+from ..db_queries import OptimizedQueries
+from ..http_cache import conditional_get
+from ..live_updates import availability_broker
+from ..security import rate_limit_endpoint
+
+api_bp = Blueprint('api', __name__, url_prefix='/api/v1')
+
+
+def api_login_required(f):
+    """Like login_required, but answers with a JSON 401 instead of a redirect."""
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        if not current_user.is_authenticated:
+            return jsonify({'error': 'Authentication required.'}), 401
+        return f(*args, **kwargs)
+    return decorated_function
+
+
+def _parse_date(value: Optional[str], default: date) -> date:
+    if not value:
+        return default
+    return datetime.strptime(value, '%Y-%m-%d').date()
+
+
+def _parse_range(args) -> Tuple[date, date]:
+    """
+    Read the ?from= and ?to= dates of a request (defaulting to the next 7 days).
+
+    Raises:
+        ValueError: With a client-facing message if the range is invalid
+    """
+    try:
+        start_date = _parse_date(args.get('from'), date.today())
+        end_date = _parse_date(args.get('to'), start_date + timedelta(days=6))
+    except ValueError:
+        raise ValueError('Dates must be in YYYY-MM-DD format.')
+
+    max_days = current_app.config.get('API_MAX_RANGE_DAYS', 92)
+    if end_date < start_date:
+        raise ValueError('The "to" date must not be before the "from" date.')
+    if (end_date - start_date).days >= max_days:
+        raise ValueError(f'Date ranges are limited to {max_days} days.')
+    return start_date, end_date
+
+
+def _load_entries(start_date: date, end_date: date) -> List[Any]:
+    """Availability entries in the range from the cached query layer; past dates come from the archive."""
+    return OptimizedQueries.get_availability_by_date_range(
+        start_date, end_date, include_history=start_date < date.today()
+    )
+
+
+class _UserTable:
+    """Deduplicated user lookup table; rows reference users by index."""
+
+    def __init__(self):
+        self._index: Dict[int, int] = {}
+        self.columns = {'id': [], 'username': []}
+
+    def ref(self, user) -> int:
+        index = self._index.get(user.id)
+        if index is None:
+            index = self._index[user.id] = len(self.columns['id'])
+            self.columns['id'].append(user.id)
+            self.columns['username'].append(user.username)
+        return index
+
+
+def _format_time(value) -> str:
+    return value.strftime('%H:%M')
+
+
+def find_overlaps(entries: List[Any], min_players: int = 2) -> List[Dict[str, Any]]:
+    """
+    Find the time windows in which at least min_players users are available.
+
+    Args:
+        entries: Availability entries of a single day
+        min_players: Minimum number of distinct users in a window
+
+    Returns:
+        list: Windows as dicts with start, end and the sorted user IDs present;
+              adjacent windows with the same users are merged
+    """
+    # At equal times ends sort before starts, so back-to-back slots don't overlap
+    events = sorted(
+        [(entry.start_time, 1, entry.user_id) for entry in entries] +
+        [(entry.end_time, -1, entry.user_id) for entry in entries],
+        key=lambda event: (event[0], event[1])
+    )
+
+    active: Dict[int, int] = {}
+    windows: List[Dict[str, Any]] = []
+    previous_time = None
+    for event_time, group in groupby(events, key=lambda event: event[0]):
+        if previous_time is not None and len(active) >= min_players:
+            user_ids = sorted(active)
+            if windows and windows[-1]['end'] == previous_time and windows[-1]['user_ids'] == user_ids:
+                windows[-1]['end'] = event_time
+            else:
+                windows.append({'start': previous_time, 'end': event_time, 'user_ids': user_ids})
+
+        for _, delta, user_id in group:
+            count = active.get(user_id, 0) + delta
+            if count > 0:
+                active[user_id] = count
+            else:
+                active.pop(user_id, None)
+        previous_time = event_time
+
+    return windows
+
+
+def _json_response(payload: Dict[str, Any], status: int = 200):
+    """Compact JSON response, gzip-compressed when large enough and accepted by the client."""
+    body = json.dumps(payload, separators=(',', ':')).encode('utf-8')
+    response = current_app.response_class(body, status=status, mimetype='application/json')
+    response.vary.add('Accept-Encoding')
+
+    min_size = current_app.config.get('API_GZIP_MIN_SIZE', 1024)
+    if len(body) >= min_size and 'gzip' in request.accept_encodings:
+        response.set_data(gzip.compress(body, compresslevel=6))
+        response.headers['Content-Encoding'] = 'gzip'
+    return response
+
+
+@api_bp.route('/availability')
+@api_login_required
+@rate_limit_endpoint(max_requests=120, window_minutes=10, per_user=True)
+@conditional_get('availability', daily=True, embeds_csrf=False)
+def availability():
+    """Availability entries between ?from= and ?to= (ISO dates, defaulting to the next 7 days)."""
+    try:
+        start_date, end_date = _parse_range(request.args)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    users = _UserTable()
+    columns = {'id': [], 'date': [], 'start': [], 'end': [], 'user': [], 'archived': []}
+    for entry in _load_entries(start_date, end_date):
+        columns['id'].append(entry.id)  # Archive ids are their own: (id, archived) is the key
+        columns['date'].append(entry.date.isoformat())
+        columns['start'].append(_format_time(entry.start_time))
+        columns['end'].append(_format_time(entry.end_time))
+        columns['user'].append(users.ref(entry.user))
+        columns['archived'].append(int(entry.is_archived))
+
+    return _json_response({
+        'from': start_date.isoformat(),
+        'to': end_date.isoformat(),
+        'users': users.columns,
+        'entries': columns
+    })
+
+
+@api_bp.route('/days/<day>/overlaps')
+@api_login_required
+@rate_limit_endpoint(max_requests=120, window_minutes=10, per_user=True)
+@conditional_get('availability', daily=True, embeds_csrf=False)
+def day_overlaps(day):
+    """Time windows on one day in which at least ?min_players= (default 2) users are available."""
+    try:
+        day = _parse_date(day, date.today())
+    except ValueError:
+        return jsonify({'error': 'Dates must be in YYYY-MM-DD format.'}), 400
+    min_players = max(request.args.get('min_players', 2, type=int), 1)
+
+    entries = _load_entries(day, day)
+    users = _UserTable()
+    user_refs = {entry.user_id: entry.user for entry in entries}
+    columns = {'start': [], 'end': [], 'users': []}
+    for window in find_overlaps(entries, min_players):
+        columns['start'].append(_format_time(window['start']))
+        columns['end'].append(_format_time(window['end']))
+        columns['users'].append([users.ref(user_refs[user_id]) for user_id in window['user_ids']])
+
+    return _json_response({
+        'date': day.isoformat(),
+        'min_players': min_players,
+        'users': users.columns,
+        'windows': columns
+    })
+
+
+@api_bp.route('/availability/events')
+@api_login_required
+@rate_limit_endpoint(max_requests=30, window_minutes=10, per_user=True)
+def availability_events():
+    """Server-Sent Events stream announcing availability changes between ?from= and ?to=."""
+    try:
+        start_date, end_date = _parse_range(request.args)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    dates = [start_date + timedelta(days=offset) for offset in range((end_date - start_date).days + 1)]
+    subscription = availability_broker.subscribe(dates)
+    if subscription is None:
+        response = jsonify({'error': 'Too many live update streams; try again later.'})
+        response.headers['Retry-After'] = '30'
+        return response, 503
+
+    keepalive = current_app.config.get('SSE_KEEPALIVE_SECONDS', 25)
+    max_duration = current_app.config.get('SSE_MAX_STREAM_SECONDS', 300)
+
+    def stream():
+        # Runs after the request context is gone, so no database session is
+        # held while the client idles; browsers reconnect when it ends
+        try:
+            yield 'retry: 5000\n\n'  # Reconnect delay in milliseconds
+            deadline = time.monotonic() + max_duration
+            while time.monotonic() < deadline:
+                event = subscription.get(timeout=min(keepalive, max(deadline - time.monotonic(), 0)))
+                if event is None:
+                    yield ': keepalive\n\n'
+                else:
+                    yield f"event: availability\ndata: {json.dumps(event, separators=(',', ':'))}\n\n"
+        finally:
+            availability_broker.unsubscribe(subscription)
+
+    response = Response(stream(), mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'  # Disable proxy buffering (nginx)
+    return response
@@ -3,7 +3,9 @@ from flask_login import login_user, logout_user, login_required, current_user
 from functools import wraps
 from ..models import User, db
 from ..forms import LoginForm, RegistrationForm
-from ..security import SecurityValidator, log_security_event, sanitize_form_data
+from ..security import log_security_event, sanitize_login_credentials
+from ..passwords import password_hasher
+from ..login_guard import login_timings, unknown_usernames
 
 auth_bp = Blueprint('auth', __name__)
 
@@ -22,6 +24,103 @@ def admin_required(f):
     return decorated_function
 
 
+# Flash messages for rejected logins, keyed by rate-limit reason
+RATE_LIMIT_MESSAGES = {
+    'ip': 'Too many failed login attempts. Please try again later.',
+    'username': 'Too many failed attempts for this account. Please try again later.',
+    'locked': 'This account is temporarily locked. Please try again later.'
+}
+
+
+def _authenticate(username, password, client_ip, trace):
+    """
+    Run the login pipeline, cheapest rejections first.
+    
+    Args:
+        username (str): Username from the validated login form
+        password (str): Password from the validated login form
+        client_ip (str): Client IP address
+        trace (LoginTrace): Stage timer for this attempt
+        
+    Returns:
+        tuple: (user, error_message) with exactly one of them set
+    """
+    from ..security import rate_limiter
+    
+    # One combined IP / username / account-lock check
+    limited = rate_limiter.check_login_allowed(client_ip, username)
+    trace.mark('rate_limit')
+    if limited == 'ip':
+        log_security_event('LOGIN_RATE_LIMITED', 
+                         f'IP {client_ip} exceeded login attempts', 'WARNING')
+    elif limited == 'username':
+        log_security_event('USERNAME_RATE_LIMITED', 
+                         f'Username {username} exceeded login attempts', 'WARNING')
+    elif limited == 'locked':
+        log_security_event('ACCOUNT_LOCKED_ACCESS', 
+                         f'Attempt to access locked account: {username}', 'WARNING')
+    if limited:
+        trace.outcome = 'rate_limited'
+        return None, RATE_LIMIT_MESSAGES[limited]
+    
+    # Single validation and sanitization pass
+    password, invalid = sanitize_login_credentials(username, password)
+    trace.mark('validate')
+    if invalid:
+        rate_limiter.record_login_result(client_ip, username, success=False)
+        trace.outcome = 'invalid_input'
+        if invalid == 'malicious':
+            log_security_event('FORM_SANITIZATION_FAILED', 
+                             'Failed to sanitize login form: malicious input', 'ERROR')
+            return None, 'Invalid request. Please try again.'
+        return None, 'Invalid username or password.'
+    
+    # Known-unknown usernames skip the database, but not the hashing work
+    user = None
+    if not unknown_usernames.contains(username):
+        user = User.query.filter_by(username=username).first()
+        if user is None:
+            unknown_usernames.add(username)
+    trace.mark('lookup')
+    
+    if user is None:
+        password_hasher.verify_dummy(password)
+        verified = False
+    else:
+        verified = user.check_password(password)
+    trace.mark('verify')
+    
+    if not verified:
+        rate_limiter.record_login_result(client_ip, username, success=False)
+        log_security_event('FAILED_LOGIN', 
+                         f'Failed login attempt for username: {username}', 'WARNING')
+        trace.outcome = 'unknown_user' if user is None else 'bad_password'
+        return None, 'Invalid username or password.'
+    
+    if not user.is_active:
+        rate_limiter.record_login_result(client_ip, username, success=False)
+        log_security_event('BLOCKED_ACCOUNT_LOGIN', 
+                         f'Login attempt to blocked account: {username}', 'WARNING')
+        trace.outcome = 'blocked'
+        return None, 'Your account has been blocked. Please contact an administrator.'
+    
+    # Successful login - clear rate limiting
+    rate_limiter.record_login_result(client_ip, username, success=True)
+    
+    # Upgrade the stored hash if the hashing algorithm or cost changed
+    if user.rehash_password(password):
+        try:
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            log_security_event('PASSWORD_REHASH_FAILED',
+                             f'Failed to upgrade password hash for {username}: {str(e)}', 'ERROR')
+        trace.mark('rehash')
+    
+    trace.outcome = 'success'
+    return user, None
+
+
 @auth_bp.route('/login', methods=['GET', 'POST'])
 def login():
     """User login route with comprehensive security and rate limiting."""
@@ -31,102 +130,35 @@ def login():
     # Get client IP for rate limiting
     client_ip = g.get('client_ip', request.remote_addr)
     
+    trace = login_timings.start()
     form = LoginForm()
     if form.validate_on_submit():
         username = form.username.data
-        password = form.password.data
-        
-        # Check if IP is rate limited for login attempts
-        from ..security import rate_limiter
-        is_limited, remaining, lockout_time = rate_limiter.is_login_rate_limited(
-            client_ip, max_attempts=3, window_minutes=15
-        )
-        
-        if is_limited:
-            log_security_event('LOGIN_RATE_LIMITED', 
-                             f'IP {client_ip} exceeded login attempts', 'WARNING')
-            flash('Too many failed login attempts. Please try again later.', 'error')
-            return render_template('auth/login_bootstrap.html', form=form)
-        
-        # Check if username is rate limited
-        username_limited, _, _ = rate_limiter.is_login_rate_limited(
-            f"user_{username}", max_attempts=5, window_minutes=30
-        )
-        
-        if username_limited:
-            log_security_event('USERNAME_RATE_LIMITED', 
-                             f'Username {username} exceeded login attempts', 'WARNING')
-            flash('Too many failed attempts for this account. Please try again later.', 'error')
-            return render_template('auth/login_bootstrap.html', form=form)
-        
-        # Check if account is locked
-        is_locked, unlock_time = rate_limiter.is_account_locked(username)
-        if is_locked:
-            log_security_event('ACCOUNT_LOCKED_ACCESS', 
-                             f'Attempt to access locked account: {username}', 'WARNING')
-            flash('This account is temporarily locked. Please try again later.', 'error')
-            return render_template('auth/login_bootstrap.html', form=form)
+        trace.mark('form')
+        try:
+            user, error = _authenticate(username, form.password.data, client_ip, trace)
+        finally:
+            trace.finish()
         
-        # Additional security validation
-        username_valid, username_error = SecurityValidator.validate_username(username)
-        if not username_valid:
-            rate_limiter.record_login_attempt(client_ip, success=False)
-            rate_limiter.record_login_attempt(f"user_{username}", success=False)
-            flash('Invalid username or password.', 'error')
+        if error:
+            flash(error, 'error')
             return render_template('auth/login_bootstrap.html', form=form)
         
-        # Sanitize form data
-        try:
-            sanitized_data = sanitize_form_data({
-                'username': username,
-                'password': password
-            })
-        except Exception as e:
-            rate_limiter.record_login_attempt(client_ip, success=False)
-            rate_limiter.record_login_attempt(f"user_{username}", success=False)
-            log_security_event('FORM_SANITIZATION_FAILED', 
-                             f'Failed to sanitize login form: {str(e)}', 'ERROR')
-            flash('Invalid request. Please try again.', 'error')
-            return render_template('auth/login_bootstrap.html', form=form)
+        login_user(user, remember=False)
+        log_security_event('SUCCESSFUL_LOGIN', 
+                         f'User {username} logged in successfully', 'INFO')
+        flash(f'Welcome back, {user.username}!', 'success')
         
-        user = User.query.filter_by(username=sanitized_data['username']).first()
+        # Validate and sanitize next page parameter
+        next_page = request.args.get('next')
+        if next_page:
+            # Security check for next page parameter
+            if next_page.startswith('/') and not next_page.startswith('//'):
+                # Additional validation for next parameter
+                if not any(dangerous in next_page.lower() for dangerous in ['javascript:', 'data:', 'vbscript:']):
+                    return redirect(next_page)
         
-        if user and user.check_password(sanitized_data['password']):
-            if not user.is_active:
-                rate_limiter.record_login_attempt(client_ip, success=False)
-                rate_limiter.record_login_attempt(f"user_{username}", success=False)
-                log_security_event('BLOCKED_ACCOUNT_LOGIN', 
-                                 f'Login attempt to blocked account: {username}', 'WARNING')
-                flash('Your account has been blocked. Please contact an administrator.', 'error')
-                return render_template('auth/login_bootstrap.html', form=form)
-            
-            # Successful login - clear rate limiting
-            rate_limiter.record_login_attempt(client_ip, success=True)
-            rate_limiter.record_login_attempt(f"user_{username}", success=True)
-            
-            login_user(user, remember=False)
-            log_security_event('SUCCESSFUL_LOGIN', 
-                             f'User {username} logged in successfully', 'INFO')
-            flash(f'Welcome back, {user.username}!', 'success')
-            
-            # Validate and sanitize next page parameter
-            next_page = request.args.get('next')
-            if next_page:
-                # Security check for next page parameter
-                if next_page.startswith('/') and not next_page.startswith('//'):
-                    # Additional validation for next parameter
-                    if not any(dangerous in next_page.lower() for dangerous in ['javascript:', 'data:', 'vbscript:']):
-                        return redirect(next_page)
-            
-            return redirect(url_for('availability.dashboard'))
-        else:
-            # Failed login - record attempt
-            rate_limiter.record_login_attempt(client_ip, success=False)
-            rate_limiter.record_login_attempt(f"user_{username}", success=False)
-            
-            log_security_event('FAILED_LOGIN', 
-                             f'Failed login attempt for username: {username}', 'WARNING')
-            flash('Invalid username or password.', 'error')
+        return redirect(url_for('availability.dashboard'))
     
     return render_template('auth/login_bootstrap.html', form=form)
 
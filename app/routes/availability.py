@@ -1,4 +1,4 @@
-from flask import Blueprint, render_template, request, redirect, url_for, flash, jsonify
+from flask import Blueprint, current_app, render_template, request, redirect, url_for, flash, jsonify
 from flask_login import login_required, current_user
 from datetime import date, datetime, timedelta
 from sqlalchemy import and_, or_
@@ -10,12 +10,14 @@ from ..utils import (admin_required, safe_get_record, safe_create_record,
                      get_date_range_filter, log_user_activity)
 from ..error_handlers import ErrorHandler, FlashMessageHelper
 from ..security import rate_limit_endpoint, log_security_event
+from ..http_cache import conditional_get
 
 availability_bp = Blueprint('availability', __name__)
 
 
 @availability_bp.route('/')
 @login_required
+@conditional_get('availability', daily=True)
 def dashboard():
     """Dashboard with today's availability by default."""
     try:
@@ -32,15 +34,12 @@ def dashboard():
             view_type = 'today'
             start_date, end_date = get_date_range_filter('today')
         
-        # Query availability entries with error handling
+        # Query availability entries with error handling (past dates are archived)
         try:
-            query = Availability.query.join(User).filter(
-                Availability.date >= start_date,
-                Availability.date <= end_date,
-                User.is_active == True
-            ).order_by(Availability.date, Availability.start_time)
-            
-            availability_entries = query.all()
+            from ..db_queries import get_availability_in_range
+            availability_entries = get_availability_in_range(
+                start_date, end_date, include_history=start_date < date.today()
+            )
         except Exception as e:
             ErrorHandler.handle_database_error(e, "loading availability data")
             availability_entries = []
@@ -66,6 +65,12 @@ def dashboard():
             filter_form.start_date.data = start_date
             filter_form.end_date.data = end_date
         
+        # Live updates for the shown range (the stream endpoint limits range length)
+        live_updates_url = None
+        if (end_date - start_date).days < current_app.config.get('API_MAX_RANGE_DAYS', 92):
+            live_updates_url = url_for('api.availability_events',
+                                       **{'from': start_date.isoformat(), 'to': end_date.isoformat()})
+        
         # Log user activity
         log_user_activity('viewed_dashboard', {'view_type': view_type})
         
@@ -74,7 +79,8 @@ def dashboard():
                              view_type=view_type,
                              start_date=start_date,
                              end_date=end_date,
-                             filter_form=filter_form)
+                             filter_form=filter_form,
+                             live_updates_url=live_updates_url)
     
     except Exception as e:
         ErrorHandler.handle_database_error(e, "loading dashboard")
@@ -204,6 +210,7 @@ def delete_availability(id):
 
 @availability_bp.route('/availability/my')
 @login_required
+@conditional_get('availability', daily=True)
 def my_availability():
     """View current user's availability entries."""
     try:
@@ -244,15 +251,12 @@ def bootstrap_test():
             view_type = 'today'
             start_date, end_date = get_date_range_filter('today')
         
-        # Query availability entries with error handling
+        # Query availability entries with error handling (past dates are archived)
         try:
-            query = Availability.query.join(User).filter(
-                Availability.date >= start_date,
-                Availability.date <= end_date,
-                User.is_active == True
-            ).order_by(Availability.date, Availability.start_time)
-            
-            availability_entries = query.all()
+            from ..db_queries import get_availability_in_range
+            availability_entries = get_availability_in_range(
+                start_date, end_date, include_history=start_date < date.today()
+            )
         except Exception as e:
             ErrorHandler.handle_database_error(e, "loading availability data")
             availability_entries = []
@@ -4,12 +4,14 @@ from sqlalchemy import desc
 from ..models import Comment, User, db
 from ..forms import CommentForm
 from ..security import rate_limit_endpoint, csrf_protect_ajax, log_security_event, sanitize_form_data
+from ..http_cache import conditional_get
 
 comments_bp = Blueprint('comments', __name__)
 
 
 @comments_bp.route('/comments')
 @login_required
+@conditional_get('comments')
 def comments():
     """Display all comments with author and timestamp information."""
     # Get all comments using optimized query
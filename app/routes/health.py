@@ -14,8 +14,12 @@ import os
 from ..routes.auth import admin_required
 from ..db_performance import get_performance_metrics, db_optimizer, performance_monitor
 from ..db_logging import get_db_performance_logger
+from ..health_probes import health_sampler
+from ..profiler import sampling_profiler
+from ..memory_diagnostics import GROUP_BY_OPTIONS, memory_tracer, structure_sizes
+from ..db_queries import cache_warmer, count_content_statistics, count_user_statistics
 from .. import db
-from ..models import User, Availability, Comment
+from ..models import User, Availability
 
 health_bp = Blueprint('health', __name__)
 
@@ -55,24 +59,30 @@ def health_check():
     return jsonify(health_data), status_code
 
 
+@health_bp.route('/livez')
+def liveness():
+    """Liveness probe: the worker is running and answering requests (no I/O)."""
+    return jsonify({'status': 'alive', 'pid': os.getpid()})
+
+
+@health_bp.route('/readyz')
+def readiness():
+    """Readiness probe from the latest background health sample (details under /health/detailed)."""
+    ready, age = health_sampler.readiness()
+    return jsonify({'status': 'ready' if ready else 'not_ready', 'age_seconds': age}), 200 if ready else 503
+
+
 @health_bp.route('/health/detailed')
 @login_required
 @admin_required
 def detailed_health_check():
     """Detailed health check with performance metrics (admin only)."""
     try:
-        # Basic database tests
+        # Basic database tests: the admin dashboard's aggregate queries, uncached
         start_time = time.time()
         
-        # Test various database operations
-        user_count = User.query.count()
-        availability_count = Availability.query.count()
-        comment_count = Comment.query.count()
-        
-        # Test a more complex query
-        recent_availability = Availability.query.filter(
-            Availability.date >= datetime.now().date()
-        ).count()
+        user_stats = count_user_statistics()
+        content_stats = count_content_statistics()
         
         db_response_time = time.time() - start_time
         
@@ -82,6 +92,10 @@ def detailed_health_check():
         # Get system information
         system_info = _get_system_info()
         
+        # The sample behind /readyz, which only reports status and age publicly
+        ready, _ = health_sampler.readiness()
+        sample, age = health_sampler.current()
+        
         health_data = {
             'status': 'healthy',
             'timestamp': datetime.utcnow().isoformat(),
@@ -89,14 +103,19 @@ def detailed_health_check():
                 'status': 'healthy',
                 'response_time_ms': round(db_response_time * 1000, 2),
                 'counts': {
-                    'users': user_count,
-                    'availability_entries': availability_count,
-                    'comments': comment_count,
-                    'future_availability': recent_availability
+                    'users': user_stats['total_users'],
+                    'availability_entries': content_stats['total_availability'],
+                    'comments': content_stats['total_comments'],
+                    'future_availability': content_stats['future_availability']
                 }
             },
             'performance': performance_data,
-            'system': system_info
+            'system': system_info,
+            'readiness': {
+                'ready': ready,
+                'age_seconds': round(age, 3) if age is not None else None,
+                'checks': sample
+            }
         }
         
     except Exception as e:
@@ -176,6 +195,20 @@ def reset_performance_stats():
         }), 500
 
 
+@health_bp.route('/health/metrics')
+@login_required
+@admin_required
+def metrics_snapshot():
+    """Snapshot of the metrics registry: counters, gauges and histograms (admin only)."""
+    from ..metrics import metrics_registry
+    return jsonify({
+        'status': 'success',
+        'timestamp': datetime.utcnow().isoformat(),
+        'registry': metrics_registry.get_stats(),
+        'metrics': metrics_registry.snapshot()
+    })
+
+
 @health_bp.route('/health/cache/invalidate', methods=['POST'])
 @login_required
 @admin_required
@@ -186,6 +219,7 @@ def invalidate_cache():
         
         if db_optimizer:
             db_optimizer.invalidate_cache(pattern)
+        cache_warmer.schedule()
         
         return jsonify({
             'status': 'success',
@@ -200,6 +234,184 @@ def invalidate_cache():
         }), 500
 
 
+@health_bp.route('/health/cache/warmup')
+@login_required
+@admin_required
+def cache_warmup_status():
+    """Cache warm-up registry and timings (admin only)."""
+    return jsonify({
+        'status': 'success',
+        'timestamp': datetime.utcnow().isoformat(),
+        'warmup': cache_warmer.get_stats()
+    })
+
+
+@health_bp.route('/health/scheduler')
+@login_required
+@admin_required
+def scheduler_status():
+    """Background maintenance scheduler status (admin only)."""
+    from ..scheduler import maintenance_scheduler
+    return jsonify({
+        'status': 'success',
+        'timestamp': datetime.utcnow().isoformat(),
+        'scheduler': maintenance_scheduler.get_status()
+    })
+
+
+@health_bp.route('/health/profile', methods=['GET', 'POST'])
+@login_required
+@admin_required
+def profile():
+    """
+    Sampling profiler of this worker process (admin only).
+    
+    POST starts a profile (JSON: seconds, hz, include_threads). GET returns the
+    latest profile as collapsed stacks (optionally ?endpoint=), or its status
+    with ?format=json.
+    """
+    if request.method == 'POST':
+        options = request.get_json(silent=True) or {}
+        try:
+            started = sampling_profiler.start(seconds=options.get('seconds'), hz=options.get('hz'),
+                                              include_threads=bool(options.get('include_threads')))
+        except (TypeError, ValueError):
+            return jsonify({
+                'status': 'error',
+                'message': 'seconds and hz must be finite numbers',
+                'timestamp': datetime.utcnow().isoformat()
+            }), 400
+        
+        return jsonify({
+            'status': 'started' if started else 'busy',
+            'timestamp': datetime.utcnow().isoformat(),
+            'profile': sampling_profiler.get_stats()
+        }), 202 if started else 409
+    
+    if request.args.get('format') == 'json':
+        return jsonify({
+            'status': 'success',
+            'timestamp': datetime.utcnow().isoformat(),
+            'profile': sampling_profiler.get_stats()
+        })
+    
+    return sampling_profiler.collapsed(request.args.get('endpoint')), 200, {
+        'Content-Type': 'text/plain; charset=utf-8'
+    }
+
+
+@health_bp.route('/health/memory')
+@login_required
+@admin_required
+def memory_status():
+    """tracemalloc state, kept snapshots and in-memory structure sizes (admin only)."""
+    return jsonify({
+        'status': 'success',
+        'timestamp': datetime.utcnow().isoformat(),
+        'tracemalloc': memory_tracer.get_status(),
+        'structures': structure_sizes()
+    })
+
+
+@health_bp.route('/health/memory/tracemalloc', methods=['POST'])
+@login_required
+@admin_required
+def memory_tracing():
+    """Start or stop tracemalloc (admin only). JSON: action ('start'/'stop'), frames."""
+    options = request.get_json(silent=True) or {}
+    action = options.get('action')
+    
+    try:
+        if action == 'start':
+            changed = memory_tracer.start(options.get('frames'))
+        elif action == 'stop':
+            changed = memory_tracer.stop()
+        else:
+            raise ValueError("action must be 'start' or 'stop'")
+    except (TypeError, ValueError) as e:
+        return jsonify({
+            'status': 'error',
+            'message': str(e),
+            'timestamp': datetime.utcnow().isoformat()
+        }), 400
+    
+    return jsonify({
+        'status': 'success' if changed else 'unchanged',
+        'timestamp': datetime.utcnow().isoformat(),
+        'tracemalloc': memory_tracer.get_status()
+    })
+
+
+@health_bp.route('/health/memory/snapshots', methods=['POST'])
+@login_required
+@admin_required
+def memory_snapshot():
+    """Take a tracemalloc snapshot and return its largest allocation sites (admin only)."""
+    try:
+        snapshot = memory_tracer.take_snapshot()
+    except RuntimeError as e:
+        return jsonify({
+            'status': 'error',
+            'message': str(e),
+            'timestamp': datetime.utcnow().isoformat()
+        }), 409
+    
+    return jsonify({
+        'status': 'success',
+        'timestamp': datetime.utcnow().isoformat(),
+        'snapshot': snapshot,
+        'top': memory_tracer.top(snapshot['id'], limit=request.args.get('limit', 10, type=int))
+    }), 201
+
+
+@health_bp.route('/health/memory/snapshots/<int:first_id>/diff/<int:second_id>')
+@login_required
+@admin_required
+def memory_diff(first_id, second_id):
+    """
+    Allocation growth between two snapshots (admin only).
+    
+    Query args: group_by ('lineno', 'filename', 'traceback'), limit.
+    """
+    group_by = request.args.get('group_by', 'lineno')
+    if group_by not in GROUP_BY_OPTIONS:
+        return jsonify({
+            'status': 'error',
+            'message': f"group_by must be one of {', '.join(GROUP_BY_OPTIONS)}",
+            'timestamp': datetime.utcnow().isoformat()
+        }), 400
+    
+    try:
+        diff = memory_tracer.diff(first_id, second_id, group_by=group_by,
+                                  limit=request.args.get('limit', 25, type=int))
+    except KeyError as e:
+        return jsonify({
+            'status': 'error',
+            'message': e.args[0],
+            'timestamp': datetime.utcnow().isoformat()
+        }), 404
+    
+    return jsonify({
+        'status': 'success',
+        'timestamp': datetime.utcnow().isoformat(),
+        'diff': diff
+    })
+
+
+@health_bp.route('/health/login')
+@login_required
+@admin_required
+def login_stats():
+    """Login pipeline stage timings and unknown-username cache stats (admin only)."""
+    from ..login_guard import login_timings, unknown_usernames
+    return jsonify({
+        'status': 'success',
+        'timestamp': datetime.utcnow().isoformat(),
+        'timings': login_timings.get_stats(),
+        'unknown_username_cache': unknown_usernames.get_stats()
+    })
+
+
 @health_bp.route('/health/database/test')
 @login_required
 @admin_required
@@ -303,6 +515,9 @@ def _get_system_info():
         # Disk usage for the application directory
         disk = psutil.disk_usage('.')
         
+        # System-wide CPU from the latest health sample instead of blocking a second to measure it
+        sample, _ = health_sampler.current()
+        
         return {
             'memory': {
                 'total_mb': round(memory.total / 1024 / 1024, 2),
@@ -314,7 +529,7 @@ def _get_system_info():
                 'free_gb': round(disk.free / 1024 / 1024 / 1024, 2),
                 'percent_used': round((disk.used / disk.total) * 100, 2)
             },
-            'cpu_percent': psutil.cpu_percent(interval=1)
+            'cpu_percent': sample['process']['system_cpu_percent'] if sample else None
         }
     except ImportError:
         return {
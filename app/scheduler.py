@@ -0,0 +1,318 @@
+"""
+In-process background maintenance scheduler for the Badminton Scheduler application.
+
+Runs periodic housekeeping jobs (cache sweeps, rate-limiter cleanup, health
+sampling, metrics flushing, error-data pruning, availability archival,
+database maintenance) on a single daemon thread.
+Jobs that touch shared state such as the database run only in the worker that
+holds the leader file lock, so they execute once per host rather than once per
+worker process.
+"""
+
+import logging
+import os
+import random
+import threading
+import time
+from datetime import date, timedelta
+from typing import Any, Callable, Dict, List, Optional
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None
+
+scheduler_logger = logging.getLogger('maintenance')
+
+
+class ScheduledJob:
+    """A periodic job with its schedule and run statistics."""
+
+    def __init__(self, name: str, func: Callable[[], Any], interval: float,
+                 jitter: float = 0.0, leader_only: bool = False):
+        self.name = name
+        self.func = func
+        self.interval = interval
+        self.jitter = jitter
+        self.leader_only = leader_only
+        self.next_run: Optional[float] = None
+        self.last_run: Optional[float] = None
+        self.last_duration: Optional[float] = None
+        self.last_result: Any = None
+        self.last_error: Optional[str] = None
+        self.run_count = 0
+        self.error_count = 0
+
+    def schedule_next(self, now: float, initial: bool = False):
+        """Compute the next run time, spreading runs with random jitter."""
+        if initial:
+            # Stagger first runs so workers don't all fire together at startup
+            self.next_run = now + random.uniform(0, self.jitter or self.interval)
+        else:
+            self.next_run = now + self.interval + random.uniform(0, self.jitter)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'name': self.name,
+            'interval': self.interval,
+            'jitter': self.jitter,
+            'leader_only': self.leader_only,
+            'run_count': self.run_count,
+            'error_count': self.error_count,
+            'last_duration_ms': round(self.last_duration * 1000, 2) if self.last_duration is not None else None,
+            'last_error': self.last_error,
+            'seconds_until_next_run': round(self.next_run - time.time(), 1) if self.next_run else None
+        }
+
+
+class MaintenanceScheduler:
+    """Thread-based periodic job runner with file-lock leader election."""
+
+    def __init__(self, lock_path: Optional[str] = None, tick_seconds: float = 1.0):
+        self.app = None
+        self.jobs: Dict[str, ScheduledJob] = {}
+        self.lock_path = lock_path
+        self.tick_seconds = tick_seconds
+        self.is_leader = False
+        self._lock_file = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._pid = None
+
+    def add_job(self, name: str, func: Callable[[], Any], interval: float,
+                jitter: Optional[float] = None, leader_only: bool = False) -> ScheduledJob:
+        """Register (or replace) a periodic job."""
+        if jitter is None:
+            jitter = interval * 0.1
+        job = ScheduledJob(name, func, interval, jitter, leader_only)
+        job.schedule_next(time.time(), initial=True)
+        with self._lock:
+            self.jobs[name] = job
+        return job
+
+    # -------------------------------
+    # Leader election
+    # -------------------------------
+
+    def try_acquire_leadership(self) -> bool:
+        """Try to become the leader by taking an exclusive, non-blocking file lock."""
+        if self.is_leader:
+            return True
+        if fcntl is None or not self.lock_path:
+            # No cross-process locking available; assume a single worker
+            self.is_leader = True
+            return True
+
+        lock_file = None
+        try:
+            directory = os.path.dirname(self.lock_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            lock_file = open(self.lock_path, 'a+')
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            if lock_file:
+                lock_file.close()
+            return False
+
+        lock_file.seek(0)
+        lock_file.truncate()
+        lock_file.write(str(os.getpid()))
+        lock_file.flush()
+        self._lock_file = lock_file
+        self.is_leader = True
+        scheduler_logger.info(f"Process {os.getpid()} acquired maintenance leadership")
+        return True
+
+    def release_leadership(self):
+        """Release the leader lock if held."""
+        if self._lock_file:
+            try:
+                fcntl.flock(self._lock_file.fileno(), fcntl.LOCK_UN)
+            except OSError:
+                pass
+            self._lock_file.close()
+            self._lock_file = None
+        self.is_leader = False
+
+    # -------------------------------
+    # Execution
+    # -------------------------------
+
+    def run_job(self, job: ScheduledJob):
+        """Run a single job inside the app context, recording its outcome."""
+        started = time.time()
+        try:
+            if self.app is not None:
+                with self.app.app_context():
+                    job.last_result = job.func()
+            else:
+                job.last_result = job.func()
+            job.last_error = None
+        except Exception as e:
+            job.error_count += 1
+            job.last_error = str(e)
+            scheduler_logger.error(f"Maintenance job {job.name} failed: {e}")
+        finally:
+            job.run_count += 1
+            job.last_run = started
+            job.last_duration = time.time() - started
+
+    def run_pending(self, now: Optional[float] = None) -> List[str]:
+        """Run every job whose next run time has passed; return their names."""
+        if now is None:
+            now = time.time()
+
+        with self._lock:
+            due = [job for job in self.jobs.values() if job.next_run is not None and job.next_run <= now]
+
+        ran = []
+        for job in due:
+            job.schedule_next(now)
+            if job.leader_only and not self.is_leader:
+                continue
+            self.run_job(job)
+            ran.append(job.name)
+        return ran
+
+    def _run_loop(self):
+        while not self._stop.is_set():
+            if not self.is_leader:
+                self.try_acquire_leadership()
+            self.run_pending()
+            self._stop.wait(self.tick_seconds)
+
+    def start(self, app=None):
+        """Start the scheduler thread (restarting it in a freshly forked worker)."""
+        if app is not None:
+            self.app = app
+
+        if self._thread and self._thread.is_alive() and self._pid == os.getpid():
+            return
+
+        if self._pid is not None and self._pid != os.getpid():
+            # Forked child: the parent's lock and thread did not come with us
+            self._lock_file = None
+            self.is_leader = False
+
+        self._pid = os.getpid()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run_loop, name='maintenance-scheduler', daemon=True)
+        self._thread.start()
+        scheduler_logger.info(f"Maintenance scheduler started with {len(self.jobs)} jobs")
+
+    def stop(self):
+        """Stop the scheduler thread and release leadership."""
+        self._stop.set()
+        if self._thread and self._thread is not threading.current_thread():
+            self._thread.join(timeout=5)
+        self._thread = None
+        self.release_leadership()
+
+    def get_status(self) -> Dict[str, Any]:
+        """Get scheduler state and per-job statistics."""
+        with self._lock:
+            jobs = [job.to_dict() for job in self.jobs.values()]
+        return {
+            'running': bool(self._thread and self._thread.is_alive()),
+            'pid': os.getpid(),
+            'is_leader': self.is_leader,
+            'lock_path': self.lock_path,
+            'jobs': jobs
+        }
+
+
+# -------------------------------
+# Default maintenance jobs
+# -------------------------------
+
+def _sweep_query_cache():
+    from .db_performance import db_optimizer
+    if db_optimizer:
+        return db_optimizer.cache.cleanup_expired()
+    return 0
+
+
+def _prune_rate_limiter():
+    from .security import rate_limiter
+    return rate_limiter.prune()
+
+
+def _sample_health():
+    from .health_probes import health_sampler
+    return health_sampler.take_sample()['database']['ok']
+
+
+def _flush_metrics():
+    from .db_logging import get_metrics_collector
+    from .error_tracking import error_tracker
+    get_metrics_collector().flush_metrics()
+    error_tracker.metrics.series.flush()
+
+
+def _prune_error_data():
+    from .error_tracking import error_tracker
+    error_tracker.metrics.clear_old_data()
+
+
+def _check_error_alerts():
+    from .error_tracking import error_tracker
+    error_tracker.check_alerts()
+
+
+def _optimize_database():
+    from .db_performance import db_optimizer
+    if db_optimizer:
+        return db_optimizer.optimize_database()
+    return False
+
+
+def _archive_past_availability(archive_after_days: int):
+    from .db_queries import archive_past_availability
+    cutoff = date.today() - timedelta(days=archive_after_days)
+    archived = archive_past_availability(cutoff)
+    if archived:
+        scheduler_logger.info(f"Archived {archived} availability entries dated before {cutoff}")
+    return archived
+
+
+def register_default_jobs(scheduler: MaintenanceScheduler, app):
+    """Register the application's standard maintenance jobs."""
+    from .error_tracking import error_tracker
+
+    # Per-process state: every worker sweeps its own in-memory structures
+    scheduler.add_job('query_cache_sweep', _sweep_query_cache, interval=60)
+    scheduler.add_job('rate_limiter_gc', _prune_rate_limiter, interval=300)
+    scheduler.add_job('health_sample', _sample_health,
+                      interval=app.config.get('HEALTH_SAMPLE_INTERVAL', 5), jitter=0)
+    scheduler.add_job('metrics_flush', _flush_metrics,
+                      interval=app.config.get('METRICS_EXPORT_INTERVAL', 60))
+    scheduler.add_job('error_data_prune', _prune_error_data, interval=3600)
+    scheduler.add_job('error_alert_check', _check_error_alerts,
+                      interval=app.config.get('ERROR_ALERT_INTERVAL', error_tracker.alert_interval))
+
+    # Shared database state: only the leader runs these
+    scheduler.add_job('sqlite_optimize', _optimize_database, interval=6 * 3600, leader_only=True)
+
+    archive_after_days = app.config.get('AVAILABILITY_ARCHIVE_AFTER_DAYS')
+    if archive_after_days is not None:
+        scheduler.add_job('archive_past_availability',
+                          lambda: _archive_past_availability(archive_after_days),
+                          interval=6 * 3600, jitter=600, leader_only=True)
+
+
+# Global scheduler instance
+maintenance_scheduler = MaintenanceScheduler()
+
+
+def init_scheduler(app) -> Optional[MaintenanceScheduler]:
+    """Configure the maintenance scheduler and start it if enabled."""
+    if not app.config.get('SCHEDULER_ENABLED', False):
+        return None
+
+    maintenance_scheduler.lock_path = app.config.get('SCHEDULER_LOCK_FILE', 'logs/maintenance.lock')
+    register_default_jobs(maintenance_scheduler, app)
+    maintenance_scheduler.start(app)
+    app.maintenance_scheduler = maintenance_scheduler
+    return maintenance_scheduler
@@ -308,6 +308,37 @@ class RateLimiter:
         
         return False, remaining, None
     
+    def check_login_allowed(self, client_ip, username):
+        """
+        Run the IP, username and account-lock login checks together.
+        
+        Args:
+            client_ip (str): Client IP address
+            username (str): Submitted username
+            
+        Returns:
+            str: 'ip', 'username' or 'locked' for the first limit hit, or None if allowed
+        """
+        if self.is_login_rate_limited(client_ip, max_attempts=3, window_minutes=15)[0]:
+            return 'ip'
+        if self.is_login_rate_limited(f"user_{username}", max_attempts=5, window_minutes=30)[0]:
+            return 'username'
+        if self.is_account_locked(username)[0]:
+            return 'locked'
+        return None
+    
+    def record_login_result(self, client_ip, username, success=False):
+        """
+        Record a login attempt against both the client IP and the username.
+        
+        Args:
+            client_ip (str): Client IP address
+            username (str): Submitted username
+            success (bool): Whether the login was successful
+        """
+        self.record_login_attempt(client_ip, success=success)
+        self.record_login_attempt(f"user_{username}", success=success)
+    
     def lock_account(self, username, duration_minutes=30):
         """
         Temporarily lock a user account.
@@ -338,6 +369,37 @@ class RateLimiter:
             return False, None
         
         return True, unlock_time
+    
+    def prune(self, max_window_minutes=60):
+        """
+        Drop request and login history that no rate-limit window can still see.
+        
+        Args:
+            max_window_minutes (int): Longest window used by any rate-limit check
+            
+        Returns:
+            int: Number of identifiers removed
+        """
+        now = datetime.utcnow()
+        cutoff = now - timedelta(minutes=max_window_minutes)
+        removed = 0
+        
+        for history in (self.requests, self.login_attempts):
+            for identifier in list(history.keys()):
+                recent = [t for t in history.get(identifier, []) if t > cutoff]
+                if recent:
+                    history[identifier] = recent
+                else:
+                    history.pop(identifier, None)
+                    removed += 1
+        
+        for expiries in (self.blocked_ips, self.locked_accounts):
+            for identifier, until in list(expiries.items()):
+                if until <= now:
+                    expiries.pop(identifier, None)
+                    removed += 1
+        
+        return removed
 
 
 # Global rate limiter instance
@@ -470,6 +532,34 @@ def sanitize_form_data(form_data):
     return sanitized
 
 
+def sanitize_login_credentials(username, password):
+    """
+    Validate and sanitize login credentials in a single pass.
+    
+    Expects a username that already passed LoginForm validation (length and
+    format), so only the injection checks and password sanitization remain.
+    
+    Args:
+        username (str): Submitted username
+        password (str): Submitted password
+        
+    Returns:
+        tuple: (password, error) where error is 'username' for a rejected
+               username, 'malicious' for a password with injection content,
+               or None with the sanitized password
+    """
+    is_valid, _ = SecurityValidator.validate_against_injection(username)
+    if not is_valid:
+        return None, 'username'
+    
+    is_valid, error_msg = SecurityValidator.validate_against_injection(password)
+    if not is_valid:
+        log_security_event('MALICIOUS_INPUT_DETECTED', f'Field password: {error_msg}', 'ERROR')
+        return None, 'malicious'
+    
+    return SecurityValidator.sanitize_string(password, max_length=128), None
+
+
 def validate_csrf_token_manually(token):
     """
     Manually validate CSRF token for AJAX requests.
@@ -0,0 +1,187 @@
+"""
+Production WSGI server launcher for the Badminton Scheduler application.
+
+Runs the app under gunicorn with a prefork master and threaded workers:
+
+- The master imports and builds the app once (preload), stops any
+  background threads it started, closes its database connections and
+  freezes the garbage collector, so forked workers share its memory
+  copy-on-write instead of each touching (and copying) every page.
+- Each worker restarts the background threads and database pool it needs.
+- Workers are recycled after SERVER_MAX_REQUESTS requests (with jitter so
+  they don't all restart at once).
+- SIGHUP performs a rolling reload: the master re-imports the application
+  code, starts fresh workers and gracefully stops the old ones, without
+  dropping connections or changing the master PID seen by systemd.
+"""
+
+import gc
+import os
+import sys
+from typing import Any, Dict, Optional
+
+
+def default_worker_count(cpu_count: Optional[int] = None) -> int:
+    """Worker processes for the available CPU cores (2 x cores + 1)."""
+    cpu_count = cpu_count or os.cpu_count() or 1
+    return cpu_count * 2 + 1
+
+
+def server_settings(config: Dict[str, Any], **overrides) -> Dict[str, Any]:
+    """
+    Build gunicorn settings from the application config.
+
+    Args:
+        config: Application config (SERVER_* keys)
+        overrides: Settings given on the command line (None values are ignored)
+
+    Returns:
+        dict: gunicorn settings
+    """
+    graceful_timeout = config.get('SERVER_GRACEFUL_TIMEOUT', 30)
+    settings = {
+        'bind': config.get('SERVER_BIND', '127.0.0.1:5000'),
+        'workers': config.get('SERVER_WORKERS') or default_worker_count(),
+        'worker_class': 'gthread',
+        'threads': config.get('SERVER_THREADS', 8),
+        'preload_app': True,
+        'max_requests': config.get('SERVER_MAX_REQUESTS', 2000),
+        'max_requests_jitter': config.get('SERVER_MAX_REQUESTS_JITTER', 200),
+        'timeout': config.get('SERVER_TIMEOUT', 60),
+        'graceful_timeout': graceful_timeout,
+        'keepalive': config.get('SERVER_KEEPALIVE', 5),
+        'pidfile': config.get('SERVER_PIDFILE'),
+        'accesslog': config.get('SERVER_ACCESS_LOG'),
+        'errorlog': '-',
+    }
+    settings.update({key: value for key, value in overrides.items() if value is not None})
+    return settings
+
+
+def prepare_master(app):
+    """
+    Make a freshly loaded app safe and cheap to fork.
+
+    Background threads and database connections do not survive fork(), so
+    the master stops and closes them; freezing the collector keeps the
+    objects allocated so far out of future collections, which would
+    otherwise write to (and un-share) their pages in every worker.
+    """
+    from . import db
+    from .db_queries import cache_warmer
+    from .error_tracking import error_tracker
+    from .passwords import password_hasher
+    from .scheduler import maintenance_scheduler
+
+    maintenance_scheduler.stop()
+    error_tracker.stop_alert_ticker()
+    password_hasher.shutdown()
+    cache_warmer.stop()
+    with app.app_context():
+        db.engine.dispose()
+
+    gc.collect()
+    gc.freeze()
+
+
+def init_worker(app, threads: int = 1):
+    """
+    Restart per-process resources in a forked worker.
+
+    Args:
+        app: The preloaded Flask application
+        threads: Threads per worker; at most half of them may hold SSE streams
+    """
+    from . import db
+    from .db_queries import cache_warmer
+    from .error_tracking import error_tracker
+    from .live_updates import availability_broker
+    from .scheduler import maintenance_scheduler
+
+    with app.app_context():
+        # Drop pooled connections inherited from the master without closing
+        # them, since the master and sibling workers share the sockets
+        db.engine.dispose(close=False)
+
+    if app.config.get('SCHEDULER_ENABLED'):
+        maintenance_scheduler.start(app)
+    elif not app.testing and error_tracker.alert_interval:
+        error_tracker.start_alert_ticker()
+
+    # Warm-ups queued in the master were cancelled before forking
+    cache_warmer.schedule(app=app)
+
+    # Each open SSE stream holds a worker thread; keep half for page requests
+    availability_broker.max_subscribers = min(app.config.get('SSE_MAX_CLIENTS', 200),
+                                              max(threads // 2, 1))
+
+
+def remove_global_listeners():
+    """
+    Remove the listeners the loaded application registered on SQLAlchemy's
+    Engine and Session classes, which would otherwise outlive a reload and
+    keep the previous app, optimizer and registry alive.
+    """
+    db_performance = sys.modules.get(__package__ + '.db_performance')
+    if db_performance is not None:
+        db_performance.remove_query_monitoring()
+    http_cache = sys.modules.get(__package__ + '.http_cache')
+    if http_cache is not None:
+        http_cache.unregister_commit_hooks()
+
+
+def purge_app_modules():
+    """Forget imported application modules so the next load runs the current code."""
+    remove_global_listeners()
+    for name in list(sys.modules):
+        if name == __package__ or name.startswith(__package__ + '.'):
+            del sys.modules[name]
+
+
+def run_server(config_name: str = 'production', **overrides):
+    """
+    Run the application under gunicorn (blocks until the server stops).
+
+    Args:
+        config_name: Configuration to create the app with
+        overrides: gunicorn settings taking precedence over the SERVER_* config
+    """
+    try:
+        from gunicorn.app.base import BaseApplication
+    except ImportError:
+        raise RuntimeError('gunicorn is not installed; run "pip install gunicorn"')
+
+    class SchedulerApplication(BaseApplication):
+        """gunicorn application loading the app in the master and reloading it on SIGHUP."""
+
+        def __init__(self):
+            from . import create_app
+            self.config_name = config_name
+            self.application = create_app(config_name)
+            self.settings = server_settings(self.application.config, **overrides)
+            prepare_master(self.application)
+            super().__init__()
+
+        def load_config(self):
+            for key, value in self.settings.items():
+                if key in self.cfg.settings and value is not None:
+                    self.cfg.set(key, value)
+            threads = self.settings['threads']
+            self.cfg.set('post_fork', lambda server, worker: init_worker(self.application, threads))
+
+        def load(self):
+            if self.application is None:
+                # Rolling reload: import the current code in the master
+                from importlib import import_module
+                self.application = import_module(__package__).create_app(self.config_name)
+                prepare_master(self.application)
+            return self.application
+
+        def reload(self):
+            super().reload()
+            gc.unfreeze()
+            purge_app_modules()
+            self.application = None
+            self.callable = None
+
+    SchedulerApplication().run()
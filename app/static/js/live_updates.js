@@ -0,0 +1,14 @@
+// Show a refresh prompt when availability shown on the page changes.
+// The page sets data-live-updates on an element to the event stream URL.
+(function () {
+    var container = document.querySelector('[data-live-updates]');
+    if (!container || !window.EventSource) {
+        return;
+    }
+
+    var source = new EventSource(container.getAttribute('data-live-updates'));
+    source.addEventListener('availability', function () {
+        container.classList.remove('d-none');
+        source.close();
+    });
+})();
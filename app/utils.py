@@ -9,6 +9,7 @@ from functools import wraps
 from datetime import datetime, date, time
 import re
 from .error_handlers import ErrorHandler, FlashMessageHelper
+from .comment_validation import MODEL_COMMENT_RULES, comment_spam_error
 from .logging_config import log_user_action, log_database_operation
 
 
@@ -517,5 +518,10 @@ class ValidationHelper:
         
         if len(sanitized) != len(content.strip()):
             errors.append(f"Comment is too long. Maximum {max_length} characters allowed.")
+        else:
+            # Apply the same spam rules the Comment model enforces
+            error = comment_spam_error(content, MODEL_COMMENT_RULES)
+            if error:
+                errors.append(f"{error}.")
         
         return len(errors) == 0, errors, sanitized
\ No newline at end of file
@@ -7,7 +7,7 @@ import tempfile
 import os
 from datetime import date, time, datetime, timedelta
 from app import create_app, db
-from app.models import User, Availability, Comment, AdminAction
+from app.models import User, Availability, AvailabilityArchive, Comment, AdminAction
 
 
 @pytest.fixture(scope='session')
@@ -30,6 +30,17 @@ def app():
     os.unlink(db_path)
 
 
+@pytest.fixture(autouse=True)
+def reset_rate_limits():
+    """Start every test with an empty rate limiter, so repeated requests stay under the limits."""
+    from app.security import rate_limiter
+    rate_limiter.requests.clear()
+    rate_limiter.blocked_ips.clear()
+    rate_limiter.login_attempts.clear()
+    rate_limiter.locked_accounts.clear()
+    yield
+
+
 @pytest.fixture
 def client(app):
     """Create test client."""
@@ -232,6 +243,7 @@ def clean_database(app_context):
         try:
             db.session.query(Comment).delete()
             db.session.query(Availability).delete() 
+            db.session.query(AvailabilityArchive).delete()
             db.session.query(User).delete()
             db.session.commit()
         except Exception:
@@ -246,6 +258,7 @@ def clean_database(app_context):
         try:
             db.session.query(Comment).delete()
             db.session.query(Availability).delete()
+            db.session.query(AvailabilityArchive).delete()
             db.session.query(User).delete()
             db.session.commit()
         except Exception:
@@ -147,7 +147,11 @@ WorkingDirectory=/path/to/badminton-scheduler
 Environment=PATH=/path/to/badminton-scheduler/venv/bin
 Environment=FLASK_ENV=production
 EnvironmentFile=/path/to/badminton-scheduler/.env
-ExecStart=/path/to/badminton-scheduler/venv/bin/python run.py
+ExecStart=/path/to/badminton-scheduler/venv/bin/python deploy.py serve
+# Rolling reload: new code is loaded and workers are replaced one set at a time
+ExecReload=/bin/kill -s HUP $MAINPID
+KillSignal=SIGTERM
+TimeoutStopSec=40
 Restart=always
 RestartSec=10
 
@@ -169,6 +173,28 @@ WantedBy=multi-user.target
     click.echo("   Update the paths and copy to /etc/systemd/system/ for production use")
 
 
+@cli.command()
+@click.option('--env', 'config_name', type=click.Choice(['production', 'development']), default='production',
+              help='Configuration to run the app with')
+@click.option('--bind', default=None, help='Address to listen on (default: SERVER_BIND)')
+@click.option('--workers', type=int, default=None, help='Worker processes (default: 2 x CPU cores + 1)')
+@click.option('--threads', type=int, default=None, help='Threads per worker (default: SERVER_THREADS)')
+@click.option('--max-requests', type=int, default=None,
+              help='Requests before a worker is recycled (default: SERVER_MAX_REQUESTS)')
+def serve(config_name, bind, workers, threads, max_requests):
+    """Run the application under the production prefork server (gunicorn).
+    
+    Send SIGHUP to the master for a rolling reload of new code, SIGTERM for
+    a graceful shutdown.
+    """
+    from app.server import run_server
+    
+    try:
+        run_server(config_name, bind=bind, workers=workers, threads=threads, max_requests=max_requests)
+    except RuntimeError as e:
+        raise click.ClickException(str(e))
+
+
 @cli.command()
 def create_nginx_config():
     """Create nginx configuration for production deployment."""
@@ -476,14 +502,13 @@ def run_integration_tests():
     click.echo("\n=== Testing Authentication System ===")
     try:
         from app.models import User
-        from werkzeug.security import check_password_hash
         
         with app.app_context():
             # Test password hashing
             test_user = User(username='auth_test', password='password123', role='User')
             
             # Verify password is hashed
-            if test_user.password_hash and check_password_hash(test_user.password_hash, 'password123'):
+            if test_user.password_hash and test_user.check_password('password123'):
                 click.echo("✅ Password hashing working correctly")
                 test_results.append(("Password Hashing", True))
             else:
@@ -0,0 +1,564 @@
+#!/usr/bin/env python3
+"""
+Load-testing benchmark harness for the badminton scheduler application.
+
+Generates a synthetic dataset (N users x M days x K slots), then drives
+scripted scenarios through the real Flask app, both in-process via the Flask
+test client and over HTTP against a multi-threaded WSGI server. Reports
+throughput, latency percentiles and SQL statement counts as JSON, and can
+compare a run against a stored baseline to catch regressions.
+
+Usage:
+    python load_test.py --users 50 --days 30 --slots 2 --requests 200
+    python load_test.py --save-baseline
+    python load_test.py --compare            # exits 1 on regression
+"""
+
+import argparse
+import http.cookiejar
+import json
+import math
+import os
+import platform
+import random
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, time as dt_time, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+DEFAULT_BASELINE = 'load_test_baseline.json'
+LOAD_TEST_PASSWORD = 'loadtest123'
+USER_AGENT = 'badminton-load-test/1.0'
+
+# Regression thresholds used by --compare
+DEFAULT_TOLERANCE = 0.25  # Relative slack for latency and throughput
+SQL_TOLERANCE = 0.5       # Absolute slack for SQL statements per request
+
+
+# -------------------------------
+# Synthetic data
+# -------------------------------
+
+def generate_dataset(app, users=50, days=30, slots=2, comments=200, seed=42):
+    """
+    Populate the database with a reproducible synthetic dataset.
+
+    Rows are written with bulk Core inserts, so model validators and per-user
+    password hashing are skipped; every user shares one precomputed hash.
+
+    Args:
+        app: Flask application whose database is populated
+        users: Number of regular users
+        days: Number of days of availability, starting today
+        slots: Availability slots per user per day (max 7)
+        comments: Number of comments
+        seed: Random seed for reproducible content
+
+    Returns:
+        dict: Dataset description including usernames
+    """
+    from sqlalchemy import insert
+    from app import db
+    from app.models import User, Availability, Comment
+
+    rng = random.Random(seed)
+    slots = max(0, min(slots, 7))
+    now = datetime.utcnow()
+
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+
+        password_hash = User('loadhash', LOAD_TEST_PASSWORD).password_hash
+        usernames = [f'loaduser{i}' for i in range(users)]
+        user_rows = [
+            {'username': name, 'password_hash': password_hash, 'role': 'User',
+             'is_active': True, 'created_at': now}
+            for name in usernames
+        ]
+        user_rows.append({'username': 'loadadmin', 'password_hash': password_hash, 'role': 'Admin',
+                          'is_active': True, 'created_at': now})
+        db.session.execute(insert(User), user_rows)
+        db.session.commit()
+
+        user_ids = [row.id for row in db.session.query(User.id).filter(User.role == 'User').order_by(User.id)]
+
+        availability_rows = []
+        for user_id in user_ids:
+            for day in range(days):
+                entry_date = date.today() + timedelta(days=day)
+                for slot in range(slots):
+                    start_hour = 8 + slot * 2
+                    availability_rows.append({
+                        'user_id': user_id,
+                        'date': entry_date,
+                        'start_time': dt_time(start_hour, rng.choice((0, 30))),
+                        'end_time': dt_time(start_hour + 1, 30),
+                        'created_at': now,
+                        'updated_at': now
+                    })
+        if availability_rows:
+            db.session.execute(insert(Availability), availability_rows)
+
+        comment_rows = [
+            {'user_id': rng.choice(user_ids),
+             'content': f'Load test comment {i}: ' + ' '.join(rng.choice(('court', 'shuttle', 'doubles', 'rally', 'smash'))
+                                                             for _ in range(rng.randint(3, 30))),
+             'created_at': now - timedelta(minutes=i),
+             'updated_at': now - timedelta(minutes=i)}
+            for i in range(comments)
+        ] if user_ids else []
+        if comment_rows:
+            db.session.execute(insert(Comment), comment_rows)
+
+        db.session.commit()
+
+        admin_id = db.session.query(User.id).filter_by(username='loadadmin').scalar()
+
+    return {
+        'users': users,
+        'days': days,
+        'slots': slots,
+        'comments': len(comment_rows),
+        'availability_entries': len(availability_rows),
+        'usernames': list(zip(usernames, user_ids)),
+        'admin': ('loadadmin', admin_id)
+    }
+
+
+# -------------------------------
+# Scenarios
+# -------------------------------
+
+class Scenario:
+    """A named request pattern run by one role of virtual client."""
+
+    def __init__(self, name, build_request, role='user'):
+        self.name = name
+        self.build_request = build_request  # (index, rng) -> (method, path, form data or None)
+        self.role = role  # 'user', 'admin' or 'anonymous'
+
+
+def _get(path):
+    return lambda index, rng: ('GET', path, None)
+
+
+def _login_request(index, rng, usernames):
+    username = usernames[index % len(usernames)][0]
+    return 'POST', '/auth/login', {'username': username, 'password': LOAD_TEST_PASSWORD}
+
+
+def _write_request(index, rng):
+    if index % 2:
+        return 'POST', '/comments/add', {'content': f'Write storm comment {index}'}
+    entry_date = date.today() + timedelta(days=rng.randint(1, 60))
+    start_hour = rng.randint(7, 20)
+    return 'POST', '/availability/add', {
+        'date': entry_date.isoformat(),
+        'start_time': f'{start_hour:02d}:00',
+        'end_time': f'{start_hour + 1:02d}:30'
+    }
+
+
+def build_scenarios(dataset):
+    """Build the standard scenario set for a generated dataset."""
+    usernames = dataset['usernames']
+    return [
+        Scenario('dashboard_today', _get('/?view=today')),
+        Scenario('dashboard_week', _get('/?view=week')),
+        Scenario('dashboard_month', _get('/?view=month')),
+        Scenario('my_availability', _get('/availability/my')),
+        Scenario('comments', _get('/comments')),
+        Scenario('admin_dashboard', _get('/admin/'), role='admin'),
+        Scenario('admin_users', _get('/admin/users'), role='admin'),
+        Scenario('admin_availability', _get('/admin/availability'), role='admin'),
+        Scenario('admin_comments', _get('/admin/comments'), role='admin'),
+        Scenario('login_burst', lambda index, rng: _login_request(index, rng, usernames), role='anonymous'),
+        Scenario('write_storm', _write_request),
+    ]
+
+
+# -------------------------------
+# Virtual clients
+# -------------------------------
+
+def _client_ip(index):
+    # One address per virtual client so per-IP limits behave like distinct users
+    return f'10.{(index >> 16) & 255}.{(index >> 8) & 255}.{index & 255}'
+
+
+class TestClientDriver:
+    """Issue requests in-process through the Flask test client."""
+
+    mode = 'test_client'
+
+    def __init__(self, app):
+        self.app = app
+
+    def make_client(self, index, user_id=None):
+        client = self.app.test_client(use_cookies=user_id is not None)
+        client.environ_base.update({
+            'HTTP_X_FORWARDED_FOR': _client_ip(index),
+            'HTTP_USER_AGENT': USER_AGENT
+        })
+        if user_id is not None:
+            with client.session_transaction() as sess:
+                sess['_user_id'] = str(user_id)
+                sess['_fresh'] = True
+        return client
+
+    def request(self, client, method, path, data):
+        response = client.open(path, method=method, data=data)
+        status = response.status_code
+        response.close()
+        return status
+
+    def close(self):
+        pass
+
+
+class _NoRedirect(urllib.request.HTTPRedirectHandler):
+    def redirect_request(self, *args, **kwargs):
+        return None
+
+
+class ServerDriver:
+    """Issue requests over HTTP to the app running on a threaded WSGI server."""
+
+    mode = 'server'
+
+    def __init__(self, app):
+        from werkzeug.serving import make_server
+        self.app = app
+        self.server = make_server('127.0.0.1', 0, app, threaded=True)
+        self.base_url = f'http://127.0.0.1:{self.server.server_port}'
+        self.thread = threading.Thread(target=self.server.serve_forever, name='load-test-server', daemon=True)
+        self.thread.start()
+
+    def make_client(self, index, user_id=None):
+        handlers = [_NoRedirect()]
+        if user_id is not None:
+            handlers.append(urllib.request.HTTPCookieProcessor(http.cookiejar.CookieJar()))
+        opener = urllib.request.build_opener(*handlers)
+        opener.addheaders = [('User-Agent', USER_AGENT), ('X-Forwarded-For', _client_ip(index))]
+        if user_id is not None:
+            # Log in once during setup; the timed requests reuse the session cookie
+            username = self._username_for(user_id)
+            self.request(opener, 'POST', '/auth/login',
+                         {'username': username, 'password': LOAD_TEST_PASSWORD})
+        return opener
+
+    def _username_for(self, user_id):
+        from app import db
+        from app.models import User
+        with self.app.app_context():
+            return db.session.query(User.username).filter_by(id=user_id).scalar()
+
+    def request(self, opener, method, path, data):
+        body = urllib.parse.urlencode(data).encode() if data is not None else None
+        req = urllib.request.Request(self.base_url + path, data=body, method=method)
+        try:
+            with opener.open(req, timeout=60) as response:
+                response.read()
+                return response.status
+        except urllib.error.HTTPError as e:
+            e.read()
+            return e.code
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+# -------------------------------
+# Measurement
+# -------------------------------
+
+class SQLCounter:
+    """Count SQL statements executed by the app's engine."""
+
+    def __init__(self):
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def install(self, app):
+        from sqlalchemy import event
+        from app import db
+        with app.app_context():
+            event.listen(db.engine, 'before_cursor_execute', self._on_execute)
+
+    def _on_execute(self, *args, **kwargs):
+        with self._lock:
+            self.count += 1
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, math.ceil(pct / 100.0 * len(sorted_values)) - 1))
+    return sorted_values[rank]
+
+
+def summarize(latencies, statuses, elapsed, sql_statements):
+    """Build the result dict for one scenario run."""
+    latencies_ms = sorted(latency * 1000 for latency in latencies)
+    status_counts = {}
+    for status in statuses:
+        status_counts[str(status)] = status_counts.get(str(status), 0) + 1
+    requests = len(latencies_ms)
+    return {
+        'requests': requests,
+        'errors': sum(1 for status in statuses if status >= 500),
+        'rate_limited': status_counts.get('429', 0),
+        'status_counts': status_counts,
+        'throughput_rps': round(requests / elapsed, 2) if elapsed else 0.0,
+        'mean_ms': round(sum(latencies_ms) / requests, 3) if requests else 0.0,
+        'p50_ms': round(percentile(latencies_ms, 50), 3),
+        'p90_ms': round(percentile(latencies_ms, 90), 3),
+        'p99_ms': round(percentile(latencies_ms, 99), 3),
+        'max_ms': round(latencies_ms[-1], 3) if latencies_ms else 0.0,
+        'sql_statements': sql_statements,
+        'sql_per_request': round(sql_statements / requests, 2) if requests else 0.0
+    }
+
+
+def reset_app_state(app):
+    """Clear in-memory rate limiting and caches so scenarios start equal."""
+    from app.security import rate_limiter
+    from app.db_performance import db_optimizer
+    from app.identity import identity_cache
+    from app.login_guard import unknown_usernames
+    rate_limiter.requests.clear()
+    rate_limiter.blocked_ips.clear()
+    rate_limiter.login_attempts.clear()
+    rate_limiter.locked_accounts.clear()
+    identity_cache.clear()
+    unknown_usernames.clear()
+    if db_optimizer:
+        db_optimizer.invalidate_cache()
+
+
+def run_scenario(driver, scenario, dataset, sql_counter, requests=200, threads=8,
+                 warmup=5, seed=42):
+    """
+    Run one scenario and return its summary.
+
+    Each worker thread owns one virtual client (and one client IP); anonymous
+    scenarios use a fresh client per request. Client setup, including
+    server-mode logins, happens before timing starts.
+    """
+    reset_app_state(driver.app)
+
+    if scenario.role == 'admin':
+        identities = [dataset['admin'][1]] * threads
+    elif scenario.role == 'user':
+        user_ids = [user_id for _, user_id in dataset['usernames']]
+        identities = [user_ids[i % len(user_ids)] for i in range(threads)]
+    else:
+        identities = [None] * threads
+    clients = [driver.make_client(i, user_id) for i, user_id in enumerate(identities)]
+    if scenario.role == 'anonymous':
+        # Anonymous bursts model many distinct visitors: one client and IP per request
+        request_clients = [driver.make_client(threads + i) for i in range(requests)]
+    else:
+        request_clients = None
+
+    # Warm up caches and lazy imports outside the measurement
+    warm_rng = random.Random(seed - 1)
+    for i in range(warmup):
+        method, path, data = scenario.build_request(i, warm_rng)
+        driver.request(clients[i % threads], method, path, data)
+
+    per_thread = [requests // threads + (1 if i < requests % threads else 0) for i in range(threads)]
+    results = [[] for _ in range(threads)]
+
+    def worker(thread_index):
+        rng = random.Random(seed + thread_index)
+        client = clients[thread_index]
+        offset = sum(per_thread[:thread_index])
+        for i in range(per_thread[thread_index]):
+            if request_clients:
+                client = request_clients[offset + i]
+            method, path, data = scenario.build_request(offset + i, rng)
+            started = time.perf_counter()
+            status = driver.request(client, method, path, data)
+            results[thread_index].append((time.perf_counter() - started, status))
+
+    sql_before = sql_counter.count
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        list(pool.map(worker, range(threads)))
+    elapsed = time.perf_counter() - started
+    sql_statements = sql_counter.count - sql_before
+
+    samples = [sample for thread_samples in results for sample in thread_samples]
+    return summarize([s[0] for s in samples], [s[1] for s in samples], elapsed, sql_statements)
+
+
+def run_load_test(users=50, days=30, slots=2, comments=200, requests=200, threads=8,
+                  modes=('test_client', 'server'), scenario_names=None, seed=42,
+                  database_path=None):
+    """
+    Generate data and run every scenario in each mode.
+
+    Returns:
+        dict: JSON-serialisable report with run metadata and per-scenario results
+    """
+    cleanup_path = None
+    if database_path is None:
+        fd, database_path = tempfile.mkstemp(prefix='badminton_load_', suffix='.db')
+        os.close(fd)
+        cleanup_path = database_path
+    os.environ['BENCHMARK_DATABASE_URL'] = f'sqlite:///{os.path.abspath(database_path)}'
+
+    from app import create_app
+    app = create_app('benchmark')
+
+    try:
+        dataset = generate_dataset(app, users, days, slots, comments, seed)
+        scenarios = build_scenarios(dataset)
+        if scenario_names:
+            scenarios = [s for s in scenarios if s.name in scenario_names]
+
+        sql_counter = SQLCounter()
+        sql_counter.install(app)
+
+        report = {
+            'meta': {
+                'timestamp': datetime.utcnow().isoformat(),
+                'python': platform.python_version(),
+                'platform': platform.platform(),
+                'threads': threads,
+                'requests_per_scenario': requests,
+                'seed': seed,
+                'dataset': {key: dataset[key] for key in ('users', 'days', 'slots', 'comments',
+                                                          'availability_entries')}
+            },
+            'results': {}
+        }
+
+        for mode in modes:
+            driver = TestClientDriver(app) if mode == 'test_client' else ServerDriver(app)
+            try:
+                mode_results = {}
+                for scenario in scenarios:
+                    mode_results[scenario.name] = run_scenario(
+                        driver, scenario, dataset, sql_counter, requests, threads, seed=seed
+                    )
+                    print(f"  {mode:<12} {scenario.name:<20} "
+                          f"{mode_results[scenario.name]['throughput_rps']:>8.1f} req/s  "
+                          f"p50 {mode_results[scenario.name]['p50_ms']:>8.2f} ms  "
+                          f"p99 {mode_results[scenario.name]['p99_ms']:>8.2f} ms  "
+                          f"sql/req {mode_results[scenario.name]['sql_per_request']:>6.2f}",
+                          file=sys.stderr)
+                report['results'][mode] = mode_results
+            finally:
+                driver.close()
+
+        return report
+    finally:
+        if cleanup_path and os.path.exists(cleanup_path):
+            os.unlink(cleanup_path)
+
+
+# -------------------------------
+# Baseline comparison
+# -------------------------------
+
+def compare_with_baseline(report, baseline, tolerance=DEFAULT_TOLERANCE, sql_tolerance=SQL_TOLERANCE):
+    """
+    Compare a report against a baseline report.
+
+    Latency (p50/p99) may grow and throughput may drop by at most `tolerance`
+    relative to the baseline; SQL statements per request may grow by at most
+    `sql_tolerance` statements. Scenarios missing from either side are skipped.
+
+    Returns:
+        list: Human-readable regression descriptions (empty when none)
+    """
+    regressions = []
+    for mode, scenarios in report.get('results', {}).items():
+        baseline_mode = baseline.get('results', {}).get(mode, {})
+        for name, result in scenarios.items():
+            base = baseline_mode.get(name)
+            if not base:
+                continue
+            for metric in ('p50_ms', 'p99_ms'):
+                if base[metric] and result[metric] > base[metric] * (1 + tolerance):
+                    regressions.append(f"{mode}/{name}: {metric} {result[metric]} > baseline {base[metric]}")
+            if base['throughput_rps'] and result['throughput_rps'] < base['throughput_rps'] * (1 - tolerance):
+                regressions.append(f"{mode}/{name}: throughput_rps {result['throughput_rps']} "
+                                   f"< baseline {base['throughput_rps']}")
+            if result['sql_per_request'] > base['sql_per_request'] + sql_tolerance:
+                regressions.append(f"{mode}/{name}: sql_per_request {result['sql_per_request']} "
+                                   f"> baseline {base['sql_per_request']}")
+            if result['errors'] > base['errors']:
+                regressions.append(f"{mode}/{name}: {result['errors']} server errors "
+                                   f"(baseline {base['errors']})")
+    return regressions
+
+
+def main(argv=None):
+    """Command-line entry point."""
+    parser = argparse.ArgumentParser(description='Badminton Scheduler load-testing harness')
+    parser.add_argument('--users', type=int, default=50, help='Number of synthetic users')
+    parser.add_argument('--days', type=int, default=30, help='Days of availability per user')
+    parser.add_argument('--slots', type=int, default=2, help='Availability slots per user per day')
+    parser.add_argument('--comments', type=int, default=200, help='Number of synthetic comments')
+    parser.add_argument('--requests', type=int, default=200, help='Timed requests per scenario')
+    parser.add_argument('--threads', type=int, default=8, help='Concurrent virtual clients')
+    parser.add_argument('--mode', choices=['test_client', 'server', 'both'], default='both')
+    parser.add_argument('--scenario', action='append', dest='scenarios',
+                        help='Run only the named scenario (repeatable)')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', help='Write the JSON report to this file (default: stdout)')
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help='Baseline report path')
+    parser.add_argument('--save-baseline', action='store_true', help='Store this run as the baseline')
+    parser.add_argument('--compare', action='store_true', help='Fail if this run regresses from the baseline')
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE,
+                        help='Allowed relative latency/throughput regression')
+    args = parser.parse_args(argv)
+
+    modes = ('test_client', 'server') if args.mode == 'both' else (args.mode,)
+    report = run_load_test(args.users, args.days, args.slots, args.comments, args.requests,
+                           args.threads, modes, args.scenarios, args.seed)
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output + '\n')
+    else:
+        print(output)
+
+    if args.save_baseline:
+        with open(args.baseline, 'w') as f:
+            f.write(output + '\n')
+        print(f"Baseline saved to {args.baseline}", file=sys.stderr)
+
+    if args.compare:
+        if not os.path.exists(args.baseline):
+            print(f"No baseline at {args.baseline}; run with --save-baseline first", file=sys.stderr)
+            return 2
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare_with_baseline(report, baseline, args.tolerance)
+        if regressions:
+            print("Performance regressions detected:", file=sys.stderr)
+            for regression in regressions:
+                print(f"  - {regression}", file=sys.stderr)
+            return 1
+        print("No regressions against baseline", file=sys.stderr)
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,40 @@
+"""Widen users.password_hash for bcrypt and scrypt hashes
+
+Revision ID: e5a17b3c2d90
+Revises: c41d2e8a9f03
+Create Date: 2026-10-18 14:05:11.502917
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e5a17b3c2d90'
+down_revision = 'c41d2e8a9f03'
+branch_labels = None
+depends_on = None
+
+
+def _password_column():
+    # The initial migration created the column as password_hashpassword
+    columns = {column['name'] for column in sa.inspect(op.get_bind()).get_columns('users')}
+    return 'password_hash' if 'password_hash' in columns else 'password_hashpassword'
+
+
+def upgrade():
+    column = _password_column()
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.alter_column(column,
+               new_column_name='password_hash',
+               existing_type=sa.String(length=120),
+               type_=sa.String(length=255),
+               existing_nullable=False)
+
+
+def downgrade():
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.alter_column('password_hash',
+               existing_type=sa.String(length=255),
+               type_=sa.String(length=120),
+               existing_nullable=False)
@@ -1,14 +1,11 @@
+import multiprocessing
 import os
 import sys
 from app import create_app, db
 from flask.cli import with_appcontext
 import click
 
-# Create Flask application
-app = create_app(os.environ.get('FLASK_ENV', 'development'))
-
-
-@app.cli.command()
+@click.command()
 @with_appcontext
 def init_db():
     """Initialize the database."""
@@ -16,7 +13,7 @@ def init_db():
     click.echo('Initialized the database.')
 
 
-@app.cli.command()
+@click.command()
 @with_appcontext
 def create_admin():
     """Create an admin user."""
@@ -46,7 +43,7 @@ def create_admin():
         click.echo(f'Error creating admin user: {e}')
 
 
-@app.cli.command()
+@click.command()
 @with_appcontext
 def reset_db():
     """Reset database (drop all tables and recreate)."""
@@ -56,7 +53,7 @@ def reset_db():
         click.echo('Database reset complete!')
 
 
-@app.cli.command()
+@click.command()
 @with_appcontext
 def seed_db():
     """Seed database with sample data."""
@@ -116,7 +113,7 @@ def seed_db():
         click.echo(f'Error seeding database: {e}')
 
 
-@app.cli.command()
+@click.command()
 def run_tests():
     """Run the complete test suite."""
     import subprocess
@@ -141,7 +138,7 @@ def run_tests():
         click.echo(f"Error running tests: {e}")
 
 
-@app.cli.command()
+@click.command()
 def health_check():
     """Run application health check."""
     click.echo("Running health check...")
@@ -166,12 +163,22 @@ def health_check():
         click.echo(f"❌ Health check failed: {e}")
 
 
-if __name__ == '__main__':
-    # Check if running in production
-    if os.environ.get('FLASK_ENV') == 'production':
-        # In production, use a proper WSGI server
-        click.echo("Production mode detected. Use a WSGI server like Gunicorn:")
-        click.echo("gunicorn -w 4 -b 0.0.0.0:5000 run:app")
-    else:
+CLI_COMMANDS = (init_db, create_admin, reset_db, seed_db, run_tests, health_check)
+
+
+if __name__ == '__main__' and os.environ.get('FLASK_ENV') == 'production':
+    # In production, serve through the prefork WSGI server launcher, which creates
+    # the app in its master; building one here as well would start a second
+    # scheduler, alert ticker and cache warmer
+    from app.server import run_server
+    run_server('production')
+elif multiprocessing.parent_process() is None:
+    # Create Flask application (not in password hash pool workers, which are
+    # spawned and re-import this file as __mp_main__)
+    app = create_app(os.environ.get('FLASK_ENV', 'development'))
+    for command in CLI_COMMANDS:
+        app.cli.add_command(command)
+    
+    if __name__ == '__main__':
         # Development mode
-        app.run(debug=True, host='0.0.0.0', port=5000)
\ No newline at end of file
+        app.run(debug=True, host='0.0.0.0', port=5000)
@@ -0,0 +1 @@
+# Micro-benchmark package
\ No newline at end of file
@@ -0,0 +1,115 @@
+"""
+Timing fixtures for the micro-benchmark suite.
+
+Benchmarks only run when RUN_BENCHMARKS=1 is set. Each run is appended to
+tests/benchmarks/.results/history.jsonl and merged into latest.json, and the
+terminal summary compares every benchmark with its previous result.
+"""
+
+import json
+import os
+import platform
+import statistics
+import subprocess
+import timeit
+from datetime import datetime
+
+import pytest
+
+
+RESULTS_DIR = os.environ.get('BENCHMARK_RESULTS_DIR') or os.path.join(os.path.dirname(__file__), '.results')
+
+# Timing parameters: each repeat runs the function for at least MIN_TIME seconds
+REPEAT = int(os.environ.get('BENCHMARK_REPEAT', 5))
+MIN_TIME = float(os.environ.get('BENCHMARK_MIN_TIME', 0.2))
+
+_results = {}
+
+
+class MicroBenchmark:
+    """Time a callable with timeit and record per-call statistics."""
+
+    def __init__(self, repeat=REPEAT, min_time=MIN_TIME):
+        self.repeat = repeat
+        self.min_time = min_time
+
+    def _number_of_loops(self, timer):
+        number = 1
+        while True:
+            if timer.timeit(number) >= self.min_time:
+                return number
+            number *= 2
+
+    def __call__(self, name, func, *args, **kwargs):
+        """Benchmark func(*args, **kwargs) under `name` and return its result."""
+        timer = timeit.Timer(lambda: func(*args, **kwargs))
+        number = self._number_of_loops(timer)
+        per_call = [total / number for total in timer.repeat(repeat=self.repeat, number=number)]
+
+        _results[name] = {
+            'loops': number,
+            'repeat': self.repeat,
+            'min_us': round(min(per_call) * 1e6, 3),
+            'median_us': round(statistics.median(per_call) * 1e6, 3),
+            'max_us': round(max(per_call) * 1e6, 3)
+        }
+        return func(*args, **kwargs)
+
+
+@pytest.fixture
+def micro_benchmark():
+    """Provide the timing helper to benchmark tests."""
+    return MicroBenchmark()
+
+
+def _git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                              text=True, cwd=os.path.dirname(__file__)).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def _load_previous():
+    path = os.path.join(RESULTS_DIR, 'latest.json')
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path) as f:
+            return json.load(f).get('benchmarks', {})
+    except (OSError, ValueError):
+        return {}
+
+
+def pytest_terminal_summary(terminalreporter):
+    """Store this run's results and print a comparison with the previous run."""
+    if not _results:
+        return
+
+    previous = _load_previous()
+    run = {
+        'timestamp': datetime.utcnow().isoformat(),
+        'revision': _git_revision(),
+        'python': platform.python_version(),
+        'benchmarks': dict(sorted(_results.items()))
+    }
+
+    # latest.json keeps the newest result for every benchmark, so partial
+    # runs (-k) don't drop the others from future comparisons
+    latest = dict(run, benchmarks=dict(sorted({**previous, **_results}.items())))
+
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    with open(os.path.join(RESULTS_DIR, 'latest.json'), 'w') as f:
+        json.dump(latest, f, indent=2)
+    with open(os.path.join(RESULTS_DIR, 'history.jsonl'), 'a') as f:
+        f.write(json.dumps(run) + '\n')
+
+    terminalreporter.section('micro-benchmarks (min per call)')
+    for name, result in run['benchmarks'].items():
+        line = f"{name:<48} {result['min_us']:>12.3f} us"
+        before = previous.get(name)
+        if before and before['min_us']:
+            change = (result['min_us'] - before['min_us']) / before['min_us'] * 100
+            line += f"   {change:+7.1f}% vs previous ({before['min_us']:.3f} us)"
+        terminalreporter.write_line(line)
+    terminalreporter.write_line(f"Results stored in {RESULTS_DIR}")
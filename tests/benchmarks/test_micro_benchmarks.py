@@ -0,0 +1,128 @@
+"""
+Micro-benchmarks for the pure-Python hot paths.
+
+Run with:
+    RUN_BENCHMARKS=1 python -m pytest tests/benchmarks -q
+"""
+
+import logging
+import os
+from datetime import date, timedelta
+
+import pytest
+
+from app.db_performance import DatabasePerformanceMonitor
+from app.logging_config import StructuredFormatter
+from app.models import Comment
+from app.security import SecurityValidator
+from app.utils import get_date_range_filter
+
+
+pytestmark = pytest.mark.skipif(
+    os.environ.get('RUN_BENCHMARKS', '').lower() not in ('1', 'true', 'yes'),
+    reason='set RUN_BENCHMARKS=1 to run benchmarks'
+)
+
+
+SHORT_COMMENT = "Anyone up for doubles on Saturday morning? I can book court 3."
+LONG_COMMENT = ("Great session yesterday, thanks everyone for coming along. " * 17)[:1000]
+# Runs of twelve identical characters defeat the repeated-character check's early exits
+ADVERSARIAL_COMMENT = (("a" * 12 + "b") * 77)[:1000]
+HTML_COMMENT = ("<b>Court 2</b> is <i>free</i> from 7pm &amp; <u>booked</u> after 9. " * 15)[:1000]
+
+SQL_QUERY = (
+    "SELECT availability.id AS availability_id, availability.user_id, availability.date, "
+    "availability.start_time, availability.end_time FROM availability JOIN users ON users.id = "
+    "availability.user_id WHERE availability.date >= '2025-06-01' AND availability.date <= "
+    "'2025-06-30' AND users.is_active = 1 AND availability.user_id IN (1, 2, 3, 4, 5, 6, 7, 8) "
+    "ORDER BY availability.date, availability.start_time LIMIT 50 OFFSET 100"
+)
+
+
+@pytest.fixture(scope='module')
+def comment():
+    return Comment(user_id=1, content='Benchmark comment')
+
+
+class TestCommentValidationBenchmarks:
+    """Per-call cost of Comment.validate_content."""
+
+    @pytest.mark.parametrize('label,content', [
+        ('short', SHORT_COMMENT),
+        ('long_1000', LONG_COMMENT),
+        ('adversarial_1000', ADVERSARIAL_COMMENT),
+    ])
+    def test_validate_content(self, micro_benchmark, comment, label, content):
+        result = micro_benchmark(f'comment.validate_content[{label}]',
+                                 comment.validate_content, 'content', content)
+        assert result == content.strip()
+
+
+class TestSecurityBenchmarks:
+    """Per-call cost of the input validation and sanitisation helpers."""
+
+    @pytest.mark.parametrize('label,value', [
+        ('username', 'player_42'),
+        ('comment_1000', LONG_COMMENT),
+    ])
+    def test_validate_against_injection(self, micro_benchmark, label, value):
+        is_valid, _ = micro_benchmark(f'security.validate_against_injection[{label}]',
+                                      SecurityValidator.validate_against_injection, value)
+        assert is_valid
+
+    @pytest.mark.parametrize('label,value,allow_html', [
+        ('plain_1000', LONG_COMMENT, False),
+        ('html_1000', HTML_COMMENT, False),
+        ('html_1000_allow_html', HTML_COMMENT, True),
+    ])
+    def test_sanitize_string(self, micro_benchmark, label, value, allow_html):
+        result = micro_benchmark(f'security.sanitize_string[{label}]',
+                                 SecurityValidator.sanitize_string, value, 1000, allow_html)
+        assert result
+
+
+class TestQueryMonitoringBenchmarks:
+    """Per-call cost of SQL normalisation in the performance monitor."""
+
+    def test_normalize_query(self, micro_benchmark):
+        monitor = DatabasePerformanceMonitor()
+        result = micro_benchmark('db_performance._normalize_query', monitor._normalize_query, SQL_QUERY)
+        assert 'IN (?)' in result
+
+
+class TestDateRangeBenchmarks:
+    """Per-call cost of dashboard date range resolution."""
+
+    @pytest.mark.parametrize('view_type', ['today', 'week', 'month'])
+    def test_get_date_range_filter(self, micro_benchmark, view_type):
+        start, end = micro_benchmark(f'utils.get_date_range_filter[{view_type}]',
+                                     get_date_range_filter, view_type)
+        assert start <= end
+
+    def test_get_date_range_filter_custom(self, micro_benchmark):
+        start = date.today().isoformat()
+        end = (date.today() + timedelta(days=14)).isoformat()
+        result = micro_benchmark('utils.get_date_range_filter[custom]',
+                                 get_date_range_filter, 'custom', start, end)
+        assert result[0].isoformat() == start
+
+
+class TestLoggingBenchmarks:
+    """Per-call cost of structured log formatting."""
+
+    @pytest.fixture
+    def record(self):
+        return logging.LogRecord('app', logging.INFO, __file__, 42,
+                                 'User %s added availability for %s', ('player_42', '2025-06-01'), None)
+
+    def test_format_outside_request(self, micro_benchmark, record):
+        result = micro_benchmark('logging.StructuredFormatter.format[no_request]',
+                                 StructuredFormatter().format, record)
+        assert '"level": "INFO"' in result
+
+    def test_format_in_request(self, micro_benchmark, app, record):
+        with app.test_request_context('/availability/add?view=week', method='POST',
+                                      headers={'User-Agent': 'benchmark-agent/1.0'}):
+            result = micro_benchmark('logging.StructuredFormatter.format[request]',
+                                     StructuredFormatter().format, record)
+        assert '"endpoint"' in result
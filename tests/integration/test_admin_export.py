@@ -0,0 +1,92 @@
+"""
+Integration tests for streaming admin data exports.
+"""
+
+import csv
+import gzip
+import io
+import json
+
+
+class TestAdminExport:
+    """Test cases for the /admin/export endpoints."""
+
+    def test_availability_csv_export(self, authenticated_admin, multiple_availability_entries):
+        """Availability export streams a CSV with a header and one row per entry."""
+        response = authenticated_admin.get('/admin/export/availability')
+
+        assert response.status_code == 200
+        assert response.mimetype == 'text/csv'
+        assert 'attachment' in response.headers['Content-Disposition']
+
+        rows = list(csv.DictReader(io.StringIO(response.get_data(as_text=True))))
+        assert len(rows) == len(multiple_availability_entries)
+        assert set(rows[0].keys()) >= {'id', 'username', 'date', 'start_time', 'end_time'}
+
+    def test_availability_export_uses_listing_filters(self, authenticated_admin, multiple_users,
+                                                      multiple_availability_entries):
+        """The user and date filters narrow the export like the listing page."""
+        user = multiple_users[0]
+        response = authenticated_admin.get(f'/admin/export/availability?user_id={user.id}')
+        rows = list(csv.DictReader(io.StringIO(response.get_data(as_text=True))))
+        assert rows and all(row['username'] == user.username for row in rows)
+
+        entry = multiple_availability_entries[0]
+        response = authenticated_admin.get(
+            f'/admin/export/availability?date={entry.date.isoformat()}&format=jsonl'
+        )
+        lines = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+        assert lines and all(line['date'] == entry.date.isoformat() for line in lines)
+
+    def test_comments_jsonl_gzip_export(self, authenticated_admin, multiple_comments):
+        """Comments can be exported as gzip-compressed JSON Lines."""
+        response = authenticated_admin.get('/admin/export/comments?format=jsonl&gzip=1')
+
+        assert response.status_code == 200
+        assert response.mimetype == 'application/gzip'
+        assert response.headers['Content-Disposition'].endswith('.jsonl.gz')
+
+        text = gzip.decompress(response.get_data()).decode('utf-8')
+        records = [json.loads(line) for line in text.splitlines()]
+        assert len(records) == len(multiple_comments)
+        assert {record['content'] for record in records} == {c.content for c in multiple_comments}
+
+    def test_csv_formulas_neutralized(self, authenticated_admin, test_user, test_factory):
+        """Cells a spreadsheet would run as formulas are prefixed with a quote."""
+        contents = ['=SUM(1,2) for the court', '+44 call me', '-10 degrees outside', '@everyone see you',
+                    'plain = text']
+        for content in contents:
+            test_factory.create_comment(test_user, content)
+
+        response = authenticated_admin.get(f'/admin/export/comments?user_id={test_user.id}')
+        rows = list(csv.DictReader(io.StringIO(response.get_data(as_text=True))))
+
+        exported = {row['content'] for row in rows}
+        assert exported == {"'" + content for content in contents[:4]} | {'plain = text'}
+
+        response = authenticated_admin.get(f'/admin/export/comments?user_id={test_user.id}&format=jsonl')
+        records = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+        assert {record['content'] for record in records} == set(contents)  # JSON stays verbatim
+
+    def test_audit_export(self, authenticated_admin, test_admin, test_factory):
+        """Audit log export honours the action type filter."""
+        test_factory.create_admin_action(test_admin, action_type='block_user')
+        test_factory.create_admin_action(test_admin, action_type='delete_comment', target_type='comment')
+
+        response = authenticated_admin.get('/admin/export/audit?format=jsonl&action_type=block_user')
+        records = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+
+        assert records
+        assert all(record['action_type'] == 'block_user' for record in records)
+        assert records[0]['admin_username'] == test_admin.username
+
+    def test_export_rejects_bad_input(self, authenticated_admin):
+        """Unknown datasets, formats and dates are rejected."""
+        assert authenticated_admin.get('/admin/export/passwords').status_code == 404
+        assert authenticated_admin.get('/admin/export/comments?format=xml').status_code == 400
+        assert authenticated_admin.get('/admin/export/availability?date=bad').status_code == 400
+
+    def test_export_requires_admin(self, authenticated_user):
+        """Regular users are redirected away from exports."""
+        response = authenticated_user.get('/admin/export/availability')
+        assert response.status_code == 302
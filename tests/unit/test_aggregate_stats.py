@@ -0,0 +1,118 @@
+"""
+Unit tests for the admin dashboard's aggregate statistics queries.
+"""
+
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import event
+
+from app import db
+from app.db_queries import OptimizedQueries, count_content_statistics, count_user_statistics
+from app.models import AdminAction
+
+
+@contextmanager
+def count_statements():
+    """Collect the SQL statements executed inside the block."""
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(db.engine, 'before_cursor_execute', record)
+    try:
+        yield statements
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', record)
+
+
+@pytest.fixture
+def populated(app_context, test_factory):
+    """Two active users (one admin), one blocked user, availability and comments."""
+    admin = test_factory.create_user(username='statsadmin', role='Admin')
+    user = test_factory.create_user(username='statsuser')
+    test_factory.create_user(username='statsblocked', is_active=False)
+    test_factory.create_availability(user, date_offset=1)
+    test_factory.create_availability(admin, date_offset=2)
+    test_factory.create_comment(user)
+    yield admin, user
+    AdminAction.query.delete()  # Not cleared by the shared clean_database fixture
+    db.session.commit()
+
+
+class TestAggregateStatistics:
+    """Test cases for the single-query statistics."""
+
+    def test_user_statistics(self, populated):
+        """Test user counts come from one statement."""
+        with count_statements() as statements:
+            stats = count_user_statistics()
+
+        assert len(statements) == 1
+        assert stats == {'total_users': 3, 'active_users': 2, 'blocked_users': 1, 'admin_users': 1}
+
+    def test_content_statistics(self, populated):
+        """Test availability and comment counts come from one statement."""
+        with count_statements() as statements:
+            stats = count_content_statistics()
+
+        assert len(statements) == 1
+        assert stats == {'total_availability': 2, 'future_availability': 2, 'total_comments': 1}
+
+    def test_empty_tables(self, app_context):
+        """Test empty tables count as zero rather than None."""
+        assert count_user_statistics() == {
+            'total_users': 0, 'active_users': 0, 'blocked_users': 0, 'admin_users': 0
+        }
+        assert count_content_statistics()['future_availability'] == 0
+
+    def test_admin_actions_summary(self, populated):
+        """Test actions are counted by type and admin in one grouped statement."""
+        admin, user = populated
+        now = datetime.utcnow()
+
+        def action(action_type, age_hours=0):
+            entry = AdminAction(admin.id, action_type, 'user', user.id, 'Test action')
+            entry.created_at = now - timedelta(hours=age_hours)
+            return entry
+
+        db.session.add_all([
+            action('block_user'),
+            action('block_user'),
+            action('delete_comment'),
+            action('delete_comment', age_hours=48),
+        ])
+        db.session.commit()
+
+        summary_func = OptimizedQueries.get_admin_actions_summary.__wrapped__
+        with count_statements() as statements:
+            summary = summary_func(24)
+
+        assert len(statements) == 1
+        assert summary == {
+            'total_actions': 3,
+            'action_counts': {'block_user': 2, 'delete_comment': 1},
+            'admin_counts': {admin.id: 3},
+            'time_period_hours': 24
+        }
+
+    def test_dashboard_uses_aggregates(self, authenticated_admin, populated):
+        """Test the admin dashboard renders the statistics and recent actions."""
+        admin, user = populated
+        db.session.add(AdminAction(admin.id, 'block_user', 'user', user.id, 'Test action'))
+        db.session.commit()
+
+        response = authenticated_admin.get('/admin/')
+
+        assert response.status_code == 200
+        assert b'block_user' in response.data
+
+    def test_detailed_health_counts(self, authenticated_admin, populated):
+        """Test the detailed health check reports the aggregate counts."""
+        counts = authenticated_admin.get('/health/detailed').get_json()['database']['counts']
+
+        assert counts['users'] == 4  # Including the logged-in admin
+        assert counts['availability_entries'] == 2
+        assert counts['comments'] == 1
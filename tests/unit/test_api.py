@@ -0,0 +1,128 @@
+"""
+Unit tests for the versioned JSON API.
+"""
+
+import gzip
+import json
+from datetime import date, time, timedelta
+from types import SimpleNamespace
+
+from app.routes.api import find_overlaps
+
+
+def _entry(user_id, start_hour, end_hour):
+    return SimpleNamespace(user_id=user_id, start_time=time(start_hour), end_time=time(end_hour))
+
+
+class TestFindOverlaps:
+    """Test cases for the overlap sweep."""
+
+    def test_overlapping_windows(self):
+        """Test windows cover exactly the times two or more users share."""
+        windows = find_overlaps([_entry(1, 10, 14), _entry(2, 12, 16), _entry(3, 13, 15)])
+
+        assert [(w['start'].hour, w['end'].hour, w['user_ids']) for w in windows] == [
+            (12, 13, [1, 2]),
+            (13, 14, [1, 2, 3]),
+            (14, 15, [2, 3])
+        ]
+
+    def test_back_to_back_slots_do_not_overlap(self):
+        """Test a slot ending when another starts is not an overlap."""
+        assert find_overlaps([_entry(1, 10, 12), _entry(2, 12, 14)]) == []
+
+    def test_same_user_counts_once(self):
+        """Test a user's own overlapping slots never form a window."""
+        assert find_overlaps([_entry(1, 10, 14), _entry(1, 12, 16)]) == []
+
+    def test_adjacent_windows_merged(self):
+        """Test windows with the same players are merged across slot boundaries."""
+        windows = find_overlaps([_entry(1, 10, 12), _entry(1, 12, 14), _entry(2, 9, 15)])
+
+        assert [(w['start'].hour, w['end'].hour) for w in windows] == [(10, 14)]
+
+
+class TestAvailabilityAPI:
+    """Test cases for /api/v1/availability."""
+
+    def _range(self, client, days=3, **headers):
+        start = date.today() + timedelta(days=1)
+        end = start + timedelta(days=days - 1)
+        return client.get(f'/api/v1/availability?from={start}&to={end}', headers=headers)
+
+    def test_requires_login(self, client):
+        """Test anonymous requests get a JSON 401."""
+        response = client.get('/api/v1/availability')
+
+        assert response.status_code == 401
+        assert response.get_json() == {'error': 'Authentication required.'}
+
+    def test_columnar_payload(self, authenticated_user, test_user, test_admin, test_factory):
+        """Test entries are returned as columns with users deduplicated."""
+        test_factory.create_availability(test_user, date_offset=1)
+        test_factory.create_availability(test_user, date_offset=2)
+        test_factory.create_availability(test_admin, date_offset=2, start_hour=14, end_hour=16)
+
+        response = self._range(authenticated_user)
+
+        assert response.status_code == 200
+        data = response.get_json()
+        assert data['users'] == {'id': [test_user.id, test_admin.id],
+                                 'username': [test_user.username, test_admin.username]}
+        assert data['entries']['user'] == [0, 0, 1]
+        assert data['entries']['start'] == ['10:00', '10:00', '14:00']
+        assert data['entries']['archived'] == [0, 0, 0]
+        assert len(data['entries']['id']) == 3
+
+    def test_invalid_ranges(self, authenticated_user):
+        """Test malformed, reversed and oversized ranges are rejected."""
+        assert authenticated_user.get('/api/v1/availability?from=tomorrow').status_code == 400
+        assert authenticated_user.get(
+            '/api/v1/availability?from=2030-02-01&to=2030-01-01').status_code == 400
+        assert authenticated_user.get(
+            '/api/v1/availability?from=2030-01-01&to=2031-01-01').status_code == 400
+
+    def test_etag_revalidation(self, authenticated_user, test_user, test_factory):
+        """Test a matching ETag gets 304 until availability changes."""
+        etag = self._range(authenticated_user).headers['ETag']
+
+        assert self._range(authenticated_user, **{'If-None-Match': etag}).status_code == 304
+
+        test_factory.create_availability(test_user, date_offset=1)
+        assert self._range(authenticated_user, **{'If-None-Match': etag}).status_code == 200
+
+    def test_gzip_when_accepted(self, app, authenticated_user, test_user, test_factory):
+        """Test large responses are gzip-compressed for clients that accept it."""
+        test_factory.create_availability(test_user, date_offset=1)
+        app.config['API_GZIP_MIN_SIZE'] = 1
+        try:
+            response = self._range(authenticated_user, **{'Accept-Encoding': 'gzip'})
+            plain = self._range(authenticated_user)
+        finally:
+            app.config['API_GZIP_MIN_SIZE'] = 1024
+
+        assert response.headers['Content-Encoding'] == 'gzip'
+        assert 'Accept-Encoding' in response.headers['Vary']
+        assert json.loads(gzip.decompress(response.data)) == plain.get_json()
+        assert 'Content-Encoding' not in plain.headers
+
+
+class TestOverlapsAPI:
+    """Test cases for /api/v1/days/<date>/overlaps."""
+
+    def test_overlaps_payload(self, authenticated_user, test_user, test_admin, test_factory):
+        """Test overlap windows reference the user lookup table."""
+        test_factory.create_availability(test_user, date_offset=1, start_hour=10, end_hour=14)
+        test_factory.create_availability(test_admin, date_offset=1, start_hour=12, end_hour=16)
+        day = date.today() + timedelta(days=1)
+
+        response = authenticated_user.get(f'/api/v1/days/{day}/overlaps')
+
+        assert response.status_code == 200
+        data = response.get_json()
+        assert data['windows'] == {'start': ['12:00'], 'end': ['14:00'], 'users': [[0, 1]]}
+        assert sorted(data['users']['id']) == sorted([test_user.id, test_admin.id])
+
+    def test_invalid_day(self, authenticated_user):
+        """Test a malformed day is rejected."""
+        assert authenticated_user.get('/api/v1/days/not-a-day/overlaps').status_code == 400
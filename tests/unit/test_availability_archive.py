@@ -0,0 +1,101 @@
+"""
+Unit tests for archiving past availability out of the hot table.
+"""
+
+from datetime import date, datetime, timedelta
+
+from sqlalchemy import text
+
+from app import db
+from app.db_queries import archive_past_availability, count_content_statistics, get_availability_in_range
+from app.exports import availability_export_query, iter_rows
+from app.models import Availability, AvailabilityArchive
+
+
+def insert_past_availability(user_id, days_ago, start='10:00:00.000000', end='12:00:00.000000'):
+    """Insert a past-dated entry directly, bypassing the future-date validators."""
+    entry_date = date.today() - timedelta(days=days_ago)
+    now = datetime.utcnow()
+    db.session.execute(text(
+        "INSERT INTO availability (user_id, date, start_time, end_time, created_at, updated_at) "
+        "VALUES (:user_id, :date, :start, :end, :now, :now)"
+    ), {'user_id': user_id, 'date': entry_date.isoformat(), 'start': start, 'end': end, 'now': now})
+    db.session.commit()
+    return entry_date
+
+
+class TestArchivePastAvailability:
+    """Test cases for archive_past_availability."""
+
+    def test_moves_past_rows_in_batches(self, app_context, test_availability):
+        """Past rows are copied to the archive with their original ids and removed from the hot table."""
+        for days_ago in (1, 2, 3):
+            insert_past_availability(test_availability.user_id, days_ago)
+        past_ids = {row.id for row in Availability.query.filter(Availability.date < date.today())}
+
+        assert archive_past_availability(batch_size=2) == 3
+
+        assert Availability.query.count() == 1
+        assert Availability.query.first().id == test_availability.id
+        archived = AvailabilityArchive.query.all()
+        assert {entry.original_id for entry in archived} == past_ids
+        assert all(entry.archived_at is not None for entry in archived)
+        assert archive_past_availability() == 0
+
+    def test_reused_availability_id(self, app_context, test_user):
+        """An id SQLite hands out again after archiving can be archived a second time."""
+        insert_past_availability(test_user.id, 2)
+        first_id = Availability.query.one().id
+        assert archive_past_availability() == 1
+
+        insert_past_availability(test_user.id, 1)
+        assert Availability.query.one().id == first_id  # No AUTOINCREMENT on availability
+
+        assert archive_past_availability() == 1
+        archived = AvailabilityArchive.query.filter_by(original_id=first_id).all()
+        assert len(archived) == 2
+        assert len({entry.id for entry in archived}) == 2
+
+    def test_respects_cutoff(self, app_context, test_user):
+        """Only entries dated before the cutoff are archived."""
+        insert_past_availability(test_user.id, 40)
+        insert_past_availability(test_user.id, 5)
+
+        assert archive_past_availability(date.today() - timedelta(days=30)) == 1
+        assert Availability.query.count() == 1
+        assert AvailabilityArchive.query.count() == 1
+
+
+class TestAvailabilityHistoryReads:
+    """Test cases for reading archived availability."""
+
+    def test_range_includes_history_when_asked(self, app_context, test_availability):
+        """Archived entries are only returned with include_history."""
+        past_date = insert_past_availability(test_availability.user_id, 2)
+        archive_past_availability()
+        start, end = past_date, test_availability.date
+
+        assert len(get_availability_in_range(start, end)) == 1
+
+        entries = get_availability_in_range(start, end, include_history=True)
+        assert [entry.is_archived for entry in entries] == [True, False]
+        assert entries[0].user.id == test_availability.user_id
+
+    def test_statistics_count_archive(self, app_context, test_availability):
+        """Archived entries still count towards the total."""
+        insert_past_availability(test_availability.user_id, 2)
+        archive_past_availability()
+
+        stats = count_content_statistics()
+        assert (stats['total_availability'], stats['future_availability']) == (2, 1)
+
+    def test_export_includes_archive(self, app_context, test_user):
+        """Exports list archived entries under their own id, flagged as archived."""
+        insert_past_availability(test_user.id, 2)
+        archive_past_availability()
+        insert_past_availability(test_user.id, 1)  # Reuses the archived entry's availability id
+
+        rows = list(iter_rows(availability_export_query(test_user.id)))
+        assert [row['archived'] for row in rows] == [0, 1]
+        assert rows[1]['id'] == AvailabilityArchive.query.one().id
+        assert rows[0]['username'] == rows[1]['username'] == test_user.username
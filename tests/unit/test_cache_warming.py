@@ -0,0 +1,117 @@
+"""
+Unit tests for background cache warming.
+"""
+
+import threading
+import time
+
+import pytest
+
+from app.db_queries import CacheManager, CacheWarmer, WARMUP_REGISTRY, cache_warmer
+
+
+@pytest.fixture
+def warming_enabled(app):
+    """Enable warm-ups with a delay long enough to inspect what is queued."""
+    app.config.update(CACHE_WARMUP_ENABLED=True, CACHE_WARMUP_DELAY=60)
+    yield
+    app.config.update(CACHE_WARMUP_ENABLED=False, CACHE_WARMUP_DELAY=1.0)
+    cache_warmer.stop()
+
+
+def _registry(calls):
+    def loader(name):
+        return lambda: calls.append(name)
+    return {
+        'days': (loader('days'), ('availability',)),
+        'comments': (loader('comments'), ('comments',)),
+        'stats': (loader('stats'), ('availability', 'comments')),
+    }
+
+
+class TestCacheWarmer:
+    """Test cases for CacheWarmer."""
+
+    def test_schedule_by_scope(self, app, warming_enabled):
+        """Test only queries depending on the changed scopes are queued."""
+        warmer = CacheWarmer(_registry([]))
+
+        assert warmer.schedule(['comments'], app=app) == 2
+        assert warmer.get_stats()['pending'] == ['comments', 'stats']
+        warmer.stop()
+
+    def test_disabled_by_config(self, app):
+        """Test nothing is queued unless CACHE_WARMUP_ENABLED is set."""
+        warmer = CacheWarmer(_registry([]))
+
+        assert warmer.schedule(app=app) == 0
+
+    def test_bursts_are_merged(self, app, warming_enabled):
+        """Test repeated invalidations run each query once after the delay."""
+        calls = []
+        warmer = CacheWarmer(_registry(calls))
+        app.config['CACHE_WARMUP_DELAY'] = 0.05
+
+        warmer.schedule(['availability'], app=app)
+        warmer.schedule(['availability', 'comments'], app=app)
+        deadline = time.time() + 2
+        while warmer.runs == 0 and time.time() < deadline:
+            time.sleep(0.01)
+
+        assert sorted(calls) == ['comments', 'days', 'stats']
+        assert warmer.runs == 1
+
+    def test_concurrency_limit(self, app):
+        """Test no more than CACHE_WARMUP_CONCURRENCY (2) queries run at once."""
+        running = []
+        peak = []
+        lock = threading.Lock()
+
+        def load():
+            with lock:
+                running.append(1)
+                peak.append(len(running))
+            time.sleep(0.02)
+            with lock:
+                running.pop()
+
+        warmer = CacheWarmer({f'query{index}': (load, ('availability',)) for index in range(6)})
+        warmer.warm(app)
+
+        assert max(peak) <= 2
+
+    def test_timings_and_errors(self, app):
+        """Test warm-up metrics record per-query times and failures."""
+        def fail():
+            raise RuntimeError('boom')
+
+        warmer = CacheWarmer({'ok': (lambda: None, ('users',)), 'broken': (fail, ('users',))})
+        results = warmer.warm(app)
+        stats = warmer.get_stats()
+
+        assert results['broken'] is None
+        assert results['ok'] >= 0
+        assert stats['errors'] == 1
+        assert list(stats['query_ms']) == ['ok']
+        assert stats['last_duration_ms'] is not None
+
+
+class TestWarmupRegistry:
+    """Test cases for the registered hot queries."""
+
+    def test_invalidation_queues_scope_queries(self, app_context, warming_enabled):
+        """Test invalidating comments queues the queries that read comments."""
+        CacheManager.invalidate_comment_cache(propagate=False)
+
+        assert cache_warmer.get_stats()['pending'] == ['content_stats', 'recent_comments']
+
+    def test_full_invalidation_queues_everything(self, app_context, warming_enabled):
+        """Test invalidating the whole cache queues every registered query."""
+        CacheManager.invalidate_all_cache()
+
+        assert cache_warmer.get_stats()['pending'] == sorted(WARMUP_REGISTRY)
+
+    def test_registered_queries_run(self, app_context):
+        """Test every registered loader runs against the database."""
+        for loader, _ in WARMUP_REGISTRY.values():
+            loader()
@@ -0,0 +1,161 @@
+"""
+Regression tests for the shared comment spam validation.
+
+The legacy_* functions are verbatim copies of the checks that the Comment
+model and CommentForm ran before the shared validator; the new code must
+accept and reject exactly the same inputs with the same messages.
+"""
+
+import random
+import re
+from types import SimpleNamespace
+
+import bleach
+import pytest
+from wtforms.validators import ValidationError
+
+from app.forms import CommentForm
+from app.models import Comment
+from app.utils import ValidationHelper
+
+
+def legacy_model_validate(content):
+    if not content or not content.strip():
+        raise ValueError("Comment content cannot be empty")
+    if len(content) > 1000:
+        raise ValueError("Comment must be between 1 and 1000 characters")
+    malicious_patterns = [
+        '<script', 'javascript:', '<img', 'onclick=', 'onload=', 'onerror='
+    ]
+    content_lower = content.lower()
+    for pattern in malicious_patterns:
+        if pattern in content_lower:
+            raise ValueError("Comment contains invalid content")
+    special_chars = sum(1 for c in content if not c.isalnum() and not c.isspace())
+    if special_chars > len(content) * 0.3:
+        raise ValueError("Comment contains too many special characters")
+    for i in range(len(content) - 12):
+        if content[i] == content[i+1] == content[i+2] == content[i+3] == content[i+4] == content[i+5] == content[i+6] == content[i+7] == content[i+8] == content[i+9] == content[i+10] == content[i+11] == content[i+12]:
+            raise ValueError("Comment contains invalid repeated characters")
+    return content.strip()
+
+
+LEGACY_XSS_PATTERNS = [
+    '<script', '</script>', 'javascript:', 'vbscript:',
+    'onload=', 'onerror=', 'onclick=', 'onmouseover=',
+    'onfocus=', 'onblur=', 'onchange=', 'onsubmit='
+]
+
+
+def legacy_form_validate(data):
+    raw = data.strip()
+    if any(p in raw.lower() for p in LEGACY_XSS_PATTERNS):
+        raise ValidationError("Comment contains invalid content")
+    data = bleach.clean(raw, tags=[], strip=True)
+    special_chars = sum(1 for c in data if not c.isalnum() and c not in " .,!?-_()[]{}:;\"'")
+    if special_chars > len(data) * 0.3:
+        raise ValidationError("Comment contains too many special characters")
+    if re.search(r"(.)\1{10,}", data):
+        raise ValidationError("Comment contains invalid repeated characters")
+    return data
+
+
+def outcome(func, *args):
+    """Return ('ok', result) or ('error', message) for a validator call."""
+    try:
+        return 'ok', func(*args)
+    except (ValueError, ValidationError) as e:
+        return 'error', str(e)
+
+
+def form_validate(data):
+    field = SimpleNamespace(data=data)
+    CommentForm.validate_content(None, field)
+    return field.data
+
+
+FIXED_CASES = [
+    "Anyone up for doubles on Saturday?",
+    "  padded comment with spaces  ",
+    "Line one\nLine two\n\n\nLine three",
+    "Check <SCRIPT>alert(1)</SCRIPT> this",
+    "<img src=x>",
+    "JavaScript:void(0)",
+    "hover ONMOUSEOVER=bad",
+    "vbscript:msgbox",
+    "!!!???...,,,",
+    "$$$ money $$$ money $$$",
+    "snake_case_words_everywhere_in_this_comment",
+    "a" * 10, "a" * 11, "a" * 12, "a" * 13, "a" * 14,
+    "x" + " " * 13 + "y",
+    "ok" + "\n" * 12 + "ok",
+    "é" * 13, "²³ numbers ٣٤٥",
+    "tab\tseparated\tvalues",
+    "5 < 6 & 7 > 3",
+    "a" * 1000,
+    ("a" * 12 + "b") * 76,
+    "w" * 1001,
+]
+
+ALPHABET = "abcXYZ019 _.,!?-()[]{}:;\"'<>=&$%#@\n\té²٣"
+TOKENS = ['<script', '</script>', 'javascript:', 'onclick=', '<img', 'onfocus=', 'vbscript:']
+
+
+def fuzz_cases(count=400, seed=1234):
+    rng = random.Random(seed)
+    cases = []
+    for _ in range(count):
+        parts = []
+        for _ in range(rng.randint(1, 12)):
+            choice = rng.random()
+            if choice < 0.1:
+                parts.append(rng.choice(TOKENS).upper() if rng.random() < 0.5 else rng.choice(TOKENS))
+            elif choice < 0.3:
+                parts.append(rng.choice(ALPHABET) * rng.randint(8, 15))
+            else:
+                parts.append(''.join(rng.choice(ALPHABET) for _ in range(rng.randint(1, 25))))
+        cases.append(''.join(parts))
+    return cases
+
+
+ALL_CASES = FIXED_CASES + fuzz_cases()
+
+
+class TestCommentModelValidation:
+    """The model validator keeps its previous accept/reject behaviour."""
+
+    @pytest.fixture(scope='class')
+    def comment(self):
+        return Comment(user_id=1, content='Regression baseline')
+
+    def test_matches_legacy_behaviour(self, comment):
+        for content in ALL_CASES:
+            assert outcome(comment.validate_content, 'content', content) == \
+                outcome(legacy_model_validate, content), repr(content)
+
+    def test_update_content_uses_validator(self, comment):
+        with pytest.raises(ValueError, match="repeated characters"):
+            comment.update_content("z" * 13)
+
+
+class TestCommentFormValidation:
+    """The form validator keeps its previous accept/reject behaviour."""
+
+    def test_matches_legacy_behaviour(self):
+        for content in ALL_CASES:
+            assert outcome(form_validate, content) == outcome(legacy_form_validate, content), repr(content)
+
+
+class TestValidationHelperComments:
+    """ValidationHelper applies the model's spam rules."""
+
+    def test_rejects_what_the_model_rejects(self):
+        is_valid, errors, _ = ValidationHelper.validate_comment_data("b" * 13)
+        assert is_valid is False
+        assert errors == ["Comment contains invalid repeated characters."]
+
+    def test_accepts_valid_comment(self):
+        is_valid, errors, sanitized = ValidationHelper.validate_comment_data("See you at court 3!")
+        assert is_valid is True
+        assert errors == []
+        assert sanitized == "See you at court 3!"
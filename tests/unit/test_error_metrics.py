@@ -0,0 +1,149 @@
+"""
+Unit tests for the per-minute error time series.
+"""
+
+from app.error_tracking import ErrorTimeSeries, ErrorMetrics, ErrorTracker
+
+
+class TestErrorTimeSeries:
+    """Test cases for ErrorTimeSeries."""
+
+    def test_window_aggregates_buckets(self):
+        """Window queries sum the buckets that fall inside the window."""
+        series = ErrorTimeSeries(retention_minutes=120)
+        series.record('NOT_FOUND', 'INFO', endpoint='a', minute=1000)
+        series.record('NOT_FOUND', 'INFO', endpoint='a', minute=1000)
+        series.record('DATABASE_ERROR', 'ERROR', user_id=7, minute=1030)
+
+        window = series.get_window(60, minute=1030)
+        assert window['total'] == 3
+        assert window['type'] == {'NOT_FOUND': 2, 'DATABASE_ERROR': 1}
+        assert window['endpoint'] == {'a': 2}
+        assert window['user'] == {7: 1}
+
+        assert series.get_window(10, minute=1030)['total'] == 1
+
+    def test_rolling_counts_expire(self):
+        """Rolling counters drop buckets as they leave the window."""
+        series = ErrorTimeSeries(retention_minutes=240, rolling_minutes=60)
+        series.record('INTERNAL_SERVER_ERROR', 'CRITICAL', minute=100)
+        series.record('NOT_FOUND', 'INFO', minute=130)
+
+        assert series.get_rolling_counts(minute=130)['total'] == 2
+        rolling = series.get_rolling_counts(minute=165)
+        assert rolling['total'] == 1
+        assert rolling['severity'] == {'INFO': 1}
+        assert series.get_rolling_counts(minute=500)['total'] == 0
+
+    def test_ring_overwrites_old_buckets(self):
+        """Buckets older than the retention period are reused."""
+        series = ErrorTimeSeries(retention_minutes=10)
+        series.record('NOT_FOUND', 'INFO', minute=5)
+        series.record('NOT_FOUND', 'INFO', minute=15)
+
+        assert series.get_window(10, minute=15)['total'] == 1
+
+    def test_persistence_round_trip(self, tmp_path):
+        """Flushed buckets are reloaded by a new instance."""
+        db_path = str(tmp_path / 'error_metrics.db')
+        minute = ErrorTimeSeries.current_minute()
+
+        series = ErrorTimeSeries(db_path=db_path)
+        series.record('DATABASE_ERROR', 'ERROR', endpoint='x', user_id=3, minute=minute - 5)
+        series.record('NOT_FOUND', 'INFO', minute=minute)
+        series.flush()
+
+        reloaded = ErrorTimeSeries(db_path=db_path)
+        window = reloaded.get_window(60, minute=minute)
+        assert window['total'] == 2
+        assert window['user'] == {3: 1}
+        assert reloaded.get_rolling_counts(minute=minute)['type'] == {
+            'DATABASE_ERROR': 1, 'NOT_FOUND': 1
+        }
+
+
+    def test_workers_share_persisted_counts(self, tmp_path):
+        """Flushes from several workers add up instead of overwriting each other."""
+        db_path = str(tmp_path / 'error_metrics.db')
+        minute = ErrorTimeSeries.current_minute()
+
+        first = ErrorTimeSeries(db_path=db_path)
+        second = ErrorTimeSeries(db_path=db_path)
+        first.record('NOT_FOUND', 'INFO', minute=minute)
+        first.record('NOT_FOUND', 'INFO', minute=minute)
+        second.record('NOT_FOUND', 'INFO', minute=minute)
+        second.record('DATABASE_ERROR', 'ERROR', minute=minute)
+        first.flush()
+        second.flush()
+        first.record('NOT_FOUND', 'INFO', minute=minute)
+        first.flush()
+        first.flush()  # Nothing new to add
+
+        window = ErrorTimeSeries(db_path=db_path).get_window(60, minute=minute)
+        assert window['total'] == 5
+        assert window['type'] == {'NOT_FOUND': 4, 'DATABASE_ERROR': 1}
+
+
+class TestErrorMetricsSummary:
+    """Test cases for ErrorMetrics summaries backed by the time series."""
+
+    def test_summary_shape(self):
+        """The summary keeps the keys used by the error dashboard."""
+        metrics = ErrorMetrics()
+        metrics.record_error('FORBIDDEN_ACCESS', 'denied', endpoint='admin.dashboard', severity='WARNING')
+        metrics.record_error('INTERNAL_SERVER_ERROR', 'boom', user_id=1, severity='CRITICAL')
+
+        summary = metrics.get_error_summary(hours=1)
+        assert summary['total_errors'] == 2
+        assert summary['severity_breakdown'] == {'WARNING': 1, 'CRITICAL': 1}
+        assert summary['top_endpoints'] == {'admin.dashboard': 1}
+        assert summary['top_users'] == {1: 1}
+        assert sum(hour['count'] for hour in summary['hourly_trend']) == 2
+        assert len(metrics.get_recent_errors()) == 2
+        assert metrics.get_rolling_counts()['total'] == 2
+
+
+class TestErrorAlerts:
+    """Test cases for incremental alert evaluation."""
+
+    def test_database_category_counter(self):
+        """Database-like error types are counted in the database category."""
+        metrics = ErrorMetrics()
+        metrics.record_error('DATABASE_ERROR', 'db down')
+        metrics.record_error('SQLAlchemyError', 'db down')
+        metrics.record_error('NOT_FOUND', 'missing', severity='INFO')
+
+        assert metrics.get_rolling_count('category', 'database') == 2
+        assert metrics.get_rolling_count() == 3
+
+    def test_track_error_does_not_evaluate_alerts(self, monkeypatch):
+        """Tracking an error only records it; thresholds are checked by the ticker."""
+        tracker = ErrorTracker()
+        calls = []
+        monkeypatch.setattr(tracker, '_check_alert_conditions', lambda: calls.append(1))
+
+        tracker.track_error(ValueError('boom'))
+        assert calls == []
+
+        tracker.check_alerts()
+        tracker.check_alerts()  # nothing new since the last check
+        assert calls == [1]
+
+    def test_alert_cooldown_suppresses_repeats(self, monkeypatch):
+        """The same alert type is sent once per cooldown window."""
+        tracker = ErrorTracker()
+        tracker.alert_thresholds['critical_errors_per_hour'] = 1
+        sent = []
+        monkeypatch.setattr(tracker.logger, 'critical', sent.append)
+
+        for _ in range(5):
+            tracker.metrics.record_error('INTERNAL_SERVER_ERROR', 'boom', severity='CRITICAL')
+            tracker.check_alerts()
+
+        assert len(sent) == 1
+        assert tracker._alert_state['CRITICAL_ERRORS']['suppressed'] == 3
+
+        tracker.alert_cooldown = 0
+        tracker.check_alerts(force=True)
+        assert len(sent) == 2
+        assert '3 repeat alerts suppressed' in sent[-1]
@@ -0,0 +1,171 @@
+"""
+Unit tests for the rendered-fragment cache.
+"""
+
+import time
+from datetime import date, timedelta
+
+import pytest
+
+from app import db
+from app import fragment_cache as fragment_cache_module
+from app.fragment_cache import CSRF_PLACEHOLDER, FragmentCache, fragment_cache
+
+
+@pytest.fixture
+def enabled_cache(app):
+    """Turn the fragment cache on (the testing config disables it)."""
+    fragment_cache.clear()
+    app.config['FRAGMENT_CACHE_TTL'] = 300
+    yield fragment_cache
+    app.config['FRAGMENT_CACHE_TTL'] = 0
+    fragment_cache.clear()
+
+
+class TestFragmentCache:
+    """Test cases for FragmentCache."""
+
+    def test_date_invalidation_is_per_date(self, app_context):
+        """Test invalidating one date leaves other dates' fragments cached."""
+        cache = FragmentCache()
+        today, tomorrow = date.today(), date.today() + timedelta(days=1)
+        cache.put(cache.make_key(('card', today)), 'today')
+        cache.put(cache.make_key(('card', tomorrow)), 'tomorrow')
+
+        cache.invalidate_dates([today])
+
+        assert cache.get(cache.make_key(('card', today))) is None
+        assert cache.get(cache.make_key(('card', tomorrow))) == 'tomorrow'
+
+    def test_clear_drops_everything(self, app_context):
+        """Test clear invalidates keys computed before it."""
+        cache = FragmentCache()
+        key = cache.make_key(('card', date.today()))
+        cache.put(key, 'html')
+
+        cache.clear()
+
+        assert cache.get(cache.make_key(('card', date.today()))) is None
+        assert cache.get_stats()['size'] == 0
+
+    def test_size_is_bounded(self):
+        """Test the least recently used fragments are evicted beyond max_entries."""
+        cache = FragmentCache(max_entries=2)
+        for name in ('a', 'b', 'c'):
+            cache.put((name,), name)
+
+        assert cache.get(('a',)) is None
+        assert cache.get(('c',)) == 'c'
+
+    def test_entries_expire(self):
+        """Test entries are dropped after the TTL."""
+        cache = FragmentCache(ttl_seconds=0.05)
+        cache.put(('a',), 'html')
+        time.sleep(0.1)
+        assert cache.get(('a',)) is None
+
+
+class TestCacheTag:
+    """Test cases for the {% cache %} template block."""
+
+    TEMPLATE = "{% cache 'part', day %}{{ render() }}{% endcache %}"
+
+    def _render(self, app, day, calls, csrf_token='token-1'):
+        def render():
+            calls.append(day)
+            return f'<input value="{csrf_token}"> {day} <b>'
+
+        template = app.jinja_env.from_string(self.TEMPLATE)
+        return template.render(day=day, render=render)
+
+    def test_block_is_cached(self, app, enabled_cache, monkeypatch):
+        """Test a cache block renders its body once per key."""
+        monkeypatch.setattr(fragment_cache_module, '_current_csrf_token', lambda: 'token-1')
+        calls = []
+        with app.test_request_context():
+            first = self._render(app, date.today(), calls)
+            second = self._render(app, date.today(), calls)
+
+        assert first == second
+        assert '&lt;b&gt;' in first and '&amp;' not in first
+        assert calls == [date.today()]
+
+    def test_csrf_token_is_per_viewer(self, app, enabled_cache, monkeypatch):
+        """Test cached fragments carry the current viewer's CSRF token."""
+        calls = []
+        with app.test_request_context():
+            monkeypatch.setattr(fragment_cache_module, '_current_csrf_token', lambda: 'token-1')
+            self._render(app, date.today(), calls, csrf_token='token-1')
+            monkeypatch.setattr(fragment_cache_module, '_current_csrf_token', lambda: 'token-2')
+            html = self._render(app, date.today(), calls)
+
+        assert 'token-2' in html and 'token-1' not in html
+        assert CSRF_PLACEHOLDER not in html
+        assert len(calls) == 1
+
+    def test_disabled_by_config(self, app):
+        """Test a zero FRAGMENT_CACHE_TTL renders the body every time."""
+        calls = []
+        with app.test_request_context():
+            self._render(app, date.today(), calls)
+            self._render(app, date.today(), calls)
+
+        assert len(calls) == 2
+
+
+class TestDashboardCards:
+    """Test cases for cached dashboard date cards."""
+
+    def _custom_range(self, client, days):
+        start = date.today() + timedelta(days=1)
+        end = start + timedelta(days=days - 1)
+        return client.get(f'/?view=custom&start_date={start}&end_date={end}')
+
+    def test_cards_reused_between_views(self, authenticated_user, test_user, test_factory, enabled_cache):
+        """Test a second dashboard view serves date cards from the cache."""
+        test_factory.create_availability(test_user, date_offset=1)
+        test_factory.create_availability(test_user, date_offset=2)
+
+        self._custom_range(authenticated_user, 2)
+        response = self._custom_range(authenticated_user, 2)
+
+        assert response.status_code == 200
+        assert enabled_cache.get_stats()['hits'] == 2
+
+    def test_write_invalidates_only_its_date(self, authenticated_user, test_user, test_factory,
+                                             enabled_cache):
+        """Test adding availability re-renders only the affected date's card."""
+        test_factory.create_availability(test_user, date_offset=1)
+        test_factory.create_availability(test_user, date_offset=2, start_hour=8, end_hour=9)
+        self._custom_range(authenticated_user, 2)
+
+        test_factory.create_availability(test_user, date_offset=2, start_hour=18, end_hour=20)
+        response = self._custom_range(authenticated_user, 2)
+
+        stats = enabled_cache.get_stats()
+        assert (stats['hits'], stats['misses']) == (1, 3)
+        assert b'06:00 PM' in response.data
+
+    def test_moved_entry_invalidates_old_date(self, authenticated_user, test_user, test_factory,
+                                              enabled_cache):
+        """Test moving an entry to another date drops the card of its old date."""
+        entry = test_factory.create_availability(test_user, date_offset=1, start_hour=18, end_hour=20)
+        self._custom_range(authenticated_user, 1)
+
+        entry.date = date.today() + timedelta(days=3)
+        db.session.commit()
+        response = self._custom_range(authenticated_user, 1)
+
+        assert b'06:00 PM' not in response.data
+
+    def test_user_change_invalidates_all_cards(self, authenticated_user, test_user, test_factory,
+                                               enabled_cache):
+        """Test renaming a user re-renders cards showing their name."""
+        test_factory.create_availability(test_user, date_offset=1)
+        self._custom_range(authenticated_user, 1)
+
+        test_user.username = 'renamedplayer'
+        db.session.commit()
+        response = self._custom_range(authenticated_user, 1)
+
+        assert b'renamedplayer' in response.data
@@ -0,0 +1,132 @@
+"""
+Unit tests for the /livez and /readyz probes and the health sampler.
+"""
+
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import event
+
+from app import db
+from app.health_probes import HealthSampler, health_sampler
+from app.scheduler import MaintenanceScheduler, register_default_jobs
+from app.security import rate_limiter
+
+
+@pytest.fixture
+def fresh_sampler():
+    """Start each test without a sample."""
+    health_sampler.sample = health_sampler.sampled_at = None
+    yield health_sampler
+    health_sampler.sample = health_sampler.sampled_at = None
+
+
+class TestHealthSampler:
+    """Test cases for HealthSampler."""
+
+    def test_sample_contents(self, app_context):
+        """Test a sample covers the database ping, pool and process."""
+        sample = HealthSampler().take_sample()
+
+        assert sample['database']['ok'] is True
+        assert sample['database']['latency_ms'] >= 0
+        assert 'class' in sample['pool']
+        assert {'rss_mb', 'cpu_percent', 'system_cpu_percent'} <= set(sample['process'])
+
+    def test_fresh_sample_reused(self, app_context):
+        """Test a fresh sample is served without touching the database."""
+        sampler = HealthSampler(max_age=60)
+        sampler.take_sample()
+        statements = []
+
+        def record(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        event.listen(db.engine, 'before_cursor_execute', record)
+        try:
+            sample, age = sampler.current()
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', record)
+
+        assert sample is sampler.sample
+        assert statements == []
+        assert sampler.samples == 1
+
+    def test_stale_sample_refreshed(self, app_context):
+        """Test a probe takes a new sample once the latest is too old."""
+        sampler = HealthSampler(max_age=60)
+        sampler.take_sample()
+        sampler.sampled_at -= 120
+
+        sampler.current()
+
+        assert sampler.samples == 2
+        assert sampler.age() < 60
+
+    def test_database_failure_not_ready(self, app_context):
+        """Test a failed database ping makes the worker not ready."""
+        sampler = HealthSampler()
+        sampler.take_sample()
+        sampler.sample['database']['ok'] = False
+
+        ready, age = sampler.readiness()
+
+        assert ready is False
+        assert age < 60
+
+    def test_scheduler_job_registered(self, app):
+        """Test the maintenance scheduler refreshes the sample."""
+        scheduler = MaintenanceScheduler()
+        register_default_jobs(scheduler, app)
+
+        assert scheduler.jobs['health_sample'].interval == app.config['HEALTH_SAMPLE_INTERVAL']
+
+
+class TestProbeEndpoints:
+    """Test cases for /livez and /readyz."""
+
+    def test_livez(self, client):
+        """Test the liveness probe answers without authentication."""
+        response = client.get('/livez')
+
+        assert response.status_code == 200
+        assert response.get_json()['status'] == 'alive'
+
+    def test_readyz(self, client, fresh_sampler):
+        """Test the readiness probe reports the sampled checks."""
+        response = client.get('/readyz')
+        data = response.get_json()
+
+        assert response.status_code == 200
+        assert data['status'] == 'ready'
+        assert set(data) == {'status', 'age_seconds'}  # Sample details are admin only
+
+    def test_sample_in_detailed_health(self, authenticated_admin, fresh_sampler):
+        """Test admins see the sample behind the readiness probe."""
+        data = authenticated_admin.get('/health/detailed').get_json()
+
+        assert data['readiness']['ready'] is True
+        assert data['readiness']['checks']['database']['ok'] is True
+
+    def test_probes_exempt_from_rate_limit(self, client, fresh_sampler):
+        """Test frequent probes are never rate limited and use none of the IP's budget."""
+        headers = {'User-Agent': 'kube-probe/1.29'}
+        rate_limiter.blocked_ips['127.0.0.1'] = datetime.utcnow() + timedelta(hours=1)
+        try:
+            statuses = {client.get('/livez', headers=headers).status_code for _ in range(260)}
+            statuses.add(client.get('/readyz', headers=headers).status_code)
+        finally:
+            rate_limiter.blocked_ips.clear()
+
+        assert statuses == {200}
+        assert rate_limiter.requests.get('127.0.0.1', []) == []
+
+    def test_readyz_unavailable(self, client, fresh_sampler, app_context):
+        """Test the readiness probe answers 503 when the database is down."""
+        fresh_sampler.take_sample()
+        fresh_sampler.sample['database'].update(ok=False, error='down')
+
+        response = client.get('/readyz')
+
+        assert response.status_code == 503
+        assert response.get_json()['status'] == 'not_ready'
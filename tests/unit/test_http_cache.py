@@ -0,0 +1,183 @@
+"""
+Unit tests for conditional GET and static asset fingerprinting.
+"""
+
+import pytest
+
+from app.http_cache import DataVersions, StaticFingerprinter, data_versions
+
+
+class TestDataVersions:
+    """Test cases for DataVersions."""
+
+    def test_memory_bump_changes_token(self):
+        """Test bumping a scope changes only that scope's version."""
+        versions = DataVersions()
+        comments, users = versions.get('comments'), versions.get('users')
+
+        versions.bump('comments')
+
+        assert versions.get('comments') != comments
+        assert versions.get('users') == users
+
+    def test_bump_without_scopes_bumps_all(self):
+        """Test a bare bump changes every scope."""
+        versions = DataVersions()
+        before = versions.token('availability', 'comments', 'users', 'admin')
+        versions.bump()
+        after = versions.token('availability', 'comments', 'users', 'admin')
+
+        assert all(a != b for a, b in zip(before.split('.'), after.split('.')))
+
+    def test_file_versions_shared_between_instances(self, tmp_path):
+        """Test a bump in one process-like instance is seen by another."""
+        writer = DataVersions(str(tmp_path))
+        reader = DataVersions(str(tmp_path))
+        changed = []
+        reader.on_external_change = changed.append
+        before = reader.token('comments')
+
+        writer.bump('comments')
+
+        assert reader.token('comments') != before
+        assert changed == ['comments']
+
+    def test_own_bump_is_not_external(self, tmp_path):
+        """Test an instance does not report its own bumps as external changes."""
+        versions = DataVersions(str(tmp_path))
+        changed = []
+        versions.on_external_change = changed.append
+
+        versions.bump('availability')
+        versions.token('availability')
+
+        assert changed == []
+
+
+class TestConditionalGet:
+    """Test cases for conditional page views."""
+
+    def test_etag_and_cache_headers(self, authenticated_user):
+        """Test conditional pages carry a weak ETag and must be revalidated."""
+        response = authenticated_user.get('/comments')
+
+        assert response.status_code == 200
+        assert response.headers['ETag'].startswith('W/')
+        assert response.headers['Cache-Control'] == 'private, no-cache'
+
+    def test_matching_etag_returns_304(self, authenticated_user, monkeypatch):
+        """Test a matching If-None-Match is answered without running the query."""
+        etag = authenticated_user.get('/comments').headers['ETag']
+
+        from app.db_queries import OptimizedQueries
+        monkeypatch.setattr(OptimizedQueries, 'get_recent_comments',
+                            lambda *args, **kwargs: pytest.fail('query ran'))
+        response = authenticated_user.get('/comments', headers={'If-None-Match': etag})
+
+        assert response.status_code == 304
+        assert response.headers['ETag'] == etag
+
+    def test_write_changes_etag(self, authenticated_user, test_user, test_factory):
+        """Test committing a comment invalidates the comments page ETag."""
+        etag = authenticated_user.get('/comments').headers['ETag']
+
+        test_factory.create_comment(test_user, content='A fresh comment')
+        response = authenticated_user.get('/comments', headers={'If-None-Match': etag})
+
+        assert response.status_code == 200
+        assert response.headers['ETag'] != etag
+        assert b'A fresh comment' in response.data
+
+    def test_etag_differs_per_view_params(self, authenticated_user):
+        """Test different filters produce different ETags."""
+        today = authenticated_user.get('/').headers['ETag']
+        filtered = authenticated_user.get('/?date=2030-01-01').headers['ETag']
+
+        assert today != filtered
+
+    def test_pending_flash_is_not_cached(self, authenticated_user):
+        """Test pages rendering flash messages get no ETag."""
+        with authenticated_user.session_transaction() as sess:
+            sess['_flashes'] = [('info', 'Saved')]
+
+        response = authenticated_user.get('/comments')
+
+        assert response.status_code == 200
+        assert 'ETag' not in response.headers
+
+    def test_disabled_by_config(self, app, authenticated_user):
+        """Test HTTP_CONDITIONAL_GET turns conditional responses off."""
+        app.config['HTTP_CONDITIONAL_GET'] = False
+        try:
+            response = authenticated_user.get('/comments')
+        finally:
+            app.config['HTTP_CONDITIONAL_GET'] = True
+
+        assert 'ETag' not in response.headers
+
+    def test_comment_edit_bumps_version(self, app_context, test_user, test_factory):
+        """Test the commit hook bumps versions for writes outside CacheManager."""
+        from app import db
+        comment = test_factory.create_comment(test_user)
+        before = data_versions.get('comments')
+
+        comment.content = 'Edited'
+        db.session.commit()
+
+        assert data_versions.get('comments') != before
+
+    def test_bulk_delete_bumps_version(self, app_context, test_user, test_factory):
+        """Test bulk query deletes, which skip the flush, also bump versions."""
+        from app import db
+        from app.models import Availability
+        test_factory.create_availability(test_user)
+        before = data_versions.get('availability')
+
+        Availability.query.filter_by(user_id=test_user.id).delete()
+        db.session.commit()
+
+        assert data_versions.get('availability') != before
+
+
+class TestStaticFingerprinting:
+    """Test cases for fingerprinted static assets."""
+
+    def test_fingerprint_and_resolve(self, tmp_path):
+        """Test fingerprinted names resolve back to the current file."""
+        (tmp_path / 'app.css').write_text('body {}')
+        fingerprinter = StaticFingerprinter(str(tmp_path))
+
+        name = fingerprinter.fingerprint('app.css')
+
+        assert name != 'app.css' and name.endswith('.css')
+        assert fingerprinter.resolve(name) == ('app.css', True)
+        assert fingerprinter.resolve('app.000000000000.css') == ('app.css', False)
+        assert fingerprinter.fingerprint('missing.css') == 'missing.css'
+
+    def test_static_url_is_fingerprinted(self, app):
+        """Test url_for('static') emits a fingerprinted filename."""
+        from flask import url_for
+        with app.test_request_context():
+            url = url_for('static', filename='css/main.css')
+
+        assert url != '/static/css/main.css'
+        assert url.startswith('/static/css/main.') and url.endswith('.css')
+
+    def test_fingerprinted_asset_is_immutable(self, app, client):
+        """Test fingerprinted assets are served with far-future cache headers."""
+        from flask import url_for
+        with app.test_request_context():
+            url = url_for('static', filename='css/main.css')
+
+        response = client.get(url)
+
+        assert response.status_code == 200
+        assert 'immutable' in response.headers['Cache-Control']
+        assert 'max-age=31536000' in response.headers['Cache-Control']
+
+    def test_plain_asset_still_served(self, client):
+        """Test unfingerprinted paths keep working with default headers."""
+        response = client.get('/static/css/main.css')
+
+        assert response.status_code == 200
+        assert 'immutable' not in response.headers.get('Cache-Control', '')
@@ -0,0 +1,130 @@
+"""
+Unit tests for the cached Flask-Login user identity.
+"""
+
+import time
+
+import pytest
+
+from app import db
+from app.identity import IdentityCache, UserIdentity, identity_cache, load_identity
+from app.models import User
+
+
+@pytest.fixture
+def enabled_cache(app):
+    """Turn the identity cache on (the testing config disables it)."""
+    identity_cache.clear()
+    app.config['USER_IDENTITY_CACHE_TTL'] = 30
+    yield identity_cache
+    app.config['USER_IDENTITY_CACHE_TTL'] = 0
+    identity_cache.clear()
+
+
+class TestUserIdentity:
+    """Test cases for UserIdentity."""
+
+    def test_from_user(self, app_context, test_admin):
+        """Test the snapshot carries the Flask-Login interface."""
+        identity = UserIdentity.from_user(test_admin)
+
+        assert identity.id == test_admin.id
+        assert identity.username == test_admin.username
+        assert identity.get_id() == str(test_admin.id)
+        assert identity.is_admin() is True
+        assert identity.is_authenticated is True
+        assert identity.is_anonymous is False
+        assert identity.is_active is True
+
+    def test_immutable(self):
+        """Test snapshots cannot be modified."""
+        identity = UserIdentity(1, 'player', 'User', True)
+        with pytest.raises(AttributeError):
+            identity.role = 'Admin'
+
+
+class TestIdentityCache:
+    """Test cases for IdentityCache."""
+
+    def test_put_get_invalidate(self):
+        """Test cached identities are returned until invalidated."""
+        cache = IdentityCache(ttl_seconds=30)
+        identity = UserIdentity(1, 'player', 'User', True)
+        cache.put(identity)
+
+        assert cache.get(1) == identity
+        cache.invalidate(1)
+        assert cache.get(1) is None
+
+    def test_entries_expire(self):
+        """Test entries are dropped after the TTL."""
+        cache = IdentityCache(ttl_seconds=0.05)
+        cache.put(UserIdentity(1, 'player', 'User', True))
+        time.sleep(0.1)
+        assert cache.get(1) is None
+        assert cache.get_stats()['size'] == 0
+
+    def test_disabled_with_zero_ttl(self):
+        """Test a zero TTL disables caching."""
+        cache = IdentityCache(ttl_seconds=0)
+        cache.put(UserIdentity(1, 'player', 'User', True))
+        assert cache.get(1) is None
+
+    def test_disabled_by_app_config(self, app_context, test_user):
+        """Test the testing config's zero TTL bypasses the cache."""
+        identity_cache.clear()
+        load_identity(test_user.id)
+        assert identity_cache.get_stats()['size'] == 0
+
+
+class TestLoadIdentity:
+    """Test cases for the user loader and its invalidation."""
+
+    def test_load_identity_uses_cache(self, app_context, test_user, enabled_cache):
+        """Test a second load is served from the cache."""
+        first = load_identity(str(test_user.id))
+        second = load_identity(str(test_user.id))
+
+        assert first == second == UserIdentity.from_user(test_user)
+        assert enabled_cache.get_stats()['hits'] == 1
+
+    def test_load_identity_missing_user(self, app_context, enabled_cache):
+        """Test unknown or malformed IDs load no identity."""
+        assert load_identity('999999') is None
+        assert load_identity('not-a-number') is None
+
+    def test_role_change_invalidates(self, app_context, test_user, enabled_cache):
+        """Test changing a user's role evicts the cached identity."""
+        load_identity(test_user.id)
+        test_user.role = 'Admin'
+        db.session.commit()
+
+        assert enabled_cache.get(test_user.id) is None
+        assert load_identity(test_user.id).is_admin() is True
+
+    def test_toggle_user_status_invalidates(self, authenticated_admin, test_user, enabled_cache):
+        """Test blocking a user evicts their cached identity."""
+        load_identity(test_user.id)
+
+        response = authenticated_admin.post(f'/admin/users/{test_user.id}/toggle')
+
+        assert response.status_code == 302
+        assert enabled_cache.get(test_user.id) is None
+        assert load_identity(test_user.id).is_active is False
+
+    def test_delete_user_invalidates(self, authenticated_admin, test_user, enabled_cache):
+        """Test deleting a user evicts their cached identity."""
+        user_id = test_user.id
+        load_identity(user_id)
+
+        response = authenticated_admin.post(f'/admin/users/{user_id}/delete')
+
+        assert response.status_code == 302
+        assert db.session.get(User, user_id) is None
+        assert load_identity(user_id) is None
+
+    def test_page_view_caches_identity(self, authenticated_user, test_user, enabled_cache):
+        """Test an authenticated page view stores the user's identity snapshot."""
+        assert authenticated_user.get('/').status_code == 200
+
+        assert enabled_cache.get(test_user.id) == UserIdentity.from_user(test_user)
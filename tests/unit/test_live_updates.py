@@ -0,0 +1,142 @@
+"""
+Unit tests for live availability updates (broker, shared event log, SSE stream).
+"""
+
+import threading
+import time
+from datetime import date, timedelta
+
+import pytest
+
+from app.live_updates import AvailabilityBroker, EventLog, availability_broker
+
+
+@pytest.fixture
+def short_streams(app):
+    """Make SSE streams end quickly so the test client can read them whole."""
+    app.config.update(SSE_KEEPALIVE_SECONDS=0.05, SSE_MAX_STREAM_SECONDS=0.3)
+    yield
+    app.config.update(SSE_KEEPALIVE_SECONDS=25, SSE_MAX_STREAM_SECONDS=300)
+
+
+TOMORROW = date.today() + timedelta(days=1)
+NEXT_WEEK = date.today() + timedelta(days=7)
+
+
+class TestAvailabilityBroker:
+    """Test cases for AvailabilityBroker."""
+
+    def test_publish_reaches_watchers_of_changed_dates(self):
+        """Test only subscribers watching a changed date are notified."""
+        broker = AvailabilityBroker()
+        watching = broker.subscribe([TOMORROW])
+        elsewhere = broker.subscribe([NEXT_WEEK])
+
+        broker.publish([TOMORROW])
+
+        assert watching.get(timeout=0) == {'dates': [TOMORROW.isoformat()]}
+        assert elsewhere.get(timeout=0) is None
+
+    def test_unknown_dates_reach_everyone(self):
+        """Test a change with unknown dates notifies every subscriber."""
+        broker = AvailabilityBroker()
+        subscription = broker.subscribe([NEXT_WEEK])
+
+        broker.publish(None)
+
+        assert subscription.get(timeout=0) == {'dates': None}
+
+    def test_subscriber_limit(self):
+        """Test subscriptions are refused beyond max_subscribers."""
+        broker = AvailabilityBroker(max_subscribers=1)
+        first = broker.subscribe([TOMORROW])
+
+        assert broker.subscribe([TOMORROW]) is None
+        broker.unsubscribe(first)
+        assert broker.subscribe([TOMORROW]) is not None
+
+    def test_changes_from_other_workers(self, tmp_path):
+        """Test the poller forwards changes logged by another process."""
+        broker = AvailabilityBroker(poll_interval=0.02)
+        broker.configure(str(tmp_path / 'events.db'), poll_interval=0.02)
+        subscription = broker.subscribe([TOMORROW])
+        time.sleep(0.05)
+
+        # Same as EventLog.append from a different process ID
+        broker.event_log._execute(
+            'INSERT INTO availability_events (pid, dates, created_at) VALUES (?, ?, ?)',
+            (-1, TOMORROW.isoformat(), time.time())
+        )
+
+        assert subscription.get(timeout=2) == {'dates': [TOMORROW.isoformat()]}
+        broker.unsubscribe(subscription)
+
+    def test_own_changes_not_read_back(self, tmp_path):
+        """Test a worker skips its own log entries, which it already dispatched."""
+        log = EventLog(str(tmp_path / 'events.db'))
+        log.append(frozenset([TOMORROW]))
+
+        assert log.read_since(0) == (1, [])
+
+
+class TestCommitPublishing:
+    """Test cases for publishing committed availability writes."""
+
+    def test_availability_write_published(self, app_context, test_user, test_factory):
+        """Test creating availability announces its date."""
+        subscription = availability_broker.subscribe([TOMORROW])
+        try:
+            test_factory.create_availability(test_user, date_offset=1)
+            assert subscription.get(timeout=0) == {'dates': [TOMORROW.isoformat()]}
+        finally:
+            availability_broker.unsubscribe(subscription)
+
+
+class TestEventStream:
+    """Test cases for /api/v1/availability/events."""
+
+    def _url(self, start=TOMORROW, end=TOMORROW):
+        return f'/api/v1/availability/events?from={start}&to={end}'
+
+    def test_requires_login(self, client):
+        """Test anonymous clients cannot open a stream."""
+        assert client.get(self._url()).status_code == 401
+
+    def test_invalid_range(self, authenticated_user):
+        """Test invalid ranges are rejected before subscribing."""
+        assert authenticated_user.get(self._url(NEXT_WEEK, TOMORROW)).status_code == 400
+
+    def test_stream_delivers_changes(self, authenticated_user, short_streams):
+        """Test the stream sends keep-alives and changes for watched dates."""
+        timer = threading.Timer(0.1, availability_broker.publish, [[TOMORROW]])
+        timer.start()
+        try:
+            response = authenticated_user.get(self._url())
+            body = response.get_data(as_text=True)
+        finally:
+            timer.cancel()
+
+        assert response.mimetype == 'text/event-stream'
+        assert body.startswith('retry: 5000')
+        assert ': keepalive' in body
+        assert f'event: availability\ndata: {{"dates":["{TOMORROW.isoformat()}"]}}' in body
+        assert availability_broker.get_stats()['subscribers'] == 0
+
+    def test_full_broker_returns_503(self, authenticated_user):
+        """Test new streams are refused when the worker is at its limit."""
+        limit = availability_broker.max_subscribers
+        availability_broker.max_subscribers = 0
+        try:
+            response = authenticated_user.get(self._url())
+        finally:
+            availability_broker.max_subscribers = limit
+
+        assert response.status_code == 503
+        assert response.headers['Retry-After'] == '30'
+
+    def test_dashboard_links_stream(self, authenticated_user):
+        """Test the dashboard points its live update prompt at the stream."""
+        response = authenticated_user.get('/')
+
+        assert b'data-live-updates="/api/v1/availability/events?' in response.data
+        assert b'js/live_updates.' in response.data
@@ -0,0 +1,57 @@
+"""
+Unit tests for the load-testing harness helpers.
+"""
+
+from load_test import compare_with_baseline, percentile, summarize
+
+
+def make_report(p50=10.0, p99=20.0, throughput=100.0, sql=2.0, errors=0):
+    return {'results': {'test_client': {'dashboard_today': {
+        'p50_ms': p50, 'p99_ms': p99, 'throughput_rps': throughput,
+        'sql_per_request': sql, 'errors': errors
+    }}}}
+
+
+class TestLoadTestMeasurement:
+    """Test cases for latency summaries."""
+
+    def test_percentile_nearest_rank(self):
+        """Percentiles pick the nearest-rank sample."""
+        values = list(range(1, 101))
+        assert percentile(values, 50) == 50
+        assert percentile(values, 99) == 99
+        assert percentile([], 50) == 0.0
+
+    def test_summarize(self):
+        """Summaries count statuses, errors and SQL per request."""
+        result = summarize([0.01, 0.02, 0.03, 0.04], [200, 200, 429, 500], elapsed=2.0, sql_statements=8)
+
+        assert result['requests'] == 4
+        assert result['throughput_rps'] == 2.0
+        assert result['errors'] == 1
+        assert result['rate_limited'] == 1
+        assert result['status_counts'] == {'200': 2, '429': 1, '500': 1}
+        assert result['sql_per_request'] == 2.0
+        assert result['p50_ms'] == 20.0
+
+
+class TestBaselineComparison:
+    """Test cases for regression detection against a baseline."""
+
+    def test_within_tolerance(self):
+        """Small fluctuations are not reported."""
+        baseline = make_report()
+        assert compare_with_baseline(make_report(p50=11.0, throughput=90.0), baseline) == []
+
+    def test_regressions_reported(self):
+        """Slower latency, lower throughput, extra SQL and new errors are regressions."""
+        baseline = make_report()
+        report = make_report(p50=15.0, p99=40.0, throughput=50.0, sql=3.0, errors=2)
+
+        regressions = compare_with_baseline(report, baseline)
+        assert len(regressions) == 5
+        assert any('sql_per_request' in regression for regression in regressions)
+
+    def test_missing_scenarios_skipped(self):
+        """Scenarios absent from the baseline are ignored."""
+        assert compare_with_baseline(make_report(p50=99.0), {'results': {}}) == []
@@ -0,0 +1,182 @@
+"""
+Unit tests for the login pipeline: unknown-username cache, combined rate-limit
+check and stage timings.
+"""
+
+import time
+
+import pytest
+
+from app.login_guard import LoginTimings, UnknownUsernameCache, login_timings, unknown_usernames
+from app.passwords import password_hasher
+from app.security import RateLimiter, rate_limiter, sanitize_login_credentials
+
+
+@pytest.fixture(autouse=True)
+def reset_login_state():
+    """Start every test with empty cache and timing state (conftest resets the rate limiter)."""
+    unknown_usernames.clear()
+    login_timings.reset()
+    yield
+
+
+class TestUnknownUsernameCache:
+    """Test cases for UnknownUsernameCache."""
+
+    def test_add_and_contains(self):
+        """Test cached usernames are reported until discarded."""
+        cache = UnknownUsernameCache(ttl_seconds=60)
+        assert cache.contains('ghost') is False
+
+        cache.add('ghost')
+        assert cache.contains('ghost') is True
+
+        cache.discard('ghost')
+        assert cache.contains('ghost') is False
+        assert cache.get_stats()['hits'] == 1
+
+    def test_entries_expire(self):
+        """Test entries stop matching after the TTL."""
+        cache = UnknownUsernameCache(ttl_seconds=0.05)
+        cache.add('ghost')
+        time.sleep(0.1)
+        assert cache.contains('ghost') is False
+        assert cache.get_stats()['size'] == 0
+
+    def test_size_is_bounded(self):
+        """Test the oldest entries are evicted beyond max_size."""
+        cache = UnknownUsernameCache(ttl_seconds=60, max_size=3)
+        for name in ('a1', 'a2', 'a3', 'a4'):
+            cache.add(name)
+
+        assert cache.contains('a1') is False
+        assert cache.contains('a4') is True
+        assert cache.get_stats()['size'] == 3
+
+    def test_disabled_with_zero_ttl(self):
+        """Test a zero TTL disables caching."""
+        cache = UnknownUsernameCache(ttl_seconds=0)
+        cache.add('ghost')
+        assert cache.contains('ghost') is False
+
+    def test_user_creation_clears_entry(self, app_context, test_factory):
+        """Test creating an account removes its username from the cache."""
+        unknown_usernames.add('newplayer')
+        test_factory.create_user(username='newplayer')
+        assert unknown_usernames.contains('newplayer') is False
+
+
+class TestLoginTimings:
+    """Test cases for LoginTimings."""
+
+    def test_trace_records_stages_and_outcome(self):
+        """Test a finished trace adds its stages, total and outcome."""
+        timings = LoginTimings()
+        trace = timings.start()
+        trace.mark('rate_limit')
+        trace.mark('verify')
+        trace.finish('bad_password')
+
+        stats = timings.get_stats()
+        assert set(stats['stages']) == {'rate_limit', 'verify', 'total'}
+        assert stats['stages']['total']['count'] == 1
+        assert stats['outcomes'] == {'bad_password': 1}
+
+    def test_unfinished_outcome_counts_as_error(self):
+        """Test a trace finished without an outcome is counted as an error."""
+        timings = LoginTimings()
+        timings.start().finish()
+        assert timings.get_stats()['outcomes'] == {'error': 1}
+
+
+class TestLoginChecks:
+    """Test cases for the combined rate-limit check and credential validation."""
+
+    def test_check_login_allowed(self):
+        """Test the combined check reports IP, username and lock limits in order."""
+        limiter = RateLimiter()
+        assert limiter.check_login_allowed('1.2.3.4', 'player') is None
+
+        for _ in range(3):
+            limiter.record_login_result('1.2.3.4', 'player', success=False)
+        assert limiter.check_login_allowed('1.2.3.4', 'player') == 'ip'
+
+        for _ in range(2):
+            limiter.record_login_result('5.6.7.8', 'player', success=False)
+        assert limiter.check_login_allowed('9.9.9.9', 'player') == 'username'
+
+        limiter.lock_account('other')
+        assert limiter.check_login_allowed('9.9.9.9', 'other') == 'locked'
+
+    def test_successful_result_clears_attempts(self):
+        """Test a successful login clears both IP and username attempts."""
+        limiter = RateLimiter()
+        limiter.record_login_result('1.2.3.4', 'player', success=False)
+        limiter.record_login_result('1.2.3.4', 'player', success=True)
+        assert limiter.login_attempts == {}
+
+    def test_sanitize_login_credentials(self, app):
+        """Test credential validation results."""
+        with app.test_request_context():
+            assert sanitize_login_credentials('player', 'password123') == ('password123', None)
+            assert sanitize_login_credentials('xp_cmdshell', 'password123') == (None, 'username')
+            assert sanitize_login_credentials('player', 'pass--word1') == (None, 'malicious')
+
+
+class TestLoginPipeline:
+    """Test cases for the login view pipeline."""
+
+    def _login(self, client, username, password='password123'):
+        return client.post('/auth/login', data={'username': username, 'password': password})
+
+    def test_unknown_username_cached_and_dummy_hashed(self, client, monkeypatch):
+        """Test unknown usernames are cached and still pay for a hash."""
+        calls = []
+        original = password_hasher.verify_dummy
+        monkeypatch.setattr(password_hasher, 'verify_dummy',
+                            lambda password: calls.append(password) or original(password))
+
+        response = self._login(client, 'nosuchuser')
+
+        assert response.status_code == 200
+        assert b'Invalid username or password.' in response.data
+        assert unknown_usernames.contains('nosuchuser') is True
+        assert calls == ['password123']
+
+    def test_cached_username_logs_in_after_account_creation(self, client, test_factory):
+        """Test a previously unknown username can log in once the account exists."""
+        self._login(client, 'lateplayer')
+        test_factory.create_user(username='lateplayer')
+
+        response = self._login(client, 'lateplayer')
+        assert response.status_code == 302
+
+    def test_rate_limited_login_skips_hashing(self, client, test_user, monkeypatch):
+        """Test rate-limited attempts are rejected before any password check."""
+        for _ in range(3):
+            rate_limiter.record_login_result('127.0.0.1', test_user.username, success=False)
+        monkeypatch.setattr(type(test_user), 'check_password',
+                            lambda self, password: pytest.fail('password checked'))
+
+        response = self._login(client, test_user.username)
+
+        assert b'Too many failed login attempts' in response.data
+        assert login_timings.get_stats()['outcomes'] == {'rate_limited': 1}
+
+    def test_stage_timings_recorded(self, client, test_user):
+        """Test a successful login records every stage it passed through."""
+        response = self._login(client, test_user.username)
+
+        assert response.status_code == 302
+        stats = login_timings.get_stats()
+        assert stats['outcomes'] == {'success': 1}
+        assert {'form', 'rate_limit', 'validate', 'lookup', 'verify', 'total'} <= set(stats['stages'])
+
+    def test_login_stats_endpoint(self, authenticated_admin):
+        """Test the admin login stats endpoint."""
+        response = authenticated_admin.get('/health/login')
+
+        assert response.status_code == 200
+        data = response.get_json()
+        assert 'timings' in data
+        assert 'unknown_username_cache' in data
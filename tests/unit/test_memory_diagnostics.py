@@ -0,0 +1,190 @@
+"""
+Unit tests for the tracemalloc memory diagnostics.
+"""
+
+import threading
+import tracemalloc
+
+import pytest
+
+from app import db_performance, memory_diagnostics
+from app.memory_diagnostics import MemoryTracer, count_orm_objects, memory_tracer, structure_sizes
+from app.security import rate_limiter
+
+
+# Kept alive between snapshots so the diff has something to find
+_retained = []
+
+
+def _allocate():
+    _retained.append([object() for _ in range(5000)])
+
+
+@pytest.fixture
+def tracer():
+    """A tracer that leaves tracemalloc stopped."""
+    tracer = MemoryTracer(max_snapshots=2)
+    yield tracer
+    tracer.stop()
+    _retained.clear()
+
+
+@pytest.fixture
+def global_tracer():
+    """Leave the global tracer stopped and without snapshots."""
+    yield memory_tracer
+    memory_tracer.stop()
+    memory_tracer.snapshots.clear()
+
+
+class TestMemoryTracer:
+    """Test cases for MemoryTracer."""
+
+    def test_start_stop(self, tracer):
+        """Test tracing is only turned on and off once."""
+        assert tracer.start() is True
+        assert tracer.start() is False
+        assert tracer.get_status()['tracing'] is True
+        assert tracer.stop() is True
+        assert tracer.stop() is False
+        assert tracemalloc.is_tracing() is False
+
+    def test_snapshot_requires_tracing(self, tracer):
+        """Test snapshots cannot be taken while tracemalloc is stopped."""
+        with pytest.raises(RuntimeError):
+            tracer.take_snapshot()
+
+    def test_diff_finds_allocation_site(self, tracer):
+        """Test the diff attributes growth to the allocating file and line."""
+        tracer.start()
+        first = tracer.take_snapshot()['id']
+        _allocate()
+        second = tracer.take_snapshot()['id']
+
+        diff = tracer.diff(first, second)
+
+        assert diff['size_diff_kb'] > 0
+        top = diff['top'][0]
+        assert top['file'] == __file__
+        assert top['count_diff'] >= 5000
+
+    def test_group_by_filename(self, tracer):
+        """Test growth can be grouped per file."""
+        tracer.start()
+        first = tracer.take_snapshot()['id']
+        _allocate()
+        second = tracer.take_snapshot()['id']
+
+        files = [entry['file'] for entry in tracer.diff(first, second, group_by='filename')['top']]
+
+        assert __file__ in files
+
+    def test_snapshots_bounded(self, tracer):
+        """Test only max_snapshots snapshots are kept, oldest dropped first."""
+        tracer.start()
+        ids = [tracer.take_snapshot()['id'] for _ in range(3)]
+
+        assert list(tracer.snapshots) == ids[1:]
+        with pytest.raises(KeyError):
+            tracer.diff(ids[0], ids[2])
+
+
+class TestStructureSizes:
+    """Test cases for structure_sizes."""
+
+    def test_reports_known_structures(self, app_context):
+        """Test every known structure is reported."""
+        sizes = structure_sizes()
+
+        assert {'query_cache', 'query_stats', 'rate_limiter', 'error_metrics',
+                'fragment_cache', 'unknown_usernames', 'session_identity_map'} <= set(sizes)
+
+    def test_rate_limiter_growth_visible(self, app_context):
+        """Test new rate-limiter keys show up in the report."""
+        before = structure_sizes()['rate_limiter']
+        for index in range(20):
+            rate_limiter.is_rate_limited(f'memory_test_{index}')
+        after = structure_sizes()['rate_limiter']
+
+        try:
+            assert after['keys'] == before['keys'] + 20
+            assert after['estimated_kb'] > before['estimated_kb']
+        finally:
+            for index in range(20):
+                rate_limiter.requests.pop(f'memory_test_{index}', None)
+
+    def test_cached_orm_objects_counted(self, app_context, test_user):
+        """Test ORM objects held by cached results are counted once each."""
+        assert count_orm_objects({'users': [test_user, test_user], 'page': (test_user,)}) == 1
+
+        optimizer = db_performance.db_optimizer
+        optimizer.cache.set('memory_test_user', [test_user], ttl=60)
+        try:
+            assert structure_sizes()['query_cache']['orm_objects'] >= 1
+        finally:
+            optimizer.invalidate_cache('memory_test')
+
+
+    def test_cache_unlocked_while_counting(self, app_context, monkeypatch):
+        """Test cached queries are not blocked while ORM objects are counted."""
+        lock = db_performance.db_optimizer.cache._lock
+        free = []
+
+        def count(values):
+            def try_lock():
+                if lock.acquire(timeout=1):
+                    free.append(True)
+                    lock.release()
+            thread = threading.Thread(target=try_lock)
+            thread.start()
+            thread.join()
+            return 0
+
+        monkeypatch.setattr(memory_diagnostics, 'count_orm_objects', count)
+        structure_sizes()
+
+        assert free == [True]
+
+
+class TestMemoryEndpoints:
+    """Test cases for the /health/memory endpoints."""
+
+    def test_requires_admin(self, authenticated_user):
+        """Test regular users cannot start tracing."""
+        response = authenticated_user.post('/health/memory/tracemalloc', json={'action': 'start'})
+
+        assert response.status_code in (302, 403)
+        assert tracemalloc.is_tracing() is False
+
+    def test_status(self, authenticated_admin):
+        """Test the status reports tracing state and structure sizes."""
+        data = authenticated_admin.get('/health/memory').get_json()
+
+        assert data['tracemalloc']['tracing'] is False
+        assert 'rate_limiter' in data['structures']
+
+    def test_snapshot_and_diff(self, authenticated_admin, global_tracer):
+        """Test tracing, two snapshots and their diff over HTTP."""
+        assert authenticated_admin.post('/health/memory/snapshots').status_code == 409
+        assert authenticated_admin.post('/health/memory/tracemalloc',
+                                        json={'action': 'start'}).status_code == 200
+
+        first = authenticated_admin.post('/health/memory/snapshots').get_json()['snapshot']['id']
+        _allocate()
+        response = authenticated_admin.post('/health/memory/snapshots')
+        second = response.get_json()['snapshot']['id']
+        assert response.status_code == 201
+
+        diff = authenticated_admin.get(f'/health/memory/snapshots/{first}/diff/{second}').get_json()['diff']
+        assert any(entry['file'] == __file__ for entry in diff['top'])
+
+        authenticated_admin.post('/health/memory/tracemalloc', json={'action': 'stop'})
+        assert tracemalloc.is_tracing() is False
+        _retained.clear()
+
+    def test_invalid_requests(self, authenticated_admin, global_tracer):
+        """Test bad actions, groupings and unknown snapshots are rejected."""
+        assert authenticated_admin.post('/health/memory/tracemalloc',
+                                        json={'action': 'pause'}).status_code == 400
+        assert authenticated_admin.get('/health/memory/snapshots/1/diff/2?group_by=module').status_code == 400
+        assert authenticated_admin.get('/health/memory/snapshots/98/diff/99').status_code == 404
@@ -0,0 +1,221 @@
+"""
+Unit tests for the metrics registry and the components producing into it.
+"""
+
+import threading
+
+import pytest
+
+from app.db_logging import PerformanceMetricsCollector
+from app.db_performance import DatabasePerformanceMonitor
+from app.error_tracking import ErrorMetrics
+from app.metrics import MetricsRegistry, series_name
+
+
+def _run_threads(count, target):
+    threads = [threading.Thread(target=target) for _ in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+
+class _SnapshotLog:
+    """Stands in for DatabasePerformanceLogger, keeping exported snapshots."""
+
+    def __init__(self):
+        self.snapshots = []
+
+    def log_metrics_snapshot(self, snapshot):
+        self.snapshots.append(snapshot)
+
+
+class TestMetricsRegistry:
+    """Test cases for MetricsRegistry."""
+
+    def test_thread_shards_merged(self):
+        """Test counts from many threads add up when read."""
+        registry = MetricsRegistry()
+        counter = registry.counter('requests')
+        barrier = threading.Barrier(8)
+
+        def work():
+            barrier.wait()
+            for _ in range(1000):
+                counter.inc()
+                counter.inc(2, 'labelled')
+
+        _run_threads(8, work)
+
+        assert counter.value() == 8000
+        assert counter.values() == {None: 8000, 'labelled': 16000}
+
+    def test_finished_thread_shards_retired(self):
+        """Test shards of finished threads are folded in and their counts kept."""
+        registry = MetricsRegistry()
+        counter = registry.counter('jobs')
+        _run_threads(5, counter.inc)
+
+        assert counter.value() == 5
+        assert registry.get_stats()['shards'] == 0
+
+        counter.inc()
+        assert counter.value() == 6
+        assert registry.get_stats()['shards'] == 1
+
+    def test_histogram_stats(self):
+        """Test histograms summarize count, sum, extremes and bucket percentiles."""
+        registry = MetricsRegistry()
+        histogram = registry.histogram('latency', buckets=(0.01, 0.1, 1.0))
+        for value in [0.005] * 90 + [0.05] * 9 + [3.0]:
+            histogram.observe(value, 'select')
+
+        stats = histogram.stats()['select']
+
+        assert stats['count'] == 100
+        assert stats['sum'] == pytest.approx(0.45 + 0.45 + 3.0)
+        assert (stats['min'], stats['max']) == (0.005, 3.0)
+        assert (stats['p50'], stats['p95'], stats['p99']) == (0.01, 0.1, 0.1)
+
+    def test_histogram_merges_shards(self):
+        """Test histogram series from several threads merge into one."""
+        registry = MetricsRegistry()
+        histogram = registry.histogram('latency')
+        values = iter([0.5, 0.001, 2.0])
+        _run_threads(3, lambda: histogram.observe(next(values)))
+
+        stats = histogram.stats()[None]
+
+        assert stats['count'] == 3
+        assert (stats['min'], stats['max']) == (0.001, 2.0)
+
+    def test_gauges(self):
+        """Test gauges can be set, adjusted with a floor and raised to a peak."""
+        registry = MetricsRegistry()
+        gauge = registry.gauge('connections')
+
+        assert gauge.add(1, 'active') == 1
+        assert gauge.add(-5, 'active', minimum=0) == 0
+        gauge.set_max(3, 'peak')
+        gauge.set_max(2, 'peak')
+        gauge.set(5, 'pool_size')
+
+        assert gauge.values() == {'active': 0, 'peak': 3, 'pool_size': 5}
+
+    def test_reset_by_prefix(self):
+        """Test reset only drops metrics under the prefix."""
+        registry = MetricsRegistry()
+        registry.counter('db.queries').inc()
+        registry.histogram('db.latency').observe(0.1)
+        registry.counter('errors').inc()
+
+        registry.reset('db.')
+
+        assert registry.snapshot()['counters'] == {'errors': 1}
+        assert registry.snapshot()['histograms'] == {}
+
+    def test_snapshot_series_names(self):
+        """Test snapshots key series by 'name' or 'name[label]'."""
+        registry = MetricsRegistry()
+        registry.counter('errors').inc(label='NOT_FOUND')
+        registry.gauge('pool').set(5)
+
+        snapshot = registry.snapshot()
+
+        assert snapshot['counters'] == {'errors[NOT_FOUND]': 1}
+        assert snapshot['gauges'] == {'pool': 5}
+        assert series_name('errors', 'NOT_FOUND') == 'errors[NOT_FOUND]'
+
+    def test_kind_conflict(self):
+        """Test a name cannot be registered as two kinds of metric."""
+        registry = MetricsRegistry()
+        assert registry.counter('hits') is registry.counter('hits')
+        with pytest.raises(ValueError):
+            registry.gauge('hits')
+
+
+class TestProducers:
+    """Test cases for the components recording into the registry."""
+
+    def test_monitor_queries_and_cache(self):
+        """Test the monitor's summary is read back from the registry."""
+        registry = MetricsRegistry()
+        monitor = DatabasePerformanceMonitor(registry)
+        monitor.record_query('SELECT * FROM user WHERE id = 1', 0.002)
+        monitor.record_query('SELECT * FROM user WHERE id = 2', 0.004)
+        monitor.record_query('SELECT * FROM comment', 0.5)
+        for event in ('hit', 'hit', 'miss', 'stale'):
+            monitor.record_cache_event(event)
+        monitor.record_request_memo(hits=3, misses=1)
+
+        summary = monitor.get_performance_summary()
+
+        assert summary['query_stats']['total_queries'] == 3
+        assert summary['query_stats']['slowest_queries'][0]['query'] == 'SELECT * FROM comment'
+        assert summary['query_stats']['slowest_queries'][1]['count'] == 2
+        assert summary['cache_stats']['hit_rate'] == 0.75
+        assert (summary['cache_stats']['request_hits'], summary['cache_stats']['requests']) == (3, 1)
+        assert len(monitor.get_slow_queries()) == 1
+        assert 'db.query.duration[SELECT * FROM comment]' in registry.snapshot()['histograms']
+
+    def test_monitor_connections_and_reset(self):
+        """Test connection gauges and that reset clears the monitor's metrics."""
+        registry = MetricsRegistry()
+        monitor = DatabasePerformanceMonitor(registry)
+        for event in ('connect', 'connect', 'disconnect', 'error'):
+            monitor.record_connection_event(event)
+        monitor.record_connection_event('pool_info', pool_size=10)
+
+        stats = monitor.connection_stats
+        assert (stats['total_connections'], stats['active_connections'], stats['peak_connections']) == (2, 1, 2)
+        assert (stats['connection_errors'], stats['pool_size']) == (1, 10)
+
+        monitor.reset_stats()
+        assert monitor.connection_stats['total_connections'] == 0
+        assert monitor.get_performance_summary()['query_stats']['total_queries'] == 0
+
+    def test_error_counts(self):
+        """Test error counts by type and severity go to the registry."""
+        registry = MetricsRegistry()
+        metrics = ErrorMetrics(registry=registry)
+        metrics.record_error('NOT_FOUND', 'missing', severity='INFO')
+        metrics.record_error('NOT_FOUND', 'missing', severity='INFO')
+        metrics.record_error('DATABASE_ERROR', 'down')
+
+        assert metrics.error_counts == {'NOT_FOUND': 2, 'DATABASE_ERROR': 1}
+        assert registry.snapshot()['counters']['errors.severity[INFO]'] == 2
+
+    def test_collector_exports_snapshots(self):
+        """Test the collector records into the registry and exports snapshots."""
+        registry = MetricsRegistry()
+        log = _SnapshotLog()
+        collector = PerformanceMetricsCollector(log, registry)
+
+        collector.flush_metrics()
+        assert log.snapshots == []  # Nothing recorded yet
+
+        collector.collect_query_metric('SELECT ?', 0.01)
+        collector.collect_cache_metric('hit')
+        collector.collect_connection_metric('connect')
+        collector.flush_metrics()
+
+        snapshot = log.snapshots[0]
+        assert snapshot['counters'] == {'db.cache.events[hit]': 1, 'db.connection.events[connect]': 1}
+        assert snapshot['histograms']['db.query.duration[SELECT ?]']['count'] == 1
+        assert snapshot['cumulative_since'] == registry.created_at.isoformat()
+
+        collector.collect_cache_metric('hit')
+        collector.flush_metrics()
+        assert log.snapshots[1]['counters']['db.cache.events[hit]'] == 2  # Cumulative, not per flush
+
+
+class TestMetricsEndpoint:
+    """Test cases for /health/metrics."""
+
+    def test_snapshot(self, authenticated_admin):
+        """Test admins get the global registry snapshot."""
+        data = authenticated_admin.get('/health/metrics').get_json()
+
+        assert data['status'] == 'success'
+        assert set(data['metrics']) == {'counters', 'gauges', 'histograms'}
+        assert data['registry']['metrics'] > 0
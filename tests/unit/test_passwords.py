@@ -0,0 +1,148 @@
+"""
+Unit tests for the pluggable password hasher.
+"""
+
+import runpy
+import threading
+from pathlib import Path
+
+import pytest
+from werkzeug.security import generate_password_hash
+
+from app import db
+from app.models import User
+from app.passwords import PasswordHasher, hash_method_of, password_hasher
+
+
+RUN_SCRIPT = str(Path(__file__).parents[2] / 'run.py')
+
+
+def _import_run_script():
+    """Import run.py the way a spawned pool worker imports the main script."""
+    namespace = runpy.run_path(RUN_SCRIPT, run_name='__mp_main__')
+    return 'app' in namespace, sorted(thread.name for thread in threading.enumerate())
+
+
+class TestPasswordHasher:
+    """Test cases for PasswordHasher."""
+
+    def test_pbkdf2_hash_and_verify(self):
+        """Test PBKDF2 hashes carry their iteration count and verify."""
+        hasher = PasswordHasher('pbkdf2', pbkdf2_iterations=1500)
+        hashed = hasher.hash('password123')
+
+        assert hashed.startswith('pbkdf2:sha256:1500$')
+        assert hasher.verify(hashed, 'password123') is True
+        assert hasher.verify(hashed, 'wrongpassword1') is False
+
+    def test_scrypt_hash_and_verify(self):
+        """Test scrypt hashes carry their cost parameters and verify."""
+        hasher = PasswordHasher('scrypt', scrypt_n=2 ** 10, scrypt_r=8, scrypt_p=1)
+        hashed = hasher.hash('password123')
+
+        assert hashed.startswith('scrypt:1024:8:1$')
+        assert len(hashed) <= User.__table__.c.password_hash.type.length
+        assert hasher.verify(hashed, 'password123') is True
+        assert hasher.verify(hashed, 'wrongpassword1') is False
+
+    def test_bcrypt_hash_and_verify(self):
+        """Test bcrypt hashes verify, including passwords longer than 72 bytes."""
+        pytest.importorskip('bcrypt')
+        hasher = PasswordHasher('bcrypt', bcrypt_rounds=4)
+        long_password = 'a1' * 60
+        hashed = hasher.hash(long_password)
+
+        assert hash_method_of(hashed) == 'bcrypt:4'
+        assert hasher.verify(hashed, long_password) is True
+        assert hasher.verify(hashed, long_password[:72] + 'zz9') is False
+
+    def test_unknown_algorithm_rejected(self):
+        """Test configuring an unsupported algorithm fails."""
+        with pytest.raises(ValueError, match="Unsupported password hash algorithm"):
+            PasswordHasher('md5')
+
+    def test_verifies_hashes_from_other_algorithms(self):
+        """Test a hasher verifies hashes made with different settings."""
+        legacy_hash = generate_password_hash('password123', method='pbkdf2:sha256:1000')
+        hasher = PasswordHasher('scrypt', scrypt_n=2 ** 10)
+
+        assert hasher.verify(legacy_hash, 'password123') is True
+        assert hasher.verify('', 'password123') is False
+        assert hasher.verify('not-a-hash', 'password123') is False
+
+    def test_needs_rehash(self):
+        """Test hashes made with a different algorithm or cost need rehashing."""
+        hasher = PasswordHasher('pbkdf2', pbkdf2_iterations=2000)
+
+        assert hasher.needs_rehash(hasher.hash('password123')) is False
+        assert hasher.needs_rehash(generate_password_hash('password123', method='pbkdf2:sha256:1000')) is True
+        assert hasher.needs_rehash(generate_password_hash('password123', method='scrypt:1024:8:1')) is True
+        assert hasher.needs_rehash('not-a-hash') is True
+
+    def test_process_pool_hashing(self):
+        """Test hashing and verification through worker processes."""
+        hasher = PasswordHasher('pbkdf2', pbkdf2_iterations=1000, pool_size=1)
+        try:
+            hashed = hasher.hash('password123')
+            assert hashed.startswith('pbkdf2:sha256:1000$')
+            assert hasher.verify(hashed, 'password123') is True
+            assert hasher.verify(hashed, 'wrongpassword1') is False
+        finally:
+            hasher.shutdown()
+
+    def test_pool_worker_creates_no_app(self):
+        """Test a pool worker re-importing run.py starts no app or background threads."""
+        hasher = PasswordHasher('pbkdf2', pbkdf2_iterations=1000, pool_size=1)
+        try:
+            has_app, threads = hasher._get_pool().submit(_import_run_script).result(timeout=60)
+        finally:
+            hasher.shutdown()
+
+        assert has_app is False
+        assert threads == ['MainThread']
+
+    def test_app_config_applied(self, app):
+        """Test the global hasher is configured from the application config."""
+        assert password_hasher.method == f"pbkdf2:sha256:{app.config['PASSWORD_PBKDF2_ITERATIONS']}"
+
+
+class TestRehashOnLogin:
+    """Test cases for upgrading stored hashes on login."""
+
+    def test_rehash_password(self, app_context):
+        """Test rehash_password only replaces outdated hashes."""
+        user = User(username='rehashuser', password='password123')
+        assert user.rehash_password('password123') is False
+
+        user.password_hash = generate_password_hash('password123', method='pbkdf2:sha256:1500')
+        assert user.rehash_password('password123') is True
+        assert password_hasher.needs_rehash(user.password_hash) is False
+        assert user.check_password('password123') is True
+
+    def test_login_upgrades_outdated_hash(self, client, test_user):
+        """Test a successful login stores a hash made with the current settings."""
+        test_user.password_hash = generate_password_hash('password123', method='pbkdf2:sha256:1500')
+        db.session.commit()
+
+        response = client.post('/auth/login', data={
+            'username': test_user.username,
+            'password': 'password123'
+        })
+
+        assert response.status_code == 302
+        user = db.session.get(User, test_user.id)
+        assert hash_method_of(user.password_hash) == password_hasher.method
+        assert user.check_password('password123') is True
+
+    def test_failed_login_keeps_hash(self, client, test_user):
+        """Test a failed login leaves the stored hash untouched."""
+        legacy_hash = generate_password_hash('password123', method='pbkdf2:sha256:1500')
+        test_user.password_hash = legacy_hash
+        db.session.commit()
+
+        client.post('/auth/login', data={
+            'username': test_user.username,
+            'password': 'wrongpassword1'
+        })
+
+        assert db.session.get(User, test_user.id).password_hash == legacy_hash
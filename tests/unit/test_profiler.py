@@ -0,0 +1,177 @@
+"""
+Unit tests for the sampling profiler.
+"""
+
+import sys
+import threading
+import time
+
+import pytest
+
+from app.profiler import TRUNCATED_STACK, SamplingProfiler, collapse_stack, sampling_profiler
+
+
+def _busy_endpoint(profiler, endpoint, stop):
+    """Serve 'endpoint' until stop is set."""
+    profiler.enter_request(endpoint)
+    try:
+        while not stop.is_set():
+            sum(range(1000))
+    finally:
+        profiler.exit_request()
+
+
+def _profile(profiler, endpoint='main.busy', **options):
+    """Run a short profile while a thread serves endpoint."""
+    stop = threading.Event()
+    assert profiler.start(**options)
+    worker = threading.Thread(target=_busy_endpoint, args=(profiler, endpoint, stop))
+    worker.start()
+    profiler._thread.join(5)
+    stop.set()
+    worker.join(5)
+
+
+@pytest.fixture
+def idle_profiler():
+    """Leave the global profiler stopped and empty after each test."""
+    yield sampling_profiler
+    sampling_profiler.stop()
+    sampling_profiler.stacks.clear()
+    sampling_profiler.info = {}
+
+
+class TestCollapseStack:
+    """Test cases for collapse_stack."""
+
+    def test_outermost_first(self):
+        """Test frames run from the outermost caller to the current function."""
+        def inner():
+            return collapse_stack(sys._getframe(), max_depth=2)
+
+        assert collapse_stack(sys._getframe(), 64).endswith('test_profiler:test_outermost_first')
+        assert inner() == f'{__name__}:test_outermost_first;{__name__}:inner'
+
+
+class TestSamplingProfiler:
+    """Test cases for SamplingProfiler."""
+
+    def test_stacks_per_endpoint(self):
+        """Test request threads are sampled under their endpoint."""
+        profiler = SamplingProfiler()
+        _profile(profiler, seconds=0.3, hz=100)
+        stats = profiler.get_stats()
+
+        assert stats['active'] is False
+        assert stats['samples'] > 5
+        assert list(stats['endpoints']) == ['main.busy']
+        assert f'{__name__}:_busy_endpoint' in profiler.collapsed('main.busy')
+
+    def test_collapsed_format(self):
+        """Test each line is 'endpoint;frames count', heaviest first."""
+        profiler = SamplingProfiler()
+        _profile(profiler, seconds=0.2, hz=100)
+        lines = profiler.collapsed().splitlines()
+        counts = [int(line.rsplit(' ', 1)[1]) for line in lines]
+
+        assert lines and all(line.startswith('main.busy;') for line in lines)
+        assert counts == sorted(counts, reverse=True)
+        assert profiler.collapsed('other.endpoint') == ''
+
+    def test_other_threads_only_when_requested(self):
+        """Test threads not serving a request are skipped unless include_threads is set."""
+        profiler = SamplingProfiler()
+        _profile(profiler, seconds=0.1, hz=50)
+        assert all(not name.startswith('thread:') for name in profiler.get_stats()['endpoints'])
+
+        _profile(profiler, seconds=0.1, hz=50, include_threads=True)
+        assert any(name.startswith('thread:') for name in profiler.get_stats()['endpoints'])
+
+    def test_limits(self):
+        """Test rate and duration are capped, and extra stacks are truncated."""
+        profiler = SamplingProfiler(max_hz=20, max_seconds=0.2, max_stacks=0)
+        _profile(profiler, seconds=30, hz=1000)
+        stats = profiler.get_stats()
+
+        assert stats['hz'] == 20 and stats['seconds'] == 0.2
+        assert stats['samples'] <= 6
+        assert stats['distinct_stacks'] == 1
+        assert stats['stacks_truncated'] > 0
+        assert f'main.busy;{TRUNCATED_STACK}' in profiler.collapsed()
+
+    def test_non_finite_options_rejected(self):
+        """Test NaN and infinite options are refused rather than clamped."""
+        profiler = SamplingProfiler()
+        for options in ({'seconds': float('nan')}, {'hz': float('nan')}, {'seconds': float('inf')}):
+            with pytest.raises(ValueError):
+                profiler.start(**options)
+
+        assert profiler.active is False
+
+    def test_one_profile_at_a_time(self):
+        """Test a second start is refused while a profile runs, and stop ends it early."""
+        profiler = SamplingProfiler()
+        assert profiler.start(seconds=30, hz=10)
+        try:
+            assert profiler.start() is False
+        finally:
+            started = time.perf_counter()
+            profiler.stop()
+
+        assert time.perf_counter() - started < 2
+        assert profiler.active is False
+        assert profiler.get_stats()['finished_at']
+
+
+class TestProfileEndpoint:
+    """Test cases for /health/profile."""
+
+    def test_requires_admin(self, authenticated_user):
+        """Test regular users cannot start a profile."""
+        response = authenticated_user.post('/health/profile', json={'seconds': 0.1})
+
+        assert response.status_code in (302, 403)
+        assert sampling_profiler.active is False
+
+    def test_start_and_read(self, authenticated_admin, idle_profiler):
+        """Test a profile started over HTTP runs in the background and is served as text."""
+        response = authenticated_admin.post('/health/profile', json={'seconds': 0.2, 'hz': 100})
+        assert response.status_code == 202
+        assert response.get_json()['profile']['active'] is True
+
+        idle_profiler._thread.join(5)
+        status = authenticated_admin.get('/health/profile?format=json').get_json()['profile']
+        text = authenticated_admin.get('/health/profile')
+
+        assert status['active'] is False
+        assert status['samples'] > 0
+        assert text.mimetype == 'text/plain'
+
+    def test_request_threads_tracked(self, app, idle_profiler):
+        """Test request threads are mapped to their endpoint only while profiling."""
+        with app.test_request_context('/livez'):
+            app.preprocess_request()
+            assert idle_profiler.request_threads == {}
+            app.do_teardown_request()
+
+        idle_profiler.start(seconds=30, hz=1)
+        with app.test_request_context('/livez'):
+            app.preprocess_request()
+            assert idle_profiler.request_threads[threading.get_ident()] == 'health.liveness'
+            app.do_teardown_request()
+        assert threading.get_ident() not in idle_profiler.request_threads
+
+    def test_busy(self, authenticated_admin, idle_profiler):
+        """Test starting a second profile answers 409."""
+        authenticated_admin.post('/health/profile', json={'seconds': 30})
+        response = authenticated_admin.post('/health/profile', json={'seconds': 30})
+
+        assert response.status_code == 409
+
+    def test_invalid_options(self, authenticated_admin, idle_profiler):
+        """Test non-numeric and non-finite options are rejected."""
+        for seconds in ('soon', 'nan'):
+            response = authenticated_admin.post('/health/profile', json={'seconds': seconds})
+
+            assert response.status_code == 400
+            assert idle_profiler.active is False
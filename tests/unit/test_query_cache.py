@@ -0,0 +1,288 @@
+"""
+Unit tests for the query result cache (single flight, stale-while-revalidate,
+probabilistic early expiration) and the request-scoped memo in front of it.
+"""
+
+import threading
+import time
+
+import pytest
+from flask import g
+
+from app import db_performance
+from app.db_performance import (DatabaseOptimizer, QueryCache, cache_namespace, estimate_size,
+                                invalidate_query_cache, query_performance_decorator)
+
+
+class _SlowQuery:
+    """Query function that counts its runs and blocks until released."""
+
+    def __init__(self, result='fresh'):
+        self.result = result
+        self.calls = 0
+        self.release = threading.Event()
+        self._lock = threading.Lock()
+
+    def __call__(self):
+        with self._lock:
+            self.calls += 1
+        self.release.wait(2)
+        return self.result
+
+
+def _expire(cache, key):
+    """Age an entry past its TTL (but not past its stale window)."""
+    cache.timestamps[key]['created'] -= cache.timestamps[key]['ttl'] + 1
+
+
+class TestQueryCache:
+    """Test cases for QueryCache."""
+
+    def test_lookup_states(self):
+        """Test entries are fresh, then stale within their window, then missing."""
+        cache = QueryCache()
+        cache.set('key', 'value', ttl=60, stale_ttl=30)
+        assert cache.lookup('key') == ('value', 'fresh')
+
+        _expire(cache, 'key')
+        assert cache.lookup('key') == ('value', 'stale')
+        assert cache.get('key') is None
+
+        cache.timestamps['key']['created'] -= 30
+        assert cache.lookup('key') == (None, 'miss')
+        assert 'key' not in cache.cache
+
+    def test_early_expiration(self, monkeypatch):
+        """Test slow results near expiry are picked for an early refresh."""
+        monkeypatch.setattr(db_performance.random, 'random', lambda: 0.5)
+        cache = QueryCache()
+        cache.set('slow', 'value', ttl=60, compute_time=100.0)
+        cache.set('fast', 'value', ttl=60, compute_time=0.01)
+
+        assert cache.lookup('slow', early_expiry_beta=1.0)[1] == 'refresh'
+        assert cache.lookup('slow', early_expiry_beta=0.0)[1] == 'fresh'
+        assert cache.lookup('fast', early_expiry_beta=1.0)[1] == 'fresh'
+
+    def test_invalidation_supersedes_running_fills(self):
+        """Test a result computed before an invalidation is not stored."""
+        cache = QueryCache()
+        generation = cache.generation
+        cache.invalidate('key')
+
+        assert cache.set('key', 'old', generation=generation) is False
+        assert cache.lookup('key') == (None, 'miss')
+
+    def test_cleanup_keeps_stale_window(self):
+        """Test the sweeper only drops entries past their stale window."""
+        cache = QueryCache()
+        cache.set('stale', 'value', ttl=60, stale_ttl=30)
+        cache.set('expired', 'value', ttl=60)
+        _expire(cache, 'stale')
+        _expire(cache, 'expired')
+
+        assert cache.cleanup_expired() == 1
+        assert 'stale' in cache.cache
+
+    def test_full_cache_evicts_oldest(self):
+        """Test a full cache drops its oldest entries."""
+        cache = QueryCache(max_size=4)
+        for index in range(5):
+            cache.set(f'key{index}', index)
+
+        assert 'key0' not in cache.cache
+        assert 'key4' in cache.cache
+
+
+class TestMemoryBudget:
+    """Test cases for the query cache's byte accounting."""
+
+    def test_namespaces(self):
+        """Test keys are grouped by their leading words."""
+        assert cache_namespace('availability_range_2026-01-01_2026-01-31_0') == 'availability_range'
+        assert cache_namespace('user_availability_history_5_50') == 'user_availability_history'
+        assert cache_namespace('user_stats') == 'user_stats'
+
+    def test_estimate_counts_shared_objects_once(self):
+        """Test a value referenced by many entries is only counted once."""
+        shared = 'x' * 10000
+        assert estimate_size([shared] * 50) < estimate_size([shared]) + 1000
+        assert estimate_size(['x' * 10000 + str(index) for index in range(50)]) > 50 * 10000
+
+    def test_estimate_orm_objects(self, app_context, test_user, test_factory):
+        """Test ORM results count their loaded attributes and related objects."""
+        entry = test_factory.create_availability(test_user, date_offset=1)
+        entry.user  # Load the relationship
+
+        assert estimate_size([entry]) > estimate_size([]) + estimate_size(test_user.username)
+
+    def test_budget_evicts_oldest_in_namespace(self):
+        """Test a namespace over budget drops its own oldest entries only."""
+        cache = QueryCache(namespace_budget=25000)
+        cache.set('user_stats', {'total': 1})
+        for day in range(3):
+            cache.set(f'availability_range_{day}', 'x' * 10000)
+
+        stats = cache.get_stats()
+        assert 'availability_range_0' not in cache.cache
+        assert 'user_stats' in cache.cache
+        assert stats['namespaces']['availability_range']['evictions'] == 1
+        assert stats['namespaces']['availability_range']['bytes'] <= 25000
+
+    def test_oversized_entry_rejected(self):
+        """Test a result larger than its namespace budget is not cached."""
+        cache = QueryCache(namespace_budget=1000, namespace_budgets={'big': 100000})
+
+        assert cache.set('recent_comments_100', 'x' * 5000) is False
+        assert cache.set('big_1', 'x' * 5000) is True
+        assert cache.get_stats()['namespaces']['recent_comments']['rejected'] == 1
+
+    def test_bytes_released(self):
+        """Test replaced and invalidated entries give back their bytes."""
+        cache = QueryCache(namespace_budget=100000)
+        cache.set('user_stats', 'x' * 1000)
+        cache.set('user_stats', 'x' * 2000)
+        assert cache.get_stats()['bytes'] == cache.sizes['user_stats']
+
+        cache.invalidate('user_')
+        assert cache.get_stats()['bytes'] == 0
+        assert not cache.namespace_bytes
+
+
+class TestCachedQuery:
+    """Test cases for DatabaseOptimizer.cached_query."""
+
+    def _optimizer(self):
+        return DatabaseOptimizer(db=None)
+
+    def test_concurrent_misses_run_once(self):
+        """Test simultaneous misses for one key share a single query."""
+        optimizer = self._optimizer()
+        query = _SlowQuery()
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(optimizer.cached_query('key', query)))
+            for _ in range(8)
+        ]
+        for thread in threads:
+            thread.start()
+        time.sleep(0.1)
+        query.release.set()
+        for thread in threads:
+            thread.join()
+
+        assert query.calls == 1
+        assert results == ['fresh'] * 8
+        assert optimizer.monitor.cache_stats['coalesced'] == 7
+
+    def test_failed_fill_lets_waiters_retry(self):
+        """Test waiters run the query themselves when the leader fails."""
+        optimizer = self._optimizer()
+        flight, leader = optimizer._join_flight('key')
+        assert leader
+
+        threading.Timer(0.05, flight.done.set).start()
+
+        assert optimizer.cached_query('key', lambda: 'own') == 'own'
+
+    def test_stale_value_served_while_refreshing(self, app):
+        """Test an expired result is returned at once and refreshed in the background."""
+        app.config['QUERY_CACHE_STALE_SECONDS'] = 30
+        try:
+            optimizer = self._optimizer()
+            with app.app_context():
+                optimizer.cached_query('key', lambda: 'old')
+                _expire(optimizer.cache, 'key')
+
+                query = _SlowQuery('new')
+                assert optimizer.cached_query('key', query) == 'old'
+                assert optimizer.cached_query('key', query) == 'old'
+                query.release.set()
+
+                deadline = time.time() + 2
+                while optimizer.cache.get('key') != 'new' and time.time() < deadline:
+                    time.sleep(0.01)
+        finally:
+            app.config['QUERY_CACHE_STALE_SECONDS'] = 0
+
+        assert optimizer.cache.get('key') == 'new'
+        assert query.calls == 1
+        assert optimizer.monitor.cache_stats['stale_hits'] == 2
+
+    def test_invalidation_drops_stale_values(self, app):
+        """Test invalidated entries are recomputed rather than served stale."""
+        app.config['QUERY_CACHE_STALE_SECONDS'] = 30
+        try:
+            optimizer = self._optimizer()
+            with app.app_context():
+                optimizer.cached_query('key', lambda: 'old')
+                _expire(optimizer.cache, 'key')
+                optimizer.invalidate_cache('key')
+
+                assert optimizer.cached_query('key', lambda: 'new') == 'new'
+        finally:
+            app.config['QUERY_CACHE_STALE_SECONDS'] = 0
+
+
+class TestRequestMemo:
+    """Test cases for the request-scoped (L1) query memo."""
+
+    @pytest.fixture(autouse=True)
+    def clear_cached_results(self, app):
+        with app.app_context():
+            invalidate_query_cache('memo_')
+
+    def _counted_query(self, calls):
+        @query_performance_decorator(cache_key_func=lambda: 'memo_test', ttl=60)
+        def query():
+            calls.append(1)
+            return len(calls)
+        return query
+
+    def test_shared_cache_consulted_once_per_request(self, app, monkeypatch):
+        """Test repeated calls in one request are answered without the shared cache."""
+        optimizer = db_performance.db_optimizer
+        lookups = []
+        lookup = optimizer.cache.lookup
+        monkeypatch.setattr(optimizer.cache, 'lookup',
+                            lambda key, *args: lookups.append(key) or lookup(key, *args))
+        query = self._counted_query([])
+
+        with app.test_request_context('/'):
+            assert [query() for _ in range(3)] == [1, 1, 1]
+            assert g._query_memo.hits == 2
+
+        assert lookups == ['memo_test']
+
+    def test_invalidation_clears_memo(self, app):
+        """Test a request sees fresh results after its own write invalidates them."""
+        calls = []
+        query = self._counted_query(calls)
+
+        with app.test_request_context('/'):
+            assert query() == 1
+            invalidate_query_cache('memo_')
+            assert query() == 2
+
+    def test_hits_reported_at_teardown(self, app):
+        """Test per-request memo hits are added to the monitor's cache stats."""
+        monitor = db_performance.db_optimizer.monitor
+        before = (monitor.cache_stats['request_hits'], monitor.cache_stats['requests'])
+        query = self._counted_query([])
+
+        with app.test_request_context('/'):
+            query()
+            query()
+
+        stats = monitor.cache_stats
+        assert (stats['request_hits'], stats['requests']) == (before[0] + 1, before[1] + 1)
+
+    def test_no_memo_outside_requests(self, app_context):
+        """Test background code without a request always reads the shared cache."""
+        calls = []
+        query = self._counted_query(calls)
+
+        query()
+        invalidate_query_cache('memo_')
+        query()
+
+        assert len(calls) == 2
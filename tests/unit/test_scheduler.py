@@ -0,0 +1,93 @@
+"""
+Unit tests for the background maintenance scheduler and its jobs.
+"""
+
+import time as time_module
+from datetime import datetime, timedelta
+
+from app.db_performance import QueryCache
+from app.scheduler import MaintenanceScheduler
+from app.security import RateLimiter
+
+
+class TestMaintenanceScheduler:
+    """Test cases for MaintenanceScheduler."""
+
+    def test_run_pending_runs_due_jobs(self):
+        """Jobs run once due and are rescheduled one interval later."""
+        scheduler = MaintenanceScheduler()
+        calls = []
+        job = scheduler.add_job('count', lambda: calls.append(1), interval=60, jitter=0)
+        job.next_run = 100
+
+        assert scheduler.run_pending(now=50) == []
+        assert scheduler.run_pending(now=100) == ['count']
+        assert calls == [1]
+        assert job.next_run == 160
+        assert scheduler.run_pending(now=120) == []
+
+    def test_job_errors_are_recorded(self):
+        """A failing job does not stop the scheduler and its error is kept."""
+        scheduler = MaintenanceScheduler()
+
+        def fail():
+            raise RuntimeError('broken')
+
+        job = scheduler.add_job('fail', fail, interval=10, jitter=0)
+        job.next_run = 0
+        scheduler.run_pending(now=1)
+
+        assert job.error_count == 1
+        assert job.last_error == 'broken'
+        assert scheduler.get_status()['jobs'][0]['run_count'] == 1
+
+    def test_leader_only_jobs_need_leadership(self, tmp_path):
+        """Only the scheduler holding the lock file runs leader-only jobs."""
+        lock_path = str(tmp_path / 'maintenance.lock')
+        leader = MaintenanceScheduler(lock_path=lock_path)
+        follower = MaintenanceScheduler(lock_path=lock_path)
+
+        assert leader.try_acquire_leadership() is True
+        assert follower.try_acquire_leadership() is False
+
+        calls = []
+        job = follower.add_job('db', lambda: calls.append(1), interval=10, jitter=0, leader_only=True)
+        job.next_run = 0
+        assert follower.run_pending(now=1) == []
+
+        leader.release_leadership()
+        assert follower.try_acquire_leadership() is True
+        job.next_run = 0
+        assert follower.run_pending(now=1) == ['db']
+        follower.release_leadership()
+
+
+class TestMaintenanceJobs:
+    """Test cases for the housekeeping hooks used by scheduled jobs."""
+
+    def test_query_cache_cleanup_expired(self):
+        """Expired entries are swept without waiting for a lookup."""
+        cache = QueryCache()
+        cache.set('old', 1, ttl=1)
+        cache.set('fresh', 2, ttl=300)
+        cache.timestamps['old']['created'] = time_module.time() - 10
+
+        assert cache.cleanup_expired() == 1
+        assert set(cache.cache) == {'fresh'}
+
+    def test_rate_limiter_prune(self):
+        """Identifiers with no recent activity are dropped."""
+        limiter = RateLimiter()
+        now = datetime.utcnow()
+        limiter.requests['stale'] = [now - timedelta(hours=2)]
+        limiter.requests['active'] = [now - timedelta(hours=2), now]
+        limiter.login_attempts['stale'] = [now - timedelta(hours=2)]
+        limiter.blocked_ips['expired'] = now - timedelta(minutes=1)
+        limiter.locked_accounts['locked'] = now + timedelta(minutes=10)
+
+        assert limiter.prune(max_window_minutes=60) == 3
+        assert list(limiter.requests) == ['active']
+        assert len(limiter.requests['active']) == 1
+        assert limiter.login_attempts == {}
+        assert limiter.blocked_ips == {}
+        assert 'locked' in limiter.locked_accounts
@@ -0,0 +1,130 @@
+"""
+Unit tests for the production server launcher.
+"""
+
+import gc
+import subprocess
+import sys
+import textwrap
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+from click.testing import CliRunner
+
+from app import server
+from app.live_updates import availability_broker
+from app.scheduler import maintenance_scheduler
+
+
+class TestServerSettings:
+    """Test cases for gunicorn settings."""
+
+    def test_default_worker_count(self):
+        """Test workers scale with CPU cores."""
+        assert server.default_worker_count(1) == 3
+        assert server.default_worker_count(4) == 9
+
+    def test_settings_from_config(self):
+        """Test settings come from SERVER_* config with preloading and recycling on."""
+        settings = server.server_settings({
+            'SERVER_BIND': '0.0.0.0:8000',
+            'SERVER_WORKERS': 3,
+            'SERVER_THREADS': 4,
+            'SERVER_MAX_REQUESTS': 500
+        })
+
+        assert settings['bind'] == '0.0.0.0:8000'
+        assert settings['workers'] == 3
+        assert settings['threads'] == 4
+        assert settings['worker_class'] == 'gthread'
+        assert settings['preload_app'] is True
+        assert settings['max_requests'] == 500
+        assert settings['max_requests_jitter'] > 0
+
+    def test_overrides(self):
+        """Test command line values win and unset ones are ignored."""
+        settings = server.server_settings({'SERVER_WORKERS': 3}, workers=7, bind=None)
+
+        assert settings['workers'] == 7
+        assert settings['bind'] == '127.0.0.1:5000'
+
+    def test_workers_default_to_cpu_formula(self):
+        """Test an unset SERVER_WORKERS uses the CPU-based default."""
+        assert server.server_settings({})['workers'] == server.default_worker_count()
+
+
+class TestForkHooks:
+    """Test cases for the master and worker preparation hooks."""
+
+    def test_prepare_master(self, app):
+        """Test the master stops background threads and freezes the collector."""
+        try:
+            server.prepare_master(app)
+            assert gc.get_freeze_count() > 0
+            assert maintenance_scheduler.get_status()['running'] is False
+        finally:
+            gc.unfreeze()
+
+    def test_init_worker_limits_streams(self, app):
+        """Test a worker reserves half its threads for page requests."""
+        limit = availability_broker.max_subscribers
+        try:
+            server.init_worker(app, threads=8)
+            assert availability_broker.max_subscribers == 4
+        finally:
+            availability_broker.max_subscribers = limit
+
+    def test_purge_app_modules(self, monkeypatch):
+        """Test only application modules are forgotten before a reload."""
+        modules = {'app': object(), 'app.models': object(), 'apple': object(), 'flask': object()}
+        monkeypatch.setattr(server, 'sys', SimpleNamespace(modules=modules))
+
+        server.purge_app_modules()
+
+        assert set(modules) == {'apple', 'flask'}
+
+    def test_reload_does_not_stack_listeners(self):
+        """Test reloading the app leaves one set of Engine and Session listeners."""
+        script = textwrap.dedent("""
+            import importlib
+            from sqlalchemy.engine import Engine
+            from sqlalchemy.orm import Session
+            from app import server
+
+            counts = []
+            for _ in range(3):
+                importlib.import_module('app').create_app('testing')
+                counts.append((len(Engine.dispatch.before_cursor_execute._clslevel[Engine]),
+                               len(Session.dispatch.after_commit._clslevel[Session])))
+                server.purge_app_modules()
+            print(counts)
+        """)
+        result = subprocess.run([sys.executable, '-c', script], cwd=Path(__file__).parents[2],
+                                capture_output=True, text=True, timeout=120)
+
+        assert result.stdout.strip().splitlines()[-1] == '[(1, 1), (1, 1), (1, 1)]', result.stderr
+
+    def test_missing_gunicorn(self, monkeypatch):
+        """Test a clear error is raised when gunicorn is not installed."""
+        monkeypatch.setitem(sys.modules, 'gunicorn.app.base', None)
+
+        with pytest.raises(RuntimeError, match='gunicorn is not installed'):
+            server.run_server('testing')
+
+
+class TestDeployCommands:
+    """Test cases for the deploy.py server commands."""
+
+    def test_systemd_unit_uses_serve(self, tmp_path, monkeypatch):
+        """Test the generated unit runs the production server with reload support."""
+        import deploy
+        monkeypatch.chdir(tmp_path)
+
+        result = CliRunner().invoke(deploy.cli, ['create-systemd-service'])
+        unit = (tmp_path / 'badminton-scheduler.service').read_text()
+
+        assert result.exit_code == 0
+        assert 'deploy.py serve' in unit
+        assert 'run.py' not in unit
+        assert 'ExecReload=/bin/kill -s HUP $MAINPID' in unit